@@ -21,6 +21,7 @@ from app.schemas.academy import (
     AcademyStats,
 )
 from app.core.exceptions import NotFoundException
+from app.services.counting import COUNT_MODE_PATTERN, count_total
 
 router = APIRouter(prefix="/academies", tags=["Academy"])
 
@@ -52,6 +53,7 @@ async def list_academies(
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    count: str = Query("auto", regex=COUNT_MODE_PATTERN, description="Total: auto, exact, estimate or none"),
     region: Optional[str] = None,
     license_level: Optional[str] = None,
     is_active: bool = True,
@@ -64,8 +66,7 @@ async def list_academies(
     if license_level:
         query = query.where(Academy.license_level == license_level)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
+    total, total_mode = await count_total(db, query, count)
     
     query = query.order_by(Academy.name)
     offset = (page - 1) * per_page
@@ -77,7 +78,7 @@ async def list_academies(
     return AcademyListResponse(
         success=True,
         data=[AcademyResponse.model_validate(a) for a in academies],
-        meta={"total": total, "page": page, "per_page": per_page}
+        meta={"total": total, "total_mode": total_mode, "page": page, "per_page": per_page}
     )
 
 
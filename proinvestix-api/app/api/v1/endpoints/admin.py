@@ -13,8 +13,21 @@ from sqlalchemy import select, func, delete
 from app.db.database import get_db
 from app.db.models import User, Session, AuditLog
 from app.core.dependencies import get_current_user, require_roles
-from app.core.security import get_password_hash
-from app.core.exceptions import NotFoundException, AlreadyExistsException
+from app.core.security import get_password_hash_async, password_pool, token_cache
+from app.core.exceptions import NotFoundException, AlreadyExistsException, ValidationException
+from app.core.user_cache import invalidate_user, user_cache_stats
+from app.services.counting import count_cache
+from app.services.export import EXPORT_FORMAT_PATTERN, export_columns, export_response
+from app.services.gate_index import gate_index
+from app.services.percentiles import recompute_percentiles
+from app.services.resale import resale_market
+from app.services.rollups import ROLLUP_MODULES, rebuild_rollups, check_rollups
+from app.services.score_totals import recompute_score_totals
+from app.services.seating import seat_inventory
+from app.services.similarity import similarity_index
+from app.services.talent_facets import facet_stats
+from app.services.talent_search import rebuild_search_index
+from app.services.trends import recompute_trends
 from pydantic import BaseModel, EmailStr, Field
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -167,7 +180,7 @@ async def create_user(
     user = User(
         username=request.username,
         email=request.email,
-        password_hash=get_password_hash(request.password),
+        password_hash=await get_password_hash_async(request.password),
         role=request.role,
         first_name=request.first_name,
         last_name=request.last_name,
@@ -206,6 +219,7 @@ async def update_user(
         setattr(user, field, value)
     
     await db.commit()
+    await invalidate_user(user.id)
     await db.refresh(user)
     
     return UserResponse.model_validate(user)
@@ -229,6 +243,7 @@ async def delete_user(
     
     user.is_active = False
     await db.commit()
+    await invalidate_user(user.id)
 
 
 # =============================================================================
@@ -277,6 +292,22 @@ async def terminate_session(
 # AUDIT LOGS
 # =============================================================================
 
+def audit_log_conditions(
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+) -> list:
+    """WHERE conditions for the audit log filters."""
+    conditions = []
+    if user_id:
+        conditions.append(AuditLog.user_id == user_id)
+    if action:
+        conditions.append(AuditLog.action == action)
+    if resource_type:
+        conditions.append(AuditLog.resource_type == resource_type)
+    return conditions
+
+
 @router.get("/audit", response_model=List[AuditLogResponse])
 async def get_audit_logs(
     db: AsyncSession = Depends(get_db),
@@ -288,14 +319,7 @@ async def get_audit_logs(
     resource_type: Optional[str] = None,
 ) -> Any:
     """Get audit logs."""
-    query = select(AuditLog)
-    
-    if user_id:
-        query = query.where(AuditLog.user_id == user_id)
-    if action:
-        query = query.where(AuditLog.action == action)
-    if resource_type:
-        query = query.where(AuditLog.resource_type == resource_type)
+    query = select(AuditLog).where(*audit_log_conditions(user_id, action, resource_type))
     
     query = query.order_by(AuditLog.created_at.desc())
     offset = (page - 1) * per_page
@@ -307,6 +331,24 @@ async def get_audit_logs(
     return [AuditLogResponse.model_validate(l) for l in logs]
 
 
+@router.get("/audit/export")
+async def export_audit_logs(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
+    format: str = Query("csv", regex=EXPORT_FORMAT_PATTERN),
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+) -> Any:
+    """Stream audit logs matching the filters as CSV or NDJSON (ordered by id)."""
+    query = (
+        select(*export_columns(AuditLog, AuditLogResponse))
+        .where(*audit_log_conditions(user_id, action, resource_type))
+        .order_by(AuditLog.id)
+    )
+    return export_response(db.bind, query, format, "audit-logs")
+
+
 # =============================================================================
 # SYSTEM
 # =============================================================================
@@ -351,6 +393,133 @@ async def get_settings(
     }
 
 
+@router.post("/rollups/rebuild")
+async def rebuild_stat_rollups(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("SuperAdmin")),
+    modules: Optional[List[str]] = Query(None),
+) -> Any:
+    """Regenerate statistics rollups from the base tables."""
+    if modules and not set(modules) <= set(ROLLUP_MODULES):
+        raise ValidationException(detail=f"Unknown rollup module. Available: {ROLLUP_MODULES}")
+    
+    written = await rebuild_rollups(db, modules)
+    
+    return {
+        "success": True,
+        "modules": modules or ROLLUP_MODULES,
+        "rows": written,
+    }
+
+
+@router.get("/rollups/check")
+async def check_stat_rollups(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
+    modules: Optional[List[str]] = Query(None),
+) -> Any:
+    """Compare statistics rollups against live aggregates."""
+    if modules and not set(modules) <= set(ROLLUP_MODULES):
+        raise ValidationException(detail=f"Unknown rollup module. Available: {ROLLUP_MODULES}")
+    
+    mismatches = await check_rollups(db, modules)
+    
+    return {
+        "consistent": not mismatches,
+        "modules": modules or ROLLUP_MODULES,
+        "mismatches": mismatches,
+    }
+
+
+@router.post("/search/rebuild")
+async def rebuild_talent_search(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("SuperAdmin")),
+) -> Any:
+    """Regenerate the talent search index from the talents table."""
+    indexed = await rebuild_search_index(db)
+    
+    return {
+        "success": True,
+        "indexed": indexed,
+    }
+
+
+@router.post("/percentiles/recompute")
+async def recompute_cohort_percentiles(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("SuperAdmin")),
+) -> Any:
+    """Re-rank all evaluated talents within their cohorts (run daily)."""
+    written = await recompute_percentiles(db)
+    
+    return {
+        "success": True,
+        **written,
+    }
+
+
+@router.post("/scores/recompute")
+async def recompute_talent_scores(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("SuperAdmin")),
+    talent_ids: Optional[List[int]] = Query(None),
+) -> Any:
+    """Regenerate running evaluation score totals (all or selected talents)."""
+    written = await recompute_score_totals(db, talent_ids)
+    
+    return {
+        "success": True,
+        "talents": written,
+    }
+
+
+@router.post("/trends/recompute")
+async def recompute_talent_trends(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("SuperAdmin")),
+) -> Any:
+    """Refit all talents' evaluation score trends (rising-stars ranking)."""
+    written = await recompute_trends(db)
+    
+    return {
+        "success": True,
+        "talents": written,
+    }
+
+
+@router.post("/similarity/rebuild")
+async def rebuild_similarity_index(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("SuperAdmin")),
+) -> Any:
+    """Reload this worker's talent similarity index from the database."""
+    indexed = await similarity_index.rebuild(db)
+    
+    return {
+        "success": True,
+        "indexed": indexed,
+    }
+
+
+@router.get("/cache")
+async def get_cache_stats(
+    current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
+) -> Any:
+    """Get in-process cache and hashing pool statistics (per worker)."""
+    return {
+        "users": user_cache_stats(),
+        "tokens": token_cache.stats(),
+        "counts": count_cache.stats(),
+        "facets": facet_stats(),
+        "similarity": similarity_index.stats(),
+        "gates": gate_index.stats(),
+        "seats": seat_inventory.stats(),
+        "resale": resale_market.stats(),
+        "password_hashing": password_pool.stats(),
+    }
+
+
 @router.get("/stats")
 async def get_admin_stats(
     db: AsyncSession = Depends(get_db),
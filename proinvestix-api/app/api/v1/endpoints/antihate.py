@@ -8,7 +8,7 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
 from app.db.database import get_db
 from app.db.models import AntiHateIncident, AntiHateLegalCase, User
@@ -18,6 +18,7 @@ from app.schemas.additional import (
     LegalCaseCreate, LegalCaseResponse,
 )
 from app.core.exceptions import NotFoundException
+from app.services.rollups import read_rollups
 
 router = APIRouter(prefix="/antihate", tags=["Anti-Hate Shield"])
 
@@ -57,9 +58,6 @@ async def list_incidents(
     if severity:
         query = query.where(AntiHateIncident.severity == severity)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
-    
     query = query.order_by(AntiHateIncident.reported_at.desc())
     offset = (page - 1) * per_page
     query = query.offset(offset).limit(per_page)
@@ -254,24 +252,17 @@ async def get_antihate_stats(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
 ) -> Any:
-    """Get anti-hate statistics."""
-    result = await db.execute(select(func.count(AntiHateIncident.id)))
-    total = result.scalar() or 0
-    
-    result = await db.execute(
-        select(AntiHateIncident.incident_type, func.count(AntiHateIncident.id))
-        .group_by(AntiHateIncident.incident_type)
-    )
-    by_type = {row[0]: row[1] for row in result.all()}
-    
-    result = await db.execute(
-        select(AntiHateIncident.platform, func.count(AntiHateIncident.id))
-        .group_by(AntiHateIncident.platform)
-    )
-    by_platform = {row[0] or "Unknown": row[1] for row in result.all()}
+    """Get anti-hate statistics (served from the antihate rollups)."""
+    rollups = await read_rollups(db, "antihate")
+    
+    total = rollups.count_sum("incidents.type")
+    by_type = rollups.counts("incidents.type")
+    by_platform = {
+        platform or "Unknown": count
+        for platform, count in rollups.counts("incidents.platform").items()
+    }
     
-    result = await db.execute(select(func.count(AntiHateLegalCase.id)))
-    total_cases = result.scalar() or 0
+    total_cases = rollups.count("legal_cases")
     
     return {
         "incidents": {"total": total, "by_type": by_type, "by_platform": by_platform},
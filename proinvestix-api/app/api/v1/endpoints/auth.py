@@ -12,13 +12,15 @@ from sqlalchemy import select
 from app.db.database import get_db
 from app.db.models import User
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    verify_and_rehash_password,
     create_access_token,
     create_refresh_token,
     verify_token,
 )
 from app.core.dependencies import get_current_user
+from app.core.user_cache import invalidate_user
 from app.config import settings
 from app.schemas.auth import (
     LoginRequest,
@@ -61,7 +63,11 @@ async def login(
     user = result.scalar_one_or_none()
     
     # Verify user exists and password is correct
-    if user is None or not verify_password(request.password, user.password_hash):
+    if user is None:
+        raise InvalidCredentialsException()
+    
+    valid, new_hash = await verify_and_rehash_password(request.password, user.password_hash)
+    if not valid:
         raise InvalidCredentialsException()
     
     # Check if user is active
@@ -71,9 +77,14 @@ async def login(
             detail="User account is disabled",
         )
     
+    # Roll out cost factor changes on successful login
+    if new_hash:
+        user.password_hash = new_hash
+    
     # Update last login
     user.last_login = datetime.utcnow()
     await db.commit()
+    await invalidate_user(user.id)
     
     # Create tokens
     access_token = create_access_token(subject=user.id, role=user.role)
@@ -122,7 +133,7 @@ async def register(
     user = User(
         username=request.username,
         email=request.email,
-        password_hash=get_password_hash(request.password),
+        password_hash=await get_password_hash_async(request.password),
         role="User",
         first_name=request.first_name,
         last_name=request.last_name,
@@ -212,15 +223,16 @@ async def change_password(
     Change password for current user.
     """
     # Verify current password
-    if not verify_password(request.current_password, current_user.password_hash):
+    if not await verify_password_async(request.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
     
     # Update password
-    current_user.password_hash = get_password_hash(request.new_password)
+    current_user.password_hash = await get_password_hash_async(request.new_password)
     await db.commit()
+    await invalidate_user(current_user.id)
     
     return MessageResponse(
         message="Password changed successfully",
@@ -8,7 +8,7 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
 from app.db.database import get_db
 from app.db.models import ConsularDocument, ConsularAppointment, User
@@ -18,6 +18,7 @@ from app.schemas.additional import (
     AppointmentCreate, AppointmentResponse,
 )
 from app.core.exceptions import NotFoundException
+from app.services.rollups import read_rollups
 
 router = APIRouter(prefix="/consulate", tags=["Consulate Hub"])
 
@@ -307,20 +308,15 @@ async def get_consulate_stats(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
 ) -> Any:
-    """Get consulate statistics."""
-    # Documents
-    result = await db.execute(select(func.count(ConsularDocument.id)))
-    total_docs = result.scalar() or 0
+    """Get consulate statistics (served from the consulate rollups)."""
+    rollups = await read_rollups(db, "consulate")
     
-    result = await db.execute(
-        select(ConsularDocument.document_type, func.count(ConsularDocument.id))
-        .group_by(ConsularDocument.document_type)
-    )
-    by_type = {row[0]: row[1] for row in result.all()}
+    # Documents
+    total_docs = rollups.count_sum("documents.type")
+    by_type = rollups.counts("documents.type")
     
     # Appointments
-    result = await db.execute(select(func.count(ConsularAppointment.id)))
-    total_appointments = result.scalar() or 0
+    total_appointments = rollups.count("appointments")
     
     return {
         "documents": {"total": total_docs, "by_type": by_type},
@@ -2,10 +2,10 @@
 # ProInvestiX Enterprise API - Dashboard Endpoints
 # ============================================================================
 
-from datetime import datetime, timedelta
-from typing import Any
+from datetime import date, datetime, timedelta
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
@@ -15,6 +15,8 @@ from app.db.models import (
     FoundationDonation, FanDorp, Subscription
 )
 from app.core.dependencies import get_current_user
+from app.services.aggregation import run_aggregates
+from app.services.timeseries import TimeSeries, resolve_range, run_time_series
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -30,57 +32,58 @@ async def get_dashboard_stats(
 ) -> Any:
     """
     Get main dashboard statistics.
-    """
-    # Users
-    result = await db.execute(select(func.count(User.id)))
-    total_users = result.scalar() or 0
-    
-    # Talents
-    result = await db.execute(select(func.count(Talent.id)))
-    total_talents = result.scalar() or 0
-    
-    # Transfers
-    result = await db.execute(select(func.count(Transfer.id)))
-    total_transfers = result.scalar() or 0
-    
-    result = await db.execute(select(func.sum(Transfer.transfer_fee)))
-    transfer_volume = result.scalar() or 0
-    
-    # Events
-    result = await db.execute(select(func.count(Event.id)))
-    total_events = result.scalar() or 0
-    
-    # Tickets
-    result = await db.execute(select(func.count(Ticket.id)))
-    total_tickets = result.scalar() or 0
-    
-    result = await db.execute(select(func.sum(Ticket.price)))
-    ticket_revenue = result.scalar() or 0
-    
-    # Wallets
-    result = await db.execute(select(func.count(Wallet.id)))
-    total_wallets = result.scalar() or 0
     
-    result = await db.execute(select(func.sum(Wallet.balance)))
-    total_wallet_balance = result.scalar() or 0
-    
-    # Foundation
-    result = await db.execute(select(func.sum(FoundationDonation.amount)))
-    foundation_total = result.scalar() or 0
-    
-    result = await db.execute(select(func.sum(Transfer.foundation_contribution)))
-    foundation_from_transfers = result.scalar() or 0
-    
-    # FanDorpen
-    result = await db.execute(select(func.count(FanDorp.id)))
-    total_fandorpen = result.scalar() or 0
-    
-    # Subscriptions
-    result = await db.execute(
-        select(func.count(Subscription.id))
-        .where(Subscription.status == "Active")
-    )
-    active_subscriptions = result.scalar() or 0
+    All counters are computed with one combined statement per table family
+    (or a single statement on SQLite) instead of one query per counter.
+    """
+    aggregates = await run_aggregates(db, {
+        "users": {
+            "total": select(func.count(User.id)),
+        },
+        "talents": {
+            "total": select(func.count(Talent.id)),
+        },
+        "transfers": {
+            "total": select(func.count(Transfer.id)),
+            "volume": select(func.sum(Transfer.transfer_fee)),
+            "foundation": select(func.sum(Transfer.foundation_contribution)),
+        },
+        "events": {
+            "total": select(func.count(Event.id)),
+        },
+        "tickets": {
+            "total": select(func.count(Ticket.id)),
+            "revenue": select(func.sum(Ticket.price)),
+        },
+        "wallets": {
+            "total": select(func.count(Wallet.id)),
+            "balance": select(func.sum(Wallet.balance)),
+        },
+        "foundation": {
+            "donations": select(func.sum(FoundationDonation.amount)),
+        },
+        "fandorpen": {
+            "total": select(func.count(FanDorp.id)),
+        },
+        "subscriptions": {
+            "active": select(func.count(Subscription.id))
+            .where(Subscription.status == "Active"),
+        },
+    })
+    
+    total_users = aggregates["users"]["total"] or 0
+    total_talents = aggregates["talents"]["total"] or 0
+    total_transfers = aggregates["transfers"]["total"] or 0
+    transfer_volume = aggregates["transfers"]["volume"] or 0
+    total_events = aggregates["events"]["total"] or 0
+    total_tickets = aggregates["tickets"]["total"] or 0
+    ticket_revenue = aggregates["tickets"]["revenue"] or 0
+    total_wallets = aggregates["wallets"]["total"] or 0
+    total_wallet_balance = aggregates["wallets"]["balance"] or 0
+    foundation_total = aggregates["foundation"]["donations"] or 0
+    foundation_from_transfers = aggregates["transfers"]["foundation"] or 0
+    total_fandorpen = aggregates["fandorpen"]["total"] or 0
+    active_subscriptions = aggregates["subscriptions"]["active"] or 0
     
     return {
         "users": {
@@ -219,32 +222,30 @@ async def get_chart_data(
     chart_type: str,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    granularity: str = Query("month", description="day, week or month"),
+    periods: int = Query(6, ge=1, description="Number of periods ending now"),
+    start: Optional[date] = Query(None, description="Range start (overrides periods)"),
+    end: Optional[date] = Query(None, description="Range end (default: today)"),
 ) -> Any:
     """
     Get chart data by type.
     
     Chart types: transfers, tickets, talents, foundation
+    
+    Time based charts (transfers, foundation) are aggregated with a single
+    bucketed GROUP BY, whatever the range or granularity.
     """
     if chart_type == "transfers":
-        # Monthly transfer volume (last 6 months)
-        data = []
-        for i in range(5, -1, -1):
-            month_start = (datetime.utcnow().replace(day=1) - timedelta(days=i*30)).replace(day=1)
-            month_end = (month_start + timedelta(days=32)).replace(day=1)
-            
-            result = await db.execute(
-                select(func.sum(Transfer.transfer_fee))
-                .where(Transfer.created_at >= month_start)
-                .where(Transfer.created_at < month_end)
-            )
-            total = result.scalar() or 0
-            
-            data.append({
-                "month": month_start.strftime("%b %Y"),
-                "value": total,
-            })
+        # Transfer volume per period
+        first, last = resolve_range(granularity, periods, start, end)
+        data = await run_time_series(db, {
+            "value": TimeSeries(Transfer.created_at, Transfer.transfer_fee),
+        }, granularity, first, last)
+        if granularity == "month":
+            for point in data:
+                point["month"] = point["label"]
         
-        return {"type": "transfers", "data": data}
+        return {"type": "transfers", "granularity": granularity, "data": data}
     
     elif chart_type == "talents":
         # Talents by position
@@ -268,27 +269,18 @@ async def get_chart_data(
     
     elif chart_type == "foundation":
         # Foundation growth
-        data = []
+        first, last = resolve_range(granularity, periods, start, end)
+        data = await run_time_series(db, {
+            "monthly": TimeSeries(FoundationDonation.created_at, FoundationDonation.amount),
+        }, granularity, first, last)
         running_total = 0
-        for i in range(5, -1, -1):
-            month_start = (datetime.utcnow().replace(day=1) - timedelta(days=i*30)).replace(day=1)
-            month_end = (month_start + timedelta(days=32)).replace(day=1)
-            
-            result = await db.execute(
-                select(func.sum(FoundationDonation.amount))
-                .where(FoundationDonation.created_at >= month_start)
-                .where(FoundationDonation.created_at < month_end)
-            )
-            monthly = result.scalar() or 0
-            running_total += monthly
-            
-            data.append({
-                "month": month_start.strftime("%b %Y"),
-                "monthly": monthly,
-                "cumulative": running_total,
-            })
+        for point in data:
+            running_total += point["monthly"]
+            point["cumulative"] = running_total
+            if granularity == "month":
+                point["month"] = point["label"]
         
-        return {"type": "foundation_growth", "data": data}
+        return {"type": "foundation_growth", "granularity": granularity, "data": data}
     
     return {"type": chart_type, "data": [], "error": "Unknown chart type"}
 
@@ -6,16 +6,14 @@
 from datetime import datetime
 from typing import Any, List, Optional
 import uuid
-import hashlib
-import json
-import base64
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
+from sqlalchemy.exc import IntegrityError
 
 from app.db.database import get_db
-from app.db.models import Event, Ticket, LoyaltyPoints, User
+from app.db.models import Event, EventGateMode, Ticket, User
 from app.core.dependencies import get_current_user, require_roles
 from app.schemas.event import (
     EventCreate,
@@ -24,6 +22,17 @@ from app.schemas.event import (
     EventListResponse,
     EventDetailResponse,
     TicketMintRequest,
+    TicketBatchMintRequest,
+    TicketBatchMintResponse,
+    GateVerifyResponse,
+    SeatLayoutRequest,
+    SeatMapResponse,
+    SeatSectionResponse,
+    SeatHoldRequest,
+    SeatHoldResponse,
+    ResaleBidRequest,
+    ResaleBookResponse,
+    ResaleOrderResponse,
     TicketResponse,
     TicketVerifyResponse,
     TicketListResponse,
@@ -31,7 +40,17 @@ from app.schemas.event import (
     LoyaltyResponse,
     TicketChainStats,
 )
-from app.core.exceptions import NotFoundException, BusinessLogicException
+from app.core.exceptions import NotFoundException
+from app.services.counting import COUNT_MODE_PATTERN, count_total, total_pages
+from app.services.export import EXPORT_FORMAT_PATTERN, export_columns, export_response
+from app.services.gate_index import GATE_CLOSED, gate_index, verify_entry
+from app.services.pagination import keyset_page
+from app.services.resale import cancel_order, order_book, place_bid
+from app.services.rollups import read_rollups
+from app.services.seating import (
+    hold_labels, hold_seats, release_hold, seat_inventory, set_layout, sweep_expired_holds,
+)
+from app.services.ticketing import mint_tickets
 
 router = APIRouter(prefix="/events", tags=["TicketChain - Events"])
 
@@ -44,22 +63,6 @@ def generate_event_id() -> str:
     return f"EVT-{uuid.uuid4().hex[:8].upper()}"
 
 
-def generate_ticket_hash() -> str:
-    """Generate blockchain-style ticket hash."""
-    data = f"{uuid.uuid4()}-{datetime.utcnow().isoformat()}"
-    return "0x" + hashlib.sha256(data.encode()).hexdigest()
-
-
-def generate_qr_code(ticket_hash: str, event_id: str) -> str:
-    """Generate QR code data (base64 encoded JSON)."""
-    qr_data = {
-        "ticket": ticket_hash,
-        "event": event_id,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    return base64.b64encode(json.dumps(qr_data).encode()).decode()
-
-
 # =============================================================================
 # LIST EVENTS
 # =============================================================================
@@ -70,6 +73,7 @@ async def list_events(
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    count: str = Query("auto", regex=COUNT_MODE_PATTERN, description="Total: auto, exact, estimate or none"),
     status: Optional[str] = None,
     event_type: Optional[str] = None,
     city: Optional[str] = None,
@@ -94,8 +98,7 @@ async def list_events(
         query = query.where(and_(*conditions))
     
     # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
+    total, total_mode = await count_total(db, query, count)
     
     # Sort & paginate
     query = query.order_by(Event.date.asc())
@@ -117,9 +120,10 @@ async def list_events(
         data=response_data,
         meta={
             "total": total,
+            "total_mode": total_mode,
             "page": page,
             "per_page": per_page,
-            "total_pages": (total + per_page - 1) // per_page,
+            "total_pages": total_pages(total, per_page),
         }
     )
 
@@ -240,86 +244,41 @@ async def mint_ticket(
     """
     Mint a new ticket for an event.
     Creates blockchain-verified ticket with QR code.
-    """
-    # Get event
-    result = await db.execute(select(Event).where(Event.id == event_id))
-    event = result.scalar_one_or_none()
     
-    if event is None:
-        raise NotFoundException(resource="Event", resource_id=event_id)
-    
-    # Check availability
-    if event.tickets_sold >= event.capacity:
-        raise BusinessLogicException(
-            detail=f"Event '{event.name}' is sold out",
-            error_code="EVENT_SOLD_OUT"
-        )
-    
-    # Generate ticket
-    ticket_hash = generate_ticket_hash()
-    seat_info = f"{request.seat_section or 'GA'}-{request.seat_row or '0'}-{request.seat_number or '0'}"
-    
-    ticket = Ticket(
-        ticket_hash=ticket_hash,
-        event_id=event_id,
-        owner_id=request.owner_id or current_user.id,
-        owner_name=request.owner_name,
-        seat_section=request.seat_section,
-        seat_row=request.seat_row,
-        seat_number=request.seat_number,
-        seat_info=seat_info,
-        category=request.category,
-        price=request.price,
-        minted_at=datetime.utcnow(),
-        block_number=int(datetime.utcnow().timestamp()),
-        transaction_hash="0x" + hashlib.sha256(ticket_hash.encode()).hexdigest()[:64],
-        status="Valid",
-        qr_code=generate_qr_code(ticket_hash, event.event_id),
-    )
+    Inventory is reserved atomically, so concurrent sales cannot oversell.
+    """
+    tickets, _ = await mint_tickets(db, event_id, [request], current_user.id)
+    await db.commit()
     
-    # Update event
-    event.tickets_sold += 1
+    return TicketResponse.model_validate(tickets[0])
+
+
+@router.post(
+    "/{event_id}/tickets/mint/batch",
+    response_model=TicketBatchMintResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def mint_tickets_batch(
+    event_id: int,
+    request: TicketBatchMintRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Mint several tickets for an event in one transaction
+    (group and family bookings).
     
-    db.add(ticket)
+    All tickets are minted or none: if the event has fewer tickets left
+    than requested, nothing is reserved. With a hold_id the tickets get the
+    held seats, in order.
+    """
+    tickets, available = await mint_tickets(db, event_id, request.tickets, current_user.id, request.hold_id)
     await db.commit()
-    await db.refresh(ticket)
     
-    # Update loyalty points
-    if request.owner_id:
-        result = await db.execute(
-            select(LoyaltyPoints).where(LoyaltyPoints.user_id == request.owner_id)
-        )
-        loyalty = result.scalar_one_or_none()
-        
-        if loyalty is None:
-            loyalty = LoyaltyPoints(
-                user_id=request.owner_id,
-                points_balance=0,
-                total_earned=0,
-                total_spent=0,
-                tier="Bronze",
-                tickets_purchased=0,
-            )
-            db.add(loyalty)
-        
-        # 1 point per euro spent
-        points_earned = int(request.price)
-        loyalty.points_balance += points_earned
-        loyalty.total_earned += points_earned
-        loyalty.tickets_purchased += 1
-        loyalty.last_activity = datetime.utcnow()
-        
-        # Update tier
-        if loyalty.total_earned >= 1000:
-            loyalty.tier = "Platinum"
-        elif loyalty.total_earned >= 500:
-            loyalty.tier = "Gold"
-        elif loyalty.total_earned >= 100:
-            loyalty.tier = "Silver"
-        
-        await db.commit()
-    
-    return TicketResponse.model_validate(ticket)
+    return TicketBatchMintResponse(
+        data=[TicketResponse.model_validate(ticket) for ticket in tickets],
+        meta={"minted": len(tickets), "tickets_available": available},
+    )
 
 
 # =============================================================================
@@ -333,9 +292,11 @@ async def get_event_tickets(
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=100),
+    count: str = Query("auto", regex=COUNT_MODE_PATTERN, description="Total: auto, exact, estimate or none"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass empty for the first page"),
     status: Optional[str] = None,
 ) -> Any:
-    """Get all tickets for an event."""
+    """Get all tickets for an event (page/per_page or keyset cursor)."""
     # Verify event exists
     result = await db.execute(select(Event).where(Event.id == event_id))
     if result.scalar_one_or_none() is None:
@@ -346,8 +307,17 @@ async def get_event_tickets(
     if status:
         query = query.where(Ticket.status == status)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
+    if cursor is not None:
+        tickets, meta = await keyset_page(
+            db, query, Ticket.id, Ticket.id, "id", "asc", per_page, cursor,
+        )
+        return TicketListResponse(
+            success=True,
+            data=[TicketResponse.model_validate(t) for t in tickets],
+            meta=meta,
+        )
+    
+    total, total_mode = await count_total(db, query, count)
     
     offset = (page - 1) * per_page
     query = query.offset(offset).limit(per_page)
@@ -358,49 +328,268 @@ async def get_event_tickets(
     return TicketListResponse(
         success=True,
         data=[TicketResponse.model_validate(t) for t in tickets],
-        meta={"total": total, "page": page, "per_page": per_page}
+        meta={"total": total, "total_mode": total_mode, "page": page, "per_page": per_page}
     )
 
 
+@router.get("/{event_id}/tickets/export")
+async def export_event_tickets(
+    event_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    format: str = Query("csv", regex=EXPORT_FORMAT_PATTERN),
+    status: Optional[str] = None,
+) -> Any:
+    """Stream all tickets of an event as CSV or NDJSON (ordered by id, without QR images)."""
+    result = await db.execute(select(Event.id).where(Event.id == event_id))
+    if result.scalar_one_or_none() is None:
+        raise NotFoundException(resource="Event", resource_id=event_id)
+    
+    query = select(*export_columns(Ticket, TicketResponse, exclude=["qr_code"])).where(Ticket.event_id == event_id)
+    if status:
+        query = query.where(Ticket.status == status)
+    
+    return export_response(db.bind, query.order_by(Ticket.id), format, f"event-{event_id}-tickets")
+
+
 # =============================================================================
-# TICKET STATISTICS
+# GATE MODE
 # =============================================================================
 
-@router.get("/stats/overview", response_model=TicketChainStats)
-async def get_ticketchain_stats(
+async def _set_gate_open(db: AsyncSession, event_id: int, gate_open: bool) -> None:
+    result = await db.execute(select(Event.id).where(Event.id == event_id))
+    if result.scalar_one_or_none() is None:
+        raise NotFoundException(resource="Event", resource_id=event_id)
+    gate_mode = await db.get(EventGateMode, event_id)
+    if gate_open and gate_mode is None:
+        db.add(EventGateMode(event_id=event_id))
+    elif not gate_open and gate_mode is not None:
+        await db.delete(gate_mode)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()  # Opened by a concurrent request
+
+
+@router.post("/{event_id}/gate/open")
+async def open_event_gate(
+    event_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
 ) -> Any:
-    """Get TicketChain statistics."""
-    # Total events
-    result = await db.execute(select(func.count(Event.id)))
-    total_events = result.scalar() or 0
+    """
+    Put the event in gate mode and preload its ticket index (this worker).
+    Other workers load it on their first scan.
+    """
+    await _set_gate_open(db, event_id, True)
+    gate = await gate_index.load(db, event_id)
     
-    # Total tickets
-    result = await db.execute(select(func.count(Ticket.id)))
-    total_tickets = result.scalar() or 0
+    return {
+        "success": True,
+        "gate": gate.stats(),
+    }
+
+
+@router.post("/{event_id}/gate/close")
+async def close_event_gate(
+    event_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
+) -> Any:
+    """
+    End gate mode and drop the event's ticket index (this worker).
+    Other workers drop theirs at their next refresh.
+    """
+    await _set_gate_open(db, event_id, False)
     
-    # Tickets used
-    result = await db.execute(
-        select(func.count(Ticket.id)).where(Ticket.status == "Used")
+    return {
+        "success": True,
+        "closed": gate_index.close(event_id),
+    }
+
+
+@router.get("/{event_id}/gate/verify/{ticket_hash}", response_model=GateVerifyResponse)
+async def verify_gate_scan(
+    event_id: int,
+    ticket_hash: str,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Verify a ticket scanned at the event's gates.
+    Public endpoint for turnstiles; answered from the in-memory gate index
+    of events opened for gate mode.
+    """
+    gate = await gate_index.gate(db, event_id)
+    if gate is None:
+        return GATE_CLOSED
+    return verify_entry(gate.lookup(ticket_hash))
+
+
+# =============================================================================
+# SEAT MAP
+# =============================================================================
+
+def _seat_map_response(seat_map) -> SeatMapResponse:
+    sections = seat_map.summary()
+    return SeatMapResponse(
+        data=sections,
+        meta={
+            "sections": len(sections),
+            "seats": sum(section["seats"] for section in sections),
+            "available": sum(section["available"] for section in sections),
+        },
     )
-    tickets_used = result.scalar() or 0
+
+
+@router.put("/{event_id}/seats", response_model=SeatMapResponse)
+async def set_event_seat_map(
+    event_id: int,
+    request: SeatLayoutRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
+) -> Any:
+    """
+    Define (or replace) the event's seat map.
+    Not allowed once seats are sold or held.
+    """
+    await set_layout(db, event_id, request.sections)
+    await db.commit()
     
-    # Revenue
-    result = await db.execute(select(func.sum(Ticket.price)))
-    total_revenue = result.scalar() or 0
+    return _seat_map_response(await seat_inventory.load(db, event_id))
+
+
+@router.get("/{event_id}/seats", response_model=SeatMapResponse)
+async def get_event_seat_map(
+    event_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Seat availability per section (from the in-memory seat map)."""
+    await sweep_expired_holds(db, event_id)
+    seat_map = await seat_inventory.seat_map(db, event_id)
+    if not seat_map.seated:
+        raise NotFoundException(resource="Seat map", resource_id=event_id)
     
-    # By status
-    result = await db.execute(
-        select(Ticket.status, func.count(Ticket.id)).group_by(Ticket.status)
+    return _seat_map_response(seat_map)
+
+
+@router.get("/{event_id}/seats/{section}", response_model=SeatSectionResponse)
+async def get_event_section_seats(
+    event_id: int,
+    section: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Free seat numbers per row of a section."""
+    await sweep_expired_holds(db, event_id)
+    seat_map = await seat_inventory.seat_map(db, event_id)
+    
+    return SeatSectionResponse(section=section, data=seat_map.section_rows(section))
+
+
+@router.post("/{event_id}/seats/holds", response_model=SeatHoldResponse, status_code=status.HTTP_201_CREATED)
+async def hold_event_seats(
+    event_id: int,
+    request: SeatHoldRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Hold seats during checkout: the best available block (or the given
+    seats). Mint with the hold_id before expires_at to buy them.
+    """
+    seats = [(seat.section, seat.row, seat.seat) for seat in request.seats or ()]
+    hold = await hold_seats(
+        db, event_id, current_user.id, request.quantity, request.sections, request.together, seats,
     )
-    by_status = {row[0]: row[1] for row in result.all()}
+    await db.commit()
     
-    # By category
-    result = await db.execute(
-        select(Ticket.category, func.count(Ticket.id)).group_by(Ticket.category)
+    return SeatHoldResponse(
+        hold_id=hold.hold_id,
+        event_id=event_id,
+        seats=[{"section": section, "row": row, "seat": seat} for section, row, seat in hold_labels(hold)],
+        expires_at=hold.expires_at,
     )
-    by_category = {row[0] or "Standard": row[1] for row in result.all()}
+
+
+@router.delete("/{event_id}/seats/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_event_seats(
+    event_id: int,
+    hold_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> None:
+    """Give held seats back before the hold expires."""
+    await release_hold(db, event_id, hold_id, current_user.id)
+    await db.commit()
+
+
+# =============================================================================
+# RESALE MARKET
+# =============================================================================
+
+@router.get("/{event_id}/resale/{category}", response_model=ResaleBookResponse)
+async def get_resale_book(
+    event_id: int,
+    category: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    levels: int = Query(10, ge=1, le=100),
+) -> Any:
+    """Resale order book of an event category (price levels, best first)."""
+    return await order_book(db, event_id, category, levels)
+
+
+@router.post("/{event_id}/resale/{category}/bids", response_model=ResaleOrderResponse, status_code=status.HTTP_201_CREATED)
+async def place_resale_bid(
+    event_id: int,
+    category: str,
+    request: ResaleBidRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Bid for resale tickets of an event category.
+    Buys from the cheapest (then oldest) asks at once; the rest stays open.
+    """
+    return await place_bid(
+        db, event_id, category, request.price, request.quantity, current_user.id, request.owner_name,
+    )
+
+
+@router.delete("/{event_id}/resale/{category}/orders/{order_id}", response_model=ResaleOrderResponse)
+async def cancel_resale_order(
+    event_id: int,
+    category: str,
+    order_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Withdraw an open ask or bid."""
+    return await cancel_order(db, event_id, category, order_id, current_user.id)
+
+
+# =============================================================================
+# TICKET STATISTICS
+# =============================================================================
+
+@router.get("/stats/overview", response_model=TicketChainStats)
+async def get_ticketchain_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get TicketChain statistics.
+    
+    Counters come from the ticketchain rollups; only the upcoming events
+    count (time dependent) is queried live.
+    """
+    rollups = await read_rollups(db, "ticketchain")
+    
+    by_category = {
+        category or "Standard": count
+        for category, count in rollups.counts("tickets.category").items()
+    }
     
     # Upcoming events
     result = await db.execute(
@@ -409,11 +598,11 @@ async def get_ticketchain_stats(
     upcoming = result.scalar() or 0
     
     return TicketChainStats(
-        total_events=total_events,
-        total_tickets=total_tickets,
-        tickets_used=tickets_used,
-        total_revenue=total_revenue,
-        by_status=by_status,
+        total_events=rollups.count("events"),
+        total_tickets=rollups.count("tickets"),
+        tickets_used=rollups.count("tickets.status", "Used"),
+        total_revenue=rollups.total("tickets"),
+        by_status=rollups.counts("tickets.status"),
         by_category=by_category,
         upcoming_events=upcoming,
     )
@@ -22,6 +22,7 @@ from app.schemas.fandorp import (
     FanDorpStats,
 )
 from app.core.exceptions import NotFoundException, BusinessLogicException
+from app.services.counting import COUNT_MODE_PATTERN, count_total
 
 router = APIRouter(prefix="/fandorpen", tags=["FanDorpen - WK 2030"])
 
@@ -53,6 +54,7 @@ async def list_fandorpen(
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    count: str = Query("auto", regex=COUNT_MODE_PATTERN, description="Total: auto, exact, estimate or none"),
     city: Optional[str] = None,
     status: Optional[str] = None,
 ) -> Any:
@@ -64,8 +66,7 @@ async def list_fandorpen(
     if status:
         query = query.where(FanDorp.status == status)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
+    total, total_mode = await count_total(db, query, count)
     
     query = query.order_by(FanDorp.name)
     offset = (page - 1) * per_page
@@ -77,7 +78,7 @@ async def list_fandorpen(
     return FanDorpListResponse(
         success=True,
         data=[FanDorpResponse.model_validate(f) for f in fandorpen],
-        meta={"total": total, "page": page, "per_page": per_page}
+        meta={"total": total, "total_mode": total_mode, "page": page, "per_page": per_page}
     )
 
 
@@ -3,7 +3,7 @@
 # Sadaka Jaaria Foundation Bank
 # ============================================================================
 
-from datetime import datetime, timedelta
+from datetime import date, datetime
 from typing import Any, Optional
 import uuid
 
@@ -22,6 +22,8 @@ from app.schemas.foundation import (
     FoundationStats,
 )
 from app.core.exceptions import NotFoundException
+from app.services.timeseries import TimeSeries, resolve_range, run_time_series
+from app.services.counting import COUNT_MODE_PATTERN, count_total
 
 router = APIRouter(prefix="/foundation", tags=["Foundation Bank"])
 
@@ -46,6 +48,10 @@ def generate_receipt_number() -> str:
 async def get_foundation_stats(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    granularity: str = Query("month", description="day, week or month"),
+    periods: int = Query(6, ge=1, description="Number of periods ending now"),
+    start: Optional[date] = Query(None, description="Range start (overrides periods)"),
+    end: Optional[date] = Query(None, description="Range end (default: today)"),
 ) -> Any:
     """Get foundation statistics overview."""
     # Total donations
@@ -77,32 +83,16 @@ async def get_foundation_stats(
     )
     by_project = {row[0] or "General": row[1] for row in result.all()}
     
-    # Monthly growth (last 6 months)
-    monthly = []
-    for i in range(5, -1, -1):
-        month_start = (datetime.utcnow().replace(day=1) - timedelta(days=i*30)).replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1)
-        
-        result = await db.execute(
-            select(func.sum(FoundationDonation.amount))
-            .where(FoundationDonation.created_at >= month_start)
-            .where(FoundationDonation.created_at < month_end)
-        )
-        donations = result.scalar() or 0
-        
-        result = await db.execute(
-            select(func.sum(FoundationContribution.amount))
-            .where(FoundationContribution.created_at >= month_start)
-            .where(FoundationContribution.created_at < month_end)
-        )
-        contributions = result.scalar() or 0
-        
-        monthly.append({
-            "month": month_start.strftime("%b %Y"),
-            "donations": donations,
-            "contributions": contributions,
-            "total": donations + contributions,
-        })
+    # Growth per period (single bucketed query for both tables)
+    first, last = resolve_range(granularity, periods, start, end)
+    monthly = await run_time_series(db, {
+        "donations": TimeSeries(FoundationDonation.created_at, FoundationDonation.amount),
+        "contributions": TimeSeries(FoundationContribution.created_at, FoundationContribution.amount),
+    }, granularity, first, last)
+    for point in monthly:
+        point["total"] = point["donations"] + point["contributions"]
+        if granularity == "month":
+            point["month"] = point["label"]
     
     # Top donors (non-anonymous)
     result = await db.execute(
@@ -138,6 +128,7 @@ async def list_donations(
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    count: str = Query("auto", regex=COUNT_MODE_PATTERN, description="Total: auto, exact, estimate or none"),
     donation_type: Optional[str] = None,
     project: Optional[str] = None,
 ) -> Any:
@@ -149,8 +140,7 @@ async def list_donations(
     if project:
         query = query.where(FoundationDonation.project == project)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
+    total, total_mode = await count_total(db, query, count)
     
     query = query.order_by(FoundationDonation.created_at.desc())
     offset = (page - 1) * per_page
@@ -171,7 +161,7 @@ async def list_donations(
     return DonationListResponse(
         success=True,
         data=response_data,
-        meta={"total": total, "page": page, "per_page": per_page}
+        meta={"total": total, "total_mode": total_mode, "page": page, "per_page": per_page}
     )
 
 
@@ -245,6 +235,7 @@ async def list_contributions(
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    count: str = Query("auto", regex=COUNT_MODE_PATTERN, description="Total: auto, exact, estimate or none"),
     source_type: Optional[str] = None,
 ) -> Any:
     """List auto-generated contributions (0.5% from transfers/tickets)."""
@@ -253,8 +244,7 @@ async def list_contributions(
     if source_type:
         query = query.where(FoundationContribution.source_type == source_type)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
+    total, total_mode = await count_total(db, query, count)
     
     query = query.order_by(FoundationContribution.created_at.desc())
     offset = (page - 1) * per_page
@@ -266,7 +256,7 @@ async def list_contributions(
     return {
         "success": True,
         "data": [ContributionResponse.model_validate(c) for c in contributions],
-        "meta": {"total": total, "page": page, "per_page": per_page}
+        "meta": {"total": total, "total_mode": total_mode, "page": page, "per_page": per_page}
     }
 
 
@@ -9,7 +9,7 @@ import hashlib
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
 from app.db.database import get_db
 from app.db.models import Identity, FraudAlert, User
@@ -21,6 +21,7 @@ from app.schemas.identity import (
     IdentityStats,
 )
 from app.core.exceptions import NotFoundException
+from app.services.rollups import read_rollups
 
 router = APIRouter(prefix="/identities", tags=["Identity Shield"])
 
@@ -328,39 +329,22 @@ async def get_identity_stats(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
 ) -> Any:
-    """Get identity statistics."""
-    # Total identities
-    result = await db.execute(select(func.count(Identity.id)))
-    total = result.scalar() or 0
-    
-    # Verified
-    result = await db.execute(
-        select(func.count(Identity.id)).where(Identity.is_verified == True)
-    )
-    verified = result.scalar() or 0
-    
-    # Fraud alerts
-    result = await db.execute(select(func.count(FraudAlert.id)))
-    alerts = result.scalar() or 0
-    
-    result = await db.execute(
-        select(func.count(FraudAlert.id)).where(FraudAlert.status == "Resolved")
-    )
-    resolved = result.scalar() or 0
-    
-    # By verification level
-    result = await db.execute(
-        select(Identity.verification_level, func.count(Identity.id))
-        .group_by(Identity.verification_level)
-    )
-    by_level = {f"Level {row[0]}": row[1] for row in result.all()}
-    
-    # By nationality
-    result = await db.execute(
-        select(Identity.nationality, func.count(Identity.id))
-        .group_by(Identity.nationality)
-    )
-    by_nationality = {row[0] or "Unknown": row[1] for row in result.all()}
+    """Get identity statistics (served from the identities rollups)."""
+    rollups = await read_rollups(db, "identities")
+    
+    total = rollups.count("identities")
+    verified = rollups.count("identities.verified", True)
+    alerts = rollups.count_sum("fraud_alerts.status")
+    resolved = rollups.count("fraud_alerts.status", "Resolved")
+    
+    by_level = {
+        f"Level {level}": count
+        for level, count in rollups.counts("identities.level").items()
+    }
+    by_nationality = {
+        nationality or "Unknown": count
+        for nationality, count in rollups.counts("identities.nationality").items()
+    }
     
     return IdentityStats(
         total_identities=total,
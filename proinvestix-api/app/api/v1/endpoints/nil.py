@@ -9,7 +9,7 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
 from app.db.database import get_db
 from app.db.models import NILSignal, NILEvidence, NILFactCard, User
@@ -19,6 +19,7 @@ from app.schemas.additional import (
     FactCardCreate, FactCardResponse,
 )
 from app.core.exceptions import NotFoundException
+from app.services.rollups import read_rollups
 
 router = APIRouter(prefix="/nil", tags=["NIL - News Intelligence"])
 
@@ -58,9 +59,6 @@ async def list_signals(
     if severity:
         query = query.where(NILSignal.severity == severity)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
-    
     query = query.order_by(NILSignal.created_at.desc())
     offset = (page - 1) * per_page
     query = query.offset(offset).limit(per_page)
@@ -280,33 +278,17 @@ async def get_nil_stats(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
 ) -> Any:
-    """Get NIL statistics."""
-    # Signals
-    result = await db.execute(select(func.count(NILSignal.id)))
-    total_signals = result.scalar() or 0
-    
-    result = await db.execute(
-        select(NILSignal.signal_type, func.count(NILSignal.id))
-        .group_by(NILSignal.signal_type)
-    )
-    by_type = {row[0]: row[1] for row in result.all()}
+    """Get NIL statistics (served from the nil rollups)."""
+    rollups = await read_rollups(db, "nil")
     
-    # Fact cards
-    result = await db.execute(select(func.count(NILFactCard.id)))
-    total_cards = result.scalar() or 0
-    
-    result = await db.execute(
-        select(NILFactCard.verdict, func.count(NILFactCard.id))
-        .group_by(NILFactCard.verdict)
-    )
-    by_verdict = {row[0]: row[1] for row in result.all()}
+    total_signals = rollups.count_sum("signals.type")
+    by_type = rollups.counts("signals.type")
     
-    # Engagement
-    result = await db.execute(select(func.sum(NILFactCard.views)))
-    total_views = result.scalar() or 0
+    total_cards = rollups.count("factcards.views")
+    by_verdict = rollups.counts("factcards.verdict")
     
-    result = await db.execute(select(func.sum(NILFactCard.shares)))
-    total_shares = result.scalar() or 0
+    total_views = int(rollups.total("factcards.views"))
+    total_shares = int(rollups.total("factcards.shares"))
     
     return {
         "signals": {"total": total_signals, "by_type": by_type},
@@ -21,6 +21,7 @@ from app.schemas.subscription import (
     SubscriptionStats,
 )
 from app.core.exceptions import NotFoundException, BusinessLogicException
+from app.services.counting import COUNT_MODE_PATTERN, count_total
 
 router = APIRouter(prefix="/subscriptions", tags=["Subscriptions"])
 
@@ -86,6 +87,7 @@ async def list_subscriptions(
     current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    count: str = Query("auto", regex=COUNT_MODE_PATTERN, description="Total: auto, exact, estimate or none"),
     status: Optional[str] = None,
 ) -> Any:
     """List all subscriptions (Admin only)."""
@@ -94,8 +96,7 @@ async def list_subscriptions(
     if status:
         query = query.where(Subscription.status == status)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
+    total, total_mode = await count_total(db, query, count)
     
     query = query.order_by(Subscription.created_at.desc())
     offset = (page - 1) * per_page
@@ -107,7 +108,7 @@ async def list_subscriptions(
     return SubscriptionListResponse(
         success=True,
         data=[SubscriptionResponse.model_validate(s) for s in subs],
-        meta={"total": total, "page": page, "per_page": per_page}
+        meta={"total": total, "total_mode": total_mode, "page": page, "per_page": per_page}
     )
 
 
@@ -6,13 +6,15 @@
 from datetime import datetime, date
 from typing import Any, List, Optional
 import uuid
+import warnings
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, and_
 
 from app.db.database import get_db
-from app.db.models import Talent, TalentEvaluation, Scout, User
+from app.db.models import Talent, TalentEvaluation, TalentPercentile, TalentTrend, Scout, User
 from app.core.dependencies import get_current_user, require_roles
 from app.schemas.talent import (
     TalentCreate,
@@ -22,9 +24,31 @@ from app.schemas.talent import (
     TalentDetailResponse,
     EvaluationCreate,
     EvaluationResponse,
+    EvaluationBatchCreate,
+    EvaluationBatchResponse,
     TalentStats,
+    SimilarTalent,
+    SimilarTalentsResponse,
+    RisingTalent,
+    RisingTalentsResponse,
+    TalentTrendResponse,
 )
-from app.core.exceptions import NotFoundException, AlreadyExistsException
+from app.core.exceptions import NotFoundException, AlreadyExistsException, ValidationException
+from app.services.bulk_import import (
+    IMPORT_FORMAT_PATTERN, detect_format, import_progress, import_talents, start_import,
+)
+from app.services.counting import COUNT_MODE_PATTERN, count_total, total_pages
+from app.services.export import EXPORT_FORMAT_PATTERN, export_columns, export_response
+from app.services.pagination import keyset_page
+from app.services.percentiles import PERCENTILE_SORT_PATTERN, talent_percentiles
+from app.services.rollups import read_rollups
+from app.services.similarity import METRIC_PATTERN, similarity_index
+from app.services.talent_facets import facet_counts, facet_values
+from app.services.talent_filters import (
+    AGE_BAND_PATTERN, age_band_counts, birth_date_range, talent_conditions,
+)
+from app.services.talent_search import search_ranking
+from app.services.trends import CATEGORY_PATTERN, SLOPE_COLUMNS
 
 router = APIRouter(prefix="/talents", tags=["NTSP - Talents"])
 
@@ -49,51 +73,61 @@ def calculate_age(birth_date: date) -> int:
     return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
 
 
+# Category score -> individual scores it averages
+SCORE_CATEGORIES = {
+    'overall_technical': [
+        'score_ball_control', 'score_passing', 'score_dribbling',
+        'score_shooting', 'score_heading', 'score_first_touch',
+    ],
+    'overall_physical': [
+        'score_speed', 'score_acceleration', 'score_stamina',
+        'score_strength', 'score_jumping', 'score_agility',
+    ],
+    'overall_mental': [
+        'score_positioning', 'score_vision', 'score_composure',
+        'score_leadership', 'score_work_rate', 'score_decision_making',
+    ],
+}
+
+
 def calculate_overall_scores(evaluation: dict) -> dict:
     """Calculate overall scores from individual scores."""
-    technical_scores = [
-        evaluation.get('score_ball_control'),
-        evaluation.get('score_passing'),
-        evaluation.get('score_dribbling'),
-        evaluation.get('score_shooting'),
-        evaluation.get('score_heading'),
-        evaluation.get('score_first_touch'),
-    ]
-    physical_scores = [
-        evaluation.get('score_speed'),
-        evaluation.get('score_acceleration'),
-        evaluation.get('score_stamina'),
-        evaluation.get('score_strength'),
-        evaluation.get('score_jumping'),
-        evaluation.get('score_agility'),
-    ]
-    mental_scores = [
-        evaluation.get('score_positioning'),
-        evaluation.get('score_vision'),
-        evaluation.get('score_composure'),
-        evaluation.get('score_leadership'),
-        evaluation.get('score_work_rate'),
-        evaluation.get('score_decision_making'),
-    ]
-    
     def avg(scores):
         valid = [s for s in scores if s is not None]
         return sum(valid) / len(valid) if valid else None
     
-    overall_technical = avg(technical_scores)
-    overall_physical = avg(physical_scores)
-    overall_mental = avg(mental_scores)
-    
-    all_scores = [overall_technical, overall_physical, overall_mental]
-    valid_overall = [s for s in all_scores if s is not None]
-    overall_score = sum(valid_overall) / len(valid_overall) if valid_overall else None
-    
-    return {
-        'overall_technical': overall_technical,
-        'overall_physical': overall_physical,
-        'overall_mental': overall_mental,
-        'overall_score': overall_score,
+    scores = {
+        category: avg([evaluation.get(name) for name in names])
+        for category, names in SCORE_CATEGORIES.items()
     }
+    scores['overall_score'] = avg(list(scores.values()))
+    return scores
+
+
+def calculate_overall_scores_batch(evaluations: List[dict]) -> List[dict]:
+    """
+    Calculate overall scores for many evaluations at once (NumPy).
+    
+    Gives the same values as calculate_overall_scores per evaluation.
+    """
+    categories = list(SCORE_CATEGORIES)
+    columns = [name for names in SCORE_CATEGORIES.values() for name in names]
+    values = np.array(
+        [[evaluation.get(name) for name in columns] for evaluation in evaluations],
+        dtype=float,
+    ).reshape(len(evaluations), len(categories), -1)
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # Empty categories
+        category_scores = np.nanmean(values, axis=2)
+        overall = np.nanmean(category_scores, axis=1)
+    
+    table = np.column_stack([category_scores, overall]).tolist()
+    keys = categories + ['overall_score']
+    return [
+        {key: None if value != value else value for key, value in zip(keys, row)}
+        for row in table
+    ]
 
 
 # =============================================================================
@@ -107,6 +141,8 @@ async def list_talents(
     # Pagination
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    count: str = Query("auto", regex=COUNT_MODE_PATTERN, description="Total: auto, exact, estimate or none"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass empty for the first page"),
     # Filters
     search: Optional[str] = None,
     nationality: Optional[str] = None,
@@ -114,71 +150,89 @@ async def list_talents(
     status: Optional[str] = None,
     priority: Optional[str] = None,
     is_diaspora: Optional[bool] = None,
-    min_age: Optional[int] = None,
-    max_age: Optional[int] = None,
+    min_age: Optional[int] = Query(None, ge=0, le=100),
+    max_age: Optional[int] = Query(None, ge=0, le=100),
+    age_band: Optional[str] = Query(None, regex=AGE_BAND_PATTERN),
     # Sorting
-    sort_by: str = Query("created_at", regex="^(created_at|last_name|overall_score|potential_score)$"),
+    sort_by: Optional[str] = Query(
+        None,
+        regex=f"^(relevance|created_at|last_name|overall_score|potential_score|{PERCENTILE_SORT_PATTERN})$",
+        description="Defaults to relevance when searching, created_at otherwise; "
+                    "percentile_<attribute> sorts by cohort percentile",
+    ),
     sort_order: str = Query("desc", regex="^(asc|desc)$"),
 ) -> Any:
     """
     List all talents with filtering and pagination.
     
-    - **search**: Search in name, club
+    - **search**: Search in name, club (accent-insensitive, prefix matching,
+      ranked by relevance)
     - **nationality**: Filter by nationality
     - **position**: Filter by position (GK, CB, LB, RB, CDM, CM, CAM, LW, RW, ST)
     - **status**: Filter by status (Prospect, Monitored, Priority, Signed, Inactive)
     - **is_diaspora**: Filter diaspora talents
+    - **min_age** / **max_age**: Inclusive age bounds (today)
+    - **age_band**: Youth band (U15, U17, U19, U21, U23)
+    - **cursor**: Keyset pagination; returns `next_cursor` in meta instead
+      of page totals (use for deep paging)
+    - **sort_by=percentile_<attribute>**: Sort by the percentile within the
+      talent's cohort (unranked talents last); items carry `percentile`
     """
     # Build query
     query = select(Talent)
     
     # Apply filters
-    conditions = []
-    
-    if search:
-        search_term = f"%{search}%"
-        conditions.append(
-            or_(
-                Talent.first_name.ilike(search_term),
-                Talent.last_name.ilike(search_term),
-                Talent.current_club.ilike(search_term),
-            )
-        )
-    
-    if nationality:
-        conditions.append(Talent.nationality == nationality)
-    
-    if position:
-        conditions.append(
-            or_(
-                Talent.primary_position == position,
-                Talent.secondary_position == position,
-            )
-        )
-    
-    if status:
-        conditions.append(Talent.status == status)
+    conditions = talent_conditions(
+        nationality, position, status, priority, is_diaspora, min_age, max_age, age_band,
+    )
     
-    if priority:
-        conditions.append(Talent.priority_level == priority)
+    ranking = search_ranking(db.bind.dialect.name, search) if search else None
+    if ranking is not None:
+        query = query.join(ranking, ranking.c.talent_id == Talent.id)
     
-    if is_diaspora is not None:
-        conditions.append(Talent.is_diaspora == is_diaspora)
+    if sort_by is None:
+        sort_by = "relevance" if ranking is not None and cursor is None else "created_at"
+    elif sort_by == "relevance" and ranking is None:
+        sort_by = "created_at"
     
     if conditions:
         query = query.where(and_(*conditions))
     
+    # Keyset pagination (opt-in)
+    if cursor is not None:
+        if sort_by == "relevance" or sort_by.startswith("percentile_"):
+            raise ValidationException(f"Cursor pagination does not support sort_by={sort_by}")
+        talents, meta = await keyset_page(
+            db, query, getattr(Talent, sort_by), Talent.id,
+            sort_by, sort_order, per_page, cursor,
+        )
+        return TalentListResponse(
+            success=True,
+            data=[TalentResponse.model_validate(t) for t in talents],
+            meta=meta,
+        )
+    
     # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    total, total_mode = await count_total(db, query, count)
     
     # Apply sorting
-    sort_column = getattr(Talent, sort_by)
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
+    percentile_column = None
+    if sort_by == "relevance":
+        query = query.order_by(ranking.c.score.desc(), Talent.id.desc())
+    elif sort_by.startswith("percentile_"):
+        percentile_column = getattr(TalentPercentile, sort_by[len("percentile_"):])
+        query = query.outerjoin(TalentPercentile, TalentPercentile.talent_id == Talent.id)
+        query = query.add_columns(percentile_column).order_by(
+            percentile_column.is_(None),
+            percentile_column.desc() if sort_order == "desc" else percentile_column.asc(),
+            Talent.id.desc(),
+        )
     else:
-        query = query.order_by(sort_column.asc())
+        sort_column = getattr(Talent, sort_by)
+        if sort_order == "desc":
+            query = query.order_by(sort_column.desc())
+        else:
+            query = query.order_by(sort_column.asc())
     
     # Apply pagination
     offset = (page - 1) * per_page
@@ -186,20 +240,167 @@ async def list_talents(
     
     # Execute
     result = await db.execute(query)
-    talents = result.scalars().all()
+    if percentile_column is not None:
+        data = [
+            TalentResponse.model_validate(t).model_copy(update={"percentile": value})
+            for t, value in result.all()
+        ]
+    else:
+        data = [TalentResponse.model_validate(t) for t in result.scalars().all()]
     
     return TalentListResponse(
         success=True,
-        data=[TalentResponse.model_validate(t) for t in talents],
+        data=data,
         meta={
             "total": total,
+            "total_mode": total_mode,
             "page": page,
             "per_page": per_page,
-            "total_pages": (total + per_page - 1) // per_page,
+            "total_pages": total_pages(total, per_page),
         }
     )
 
 
+# =============================================================================
+# FACETS
+# =============================================================================
+
+@router.get("/facets")
+async def get_talent_facets(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    search: Optional[str] = None,
+    nationality: Optional[str] = None,
+    position: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    is_diaspora: Optional[bool] = None,
+    min_age: Optional[int] = Query(None, ge=0, le=100),
+    max_age: Optional[int] = Query(None, ge=0, le=100),
+    age_band: Optional[str] = Query(None, regex=AGE_BAND_PATTERN),
+) -> Any:
+    """
+    Count talents per status, position, priority, nationality, diaspora and
+    age band for the current filter set (same filters as the talent list).
+    
+    Computed in one statement and cached briefly per filter set.
+    """
+    dialect = db.bind.dialect.name
+    query = select(Talent)
+    
+    ranking = search_ranking(dialect, search) if search else None
+    if ranking is not None:
+        query = query.join(ranking, ranking.c.talent_id == Talent.id)
+    
+    conditions = talent_conditions(
+        nationality, position, status, priority, is_diaspora, min_age, max_age, age_band,
+    )
+    if conditions:
+        query = query.where(and_(*conditions))
+    
+    return {
+        "success": True,
+        "data": await facet_counts(db, query, dialect),
+    }
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+@router.get("/export")
+async def export_talents(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    format: str = Query("csv", regex=EXPORT_FORMAT_PATTERN),
+    search: Optional[str] = None,
+    nationality: Optional[str] = None,
+    position: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    is_diaspora: Optional[bool] = None,
+    min_age: Optional[int] = Query(None, ge=0, le=100),
+    max_age: Optional[int] = Query(None, ge=0, le=100),
+    age_band: Optional[str] = Query(None, regex=AGE_BAND_PATTERN),
+) -> Any:
+    """
+    Stream all talents matching the list filters as CSV or NDJSON
+    (TalentResponse fields, ordered by id).
+    """
+    query = select(*export_columns(Talent, TalentResponse))
+    
+    ranking = search_ranking(db.bind.dialect.name, search) if search else None
+    if ranking is not None:
+        query = query.join(ranking, ranking.c.talent_id == Talent.id)
+    
+    conditions = talent_conditions(
+        nationality, position, status, priority, is_diaspora, min_age, max_age, age_band,
+    )
+    if conditions:
+        query = query.where(and_(*conditions))
+    
+    return export_response(db.bind, query.order_by(Talent.id), format, "talents")
+
+
+# =============================================================================
+# RISING STARS
+# =============================================================================
+
+@router.get("/rising", response_model=RisingTalentsResponse)
+async def get_rising_talents(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=100),
+    category: str = Query("overall", regex=CATEGORY_PATTERN),
+    min_evaluations: int = Query(3, ge=2),
+    min_confidence: float = Query(0, ge=0, le=1, description="Minimum adjusted R^2 of the overall trend"),
+    evaluated_since: Optional[date] = Query(None, description="Last evaluation on or after this date"),
+    nationality: Optional[str] = None,
+    position: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    is_diaspora: Optional[bool] = None,
+    min_age: Optional[int] = Query(None, ge=0, le=100),
+    max_age: Optional[int] = Query(None, ge=0, le=100),
+    age_band: Optional[str] = Query(None, regex=AGE_BAND_PATTERN),
+) -> Any:
+    """
+    Rank talents by how fast their evaluation scores rise (points per year).
+    
+    Reads the trend table fitted by the daily trend batch
+    (`python -m app.services.trends recompute`).
+    """
+    slope = SLOPE_COLUMNS[category]
+    conditions = talent_conditions(
+        nationality, position, status, priority, is_diaspora, min_age, max_age, age_band,
+    )
+    conditions += [slope.is_not(None), TalentTrend.evaluations >= min_evaluations]
+    if min_confidence > 0:
+        conditions.append(TalentTrend.confidence >= min_confidence)
+    if evaluated_since is not None:
+        conditions.append(TalentTrend.last_evaluation >= evaluated_since)
+    
+    result = await db.execute(
+        select(Talent, TalentTrend)
+        .join(TalentTrend, TalentTrend.talent_id == Talent.id)
+        .where(and_(*conditions))
+        .order_by(slope.desc(), Talent.id)
+        .limit(limit)
+    )
+    
+    return RisingTalentsResponse(
+        success=True,
+        data=[
+            RisingTalent(
+                talent=TalentResponse.model_validate(talent),
+                trend=TalentTrendResponse.model_validate(trend),
+            )
+            for talent, trend in result.all()
+        ],
+        meta={"category": category, "limit": limit},
+    )
+
+
 # =============================================================================
 # GET TALENT
 # =============================================================================
@@ -211,7 +412,8 @@ async def get_talent(
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Get talent by ID.
+    Get talent by ID, with percentile ranks within its cohort
+    (position, age band, nationality group) once evaluated.
     """
     result = await db.execute(
         select(Talent).where(Talent.id == talent_id)
@@ -224,6 +426,7 @@ async def get_talent(
     return TalentDetailResponse(
         success=True,
         data=TalentResponse.model_validate(talent),
+        percentiles=await talent_percentiles(db, talent_id),
     )
 
 
@@ -265,6 +468,53 @@ async def create_talent(
     )
 
 
+# =============================================================================
+# BULK IMPORT
+# =============================================================================
+
+@router.post("/import")
+async def import_talents_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
+    format: Optional[str] = Query(None, regex=IMPORT_FORMAT_PATTERN, description="Defaults from Content-Type"),
+    import_id: Optional[str] = Query(None, max_length=50, description="Id to poll progress with"),
+) -> Any:
+    """
+    Import talents from a CSV (header row, TalentCreate field names) or
+    NDJSON body, streamed and inserted in chunks of IMPORT_CHUNK_SIZE rows
+    (one transaction per chunk).
+    
+    Invalid rows are skipped and reported with their row number. Progress
+    of a running import: GET /talents/import/{import_id}.
+    
+    Required roles: Admin, SuperAdmin
+    """
+    progress = start_import("talents", detect_format(request.headers.get("content-type"), format), import_id)
+    await import_talents(db, request.stream(), progress, current_user.username)
+    
+    return {
+        "success": progress.failed == 0,
+        "data": progress.to_dict(),
+    }
+
+
+@router.get("/import/{import_id}")
+async def get_import_progress(
+    import_id: str,
+    current_user: User = Depends(require_roles("Admin", "SuperAdmin")),
+) -> Any:
+    """Progress of a bulk import handled by this worker."""
+    progress = import_progress.get(import_id)
+    if progress is None:
+        raise NotFoundException(resource="Import", resource_id=import_id)
+    
+    return {
+        "success": True,
+        "data": progress.to_dict(include_errors=False),
+    }
+
+
 # =============================================================================
 # UPDATE TALENT
 # =============================================================================
@@ -394,92 +644,181 @@ async def create_evaluation(
     
     db.add(evaluation)
     
-    # Update talent scores and count
-    talent.evaluation_count += 1
+    # evaluation_count and overall_score follow from the running score
+    # totals, maintained on flush (app.services.score_totals)
     talent.last_evaluation = datetime.utcnow()
     
-    if scores['overall_score']:
-        # Update talent overall score (average of all evaluations)
-        result = await db.execute(
-            select(func.avg(TalentEvaluation.overall_score))
-            .where(TalentEvaluation.talent_id == talent_id)
-        )
-        avg_score = result.scalar()
-        if avg_score:
-            talent.overall_score = avg_score
-    
     await db.commit()
     await db.refresh(evaluation)
     
     return EvaluationResponse.model_validate(evaluation)
 
 
+@router.post("/evaluations/batch", response_model=EvaluationBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_evaluations_batch(
+    request: EvaluationBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Create many evaluations, across talents, in one transaction
+    (e.g. a scouting day).
+    
+    Overall scores are computed for the whole batch at once and each
+    talent's aggregates are updated once per batch. Results are returned
+    in request order.
+    """
+    talent_ids = {item.talent_id for item in request.evaluations}
+    result = await db.execute(select(Talent).where(Talent.id.in_(talent_ids)))
+    talents = {talent.id: talent for talent in result.scalars().all()}
+    
+    missing = sorted(talent_ids - set(talents))
+    if missing:
+        raise NotFoundException(resource="Talent", resource_id=", ".join(map(str, missing)))
+    
+    eval_data = [item.model_dump() for item in request.evaluations]
+    evaluation_ids = set()
+    while len(evaluation_ids) < len(eval_data):
+        evaluation_ids.add(generate_evaluation_id())
+    
+    now = datetime.utcnow()
+    evaluations = [
+        TalentEvaluation(evaluation_id=evaluation_id, **data, **scores, created_at=now)
+        for evaluation_id, data, scores in zip(
+            evaluation_ids, eval_data, calculate_overall_scores_batch(eval_data),
+        )
+    ]
+    db.add_all(evaluations)
+    
+    # Score totals, percentiles and the similarity index are updated per
+    # flush, i.e. once per talent for the whole batch
+    for talent in talents.values():
+        talent.last_evaluation = now
+    
+    await db.commit()
+    
+    return EvaluationBatchResponse(
+        success=True,
+        data=[EvaluationResponse.model_validate(evaluation) for evaluation in evaluations],
+        meta={"evaluations": len(evaluations), "talents": len(talents)},
+    )
+
+
 # =============================================================================
-# TALENT STATISTICS
+# SIMILAR TALENTS
 # =============================================================================
 
-@router.get("/stats/overview", response_model=TalentStats)
-async def get_talent_stats(
+@router.get("/{talent_id}/similar", response_model=SimilarTalentsResponse)
+async def get_similar_talents(
+    talent_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    k: int = Query(10, ge=1, le=50),
+    metric: str = Query("cosine", regex=METRIC_PATTERN),
+    position: Optional[str] = None,
+    same_position: bool = False,
+    min_age: Optional[int] = Query(None, ge=0, le=100),
+    max_age: Optional[int] = Query(None, ge=0, le=100),
+    age_band: Optional[str] = Query(None, regex=AGE_BAND_PATTERN),
 ) -> Any:
     """
-    Get talent statistics overview.
-    """
-    # Total talents
-    result = await db.execute(select(func.count(Talent.id)))
-    total = result.scalar()
+    Find talents with the most similar evaluation profile.
     
-    # By status
-    result = await db.execute(
-        select(Talent.status, func.count(Talent.id))
-        .group_by(Talent.status)
-    )
-    by_status = {row[0]: row[1] for row in result.all()}
+    Compares mean scores over the 18 outfield attributes. With
+    **metric=cosine** the score is the similarity (higher is better), with
+    **metric=euclidean** the distance in standard deviations (lower is better).
     
-    # By position
-    result = await db.execute(
-        select(Talent.primary_position, func.count(Talent.id))
-        .group_by(Talent.primary_position)
-    )
-    by_position = {row[0]: row[1] for row in result.all()}
+    - **same_position**: Only talents playing the target's primary position
+    - **position** / **min_age** / **max_age** / **age_band**: Candidate filters
+    """
+    result = await db.execute(select(Talent).where(Talent.id == talent_id))
+    talent = result.scalar_one_or_none()
+    if talent is None:
+        raise NotFoundException(resource="Talent", resource_id=talent_id)
     
-    # By nationality (top 10)
-    result = await db.execute(
-        select(Talent.nationality, func.count(Talent.id))
-        .group_by(Talent.nationality)
-        .order_by(func.count(Talent.id).desc())
-        .limit(10)
-    )
-    by_nationality = {row[0]: row[1] for row in result.all()}
+    if same_position:
+        position = talent.primary_position
+    born_after, born_on_or_before = birth_date_range(min_age, max_age, age_band=age_band)
     
-    # Diaspora count
-    result = await db.execute(
-        select(func.count(Talent.id))
-        .where(Talent.is_diaspora == True)
+    await similarity_index.ensure_current(db)
+    neighbours = similarity_index.nearest(
+        talent_id, k, metric, position, born_after, born_on_or_before,
     )
-    diaspora_count = result.scalar()
+    if neighbours is None:
+        raise ValidationException("Talent has no evaluated attributes to compare")
     
-    # Average scores
-    result = await db.execute(
-        select(
-            func.avg(Talent.overall_score),
-            func.avg(Talent.potential_score),
+    talents = {}
+    if neighbours:
+        result = await db.execute(
+            select(Talent).where(Talent.id.in_([neighbour_id for neighbour_id, _ in neighbours]))
         )
+        talents = {t.id: t for t in result.scalars().all()}
+    
+    return SimilarTalentsResponse(
+        success=True,
+        data=[
+            SimilarTalent(talent=TalentResponse.model_validate(talents[neighbour_id]), score=score)
+            for neighbour_id, score in neighbours
+            if neighbour_id in talents
+        ],
+        meta={"metric": metric, "k": k},
     )
-    avg_scores = result.one()
+
+
+# =============================================================================
+# TALENT STATISTICS
+# =============================================================================
+
+@router.get("/stats/overview", response_model=TalentStats)
+async def get_talent_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get talent statistics overview.
+    
+    Served from the talents rollups instead of scanning the talents table.
+    """
+    rollups = await read_rollups(db, "talents")
+    
+    by_nationality = {
+        nationality: count
+        for nationality, count, _ in rollups.top("talents.nationality", 10)
+    }
     
     return TalentStats(
-        total_talents=total or 0,
-        by_status=by_status,
-        by_position=by_position,
+        total_talents=rollups.count("talents"),
+        by_status=rollups.counts("talents.status"),
+        by_position=rollups.counts("talents.position"),
         by_nationality=by_nationality,
-        diaspora_count=diaspora_count or 0,
-        average_score=avg_scores[0] or 0,
-        average_potential=avg_scores[1] or 0,
+        diaspora_count=rollups.count("talents.diaspora", True),
+        average_score=rollups.average("talents"),
+        average_potential=rollups.average("talents.potential"),
     )
 
 
+@router.get("/stats/age-bands")
+async def get_age_band_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    nationality: Optional[str] = None,
+    position: Optional[str] = None,
+    status: Optional[str] = None,
+    is_diaspora: Optional[bool] = None,
+) -> Any:
+    """
+    Count talents per youth band (U15, U17, U19, U21, U23).
+    
+    Bands are cumulative: U21 includes the U19 talents.
+    """
+    conditions = talent_conditions(nationality, position, status, is_diaspora=is_diaspora)
+    
+    return {
+        "success": True,
+        "data": await age_band_counts(db, conditions),
+    }
+
+
 # =============================================================================
 # SEARCH & FILTERS
 # =============================================================================
@@ -491,30 +830,16 @@ async def get_filter_options(
 ) -> Any:
     """
     Get available filter options.
-    """
-    # Nationalities
-    result = await db.execute(
-        select(Talent.nationality)
-        .distinct()
-        .where(Talent.nationality != None)
-        .order_by(Talent.nationality)
-    )
-    nationalities = [row[0] for row in result.all()]
     
-    # Clubs
-    result = await db.execute(
-        select(Talent.current_club)
-        .distinct()
-        .where(Talent.current_club != None)
-        .order_by(Talent.current_club)
-    )
-    clubs = [row[0] for row in result.all()]
+    Nationalities and clubs come from the in-memory facet value index.
+    """
+    values = await facet_values.values(db)
     
     return {
         "positions": ["GK", "CB", "LB", "RB", "CDM", "CM", "CAM", "LW", "RW", "ST"],
         "statuses": ["Prospect", "Monitored", "Priority", "Signed", "Inactive"],
         "priorities": ["Low", "Normal", "High", "Critical"],
-        "nationalities": nationalities,
-        "clubs": clubs,
+        "nationalities": values["nationalities"],
+        "clubs": values["clubs"],
         "feet": ["Right", "Left", "Both"],
     }
@@ -19,12 +19,57 @@ from app.schemas.event import (
     TicketTransferRequest,
     LoyaltyResponse,
     LoyaltyRedeemRequest,
+    TicketScan,
+    TicketScanBatchRequest,
+    TicketScanResult,
+    TicketScanBatchResponse,
+    ResaleAskRequest,
+    ResaleOrderResponse,
 )
 from app.core.exceptions import NotFoundException, BusinessLogicException
+from app.services.resale import place_ask
+from app.services.ticket_qr import public_key_info, reissue_payload, revocations_since
+from app.services.ticketing import SCAN_OUTCOMES, redeem_tickets
 
 router = APIRouter(prefix="/tickets", tags=["TicketChain - Tickets"])
 
 
+# =============================================================================
+# OFFLINE VALIDATION (signed QR payloads)
+# =============================================================================
+
+@router.get("/qr/key")
+async def get_qr_signing_key() -> Any:
+    """
+    Public key for verifying ticket QR payloads offline.
+    Public endpoint for gate devices.
+    """
+    return public_key_info()
+
+
+@router.get("/revocations")
+async def get_ticket_revocations(
+    cursor: int = Query(0, ge=0, description="Last revocation id already synced"),
+    limit: int = Query(1000, ge=1, le=10000),
+    event_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Revoked QR payloads after a cursor (delta sync for gate devices).
+    
+    A payload is revoked when its version is below the ticket's
+    below_version. Pass the returned cursor on the next call.
+    """
+    page = await revocations_since(db, cursor, limit, event_id)
+    
+    return {
+        "success": True,
+        "data": page["data"],
+        "meta": {"cursor": page["cursor"], "has_more": page["has_more"]},
+    }
+
+
 # =============================================================================
 # GET TICKET BY HASH
 # =============================================================================
@@ -61,11 +106,13 @@ async def verify_ticket(
     Public endpoint for ticket scanners.
     """
     result = await db.execute(
-        select(Ticket).where(Ticket.ticket_hash == ticket_hash)
+        select(Ticket, Event.name)
+        .outerjoin(Event, Event.id == Ticket.event_id)
+        .where(Ticket.ticket_hash == ticket_hash)
     )
-    ticket = result.scalar_one_or_none()
+    row = result.first()
     
-    if ticket is None:
+    if row is None:
         return TicketVerifyResponse(
             valid=False,
             ticket=None,
@@ -73,17 +120,13 @@ async def verify_ticket(
             message="Ticket not found"
         )
     
-    # Get event
-    result = await db.execute(
-        select(Event).where(Event.id == ticket.event_id)
-    )
-    event = result.scalar_one_or_none()
+    ticket, event_name = row
     
     if ticket.status == "Used":
         return TicketVerifyResponse(
             valid=False,
             ticket=TicketResponse.model_validate(ticket),
-            event_name=event.name if event else None,
+            event_name=event_name,
             message=f"Ticket already used at {ticket.used_at}"
         )
     
@@ -91,7 +134,7 @@ async def verify_ticket(
         return TicketVerifyResponse(
             valid=False,
             ticket=TicketResponse.model_validate(ticket),
-            event_name=event.name if event else None,
+            event_name=event_name,
             message="Ticket has been cancelled"
         )
     
@@ -99,14 +142,14 @@ async def verify_ticket(
         return TicketVerifyResponse(
             valid=False,
             ticket=TicketResponse.model_validate(ticket),
-            event_name=event.name if event else None,
+            event_name=event_name,
             message="Ticket has expired"
         )
     
     return TicketVerifyResponse(
         valid=True,
         ticket=TicketResponse.model_validate(ticket),
-        event_name=event.name if event else None,
+        event_name=event_name,
         message="Ticket is valid"
     )
 
@@ -115,6 +158,32 @@ async def verify_ticket(
 # USE TICKET
 # =============================================================================
 
+@router.post("/use/batch", response_model=TicketScanBatchResponse)
+async def use_tickets_batch(
+    request: TicketScanBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Redeem buffered turnstile scans in one statement.
+    
+    Each scan gets an outcome: ok, already_used, invalid (cancelled,
+    expired, ...) or unknown. The first scan of a ticket wins, also
+    against concurrent gates; used_at is the scan time.
+    """
+    outcomes = await redeem_tickets(db, request.scans, request.event_id)
+    await db.commit()
+    
+    counts = dict.fromkeys(SCAN_OUTCOMES, 0)
+    for outcome in outcomes:
+        counts[outcome["outcome"]] += 1
+    
+    return TicketScanBatchResponse(
+        data=[TicketScanResult(**outcome) for outcome in outcomes],
+        meta={"scans": len(outcomes), **counts},
+    )
+
+
 @router.post("/{ticket_hash}/use", response_model=TicketResponse)
 async def use_ticket(
     ticket_hash: str,
@@ -124,33 +193,32 @@ async def use_ticket(
     """
     Mark ticket as used (scan at entrance).
     """
-    result = await db.execute(
-        select(Ticket).where(Ticket.ticket_hash == ticket_hash)
-    )
-    ticket = result.scalar_one_or_none()
+    scan = TicketScan(ticket_hash=ticket_hash, scanned_at=datetime.utcnow())
+    outcome = (await redeem_tickets(db, [scan]))[0]
     
-    if ticket is None:
+    if outcome["outcome"] == "unknown":
         raise NotFoundException(resource="Ticket", resource_id=ticket_hash)
     
-    if ticket.status == "Used":
+    if outcome["outcome"] == "already_used":
         raise BusinessLogicException(
-            detail=f"Ticket already used at {ticket.used_at}",
+            detail=f"Ticket already used at {outcome['used_at']}",
             error_code="TICKET_ALREADY_USED"
         )
     
-    if ticket.status != "Valid":
+    if outcome["outcome"] == "invalid":
         raise BusinessLogicException(
-            detail=f"Ticket status is {ticket.status}",
+            detail=f"Ticket status is {outcome['status']}",
             error_code="TICKET_INVALID"
         )
     
-    ticket.status = "Used"
-    ticket.used_at = datetime.utcnow()
-    
     await db.commit()
-    await db.refresh(ticket)
     
-    return TicketResponse.model_validate(ticket)
+    result = await db.execute(
+        select(Ticket)
+        .where(Ticket.ticket_hash == ticket_hash)
+        .execution_options(populate_existing=True)
+    )
+    return TicketResponse.model_validate(result.scalar_one())
 
 
 # =============================================================================
@@ -189,10 +257,11 @@ async def transfer_ticket(
             error_code="TICKET_NOT_TRANSFERABLE"
         )
     
-    # Transfer
+    # Transfer; the previous owner's QR code stops being valid
     ticket.owner_id = request.new_owner_id
     ticket.owner_name = request.new_owner_name
     ticket.status = "Resold"
+    await reissue_payload(db, ticket)
     
     await db.commit()
     await db.refresh(ticket)
@@ -200,6 +269,24 @@ async def transfer_ticket(
     return TicketResponse.model_validate(ticket)
 
 
+# =============================================================================
+# RESALE
+# =============================================================================
+
+@router.post("/{ticket_hash}/resale", response_model=ResaleOrderResponse, status_code=status.HTTP_201_CREATED)
+async def resell_ticket(
+    ticket_hash: str,
+    request: ResaleAskRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Offer ticket on the resale market (price capped at face value).
+    Sells at once if a bid matches; the buyer gets a new QR code.
+    """
+    return await place_ask(db, ticket_hash, request.price, current_user.id)
+
+
 # =============================================================================
 # MY TICKETS
 # =============================================================================
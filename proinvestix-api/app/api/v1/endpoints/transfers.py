@@ -9,7 +9,7 @@ import hashlib
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, and_
 
 from app.db.database import get_db
 from app.db.models import Transfer, TransferCompensation, Talent, User
@@ -25,6 +25,10 @@ from app.schemas.transfer import (
     TransferStats,
 )
 from app.core.exceptions import NotFoundException
+from app.services.counting import COUNT_MODE_PATTERN, count_total, total_pages
+from app.services.export import EXPORT_FORMAT_PATTERN, export_columns, export_response
+from app.services.pagination import keyset_page
+from app.services.rollups import read_rollups
 
 router = APIRouter(prefix="/transfers", tags=["Transfers"])
 
@@ -107,6 +111,33 @@ def calculate_foundation_contribution(transfer_fee: float) -> float:
     return transfer_fee * (FOUNDATION_PCT / 100)
 
 
+def transfer_conditions(
+    transfer_type: Optional[str] = None,
+    status: Optional[str] = None,
+    from_club: Optional[str] = None,
+    to_club: Optional[str] = None,
+    min_fee: Optional[float] = None,
+    max_fee: Optional[float] = None,
+) -> list:
+    """WHERE conditions for the transfer list filters."""
+    conditions = []
+    
+    if transfer_type:
+        conditions.append(Transfer.transfer_type == transfer_type)
+    if status:
+        conditions.append(Transfer.status == status)
+    if from_club:
+        conditions.append(Transfer.from_club.ilike(f"%{from_club}%"))
+    if to_club:
+        conditions.append(Transfer.to_club.ilike(f"%{to_club}%"))
+    if min_fee is not None:
+        conditions.append(Transfer.transfer_fee >= min_fee)
+    if max_fee is not None:
+        conditions.append(Transfer.transfer_fee <= max_fee)
+    
+    return conditions
+
+
 # =============================================================================
 # LIST TRANSFERS
 # =============================================================================
@@ -118,6 +149,8 @@ async def list_transfers(
     # Pagination
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    count: str = Query("auto", regex=COUNT_MODE_PATTERN, description="Total: auto, exact, estimate or none"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass empty for the first page"),
     # Filters
     transfer_type: Optional[str] = None,
     status: Optional[str] = None,
@@ -133,28 +166,25 @@ async def list_transfers(
     List all transfers with filtering and pagination.
     """
     query = select(Transfer)
-    conditions = []
-    
-    if transfer_type:
-        conditions.append(Transfer.transfer_type == transfer_type)
-    if status:
-        conditions.append(Transfer.status == status)
-    if from_club:
-        conditions.append(Transfer.from_club.ilike(f"%{from_club}%"))
-    if to_club:
-        conditions.append(Transfer.to_club.ilike(f"%{to_club}%"))
-    if min_fee is not None:
-        conditions.append(Transfer.transfer_fee >= min_fee)
-    if max_fee is not None:
-        conditions.append(Transfer.transfer_fee <= max_fee)
+    conditions = transfer_conditions(transfer_type, status, from_club, to_club, min_fee, max_fee)
     
     if conditions:
         query = query.where(and_(*conditions))
     
+    # Keyset pagination (opt-in)
+    if cursor is not None:
+        transfers, meta = await keyset_page(
+            db, query, getattr(Transfer, sort_by), Transfer.id,
+            sort_by, sort_order, per_page, cursor,
+        )
+        return TransferListResponse(
+            success=True,
+            data=[TransferResponse.model_validate(t) for t in transfers],
+            meta=meta,
+        )
+    
     # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    total, total_mode = await count_total(db, query, count)
     
     # Sort
     sort_column = getattr(Transfer, sort_by)
@@ -175,13 +205,42 @@ async def list_transfers(
         data=[TransferResponse.model_validate(t) for t in transfers],
         meta={
             "total": total,
+            "total_mode": total_mode,
             "page": page,
             "per_page": per_page,
-            "total_pages": (total + per_page - 1) // per_page,
+            "total_pages": total_pages(total, per_page),
         }
     )
 
 
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+@router.get("/export")
+async def export_transfers(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    format: str = Query("csv", regex=EXPORT_FORMAT_PATTERN),
+    transfer_type: Optional[str] = None,
+    status: Optional[str] = None,
+    from_club: Optional[str] = None,
+    to_club: Optional[str] = None,
+    min_fee: Optional[float] = None,
+    max_fee: Optional[float] = None,
+) -> Any:
+    """
+    Stream all transfers matching the list filters as CSV or NDJSON
+    (TransferResponse fields, ordered by id).
+    """
+    query = select(*export_columns(Transfer, TransferResponse))
+    conditions = transfer_conditions(transfer_type, status, from_club, to_club, min_fee, max_fee)
+    if conditions:
+        query = query.where(and_(*conditions))
+    
+    return export_response(db.bind, query.order_by(Transfer.id), format, "transfers")
+
+
 # =============================================================================
 # GET TRANSFER
 # =============================================================================
@@ -381,62 +440,27 @@ async def get_transfer_stats(
 ) -> Any:
     """
     Get transfer statistics overview.
-    """
-    # Total transfers
-    result = await db.execute(select(func.count(Transfer.id)))
-    total = result.scalar() or 0
-    
-    # Total value
-    result = await db.execute(select(func.sum(Transfer.transfer_fee)))
-    total_value = result.scalar() or 0
-    
-    # Average fee
-    result = await db.execute(select(func.avg(Transfer.transfer_fee)))
-    avg_fee = result.scalar() or 0
-    
-    # By type
-    result = await db.execute(
-        select(Transfer.transfer_type, func.count(Transfer.id))
-        .group_by(Transfer.transfer_type)
-    )
-    by_type = {row[0]: row[1] for row in result.all()}
     
-    # By status
-    result = await db.execute(
-        select(Transfer.status, func.count(Transfer.id))
-        .group_by(Transfer.status)
-    )
-    by_status = {row[0]: row[1] for row in result.all()}
-    
-    # Foundation total
-    result = await db.execute(select(func.sum(Transfer.foundation_contribution)))
-    foundation_total = result.scalar() or 0
-    
-    # Top spending clubs
-    result = await db.execute(
-        select(Transfer.to_club, func.sum(Transfer.transfer_fee))
-        .group_by(Transfer.to_club)
-        .order_by(func.sum(Transfer.transfer_fee).desc())
-        .limit(5)
-    )
-    top_spending = [{"club": row[0], "total": row[1]} for row in result.all()]
+    Served from the transfers rollups instead of scanning the transfers table.
+    """
+    rollups = await read_rollups(db, "transfers")
     
-    # Top receiving clubs
-    result = await db.execute(
-        select(Transfer.from_club, func.sum(Transfer.transfer_fee))
-        .group_by(Transfer.from_club)
-        .order_by(func.sum(Transfer.transfer_fee).desc())
-        .limit(5)
-    )
-    top_receiving = [{"club": row[0], "total": row[1]} for row in result.all()]
+    top_spending = [
+        {"club": club, "total": total}
+        for club, _, total in rollups.top("transfers.to_club", 5, by="total")
+    ]
+    top_receiving = [
+        {"club": club, "total": total}
+        for club, _, total in rollups.top("transfers.from_club", 5, by="total")
+    ]
     
     return TransferStats(
-        total_transfers=total,
-        total_value=total_value,
-        average_fee=round(avg_fee, 2),
-        by_type=by_type,
-        by_status=by_status,
-        foundation_total=foundation_total,
+        total_transfers=rollups.count("transfers"),
+        total_value=rollups.total("transfers"),
+        average_fee=round(rollups.average("transfers"), 2),
+        by_type=rollups.counts("transfers.type"),
+        by_status=rollups.counts("transfers.status"),
+        foundation_total=rollups.total("transfers.foundation"),
         top_clubs_spending=top_spending,
         top_clubs_receiving=top_receiving,
     )
@@ -10,7 +10,7 @@ import hashlib
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
 from app.db.database import get_db
 from app.db.models import Wallet, WalletTransaction, DiasporaCard, User
@@ -28,6 +28,9 @@ from app.schemas.wallet import (
     WalletStats,
 )
 from app.core.exceptions import NotFoundException, BusinessLogicException
+from app.services.counting import COUNT_MODE_PATTERN, count_total
+from app.services.pagination import keyset_page
+from app.services.rollups import read_rollups
 
 router = APIRouter(prefix="/wallets", tags=["Diaspora Wallet"])
 
@@ -151,9 +154,11 @@ async def get_transactions(
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    count: str = Query("auto", regex=COUNT_MODE_PATTERN, description="Total: auto, exact, estimate or none"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass empty for the first page"),
     type: Optional[str] = None,
 ) -> Any:
-    """Get wallet transactions."""
+    """Get wallet transactions (page/per_page or keyset cursor)."""
     # Verify wallet
     result = await db.execute(select(Wallet).where(Wallet.id == wallet_id))
     wallet = result.scalar_one_or_none()
@@ -169,8 +174,18 @@ async def get_transactions(
     if type:
         query = query.where(WalletTransaction.type == type)
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
+    if cursor is not None:
+        transactions, meta = await keyset_page(
+            db, query, WalletTransaction.created_at, WalletTransaction.id,
+            "created_at", "desc", per_page, cursor,
+        )
+        return TransactionListResponse(
+            success=True,
+            data=[TransactionResponse.model_validate(t) for t in transactions],
+            meta=meta,
+        )
+    
+    total, total_mode = await count_total(db, query, count)
     
     query = query.order_by(WalletTransaction.created_at.desc())
     offset = (page - 1) * per_page
@@ -182,7 +197,7 @@ async def get_transactions(
     return TransactionListResponse(
         success=True,
         data=[TransactionResponse.model_validate(t) for t in transactions],
-        meta={"total": total, "page": page, "per_page": per_page}
+        meta={"total": total, "total_mode": total_mode, "page": page, "per_page": per_page}
     )
 
 
@@ -436,42 +451,27 @@ async def get_wallet_stats(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Any:
-    """Get wallet statistics."""
-    # Total wallets
-    result = await db.execute(select(func.count(Wallet.id)))
-    total_wallets = result.scalar() or 0
-    
-    # Total balance
-    result = await db.execute(select(func.sum(Wallet.balance)))
-    total_balance = result.scalar() or 0
-    
-    # Total transactions
-    result = await db.execute(select(func.count(WalletTransaction.id)))
-    total_transactions = result.scalar() or 0
-    
-    # Transaction volume
-    result = await db.execute(select(func.sum(WalletTransaction.amount)))
-    transaction_volume = result.scalar() or 0
+    """
+    Get wallet statistics.
     
-    # By region
-    result = await db.execute(
-        select(Wallet.diaspora_region, func.count(Wallet.id))
-        .group_by(Wallet.diaspora_region)
-    )
-    by_region = {row[0] or "Unknown": row[1] for row in result.all()}
+    Served from the wallets rollups instead of scanning wallet_transactions.
+    """
+    rollups = await read_rollups(db, "wallets")
     
-    # By KYC level
-    result = await db.execute(
-        select(Wallet.kyc_level, func.count(Wallet.id))
-        .group_by(Wallet.kyc_level)
-    )
-    by_kyc = {f"Level {row[0]}": row[1] for row in result.all()}
+    by_region = {
+        region or "Unknown": count
+        for region, count in rollups.counts("wallets.region").items()
+    }
+    by_kyc = {
+        f"Level {level}": count
+        for level, count in rollups.counts("wallets.kyc_level").items()
+    }
     
     return WalletStats(
-        total_wallets=total_wallets,
-        total_balance=total_balance,
-        total_transactions=total_transactions,
-        transaction_volume=transaction_volume,
+        total_wallets=rollups.count("wallets"),
+        total_balance=rollups.total("wallets"),
+        total_transactions=rollups.count("transactions"),
+        transaction_volume=rollups.total("transactions"),
         by_region=by_region,
         by_kyc_level=by_kyc,
     )
@@ -38,6 +38,8 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TICKET_SIGNING_KEY: Optional[str] = None  # Ed25519 seed (base64url, 32 bytes) for ticket QR payloads; derived from SECRET_KEY when unset
+    TICKET_QR_GRACE_HOURS: int = 24  # Signed ticket QR payloads stay valid this long after the event starts
     
     # ==========================================================================
     # CORS
@@ -67,6 +69,39 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"  # json or text
     
+    # ==========================================================================
+    # PERFORMANCE
+    # ==========================================================================
+    AGGREGATE_CONCURRENCY_ENABLED: bool = True  # Parallel stat queries (non-SQLite)
+    AGGREGATE_MAX_CONNECTIONS: int = 4  # Extra pooled connections for parallel stat queries per worker
+    TIMESERIES_MAX_BUCKETS: int = 731  # Max points per chart (2 years daily)
+    USER_CACHE_SIZE: int = 10000  # Authenticated users kept in memory (0 = off)
+    USER_CACHE_TTL: int = 60  # Seconds before a cached user is reloaded
+    TOKEN_CACHE_SIZE: int = 10000  # Verified JWTs kept until expiry (0 = off)
+    COUNT_CACHE_SIZE: int = 2048  # Cached list totals per filter set (0 = off)
+    COUNT_CACHE_TTL: int = 30  # Seconds a cached list total is reused
+    COUNT_ESTIMATE_THRESHOLD: int = 100000  # count=auto switches to planner estimates above this (Postgres)
+    FACET_CACHE_SIZE: int = 1024  # Cached facet counts per filter set (0 = off)
+    FACET_CACHE_TTL: int = 30  # Seconds cached facet counts are reused
+    FACET_VALUES_TTL: int = 300  # Max age of the club/nationality value index
+    SIMILARITY_REFRESH_SECONDS: int = 900  # Full reload interval of the similarity index
+    IMPORT_CHUNK_SIZE: int = 1000  # Rows validated and inserted per transaction in bulk imports
+    IMPORT_MAX_ERRORS: int = 1000  # Row errors reported per import (the rest are counted)
+    EXPORT_BATCH_SIZE: int = 2000  # Rows fetched and encoded per chunk of a streaming export
+    SNAPSHOT_DIR: str = "snapshots"  # Output directory of the analytics snapshots (manifest.json)
+    SNAPSHOT_BATCH_SIZE: int = 50000  # Rows per record batch / Parquet row group in snapshots
+    SNAPSHOT_OVERLAP_SECONDS: int = 900  # Seconds incremental snapshots re-read before the watermark
+    GATE_REFRESH_SECONDS: int = 30  # Reload interval of a gate-mode ticket index (other workers' writes)
+    GATE_MAX_EVENTS: int = 8  # Events with a gate-mode ticket index per worker
+    SEAT_MAP_REFRESH_SECONDS: int = 10  # Reload interval of an in-memory seat map (other workers' sales)
+    SEAT_MAP_MAX_EVENTS: int = 16  # Events with an in-memory seat map per worker
+    SEAT_HOLD_SECONDS: int = 600  # Checkout window of a seat hold before its seats are released
+    RESALE_PRICE_CAP_RATIO: float = 1.0  # Resale price cap as a multiple of the ticket's face value
+    RESALE_MAX_BOOKS: int = 64  # Resale order books kept in memory per worker (others are replayed on use)
+    BCRYPT_ROUNDS: int = 12  # Cost factor; other costs are rehashed on login
+    PASSWORD_HASH_WORKERS: int = 4  # Concurrent bcrypt operations per worker
+    PASSWORD_HASH_MAX_QUEUE: int = 200  # Waiting bcrypt operations before 503 (0 = unbounded)
+    
     # ==========================================================================
     # OPTIONAL: REDIS
     # ==========================================================================
@@ -7,11 +7,11 @@ from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.db.database import get_db
 from app.db.models import User
 from app.core.security import verify_token, TokenPayload
+from app.core.user_cache import load_user
 
 # =============================================================================
 # SECURITY SCHEME
@@ -45,11 +45,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database
-    result = await db.execute(
-        select(User).where(User.id == int(payload.sub))
-    )
-    user = result.scalar_one_or_none()
+    # Get user (cached, falls back to the database)
+    user = await load_user(db, int(payload.sub))
     
     if user is None:
         raise HTTPException(
@@ -144,10 +141,7 @@ async def get_current_user_optional(
     if payload is None:
         return None
     
-    result = await db.execute(
-        select(User).where(User.id == int(payload.sub))
-    )
-    user = result.scalar_one_or_none()
+    user = await load_user(db, int(payload.sub))
     
     if user is None or not user.is_active:
         return None
@@ -167,3 +167,19 @@ class TicketAlreadyUsedException(BusinessLogicException):
             detail=detail,
             error_code="TICKET_ALREADY_USED",
         )
+
+
+# =============================================================================
+# AVAILABILITY EXCEPTIONS
+# =============================================================================
+
+class ServiceBusyException(ProInvestiXException):
+    """Raised when a bounded work queue is full."""
+    
+    def __init__(self, detail: str = "Service is busy, please retry", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            error_code="SERVICE_BUSY",
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -3,20 +3,34 @@
 # JWT Authentication & Password Hashing
 # ============================================================================
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional, Union
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
 
 from app.config import settings
+from app.core.cache import TTLCache
+from app.core.exceptions import ServiceBusyException
 
 # =============================================================================
 # PASSWORD HASHING
 # =============================================================================
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Fixed bcrypt cost: hashes with any other cost are flagged for rehashing
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -29,6 +43,117 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashPool:
+    """
+    Bounded thread pool for bcrypt work.
+    
+    bcrypt releases the GIL while hashing, so worker threads keep the event
+    loop responsive. At most `workers` hashes run at once; when more than
+    `max_queue` calls are waiting, new calls fail fast with a 503.
+    
+    Args:
+        workers: Concurrent bcrypt operations
+        max_queue: Waiting operations before rejecting (0 = unbounded)
+    """
+    
+    def __init__(self, workers: int, max_queue: int = 0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queued = 0
+        self.total_wait = 0.0
+    
+    @property
+    def queued(self) -> int:
+        return self.submitted - self.running - self.completed
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hash",
+            )
+        return self._executor
+    
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run a hashing function on the pool and await its result."""
+        if self.max_queue and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise ServiceBusyException("Too many concurrent password operations, please retry")
+        
+        enqueued_at = time.perf_counter()
+        with self._lock:
+            self.submitted += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        
+        def task():
+            with self._lock:
+                self.running += 1
+                self.total_wait += time.perf_counter() - enqueued_at
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), task)
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    def stats(self) -> Dict[str, Any]:
+        started = self.completed + self.running
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / started * 1000, 2) if started else 0.0,
+        }
+
+
+password_pool = PasswordHashPool(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool."""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool."""
+    return await password_pool.run(get_password_hash, password)
+
+
+async def verify_and_rehash_password(
+    plain_password: str,
+    hashed_password: str,
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its cost differs from BCRYPT_ROUNDS.
+    
+    Returns:
+        (valid, new_hash) where new_hash is None unless the stored hash
+        should be replaced
+    """
+    return await password_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 # =============================================================================
 # JWT TOKENS
 # =============================================================================
@@ -116,25 +241,50 @@ def create_refresh_token(
     return encoded_jwt
 
 
+# Validated payloads keyed by token digest; entries live until the token's exp
+token_cache = TTLCache(settings.TOKEN_CACHE_SIZE, ttl=0, name="tokens")
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
 def decode_token(token: str) -> Optional[TokenPayload]:
     """
     Decode and validate a JWT token.
     
+    Successfully validated tokens are cached until their expiry, so a
+    reused token skips the signature check and payload validation.
+    
     Args:
         token: The JWT token string
     
     Returns:
         TokenPayload if valid, None otherwise
     """
+    key = _token_key(token)
+    cached = token_cache.get(key)
+    if cached is not None:
+        payload, expires_at = cached
+        # Same rule as jose: valid up to and including exp
+        if time.time() <= expires_at:
+            return payload
+        token_cache.pop(key)
+        return None
+    
     try:
-        payload = jwt.decode(
+        claims = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM],
         )
-        return TokenPayload(**payload)
+        payload = TokenPayload(**claims)
     except JWTError:
         return None
+    
+    expires_at = payload.exp.timestamp()
+    token_cache.set(key, (payload, expires_at), ttl=expires_at - time.time())
+    return payload
 
 
 def verify_token(token: str, token_type: str = "access") -> Optional[TokenPayload]:
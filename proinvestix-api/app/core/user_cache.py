@@ -0,0 +1,135 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Authenticated User Cache
+# Removes the per-request users lookup from get_current_user
+# ============================================================================
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.db.models import User
+
+
+USER_CACHE_CHANNEL = "proinvestix:user-cache:invalidate"
+
+# Column snapshots of recently authenticated users, keyed by user id
+user_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL, name="users")
+
+# Bumped on every invalidation; a lookup that raced with one is not cached
+_generation = 0
+
+_redis = None
+_listener_task: Optional[asyncio.Task] = None
+
+
+# =============================================================================
+# LOOKUP
+# =============================================================================
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    """Copy the loaded column values of a user."""
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+async def load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """
+    Get a user by id, served from the user cache when possible.
+
+    A cached user is merged into the request session without a SELECT, so
+    endpoints can modify and commit it like a freshly loaded instance.
+    """
+    state = user_cache.get(user_id)
+    if state is not None:
+        user = User(**state)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    generation = _generation
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+
+    if user is not None and generation == _generation:
+        user_cache.set(user_id, _snapshot(user))
+    return user
+
+
+# =============================================================================
+# INVALIDATION
+# =============================================================================
+
+def _evict(user_id: int) -> None:
+    global _generation
+    _generation += 1
+    user_cache.pop(user_id)
+
+
+async def invalidate_user(user_id: int) -> None:
+    """
+    Drop a user from the cache of this worker and, with Redis, of all workers.
+
+    Call after committing a change to the user row.
+    """
+    _evict(user_id)
+    if _redis is not None:
+        try:
+            await _redis.publish(USER_CACHE_CHANNEL, str(user_id))
+        except Exception as exc:
+            logger.warning(f"User cache invalidation broadcast failed: {exc}")
+
+
+async def _listen(pubsub) -> None:
+    """Apply invalidations broadcast by other workers."""
+    while True:
+        try:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message is not None:
+                _evict(int(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning(f"User cache invalidation listener error: {exc}")
+            await asyncio.sleep(1.0)
+
+
+async def start_invalidation_listener() -> None:
+    """Subscribe to cross-worker invalidations when REDIS_URL is configured."""
+    global _redis, _listener_task
+    if not settings.REDIS_URL or _listener_task is not None:
+        return
+
+    try:
+        import redis.asyncio as aioredis
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed; "
+                       "user cache invalidations stay local to this worker")
+        return
+
+    _redis = aioredis.from_url(settings.REDIS_URL)
+    pubsub = _redis.pubsub()
+    await pubsub.subscribe(USER_CACHE_CHANNEL)
+    _listener_task = asyncio.create_task(_listen(pubsub))
+    logger.info("User cache invalidation listener started")
+
+
+async def stop_invalidation_listener() -> None:
+    global _redis, _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
+
+
+def user_cache_stats() -> Dict[str, Any]:
+    return {**user_cache.stats(), "broadcast": _redis is not None}
@@ -4,9 +4,11 @@
 # ============================================================================
 
 from sqlalchemy import (
-    Column, Integer, String, Float, Boolean, Text, DateTime, Date,
-    ForeignKey, Index, UniqueConstraint, CheckConstraint
+    Column, Integer, SmallInteger, String, Float, Boolean, Text, DateTime, Date,
+    LargeBinary, ForeignKey, Index, UniqueConstraint, CheckConstraint,
+    DDL, event, func, literal_column,
 )
+from sqlalchemy.dialects import postgresql  # noqa: F401 - registers to_tsvector()
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -689,6 +691,96 @@ class LoyaltyPoints(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class TicketRevocation(Base):
+    """Ingetrokken QR-payloads; id is de delta-cursor voor offline poortscanners"""
+    __tablename__ = "ticket_revocations"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticket_hash = Column(String(66), nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    
+    # Payloads van deze ticket met een lagere versie zijn ongeldig
+    below_version = Column(Integer, nullable=False)
+    reason = Column(String(20), nullable=False)  # Transferred, Resold, Cancelled, Expired
+    
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+
+
+class EventGateMode(Base):
+    """Evenementen in gate mode: scans beantwoord uit de ticketindex in het geheugen"""
+    __tablename__ = "event_gates"
+    
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    opened_at = Column(DateTime, default=datetime.utcnow)
+
+
+class EventSeatRow(Base):
+    """Stoelrij van een zaalplan; bezetting als bitmap (bit i = stoel i + 1)"""
+    __tablename__ = "event_seat_rows"
+    __table_args__ = (UniqueConstraint('event_id', 'seat_section', 'seat_row'),)
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    
+    seat_section = Column(String(50), nullable=False)
+    seat_row = Column(String(10), nullable=False)
+    position = Column(SmallInteger, nullable=False)  # 0 = dichtst bij het veld
+    seats = Column(SmallInteger, nullable=False)
+    
+    # Bitmaps (little-endian): verkocht en tijdelijk vastgehouden
+    sold = Column(LargeBinary, nullable=False)
+    held = Column(LargeBinary, nullable=False)
+    sold_count = Column(Integer, default=0)
+    held_count = Column(Integer, default=0)
+    
+    # Optimistic concurrency: elke schrijfactie verhoogt de versie
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SeatHold(Base):
+    """Tijdelijke stoelreservering tijdens checkout"""
+    __tablename__ = "seat_holds"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    hold_id = Column(String(20), unique=True, nullable=False)
+    
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    
+    seats = Column(Text, nullable=False)  # JSON: [[section, row, seat], ...]
+    quantity = Column(Integer, nullable=False)
+    
+    status = Column(String(20), default="Active")  # Active, Converted, Released, Expired
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ResaleOrderLog(Base):
+    """Append-only orderlog van de doorverkoopmarkt; het orderboek wordt hieruit herbouwd"""
+    __tablename__ = "resale_order_log"
+    __table_args__ = (UniqueConstraint('event_id', 'category', 'sequence'),)
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    category = Column(String(50), nullable=False)
+    sequence = Column(Integer, nullable=False)  # Volgnummer binnen het boek; tijdprioriteit
+    
+    action = Column(String(10), nullable=False)  # place, fill, cancel
+    order_id = Column(String(20), nullable=False)
+    side = Column(String(3))  # ask, bid (place)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    owner_name = Column(String(100))  # Naam van de koper (bid)
+    
+    ticket_hash = Column(String(66))  # ask / fill
+    price = Column(Float)
+    quantity = Column(Integer, nullable=False, default=1)
+    counter_order_id = Column(String(20))  # fill: de ask
+    reason = Column(String(50))  # cancel
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 # ============================================================================
 # FOUNDATION BANK
 # ============================================================================
@@ -1410,16 +1502,215 @@ class ConsularAppointment(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+# ============================================================================
+# STATISTICS ROLLUPS
+# ============================================================================
+
+class StatRollup(Base):
+    """Incrementeel bijgehouden tellers/sommen voor statistiek endpoints"""
+    __tablename__ = "stat_rollups"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    module = Column(String(50), nullable=False)  # talents, transfers, ticketchain, ...
+    dimension = Column(String(100), nullable=False)  # talents.status, tickets.category, ...
+    bucket = Column(String(200), nullable=False)  # Dimension value, "*" for totals
+    
+    item_count = Column(Integer, nullable=False, default=0)
+    value_total = Column(Float, nullable=False, default=0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (UniqueConstraint('module', 'dimension', 'bucket'),)
+
+
+class TalentScoreTotals(Base):
+    """Lopende sommen/aantallen van evaluatiescores per talent en categorie"""
+    __tablename__ = "talent_score_totals"
+    
+    talent_id = Column(Integer, primary_key=True, autoincrement=False)
+    evaluations = Column(Integer, nullable=False, default=0)
+    
+    technical_sum = Column(Float, nullable=False, default=0)
+    technical_count = Column(Integer, nullable=False, default=0)
+    physical_sum = Column(Float, nullable=False, default=0)
+    physical_count = Column(Integer, nullable=False, default=0)
+    mental_sum = Column(Float, nullable=False, default=0)
+    mental_count = Column(Integer, nullable=False, default=0)
+    overall_sum = Column(Float, nullable=False, default=0)
+    overall_count = Column(Integer, nullable=False, default=0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class PercentileCohort(Base):
+    """Percentieltabellen per cohort (positie, leeftijdsband, nationaliteitsgroep)"""
+    __tablename__ = "percentile_cohorts"
+    
+    cohort = Column(String(60), primary_key=True)  # CM|U17|moroccan
+    talents = Column(Integer, nullable=False, default=0)
+    breakpoints = Column(LargeBinary, nullable=False)  # float32 [attribuut][0..100]
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class TalentPercentile(Base):
+    """Percentielrang (0-100) per attribuut binnen het cohort van een talent"""
+    __tablename__ = "talent_percentiles"
+    
+    talent_id = Column(Integer, primary_key=True, autoincrement=False)
+    cohort = Column(String(60), nullable=False)
+    
+    # Technical
+    ball_control = Column(SmallInteger)
+    passing = Column(SmallInteger)
+    dribbling = Column(SmallInteger)
+    shooting = Column(SmallInteger)
+    heading = Column(SmallInteger)
+    first_touch = Column(SmallInteger)
+    
+    # Physical
+    speed = Column(SmallInteger)
+    acceleration = Column(SmallInteger)
+    stamina = Column(SmallInteger)
+    strength = Column(SmallInteger)
+    jumping = Column(SmallInteger)
+    agility = Column(SmallInteger)
+    
+    # Mental
+    positioning = Column(SmallInteger)
+    vision = Column(SmallInteger)
+    composure = Column(SmallInteger)
+    leadership = Column(SmallInteger)
+    work_rate = Column(SmallInteger)
+    decision_making = Column(SmallInteger)
+    
+    overall = Column(SmallInteger)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TalentTrend(Base):
+    """Scoreverloop per talent (kleinste-kwadraten fit over evaluatiedatums)"""
+    __tablename__ = "talent_trends"
+    
+    talent_id = Column(Integer, primary_key=True, autoincrement=False)
+    evaluations = Column(Integer, nullable=False, default=0)
+    first_evaluation = Column(Date)
+    last_evaluation = Column(Date)
+    
+    # Overall score: punten per jaar, punten per jaar^2, aangepaste R^2 (0-1)
+    slope = Column(Float)
+    acceleration = Column(Float)
+    confidence = Column(Float)
+    current_score = Column(Float)  # Gefitte score op de laatste evaluatie
+    
+    technical_slope = Column(Float)
+    physical_slope = Column(Float)
+    mental_slope = Column(Float)
+    
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ============================================================================
+# SEARCH
+# ============================================================================
+
+# Text search configuration used by the Postgres tsvector index and queries
+TALENT_TS_CONFIG = literal_column("'simple'::regconfig")
+
+
+class TalentSearchDocument(Base):
+    """Genormaliseerde zoektekst per talent (naam + club, zonder accenten)"""
+    __tablename__ = "talent_search_documents"
+    
+    talent_id = Column(Integer, primary_key=True, autoincrement=False)
+    document = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # PostgreSQL: tsvector (prefix search) and trigram (fuzzy) GIN indexes
+    __table_args__ = (
+        Index(
+            'idx_talent_search_tsv',
+            func.to_tsvector(TALENT_TS_CONFIG, document),
+            postgresql_using='gin',
+        ).ddl_if(dialect='postgresql'),
+        Index(
+            'idx_talent_search_trgm',
+            document,
+            postgresql_using='gin',
+            postgresql_ops={'document': 'gin_trgm_ops'},
+        ).ddl_if(dialect='postgresql'),
+    )
+
+# SQLite: FTS5 index over talent_search_documents, kept in sync by triggers
+for _statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS talent_search_fts USING fts5("
+    "document, content='talent_search_documents', content_rowid='talent_id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS talent_search_ai AFTER INSERT ON talent_search_documents BEGIN "
+    "INSERT INTO talent_search_fts(rowid, document) VALUES (new.talent_id, new.document); END",
+    "CREATE TRIGGER IF NOT EXISTS talent_search_ad AFTER DELETE ON talent_search_documents BEGIN "
+    "INSERT INTO talent_search_fts(talent_search_fts, rowid, document) "
+    "VALUES ('delete', old.talent_id, old.document); END",
+    "CREATE TRIGGER IF NOT EXISTS talent_search_au AFTER UPDATE ON talent_search_documents BEGIN "
+    "INSERT INTO talent_search_fts(talent_search_fts, rowid, document) "
+    "VALUES ('delete', old.talent_id, old.document); "
+    "INSERT INTO talent_search_fts(rowid, document) VALUES (new.talent_id, new.document); END",
+):
+    event.listen(
+        TalentSearchDocument.__table__, "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    TalentSearchDocument.__table__, "after_drop",
+    DDL("DROP TABLE IF EXISTS talent_search_fts").execute_if(dialect="sqlite"),
+)
+
+# PostgreSQL: trigram operator class for idx_talent_search_trgm
+event.listen(
+    TalentSearchDocument.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
 # ============================================================================
 # INDEXES
 # ============================================================================
 
 # Add indexes for frequently queried columns
-Index('idx_talents_nationality', Talent.nationality)
 Index('idx_talents_status', Talent.status)
-Index('idx_talents_position', Talent.primary_position)
 Index('idx_transfers_date', Transfer.transfer_date)
 Index('idx_events_date', Event.date)
 Index('idx_tickets_status', Ticket.status)
 Index('idx_nil_signals_status', NILSignal.status)
 Index('idx_antihate_status', AntiHateIncident.status)
+
+# Keyset pagination: (sort column, id) per sortable listing
+Index('idx_talents_created_id', Talent.created_at, Talent.id)
+Index('idx_talents_last_name_id', Talent.last_name, Talent.id)
+Index('idx_talents_overall_id', Talent.overall_score, Talent.id)
+Index('idx_talents_potential_id', Talent.potential_score, Talent.id)
+Index('idx_transfers_date_id', Transfer.transfer_date, Transfer.id)
+Index('idx_transfers_fee_id', Transfer.transfer_fee, Transfer.id)
+Index('idx_transfers_created_id', Transfer.created_at, Transfer.id)
+Index('idx_tickets_event_id', Ticket.event_id, Ticket.id)
+Index('idx_wallet_tx_wallet_created_id', WalletTransaction.wallet_id, WalletTransaction.created_at, WalletTransaction.id)
+
+# Age filters: equality on position/nationality + date_of_birth range
+# (also serve plain position/nationality lookups)
+Index('idx_talents_position_dob', Talent.primary_position, Talent.date_of_birth)
+Index('idx_talents_secondary_position_dob', Talent.secondary_position, Talent.date_of_birth)
+Index('idx_talents_nationality_dob', Talent.nationality, Talent.date_of_birth)
+Index('idx_talents_dob', Talent.date_of_birth)
+
+# Per-talent evaluation aggregates (score totals, percentiles)
+Index('idx_evaluations_talent', TalentEvaluation.talent_id)
+
+# Rising-stars ranking
+Index('idx_talent_trends_slope', TalentTrend.slope)
+
+# Revocation deltas per event
+Index('idx_ticket_revocations_event_id', TicketRevocation.event_id, TicketRevocation.id)
+
+# Expired seat holds per event (sweep)
+Index('idx_seat_holds_event_status_expires', SeatHold.event_id, SeatHold.status, SeatHold.expires_at)
@@ -11,9 +11,13 @@ from loguru import logger
 import sys
 
 from app.config import settings
-from app.db.database import init_db, close_db
+from app.db.database import AsyncSessionLocal, init_db, close_db
 from app.api.v1.router import api_router
 from app.core.exceptions import ProInvestiXException
+from app.core.security import password_pool
+from app.core.user_cache import start_invalidation_listener, stop_invalidation_listener
+from app.services.rollups import ensure_rollups
+from app.services.talent_search import ensure_search_index
 
 
 # =============================================================================
@@ -58,10 +62,22 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Database initialized")
     
+    async with AsyncSessionLocal() as db:
+        rebuilt = await ensure_rollups(db)
+        indexed = await ensure_search_index(db)
+    if rebuilt:
+        logger.info(f"Statistics rollups built for: {', '.join(rebuilt)}")
+    if indexed:
+        logger.info(f"Talent search index built for {indexed} talents")
+    
+    await start_invalidation_listener()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down ProInvestiX API...")
+    await stop_invalidation_listener()
+    password_pool.shutdown()
     await close_db()
     logger.info("Database connection closed")
 
@@ -134,6 +150,7 @@ def create_application() -> FastAPI:
                     "message": exc.detail,
                 },
             },
+            headers=exc.headers,
         )
     
     @app.exception_handler(RequestValidationError)
@@ -3,9 +3,9 @@
 # TicketChain - Blockchain Ticketing
 # ============================================================================
 
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 # =============================================================================
@@ -140,6 +140,53 @@ class TicketVerifyResponse(BaseModel):
     message: str
 
 
+class TicketScan(BaseModel):
+    """A buffered turnstile scan."""
+    ticket_hash: str = Field(..., min_length=1, max_length=66)
+    scanned_at: datetime
+    gate_id: Optional[str] = Field(None, max_length=50)
+    
+    @field_validator("scanned_at")
+    @classmethod
+    def naive_utc(cls, v):
+        """Store scan times as naive UTC, like the rest of the schema."""
+        if v.tzinfo is not None:
+            return v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
+
+
+class TicketScanBatchRequest(BaseModel):
+    """Replay of buffered scans; the earliest scan of a ticket wins."""
+    event_id: Optional[int] = Field(None, description="Only redeem tickets of this event")
+    scans: List[TicketScan] = Field(..., min_length=1, max_length=1000)
+
+
+class TicketScanResult(BaseModel):
+    """Outcome of one scan: ok, already_used, invalid or unknown."""
+    ticket_hash: str
+    gate_id: Optional[str] = None
+    scanned_at: datetime
+    outcome: str
+    status: Optional[str] = None
+    used_at: Optional[datetime] = None
+
+
+class TicketScanBatchResponse(BaseModel):
+    """Scan outcomes, in request order."""
+    success: bool = True
+    data: List[TicketScanResult]
+    meta: dict
+
+
+class GateVerifyResponse(BaseModel):
+    """Compact gate-mode scan result."""
+    valid: bool
+    status: Optional[str] = None
+    seat: Optional[str] = None
+    owner: Optional[str] = None
+    message: str
+
+
 class TicketListResponse(BaseModel):
     """Ticket list response."""
     success: bool = True
@@ -147,6 +194,149 @@ class TicketListResponse(BaseModel):
     meta: dict
 
 
+class TicketBatchMintRequest(BaseModel):
+    """Mint several tickets for one event (group/family booking)."""
+    tickets: List[TicketMintRequest] = Field(..., min_length=1, max_length=500)
+    hold_id: Optional[str] = Field(None, max_length=20, description="Seat hold whose seats the tickets get, in order")
+
+
+class TicketBatchMintResponse(BaseModel):
+    """Minted tickets, in request order."""
+    success: bool = True
+    data: List[TicketResponse]
+    meta: dict
+
+
+# =============================================================================
+# SEAT MAP SCHEMAS
+# =============================================================================
+
+class SeatRowLayout(BaseModel):
+    """One row of a section."""
+    row: str = Field(..., min_length=1, max_length=10)
+    seats: int = Field(..., ge=1, le=500)
+
+
+class SeatSectionLayout(BaseModel):
+    """A section's rows, front (nearest the pitch) to back."""
+    section: str = Field(..., min_length=1, max_length=50)
+    rows: List[SeatRowLayout] = Field(..., min_length=1, max_length=200)
+
+
+class SeatLayoutRequest(BaseModel):
+    """Seat map of an event; sections best first."""
+    sections: List[SeatSectionLayout] = Field(..., min_length=1, max_length=500)
+
+
+class SeatRef(BaseModel):
+    """One seat."""
+    section: str = Field(..., max_length=50)
+    row: str = Field(..., max_length=10)
+    seat: int = Field(..., ge=1)
+
+
+class SeatHoldRequest(BaseModel):
+    """Hold seats during checkout: best available, or exact seats."""
+    quantity: int = Field(1, ge=1, le=20)
+    sections: Optional[List[str]] = Field(None, description="Sections to choose from, preferred first")
+    together: bool = Field(True, description="Adjacent seats in one row")
+    seats: Optional[List[SeatRef]] = Field(None, min_length=1, max_length=20, description="Exact seats (overrides quantity)")
+
+
+class SeatHoldResponse(BaseModel):
+    """Held seats and when they are released."""
+    success: bool = True
+    hold_id: str
+    event_id: int
+    seats: List[SeatRef]
+    expires_at: datetime
+
+
+class SeatSectionSummary(BaseModel):
+    """Seat counts of one section."""
+    section: str
+    rows: int
+    seats: int
+    sold: int
+    held: int
+    available: int
+
+
+class SeatMapResponse(BaseModel):
+    """Seat counts per section."""
+    success: bool = True
+    data: List[SeatSectionSummary]
+    meta: dict
+
+
+class SeatRowAvailability(BaseModel):
+    """Free seat numbers of one row."""
+    row: str
+    seats: int
+    available: List[int]
+
+
+class SeatSectionResponse(BaseModel):
+    """Free seats per row of a section."""
+    success: bool = True
+    section: str
+    data: List[SeatRowAvailability]
+
+
+# =============================================================================
+# RESALE SCHEMAS
+# =============================================================================
+
+class ResaleAskRequest(BaseModel):
+    """Offer a ticket for resale."""
+    price: float = Field(..., gt=0, description="Capped at the ticket's face value times RESALE_PRICE_CAP_RATIO")
+
+
+class ResaleBidRequest(BaseModel):
+    """Bid for tickets of an event category."""
+    price: float = Field(..., gt=0)
+    quantity: int = Field(1, ge=1, le=10)
+    owner_name: str = Field(..., min_length=1, max_length=100)
+
+
+class ResaleFill(BaseModel):
+    """One trade of an order."""
+    ticket_hash: str
+    price: float
+    bid_order_id: str
+    ask_order_id: str
+
+
+class ResaleOrderResponse(BaseModel):
+    """An order after matching: open, filled or cancelled."""
+    success: bool = True
+    order_id: str
+    status: str
+    remaining: int
+    fills: List[ResaleFill]
+    sequence: int
+
+
+class ResaleBookLevel(BaseModel):
+    """Open quantity at one price."""
+    price: float
+    quantity: int
+    orders: int
+
+
+class ResaleBookResponse(BaseModel):
+    """Order book depth of an event category."""
+    success: bool = True
+    event_id: int
+    category: str
+    sequence: int
+    best_ask: Optional[float] = None
+    best_bid: Optional[float] = None
+    trades: int
+    asks: List[ResaleBookLevel]
+    bids: List[ResaleBookLevel]
+
+
 # =============================================================================
 # LOYALTY SCHEMAS
 # =============================================================================
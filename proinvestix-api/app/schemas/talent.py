@@ -4,7 +4,7 @@
 # ============================================================================
 
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel, Field, EmailStr
 
 
@@ -122,6 +122,7 @@ class TalentResponse(TalentBase):
     evaluation_count: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    percentile: Optional[int] = None  # Set when listing by a percentile sort
     
     class Config:
         from_attributes = True
@@ -134,10 +135,62 @@ class TalentListResponse(BaseModel):
     meta: dict
 
 
+class TalentPercentiles(BaseModel):
+    """Percentile ranks (0-100) within the talent's cohort."""
+    cohort: dict  # position, age_band, nationality_group, size
+    attributes: Dict[str, Optional[int]]
+    updated_at: Optional[datetime] = None
+
+
 class TalentDetailResponse(BaseModel):
     """Single talent response."""
     success: bool = True
     data: TalentResponse
+    percentiles: Optional[TalentPercentiles] = None
+
+
+class SimilarTalent(BaseModel):
+    """Talent with its similarity score."""
+    talent: TalentResponse
+    score: float
+
+
+class SimilarTalentsResponse(BaseModel):
+    """Nearest talents by evaluation profile."""
+    success: bool = True
+    data: List[SimilarTalent]
+    meta: dict
+
+
+class TalentTrendResponse(BaseModel):
+    """Fitted evaluation score trajectory."""
+    evaluations: int
+    first_evaluation: Optional[date] = None
+    last_evaluation: Optional[date] = None
+    slope: Optional[float] = None  # Overall points per year
+    acceleration: Optional[float] = None  # Overall points per year^2
+    confidence: Optional[float] = None  # Adjusted R^2 (0-1)
+    current_score: Optional[float] = None
+    technical_slope: Optional[float] = None
+    physical_slope: Optional[float] = None
+    mental_slope: Optional[float] = None
+    computed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class RisingTalent(BaseModel):
+    """Talent with its score trend."""
+    talent: TalentResponse
+    trend: TalentTrendResponse
+
+
+class RisingTalentsResponse(BaseModel):
+    """Talents ranked by score trend."""
+    success: bool = True
+    data: List[RisingTalent]
+    meta: dict
 
 
 # =============================================================================
@@ -219,6 +272,23 @@ class EvaluationResponse(EvaluationBase):
         from_attributes = True
 
 
+class EvaluationBatchItem(EvaluationCreate):
+    """Evaluation in a batch submission."""
+    talent_id: int
+
+
+class EvaluationBatchCreate(BaseModel):
+    """Batch evaluation request."""
+    evaluations: List[EvaluationBatchItem] = Field(..., min_length=1, max_length=1000)
+
+
+class EvaluationBatchResponse(BaseModel):
+    """Created evaluations, in request order."""
+    success: bool = True
+    data: List[EvaluationResponse]
+    meta: dict
+
+
 # =============================================================================
 # SCOUT SCHEMAS
 # =============================================================================
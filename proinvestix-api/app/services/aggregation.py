@@ -0,0 +1,149 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Aggregation Service
+# Combined counter queries for dashboard & statistics endpoints
+# ============================================================================
+
+import asyncio
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+
+
+# Aggregate groups are declared as {group: {metric: select(...)}} where every
+# select returns a single scalar (count, sum, avg, ...). Groups usually map to
+# one table family (users, talents, tickets, ...).
+AggregateGroups = Mapping[str, Mapping[str, Any]]
+
+
+# =============================================================================
+# STATEMENT BUILDING
+# =============================================================================
+
+def build_aggregate_statement(metrics: Mapping[str, Any]):
+    """
+    Combine scalar selects into a single SELECT of scalar subqueries.
+
+    Args:
+        metrics: Mapping of metric name to a scalar select
+
+    Returns:
+        One select statement with a labeled column per metric
+    """
+    return select(*[
+        stmt.scalar_subquery().label(name)
+        for name, stmt in metrics.items()
+    ])
+
+
+def _flatten(groups: AggregateGroups) -> Dict[str, Any]:
+    """Flatten groups into one metric mapping with group-prefixed names."""
+    return {
+        f"{group}__{name}": stmt
+        for group, metrics in groups.items()
+        for name, stmt in metrics.items()
+    }
+
+
+def _unflatten(row: Mapping[str, Any], groups: AggregateGroups) -> Dict[str, Dict[str, Any]]:
+    """Split a flattened result row back into its groups."""
+    return {
+        group: {name: row[f"{group}__{name}"] for name in metrics}
+        for group, metrics in groups.items()
+    }
+
+
+# =============================================================================
+# EXECUTION
+# =============================================================================
+
+def supports_concurrent_aggregates(db: AsyncSession) -> bool:
+    """
+    Check whether aggregate groups can run on separate pooled connections.
+
+    SQLite serializes access to a single database file, so splitting the
+    work over several connections only adds overhead there.
+    """
+    if not settings.AGGREGATE_CONCURRENCY_ENABLED:
+        return False
+    bind = db.bind
+    return bind is not None and bind.dialect.name != "sqlite"
+
+
+class ConnectionBudget:
+    """
+    Extra pooled connections that concurrent aggregates may use at once
+    (per worker, over all requests).
+
+    Connections are only taken when free, never waited for: a request
+    already holds its own connection, so waiting could exhaust the pool.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+
+    def take(self, wanted: int) -> int:
+        granted = max(0, min(wanted, self.limit - self.in_use))
+        self.in_use += granted
+        return granted
+
+    def give(self, count: int) -> None:
+        self.in_use -= count
+
+
+aggregate_connections = ConnectionBudget(settings.AGGREGATE_MAX_CONNECTIONS)
+
+
+async def _run_groups(
+    session_factory: async_sessionmaker,
+    groups: AggregateGroups,
+) -> Dict[str, Dict[str, Any]]:
+    """Run some aggregate groups as one statement on their own pooled connection."""
+    async with session_factory() as session:
+        result = await session.execute(build_aggregate_statement(_flatten(groups)))
+        return _unflatten(result.mappings().one(), groups)
+
+
+async def run_aggregates(
+    db: AsyncSession,
+    groups: AggregateGroups,
+    concurrent: Optional[bool] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Evaluate aggregate groups with as few round-trips as possible.
+
+    Without concurrency all groups are folded into a single statement on the
+    request session. With concurrency the groups are spread over as many
+    statements as there are free connections in aggregate_connections
+    (at most one per group), executed in parallel on their own pooled
+    connections; with fewer than two free, they run folded as above.
+
+    Args:
+        db: Request database session
+        groups: Mapping of group name to {metric: scalar select}
+        concurrent: Force or disable concurrent execution (default: auto)
+
+    Returns:
+        Mapping of group name to {metric: value}
+    """
+    if concurrent is None:
+        concurrent = supports_concurrent_aggregates(db)
+
+    connections = aggregate_connections.take(len(groups)) if concurrent and len(groups) > 1 else 0
+    if connections < 2:
+        aggregate_connections.give(connections)
+        result = await db.execute(build_aggregate_statement(_flatten(groups)))
+        return _unflatten(result.mappings().one(), groups)
+
+    names = list(groups)
+    chunks = [{name: groups[name] for name in names[i::connections]} for i in range(connections)]
+    session_factory = async_sessionmaker(db.bind, class_=AsyncSession, expire_on_commit=False)
+    try:
+        results = await asyncio.gather(*[_run_groups(session_factory, chunk) for chunk in chunks])
+    finally:
+        aggregate_connections.give(connections)
+    values = {group: metrics for result in results for group, metrics in result.items()}
+    return {name: values[name] for name in names}
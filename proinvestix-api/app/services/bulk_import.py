@@ -0,0 +1,376 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Bulk Import
+# Streaming CSV / NDJSON parsing and chunked, validated inserts
+# ============================================================================
+#
+# The request body is parsed while it streams in: records are cut at line
+# ends (outside quoted CSV fields) and validated in chunks of
+# IMPORT_CHUNK_SIZE rows. Each chunk's valid rows are inserted in one
+# transaction with a single Core executemany (multi-row INSERT ... RETURNING).
+# Core inserts bypass the ORM flush listeners, so the import applies the
+# same rollup deltas, search documents and facet version change itself,
+# once per chunk.
+#
+# Invalid rows are reported with their row number and do not stop the
+# import. Progress is kept per import id in this worker and can be polled
+# while a large file is still uploading.
+# ============================================================================
+
+import codecs
+import csv
+import json
+import secrets
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.exceptions import ValidationException
+from app.db.models import Talent
+from app.schemas.talent import TalentCreate
+from app.services.rollups import apply_deltas, row_deltas
+from app.services.talent_facets import mark_talents_changed
+from app.services.talent_search import build_document, sync_documents
+
+
+IMPORT_FORMAT_PATTERN = "^(csv|ndjson)$"
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+
+# Recent imports by id (progress polling, this worker only)
+import_progress = TTLCache(100, 3600, name="imports")
+
+Record = Tuple[int, Any]  # (row number, dict or parse error message)
+
+
+# =============================================================================
+# FORMAT
+# =============================================================================
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Import format from the explicit parameter or the Content-Type header.
+
+    Raises:
+        ValidationException: If neither identifies CSV or NDJSON
+    """
+    if requested:
+        return requested
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CONTENT_TYPES:
+        return CONTENT_TYPES[media_type]
+    raise ValidationException("Send text/csv or application/x-ndjson, or pass format=csv|ndjson")
+
+
+# =============================================================================
+# STREAMING PARSE
+# =============================================================================
+
+async def _lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines (BOM and CRLF tolerant)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.rstrip("\r"):
+        yield pending.rstrip("\r")
+
+
+async def _csv_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """
+    CSV rows as dicts keyed by the header row. Empty cells are omitted so
+    schema defaults apply. Quoted fields may span lines.
+    """
+    header: Optional[List[str]] = None
+    record, quotes, row = [], 0, 0
+
+    async for line in _lines(stream):
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue  # Inside a quoted field
+
+        text = "\n".join(record)
+        record, quotes = [], 0
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row += 1
+        if len(values) > len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {
+            name: value for name, value in zip(header, values)
+            if name and value != ""
+        }
+
+    if record:
+        yield row + 1, "Unterminated quoted field"
+
+
+async def _ndjson_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """One JSON object per line; blank lines are skipped."""
+    row = 0
+    async for line in _lines(stream):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield row, f"Invalid JSON: {e}"
+            continue
+        yield row, value if isinstance(value, dict) else "Expected a JSON object"
+
+
+def parse_records(stream: AsyncIterator[bytes], format: str) -> AsyncIterator[Record]:
+    """Parse a streamed body into (row number, record) pairs."""
+    return _csv_records(stream) if format == "csv" else _ndjson_records(stream)
+
+
+async def chunked(records: AsyncIterator[Record], size: int) -> AsyncIterator[List[Record]]:
+    chunk: List[Record] = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+
+def validate_chunk(
+    chunk: List[Record],
+    schema: type[BaseModel],
+) -> Tuple[List[Tuple[int, BaseModel]], List[dict]]:
+    """
+    Validate a chunk of records against a request schema.
+
+    Returns:
+        ([(row, model), ...], [{"row": n, "errors": [...]}, ...])
+    """
+    valid, errors = [], []
+    for row, record in chunk:
+        if isinstance(record, str):
+            errors.append({"row": row, "errors": [{"field": None, "message": record}]})
+            continue
+        try:
+            valid.append((row, schema.model_validate(record)))
+        except ValidationError as e:
+            errors.append({
+                "row": row,
+                "errors": [
+                    {"field": ".".join(str(part) for part in error["loc"]), "message": error["msg"]}
+                    for error in e.errors()
+                ],
+            })
+    return valid, errors
+
+
+# =============================================================================
+# PROGRESS
+# =============================================================================
+
+class ImportProgress:
+    """Running totals of one import."""
+
+    def __init__(self, import_id: str, kind: str, format: str):
+        self.import_id = import_id
+        self.kind = kind
+        self.format = format
+        self.status = "running"
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors: List[dict] = []
+        self.started_at = time.monotonic()
+        self.elapsed = 0.0
+
+    def add_errors(self, errors: List[dict]) -> None:
+        self.failed += len(errors)
+        room = settings.IMPORT_MAX_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend(errors[:room])
+
+    def tick(self) -> None:
+        self.chunks += 1
+        self.elapsed = time.monotonic() - self.started_at
+
+    def to_dict(self, include_errors: bool = True) -> Dict[str, Any]:
+        data = {
+            "import_id": self.import_id,
+            "kind": self.kind,
+            "format": self.format,
+            "status": self.status,
+            "rows": self.rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows / self.elapsed) if self.elapsed else None,
+        }
+        if include_errors:
+            data["errors"] = self.errors
+            data["errors_truncated"] = self.failed > len(self.errors)
+        return data
+
+
+def start_import(kind: str, format: str, import_id: Optional[str] = None) -> ImportProgress:
+    """
+    Register a new import.
+
+    Raises:
+        ValidationException: If the import id is already running
+    """
+    import_id = import_id or f"IMP-{secrets.token_hex(6).upper()}"
+    current = import_progress.get(import_id)
+    if current is not None and current.status == "running":
+        raise ValidationException(f"Import {import_id} is already running")
+    progress = ImportProgress(import_id, kind, format)
+    import_progress.set(import_id, progress)
+    return progress
+
+
+# =============================================================================
+# TALENTS
+# =============================================================================
+
+def _new_talent_ids(count: int, taken: Iterable[str] = ()) -> List[str]:
+    taken = set(taken)
+    ids: List[str] = []
+    while len(ids) < count:
+        talent_id = f"NTSP-{secrets.token_hex(4).upper()}"
+        if talent_id not in taken:
+            taken.add(talent_id)
+            ids.append(talent_id)
+    return ids
+
+
+async def generate_talent_ids(db: AsyncSession, count: int) -> List[str]:
+    """Talent ids for a batch, unique within it and against the table."""
+    ids = _new_talent_ids(count)
+    while True:
+        existing = set((await db.execute(
+            select(Talent.talent_id).where(Talent.talent_id.in_(ids))
+        )).scalars().all())
+        if not existing:
+            return ids
+        fresh = iter(_new_talent_ids(len(existing), taken=ids))
+        ids = [next(fresh) if talent_id in existing else talent_id for talent_id in ids]
+
+
+async def import_talents(
+    db: AsyncSession,
+    stream: AsyncIterator[bytes],
+    progress: ImportProgress,
+    created_by: str,
+) -> ImportProgress:
+    """
+    Validate and insert streamed talent records, one transaction per chunk.
+
+    A chunk whose insert fails is rolled back and its rows reported as
+    failed; earlier chunks stay committed.
+    """
+    try:
+        await _import_talent_chunks(db, stream, progress, created_by)
+    except Exception:
+        progress.status = "failed"
+        raise
+
+    progress.status = "completed"
+    progress.elapsed = time.monotonic() - progress.started_at
+    return progress
+
+
+def _insert_talents(connection: Connection, rows: List[dict]) -> None:
+    """
+    Insert talent rows with one executemany and maintain what the ORM flush
+    listeners would: rollups, search documents and the facet version.
+    """
+    result = connection.execute(insert(Talent).returning(Talent.talent_id, Talent.id), rows)
+    ids = dict(result.all())
+
+    apply_deltas(connection, row_deltas(Talent, rows))
+    sync_documents(connection, {
+        ids[row["talent_id"]]: build_document(row["first_name"], row["last_name"], row.get("current_club"))
+        for row in rows
+    })
+
+
+async def _import_talent_chunks(
+    db: AsyncSession,
+    stream: AsyncIterator[bytes],
+    progress: ImportProgress,
+    created_by: str,
+) -> None:
+    async for chunk in chunked(parse_records(stream, progress.format), settings.IMPORT_CHUNK_SIZE):
+        progress.rows += len(chunk)
+        valid, errors = validate_chunk(chunk, TalentCreate)
+        progress.add_errors(errors)
+
+        if valid:
+            now = datetime.utcnow()
+            ids = await generate_talent_ids(db, len(valid))
+            rows = [
+                {
+                    "talent_id": talent_id,
+                    **request.model_dump(),
+                    "status": "Prospect",
+                    "overall_score": 0,
+                    "potential_score": 0,
+                    "market_value": 0,
+                    "evaluation_count": 0,
+                    "created_at": now,
+                    "created_by": created_by,
+                }
+                for talent_id, (_, request) in zip(ids, valid)
+            ]
+            try:
+                connection = await db.connection()
+                await connection.run_sync(_insert_talents, rows)
+                mark_talents_changed(db.sync_session)
+                await db.commit()
+                progress.imported += len(valid)
+            except SQLAlchemyError as e:
+                await db.rollback()
+                message = str(e.orig if getattr(e, "orig", None) is not None else e).splitlines()[0]
+                progress.add_errors([
+                    {"row": row, "errors": [{"field": None, "message": message}]}
+                    for row, _ in valid
+                ])
+
+        progress.tick()
+        if progress.chunks % 10 == 0:
+            logger.info(
+                f"Import {progress.import_id}: {progress.rows} rows, "
+                f"{progress.imported} imported, {progress.failed} failed"
+            )
@@ -0,0 +1,104 @@
+# ============================================================================
+# ProInvestiX Enterprise API - List Totals
+# Cached exact counts and planner estimates for pagination metadata
+# ============================================================================
+
+import hashlib
+import json
+from typing import Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import TTLCache
+
+
+# auto: cached exact count, or a planner estimate for very large sets (Postgres)
+COUNT_MODES = ("auto", "exact", "estimate", "none")
+COUNT_MODE_PATTERN = "^(auto|exact|estimate|none)$"
+
+count_cache = TTLCache(settings.COUNT_CACHE_SIZE, settings.COUNT_CACHE_TTL, name="counts")
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def count_fingerprint(query) -> str:
+    """
+    Stable key for a filtered query: its SQL text plus bound parameters.
+
+    Filters are applied in a fixed order by the endpoints, so equal filter
+    sets produce equal fingerprints.
+    """
+    compiled = query.compile()
+    params = sorted((key, repr(value)) for key, value in compiled.params.items())
+    raw = json.dumps([str(compiled), params])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+async def planner_estimate(db: AsyncSession, query) -> Optional[int]:
+    """
+    Row estimate from the PostgreSQL planner (EXPLAIN, no execution).
+
+    Returns None on other databases or when the query can't be explained.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return None
+
+    try:
+        sql = str(query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}))
+        connection = await db.connection()
+        plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as exc:
+        logger.debug(f"Planner estimate unavailable: {exc}")
+        return None
+
+
+# =============================================================================
+# STRATEGY
+# =============================================================================
+
+async def count_total(db: AsyncSession, query, mode: str = "auto") -> Tuple[Optional[int], str]:
+    """
+    Total for list metadata according to the requested count mode.
+
+    - exact: exact count (cached per filter set for a short TTL)
+    - estimate: planner estimate on Postgres, cached exact count elsewhere
+    - none: no count at all
+    - auto: exact, unless the planner expects more than
+      COUNT_ESTIMATE_THRESHOLD rows
+
+    Returns:
+        (total, mode used) where mode used is "exact", "estimate" or "none"
+    """
+    if mode == "none":
+        return None, "none"
+
+    key = count_fingerprint(query)
+    if mode != "estimate" or db.bind.dialect.name != "postgresql":
+        cached = count_cache.get(key)
+        if cached is not None:
+            return cached, "exact"
+
+    if mode in ("auto", "estimate"):
+        estimate = await planner_estimate(db, query)
+        if estimate is not None and (
+            mode == "estimate" or estimate >= settings.COUNT_ESTIMATE_THRESHOLD
+        ):
+            return estimate, "estimate"
+
+    total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar()
+    count_cache.set(key, total)
+    return total, "exact"
+
+
+def total_pages(total: Optional[int], per_page: int) -> Optional[int]:
+    if total is None:
+        return None
+    return (total + per_page - 1) // per_page
@@ -0,0 +1,134 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Streaming Export
+# CSV / NDJSON exports over server-side cursors
+# ============================================================================
+#
+# Exports select plain columns (no ORM objects or pydantic models) and stream
+# them from a server-side cursor in partitions of EXPORT_BATCH_SIZE rows.
+# Each partition is encoded and sent before the next one is fetched, so
+# memory stays flat whatever the result size.
+#
+# The stream runs on its own connection: request-scoped sessions are
+# closed before a streaming response body is sent.
+# ============================================================================
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Iterable, List, Sequence
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+
+EXPORT_FORMAT_PATTERN = "^(csv|ndjson)$"
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_columns(model, schema: type[BaseModel], exclude: Iterable[str] = ()) -> List:
+    """Model columns for the fields of a response schema, in schema order."""
+    excluded = set(exclude)
+    return [
+        getattr(model, name) for name in schema.model_fields
+        if name not in excluded and name in model.__table__.columns
+    ]
+
+
+# =============================================================================
+# ENCODING
+# =============================================================================
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class _CsvEncoder:
+    def __init__(self, names: Sequence[str]):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator="\n")
+        self.names = names
+
+    def header(self) -> bytes:
+        self.writer.writerow(self.names)
+        return self._take()
+
+    def rows(self, rows) -> bytes:
+        self.writer.writerows([_csv_value(value) for value in row] for row in rows)
+        return self._take()
+
+    def _take(self) -> bytes:
+        data = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+class _NdjsonEncoder:
+    def __init__(self, names: Sequence[str]):
+        self.names = names
+
+    def header(self) -> bytes:
+        return b""
+
+    def rows(self, rows) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(self.names, row)), default=_json_default, separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode()
+
+
+# =============================================================================
+# STREAMING
+# =============================================================================
+
+async def stream_export(
+    engine: AsyncEngine,
+    query,
+    format: str,
+    batch_size: int = 0,
+) -> AsyncIterator[bytes]:
+    """
+    Encode the rows of a column select as CSV or NDJSON, one partition at a
+    time, reading them through a server-side cursor.
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    names = [column.name for column in query.selected_columns]
+    encoder = _CsvEncoder(names) if format == "csv" else _NdjsonEncoder(names)
+
+    header = encoder.header()
+    if header:
+        yield header
+
+    async with engine.connect() as connection:
+        result = await connection.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions(batch_size):
+            yield encoder.rows(rows)
+
+
+def export_response(engine: AsyncEngine, query, format: str, name: str) -> StreamingResponse:
+    """Streaming download of a column select."""
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_export(engine, query, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,341 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Gate Verification Index
+# In-memory per-event ticket index for turnstile scans ("gate mode")
+# ============================================================================
+#
+# In gate mode an event's tickets are preloaded into a dict of
+# ticket_hash -> (status, seat, owner, used_at), so a scan is answered from
+# memory without touching the database. Every index has a Bloom filter
+# over the ticket hashes: ticket hashes are SHA-256 hex, so the probe bits
+# are taken straight from the hash prefix (no rehashing) and unknown or
+# forged codes are rejected with a few bit tests.
+#
+# The index is the answer for its event: a hash it does not know is not a
+# ticket for that event (as of the last load), so scan latency does not
+# depend on database load. Ticket changes committed by this worker (mint,
+# use, transfer) are applied incrementally; every index is reloaded after
+# GATE_REFRESH_SECONDS to pick up other workers' writes. Verification is
+# advisory: admitting a ticket (use_ticket) still checks the database.
+#
+# Only events opened for gate mode (event_gates) are indexed, so the
+# public scan endpoint cannot be used to load arbitrary events. At most
+# GATE_MAX_EVENTS events are indexed per worker; opening another one drops
+# the least recently scanned.
+# ============================================================================
+
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.exceptions import NotFoundException
+from app.db.models import Event, EventGateMode, Ticket
+
+
+# (status, seat_info, owner_name, used_at)
+Entry = Tuple[str, Optional[str], Optional[str], Optional[datetime]]
+
+_ENTRY_FIELDS = ("status", "seat_info", "owner_name", "used_at")
+
+# Statuses a scan rejects, with the reason
+INVALID_STATUSES = {
+    "Used": "Ticket already used at {used_at}",
+    "Cancelled": "Ticket has been cancelled",
+    "Expired": "Ticket has expired",
+}
+
+BLOOM_BITS_PER_TICKET = 10
+BLOOM_PROBES = 7  # ~1% false positives at 10 bits per ticket
+
+
+# =============================================================================
+# BLOOM FILTER
+# =============================================================================
+
+def _probe_seeds(key: str) -> Tuple[int, int]:
+    """Two 64-bit seeds for double hashing, from the hash prefix when possible."""
+    try:
+        if key.startswith("0x") and len(key) >= 34:
+            return int(key[2:18], 16), int(key[18:34], 16) | 1
+    except ValueError:
+        pass
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Args:
+        capacity: Expected number of keys (sizes the bit array)
+    """
+
+    def __init__(self, capacity: int):
+        bits = 64
+        while bits < capacity * BLOOM_BITS_PER_TICKET:
+            bits *= 2
+        self.mask = bits - 1
+        self.bits = bytearray(bits // 8)
+
+    def _positions(self, key: str) -> List[int]:
+        first, step = _probe_seeds(key)
+        return [(first + i * step) & self.mask for i in range(BLOOM_PROBES)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        """Add keys in bulk (seeds and bit positions computed with NumPy)."""
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            if not all(key.startswith("0x") and len(key) >= 34 for key in keys):
+                raise ValueError
+            raw = bytes.fromhex("".join(key[2:34] for key in keys))
+            seeds = np.frombuffer(raw, dtype=">u8").astype(np.uint64).reshape(-1, 2)
+            seeds[:, 1] |= np.uint64(1)
+        except ValueError:
+            seeds = np.array([_probe_seeds(key) for key in keys], dtype=np.uint64)
+
+        probes = np.arange(BLOOM_PROBES, dtype=np.uint64)
+        with np.errstate(over="ignore"):  # Wraps modulo 2^64, like the masked sum
+            positions = (seeds[:, :1] + probes * seeds[:, 1:]) & np.uint64(self.mask)
+        flags = np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8), bitorder="little").astype(bool)
+        flags[positions.ravel()] = True
+        self.bits = bytearray(np.packbits(flags, bitorder="little").tobytes())
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+class EventGate:
+    """Ticket index of one event."""
+
+    def __init__(self, event_id: int, name: str, tickets: Dict[str, Entry]):
+        self.event_id = event_id
+        self.name = name
+        self.tickets = tickets
+        self.bloom = BloomFilter(len(tickets))
+        self.bloom.add_many(tickets)
+        self.loaded_at = time.monotonic()
+        self.scans = 0
+        self.rejected = 0  # Bloom negatives
+        self.false_positives = 0
+
+    def put(self, ticket_hash: str, entry: Entry) -> None:
+        if ticket_hash not in self.tickets:
+            self.bloom.add(ticket_hash)
+        self.tickets[ticket_hash] = entry
+
+    def lookup(self, ticket_hash: str) -> Optional[Entry]:
+        self.scans += 1
+        if ticket_hash not in self.bloom:
+            self.rejected += 1
+            return None
+        entry = self.tickets.get(ticket_hash)
+        if entry is None:
+            self.false_positives += 1
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "event_id": self.event_id,
+            "tickets": len(self.tickets),
+            "scans": self.scans,
+            "rejected": self.rejected,
+            "false_positives": self.false_positives,
+            "bloom_bytes": len(self.bloom.bits),
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1),
+        }
+
+
+GATE_CLOSED = {"valid": False, "status": None, "seat": None, "owner": None, "message": "Event is not in gate mode"}
+
+
+def verify_entry(entry: Optional[Entry]) -> Dict[str, Any]:
+    """Compact scan result for an index entry (None = unknown ticket)."""
+    if entry is None:
+        return {"valid": False, "status": None, "seat": None, "owner": None, "message": "Ticket not found for this event"}
+
+    status, seat, owner, used_at = entry
+    reason = INVALID_STATUSES.get(status)
+    return {
+        "valid": reason is None,
+        "status": status,
+        "seat": seat,
+        "owner": owner,
+        "message": reason.format(used_at=used_at) if reason else "Ticket is valid",
+    }
+
+
+class GateIndex:
+    """
+    Gate-mode ticket indexes of this worker, one per event.
+
+    Args:
+        refresh_seconds: Reload an event's index after this many seconds
+        max_events: Events indexed at once (least recently scanned is dropped)
+    """
+
+    def __init__(self, refresh_seconds: float, max_events: int):
+        self.refresh_seconds = refresh_seconds
+        self.max_events = max_events
+        self.gates: Dict[int, EventGate] = {}
+        self.loads = 0
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._loading: Dict[int, List[Tuple[str, Entry]]] = {}
+
+    def __contains__(self, event_id: int) -> bool:
+        return event_id in self.gates or event_id in self._loading
+
+    @property
+    def active(self) -> bool:
+        return bool(self.gates or self._loading)
+
+    async def load(self, db: AsyncSession, event_id: int) -> Optional[EventGate]:
+        """
+        (Re)load an event's tickets.
+
+        Returns:
+            The index, or None (and any index dropped) when the event is
+            not in gate mode
+
+        Raises:
+            NotFoundException: If the event does not exist
+        """
+        event_row = (await db.execute(
+            select(Event.name, EventGateMode.event_id)
+            .outerjoin(EventGateMode, EventGateMode.event_id == Event.id)
+            .where(Event.id == event_id)
+        )).one_or_none()
+        if event_row is None:
+            raise NotFoundException(resource="Event", resource_id=event_id)
+        name, gate_open = event_row
+        if gate_open is None:
+            self.close(event_id)
+            return None
+
+        # Changes committed while the query runs are replayed afterwards
+        self._loading[event_id] = []
+        try:
+            result = await db.execute(
+                select(Ticket.ticket_hash, *[getattr(Ticket, field) for field in _ENTRY_FIELDS])
+                .where(Ticket.event_id == event_id)
+            )
+            gate = EventGate(event_id, name, {row[0]: tuple(row[1:]) for row in result})
+        finally:
+            replay = self._loading.pop(event_id)
+        for ticket_hash, entry in replay:
+            gate.put(ticket_hash, entry)
+
+        self.gates.pop(event_id, None)
+        self.gates[event_id] = gate
+        while len(self.gates) > self.max_events:
+            self.gates.pop(next(iter(self.gates)))
+        self.loads += 1
+        return gate
+
+    async def gate(self, db: AsyncSession, event_id: int) -> Optional[EventGate]:
+        """
+        An event's index, loaded on first use and after refresh_seconds
+        (None when the event is not in gate mode).
+        """
+        gate = self.gates.get(event_id)
+        if gate is not None and time.monotonic() - gate.loaded_at < self.refresh_seconds:
+            self.gates[event_id] = self.gates.pop(event_id)  # Most recently scanned last
+            return gate
+        lock = self._locks.setdefault(event_id, asyncio.Lock())
+        if gate is not None and lock.locked():
+            return gate  # Keep scanning on the old index while it reloads
+        async with lock:
+            gate = self.gates.get(event_id)
+            if gate is not None and time.monotonic() - gate.loaded_at < self.refresh_seconds:
+                return gate
+            return await self.load(db, event_id)
+
+    def close(self, event_id: int) -> bool:
+        """Drop an event's index. Returns whether it was loaded."""
+        self._locks.pop(event_id, None)
+        return self.gates.pop(event_id, None) is not None
+
+    def clear(self) -> None:
+        self.gates.clear()
+        self._locks.clear()
+
+    def apply(self, changes: Iterable[Tuple[int, str, Entry]]) -> None:
+        """Apply committed ticket states (event_id, ticket_hash, entry)."""
+        for event_id, ticket_hash, entry in changes:
+            if event_id in self._loading:
+                self._loading[event_id].append((ticket_hash, entry))
+            gate = self.gates.get(event_id)
+            if gate is not None:
+                gate.put(ticket_hash, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "events": [gate.stats() for gate in self.gates.values()],
+            "loads": self.loads,
+        }
+
+
+gate_index = GateIndex(settings.GATE_REFRESH_SECONDS, settings.GATE_MAX_EVENTS)
+
+
+# =============================================================================
+# CHANGE TRACKING
+# =============================================================================
+
+def _pending(session: Session) -> List[Tuple[int, str, Entry]]:
+    return session.info.setdefault("gate_pending", [])
+
+
+def track_tickets(session: Session, rows: Iterable[dict]) -> None:
+    """
+    Queue tickets written with Core statements (which bypass the flush
+    listener) for the gate indexes; applied when the session commits.
+    """
+    _pending(session).extend(
+        (row["event_id"], row["ticket_hash"], tuple(row.get(field) for field in _ENTRY_FIELDS))
+        for row in rows if row["event_id"] in gate_index
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _track_ticket_changes(session: Session, flush_context) -> None:
+    """Collect new and changed tickets of gated events until commit."""
+    if not gate_index.active:
+        return
+    changes = [
+        (obj.event_id, obj.ticket_hash, tuple(getattr(obj, field) for field in _ENTRY_FIELDS))
+        for obj in (*session.new, *session.dirty)
+        if isinstance(obj, Ticket) and obj.event_id in gate_index
+    ]
+    if changes:
+        _pending(session).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_ticket_changes(session: Session) -> None:
+    pending = session.info.pop("gate_pending", None)
+    if pending:
+        gate_index.apply(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_ticket_changes(session: Session) -> None:
+    session.info.pop("gate_pending", None)
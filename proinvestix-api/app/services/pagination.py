@@ -0,0 +1,158 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Keyset Pagination
+# Opaque cursors over (sort column, id) for constant-cost deep pages
+# ============================================================================
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import ValidationException
+
+
+# =============================================================================
+# CURSOR ENCODING
+# =============================================================================
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, row_id: int) -> str:
+    """Encode the position after a row as an opaque URL-safe cursor."""
+    raw = json.dumps([sort_by, sort_order, _encode_value(value), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValidationException: If the cursor is malformed or was issued for
+            another sort order
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        value = _decode_value(value)
+        row_id = int(row_id)
+    except (ValueError, TypeError):
+        raise ValidationException("Invalid cursor")
+
+    if (cursor_sort, cursor_order) != (sort_by, sort_order):
+        raise ValidationException("Cursor does not match sort_by/sort_order")
+    return value, row_id
+
+
+# =============================================================================
+# KEYSET QUERIES
+# =============================================================================
+
+def _is_nullable(column) -> bool:
+    return getattr(getattr(column, "expression", column), "nullable", True)
+
+
+def keyset_order(sort_column, id_column, sort_order: str) -> list:
+    """
+    ORDER BY clause for keyset pages: sort column, then id.
+
+    NULLs sort as the greatest value (ASC NULLS LAST / DESC NULLS FIRST),
+    the native btree order, so a (sort column, id) index serves both
+    directions.
+    """
+    if sort_order == "desc":
+        sort = sort_column.desc()
+        if _is_nullable(sort_column):
+            sort = sort.nulls_first()
+        return [sort, id_column.desc()]
+
+    sort = sort_column.asc()
+    if _is_nullable(sort_column):
+        sort = sort.nulls_last()
+    return [sort, id_column.asc()]
+
+
+def keyset_condition(sort_column, id_column, sort_order: str, value: Any, row_id: int):
+    """WHERE clause selecting the rows after (value, row_id) in keyset order."""
+    key = tuple_(sort_column, id_column)
+
+    if value is None:
+        if sort_order == "desc":
+            return or_(and_(sort_column.is_(None), id_column < row_id), sort_column.is_not(None))
+        return and_(sort_column.is_(None), id_column > row_id)
+
+    if sort_order == "desc":
+        return key < tuple_(value, row_id)
+    after = key > tuple_(value, row_id)
+    return or_(after, sort_column.is_(None)) if _is_nullable(sort_column) else after
+
+
+async def keyset_page(
+    db: AsyncSession,
+    query,
+    sort_column,
+    id_column,
+    sort_by: str,
+    sort_order: str,
+    per_page: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Fetch one page of a filtered query in keyset order.
+
+    Every page is an index range scan starting at the cursor, so page 1000
+    costs the same as page 1. No total count is computed.
+
+    Args:
+        db: Database session
+        query: Filtered select of ORM entities (without ORDER BY/LIMIT)
+        sort_column: Column the client sorts on
+        id_column: Unique tiebreaker (primary key)
+        sort_by: Sort parameter name (stored in the cursor)
+        sort_order: "asc" or "desc"
+        per_page: Page size
+        cursor: Cursor from a previous page, or empty/None for the first page
+
+    Returns:
+        (items, meta) where meta holds per_page, next_cursor and has_more
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_by, sort_order)
+        query = query.where(keyset_condition(sort_column, id_column, sort_order, value, row_id))
+
+    query = query.order_by(*keyset_order(sort_column, id_column, sort_order)).limit(per_page + 1)
+    items = list((await db.execute(query)).scalars().all())
+
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(
+            sort_by, sort_order,
+            getattr(last, sort_column.key), getattr(last, id_column.key),
+        )
+
+    return items, {
+        "per_page": per_page,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
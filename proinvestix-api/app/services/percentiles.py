@@ -0,0 +1,370 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Cohort Percentiles
+# Percentile ranks of evaluation attributes within talent cohorts (NumPy)
+# ============================================================================
+#
+# A cohort is (primary position, age band, nationality group), e.g.
+# "LB|U17|moroccan". For every evaluated talent and attribute (mean score
+# over its evaluations) the percentile rank within its cohort is stored in
+# talent_percentiles, one SMALLINT per attribute, so lists can sort on it.
+#
+# The batch job ranks all talents of all cohorts for all attributes with a
+# single sort. It also stores per cohort a compact float32 table of the
+# 0..100th percentile values of every attribute (percentile_cohorts).
+#
+# Between batch runs, talents whose evaluations (or cohort fields) change
+# are re-ranked against their cohort's table from a flush listener, in the
+# same transaction. Run the batch daily: talents move between age bands.
+#
+# Usage:
+#     python -m app.services.percentiles recompute
+# ============================================================================
+
+import argparse
+import asyncio
+import warnings
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.db.models import PercentileCohort, Talent, TalentEvaluation, TalentPercentile
+from app.services.similarity import ATTRIBUTES as SCORE_ATTRIBUTES
+from app.services.talent_filters import age_band_of
+
+
+# Attribute -> evaluation column averaged per talent
+SOURCES = {name[len("score_"):]: name for name in SCORE_ATTRIBUTES}
+SOURCES["overall"] = "overall_score"
+ATTRIBUTES = tuple(SOURCES)
+
+PERCENTILE_SORT_PATTERN = "percentile_(?:" + "|".join(ATTRIBUTES) + ")"
+
+MOROCCAN_NATIONALITIES = {"moroccan", "morocco", "maroc", "marocain", "marokko", "marokkaans"}
+
+QUANTILES = np.arange(101)
+
+_COHORT_FIELDS = ("primary_position", "date_of_birth", "nationality", "is_diaspora")
+
+
+# =============================================================================
+# COHORTS
+# =============================================================================
+
+def nationality_group(nationality: Optional[str], is_diaspora: Optional[bool]) -> str:
+    """diaspora, moroccan or international."""
+    if is_diaspora:
+        return "diaspora"
+    if (nationality or "").strip().lower() in MOROCCAN_NATIONALITIES:
+        return "moroccan"
+    return "international"
+
+
+def cohort_key(
+    position: str,
+    born: date,
+    nationality: Optional[str],
+    is_diaspora: Optional[bool],
+    today: Optional[date] = None,
+) -> str:
+    return f"{position}|{age_band_of(born, today)}|{nationality_group(nationality, is_diaspora)}"
+
+
+def describe_cohort(cohort: str) -> Dict[str, str]:
+    position, age_band, group = cohort.split("|")
+    return {"position": position, "age_band": age_band, "nationality_group": group}
+
+
+def _profile_query(talent_ids: Optional[Iterable[int]] = None):
+    """Per talent: cohort fields plus the mean of every attribute."""
+    query = (
+        select(
+            Talent.id, Talent.primary_position, Talent.date_of_birth,
+            Talent.nationality, Talent.is_diaspora,
+            *[func.avg(getattr(TalentEvaluation, column)) for column in SOURCES.values()],
+        )
+        .join(TalentEvaluation, TalentEvaluation.talent_id == Talent.id)
+        .group_by(
+            Talent.id, Talent.primary_position, Talent.date_of_birth,
+            Talent.nationality, Talent.is_diaspora,
+        )
+    )
+    if talent_ids is not None:
+        query = query.where(Talent.id.in_(list(talent_ids)))
+    return query
+
+
+def _profiles(rows, today: date) -> Tuple[List[int], List[str], np.ndarray]:
+    ids = [row[0] for row in rows]
+    cohorts = [cohort_key(row[1], row[2], row[3], row[4], today) for row in rows]
+    values = np.array(
+        [[np.nan if value is None else float(value) for value in row[5:]] for row in rows],
+        dtype=float,
+    ).reshape(len(rows), len(ATTRIBUTES))
+    return ids, cohorts, values
+
+
+# =============================================================================
+# RANKING
+# =============================================================================
+
+def percentile_ranks(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """
+    Mid-rank percentile (0-100) of every value within its cohort, per column.
+
+    All cohorts and attributes are ranked with one sort: every value is
+    keyed by (attribute, cohort) group plus its value.
+
+    Args:
+        values: (talents, attributes) scores in 0..100, NaN when missing
+        codes: (talents,) integer cohort codes
+
+    Returns:
+        (talents, attributes) percentiles, NaN where the value is missing
+    """
+    talents, attributes = values.shape
+    ranks = np.full(values.shape, np.nan)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return ranks
+
+    span = 1000.0  # > any score, so groups never overlap
+    groups = np.arange(attributes)[None, :] * (int(codes.max()) + 1) + codes[:, None]
+    keys = (groups * span + np.where(valid, values, 0))[valid]
+    group_keys = groups[valid] * span
+
+    ordered = np.sort(keys)
+    below = np.searchsorted(ordered, keys, "left")
+    through = np.searchsorted(ordered, keys, "right")
+    start = np.searchsorted(ordered, group_keys, "left")
+    end = np.searchsorted(ordered, group_keys + span, "left")
+
+    ranks[valid] = 100 * (below - start + 0.5 * (through - below)) / (end - start)
+    return ranks
+
+
+def cohort_breakpoints(values: np.ndarray) -> np.ndarray:
+    """(attributes, 101) float32 table of the 0..100th percentile values."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN attributes
+        return np.nanpercentile(values, QUANTILES, axis=0).T.astype(np.float32)
+
+
+def rank_against(breakpoints: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Percentile of each attribute value against a cohort breakpoint table."""
+    ranks = np.full(len(values), np.nan)
+    for i, (table, value) in enumerate(zip(breakpoints, values)):
+        if np.isnan(value) or np.isnan(table).any():
+            continue
+        below = np.searchsorted(table, value, "left")
+        through = np.searchsorted(table, value, "right")
+        if through > below:
+            ranks[i] = (below + through - 1) / 2
+        elif below == 0:
+            ranks[i] = 0
+        elif below == len(table):
+            ranks[i] = 100
+        else:
+            low, high = table[below - 1], table[below]
+            ranks[i] = below - 1 + (value - low) / (high - low)
+    return ranks
+
+
+def _percentile_row(talent_id: int, cohort: str, ranks: np.ndarray, now: datetime) -> dict:
+    row = {"talent_id": talent_id, "cohort": cohort, "updated_at": now}
+    for name, rank in zip(ATTRIBUTES, ranks):
+        row[name] = None if np.isnan(rank) else int(round(rank))
+    return row
+
+
+# =============================================================================
+# BATCH
+# =============================================================================
+
+async def recompute_percentiles(db: AsyncSession, today: Optional[date] = None) -> Dict[str, int]:
+    """
+    Rank all evaluated talents within their cohorts and store the results
+    and the cohort breakpoint tables.
+
+    Returns:
+        {"talents": n, "cohorts": n}
+    """
+    today = today or date.today()
+    ids, cohorts, values = _profiles((await db.execute(_profile_query())).all(), today)
+
+    names = sorted(set(cohorts))
+    code_of = {name: code for code, name in enumerate(names)}
+    codes = np.array([code_of[name] for name in cohorts], dtype=np.int64)
+    ranks = percentile_ranks(values, codes)
+
+    now = datetime.utcnow()
+    cohort_rows = [
+        {
+            "cohort": name,
+            "talents": int((codes == code).sum()),
+            "breakpoints": cohort_breakpoints(values[codes == code]).tobytes(),
+            "computed_at": now,
+        }
+        for name, code in code_of.items()
+    ]
+    talent_rows = [
+        _percentile_row(talent_id, cohort, row_ranks, now)
+        for talent_id, cohort, row_ranks in zip(ids, cohorts, ranks)
+    ]
+
+    await db.execute(delete(PercentileCohort))
+    await db.execute(delete(TalentPercentile))
+    if cohort_rows:
+        await db.execute(insert(PercentileCohort), cohort_rows)
+    for start in range(0, len(talent_rows), 5000):
+        await db.execute(insert(TalentPercentile), talent_rows[start:start + 5000])
+    await db.commit()
+
+    return {"talents": len(talent_rows), "cohorts": len(cohort_rows)}
+
+
+# =============================================================================
+# INCREMENTAL
+# =============================================================================
+
+def _upsert_statement(dialect_name: str):
+    table = TalentPercentile.__table__
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.talent_id],
+        set_={
+            column.name: stmt.excluded[column.name]
+            for column in table.columns if column.name != "talent_id"
+        },
+    )
+
+
+def refresh_talents(connection: Connection, talent_ids: Iterable[int]) -> None:
+    """
+    Re-rank talents against their cohort tables (inside the caller's
+    transaction). Talents without evaluations lose their percentiles.
+    """
+    talent_ids = set(talent_ids)
+    if not talent_ids:
+        return
+
+    table = TalentPercentile.__table__
+    rows = connection.execute(_profile_query(talent_ids)).all()
+    ids, cohorts, values = _profiles(rows, date.today())
+
+    gone = talent_ids - set(ids)
+    if gone:
+        connection.execute(delete(table).where(table.c.talent_id.in_(gone)))
+    if not ids:
+        return
+
+    tables = {
+        row.cohort: np.frombuffer(row.breakpoints, dtype=np.float32).reshape(len(ATTRIBUTES), -1)
+        for row in connection.execute(
+            select(PercentileCohort.cohort, PercentileCohort.breakpoints)
+            .where(PercentileCohort.cohort.in_(set(cohorts)))
+        )
+    }
+
+    now = datetime.utcnow()
+    unranked = np.full(len(ATTRIBUTES), np.nan)
+    updates = [
+        _percentile_row(
+            talent_id, cohort,
+            rank_against(tables[cohort], row_values) if cohort in tables else unranked,
+            now,
+        )
+        for talent_id, cohort, row_values in zip(ids, cohorts, values)
+    ]
+
+    stmt = _upsert_statement(connection.dialect.name)
+    if stmt is None:
+        connection.execute(delete(table).where(table.c.talent_id.in_(ids)))
+        stmt = insert(table)
+    connection.execute(stmt, updates)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_percentiles(session: Session, flush_context) -> None:
+    """Re-rank talents whose evaluations or cohort fields changed."""
+    affected, removed = set(), set()
+    score_keys = ("talent_id",) + tuple(SOURCES.values())
+
+    for obj in session.new | session.deleted:
+        if isinstance(obj, TalentEvaluation):
+            affected.add(obj.talent_id)
+        elif isinstance(obj, Talent) and obj in session.deleted:
+            removed.add(obj.id)
+
+    for obj in session.dirty:
+        if isinstance(obj, TalentEvaluation):
+            for key in score_keys:
+                history = get_history(obj, key)
+                if history.has_changes():
+                    affected.update(history.deleted)
+                    affected.add(obj.talent_id)
+        elif isinstance(obj, Talent):
+            if any(get_history(obj, key).has_changes() for key in _COHORT_FIELDS):
+                affected.add(obj.id)
+
+    affected.discard(None)
+    if removed:
+        table = TalentPercentile.__table__
+        session.connection().execute(delete(table).where(table.c.talent_id.in_(removed)))
+    if affected - removed:
+        refresh_talents(session.connection(), affected - removed)
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+async def talent_percentiles(db: AsyncSession, talent_id: int) -> Optional[dict]:
+    """Percentiles of a talent with its cohort description, or None."""
+    result = await db.execute(
+        select(TalentPercentile, PercentileCohort.talents)
+        .outerjoin(PercentileCohort, PercentileCohort.cohort == TalentPercentile.cohort)
+        .where(TalentPercentile.talent_id == talent_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    percentiles, cohort_size = row
+    return {
+        "cohort": {**describe_cohort(percentiles.cohort), "size": cohort_size},
+        "attributes": {name: getattr(percentiles, name) for name in ATTRIBUTES},
+        "updated_at": percentiles.updated_at,
+    }
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+async def _main() -> None:
+    from app.db.database import AsyncSessionLocal, init_db
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        written = await recompute_percentiles(db)
+        print(f"Ranked {written['talents']} talents in {written['cohorts']} cohorts")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain cohort percentile tables")
+    parser.add_argument("command", choices=["recompute"])
+    parser.parse_args()
+    asyncio.run(_main())
@@ -0,0 +1,580 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Ticket Resale Market
+# Price-time priority order books over an append-only order log
+# ============================================================================
+#
+# Every (event, category) has an order book: asks offer one ticket each,
+# bids ask for a quantity of tickets of the category. Both sides are heaps
+# keyed (price, sequence), so the best price trades first and, at equal
+# prices, the oldest order. A trade runs at the resting order's price,
+# never above the ticket's cap (RESALE_PRICE_CAP_RATIO x face value).
+#
+# resale_order_log is the book's source of truth: every operation appends
+# its entries (place, fill, cancel) with the next per-book sequence number,
+# and a book is rebuilt by replaying them. The sequence is unique per book,
+# so when two workers act on the same book the second insert fails; that
+# worker rolls back, replays the entries it missed and tries again. A
+# worker catches up on the log before every operation, and its coroutines
+# take turns per book, so the in-memory book is always the committed one.
+#
+# A fill moves the ticket to the buyer like transfer_ticket does: new
+# owner, a re-issued QR payload and the old versions revoked, in the same
+# transaction as the log entries. Tickets that left their seller or are
+# no longer Valid when matched cancel their ask instead. Traded tickets
+# stay Valid (a "Resold" ticket cannot be redeemed at the gate). Payment
+# is not handled here.
+#
+# Usage:
+#     python -m app.services.resale bench [--orders 200000]
+# ============================================================================
+
+import argparse
+import asyncio
+import heapq
+import random
+import secrets
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import BusinessLogicException, NotFoundException
+from app.db.models import ResaleOrderLog, Ticket
+from app.services.ticket_qr import reissue_payload
+
+
+SIDES = ("ask", "bid")
+
+# Operation attempts before giving up on a contended book
+WRITE_ATTEMPTS = 5
+
+_LOG_FIELDS = (
+    "sequence", "action", "order_id", "side", "user_id", "owner_name",
+    "ticket_hash", "price", "quantity", "counter_order_id", "reason",
+)
+
+
+def new_order_id() -> str:
+    return f"ORD-{secrets.token_hex(6).upper()}"
+
+
+def price_cap(face_value: float) -> float:
+    """Highest resale price of a ticket with this face value."""
+    return round(face_value * settings.RESALE_PRICE_CAP_RATIO, 2)
+
+
+# =============================================================================
+# ORDER BOOK
+# =============================================================================
+
+class Order:
+    """A resting (or incoming) order."""
+
+    __slots__ = ("order_id", "side", "user_id", "owner_name", "ticket_hash", "price", "cap", "remaining", "sequence")
+
+    def __init__(self, order_id, side, user_id, owner_name, ticket_hash, price, remaining, sequence, cap=None):
+        self.order_id = order_id
+        self.side = side
+        self.user_id = user_id
+        self.owner_name = owner_name
+        self.ticket_hash = ticket_hash
+        self.price = price
+        self.cap = cap if cap is not None else price
+        self.remaining = remaining
+        self.sequence = sequence
+
+    def crosses(self, resting: "Order") -> bool:
+        if self.side == "bid":
+            return resting.price <= self.price
+        return resting.price >= self.price
+
+
+class OrderBook:
+    """
+    Order book of one event and category, built from its log entries.
+
+    Asks are keyed (price, sequence) and bids (-price, sequence) in min-heaps;
+    cancelled and filled orders are dropped lazily.
+    """
+
+    def __init__(self, event_id: int, category: str):
+        self.event_id = event_id
+        self.category = category
+        self.sequence = 0
+        self.orders: Dict[str, Order] = {}
+        self.asks: List[Tuple[float, int, str]] = []
+        self.bids: List[Tuple[float, int, str]] = []
+        self.listed: Dict[str, str] = {}  # ticket_hash -> ask order_id
+        self.face_cap = 0.0  # Highest cap of the category's tickets (bid limit)
+        self.trades = 0
+
+    def apply(self, entry: Dict[str, Any]) -> None:
+        """Apply one log entry (in sequence order)."""
+        action = entry["action"]
+        if action == "place":
+            order = Order(
+                entry["order_id"], entry["side"], entry["user_id"], entry["owner_name"],
+                entry["ticket_hash"], entry["price"], entry["quantity"], entry["sequence"],
+            )
+            self.orders[order.order_id] = order
+            if order.side == "ask":
+                heapq.heappush(self.asks, (order.price, order.sequence, order.order_id))
+                self.listed[order.ticket_hash] = order.order_id
+            else:
+                heapq.heappush(self.bids, (-order.price, order.sequence, order.order_id))
+        elif action == "fill":
+            self.trades += 1
+            for order_id in (entry["order_id"], entry["counter_order_id"]):
+                self._reduce(order_id, entry["quantity"])
+        elif action == "cancel":
+            self._reduce(entry["order_id"], None)
+        self.sequence = entry["sequence"]
+        self._compact()
+
+    def _reduce(self, order_id: str, quantity: Optional[int]) -> None:
+        order = self.orders.get(order_id)
+        if order is None:
+            return
+        order.remaining = 0 if quantity is None else order.remaining - quantity
+        if order.remaining <= 0:
+            del self.orders[order_id]
+            if order.side == "ask":
+                self.listed.pop(order.ticket_hash, None)
+
+    def _compact(self) -> None:
+        """Drop dead heap entries once they outnumber the live orders."""
+        for name in ("asks", "bids"):
+            heap = getattr(self, name)
+            if len(heap) > 2 * len(self.orders) + 64:
+                live = [key for key in heap if key[2] in self.orders]
+                heapq.heapify(live)
+                setattr(self, name, live)
+
+    def crossing(self, incoming: Order) -> Iterator[Order]:
+        """Resting orders the incoming order crosses, best first (book unchanged)."""
+        heap = self.asks if incoming.side == "bid" else self.bids
+        popped = []
+        try:
+            while heap:
+                key = heapq.heappop(heap)
+                order = self.orders.get(key[2])
+                if order is None:
+                    continue  # Dead entry: not restored
+                popped.append(key)
+                if not incoming.crosses(order):
+                    break
+                yield order
+        finally:
+            for key in popped:
+                heapq.heappush(heap, key)
+
+    def plan(self, incoming: Order, skip: set) -> List[Tuple[Order, float]]:
+        """
+        Fills for the incoming order's remaining quantity: (resting order,
+        trade price). Own orders and orders in `skip` are passed over.
+        """
+        fills = []
+        candidates = self.crossing(incoming)
+        try:
+            for resting in candidates:
+                if len(fills) == incoming.remaining:
+                    break
+                if resting.order_id in skip or resting.user_id == incoming.user_id:
+                    continue
+                ask = resting if resting.side == "ask" else incoming
+                fills.append((resting, min(resting.price, ask.cap)))
+                if resting.side == "bid":
+                    break  # An ask is one ticket
+        finally:
+            candidates.close()
+        return fills
+
+    def depth(self, levels: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """Aggregated price levels per side, best first."""
+        totals: Dict[str, Dict[float, List[int]]] = {"ask": {}, "bid": {}}
+        for order in self.orders.values():
+            level = totals[order.side].setdefault(order.price, [0, 0])
+            level[0] += order.remaining
+            level[1] += 1
+        return {
+            side + "s": [
+                {"price": price, "quantity": quantity, "orders": orders}
+                for price, (quantity, orders) in sorted(totals[side].items(), reverse=side == "bid")[:levels]
+            ]
+            for side in SIDES
+        }
+
+    def best(self, side: str) -> Optional[float]:
+        prices = [order.price for order in self.orders.values() if order.side == side]
+        if not prices:
+            return None
+        return min(prices) if side == "ask" else max(prices)
+
+
+# =============================================================================
+# PER-WORKER BOOKS
+# =============================================================================
+
+class ResaleMarket:
+    """
+    Order books of this worker, rebuilt from the log and kept current by
+    replaying its tail before every operation.
+
+    Args:
+        max_books: Books kept at once (least recently used is dropped)
+    """
+
+    def __init__(self, max_books: int):
+        self.max_books = max_books
+        self.books: Dict[Tuple[int, str], OrderBook] = {}
+        self.replayed = 0
+        self.conflicts = 0
+        self._locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+
+    def lock(self, event_id: int, category: str) -> asyncio.Lock:
+        """Operations of this worker on a book take turns."""
+        return self._locks.setdefault((event_id, category), asyncio.Lock())
+
+    async def book(self, db: AsyncSession, event_id: int, category: str) -> OrderBook:
+        """The book with every committed log entry applied (call under its lock)."""
+        key = (event_id, category)
+        book = self.books.pop(key, None)
+        if book is None:
+            book = OrderBook(event_id, category)
+            result = await db.execute(
+                select(func.max(Ticket.price)).where(Ticket.event_id == event_id, Ticket.category == category)
+            )
+            book.face_cap = price_cap(result.scalar() or 0)
+        self.books[key] = book  # Most recently used last
+        while len(self.books) > self.max_books:
+            self.books.pop(next(iter(self.books)))
+
+        result = await db.execute(
+            select(*[getattr(ResaleOrderLog, field) for field in _LOG_FIELDS])
+            .where(
+                ResaleOrderLog.event_id == event_id,
+                ResaleOrderLog.category == category,
+                ResaleOrderLog.sequence > book.sequence,
+            )
+            .order_by(ResaleOrderLog.sequence)
+        )
+        for entry in result.mappings():
+            book.apply(entry)
+            self.replayed += 1
+        return book
+
+    def drop(self, event_id: int, category: str) -> None:
+        self.books.pop((event_id, category), None)
+
+    def clear(self) -> None:
+        self.books.clear()
+        self._locks.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "books": [
+                {
+                    "event_id": book.event_id,
+                    "category": book.category,
+                    "orders": len(book.orders),
+                    "sequence": book.sequence,
+                    "trades": book.trades,
+                }
+                for book in self.books.values()
+            ],
+            "replayed": self.replayed,
+            "conflicts": self.conflicts,
+        }
+
+
+resale_market = ResaleMarket(settings.RESALE_MAX_BOOKS)
+
+
+# =============================================================================
+# OPERATIONS
+# =============================================================================
+
+def _entry(action: str, order_id: str, **values) -> Dict[str, Any]:
+    return {
+        "action": action, "order_id": order_id, "side": None, "user_id": None, "owner_name": None,
+        "ticket_hash": None, "price": None, "quantity": 1, "counter_order_id": None, "reason": None,
+        **values,
+    }
+
+
+async def _fill(db: AsyncSession, book: OrderBook, incoming: Order) -> List[Dict[str, Any]]:
+    """
+    Match the incoming order against the book and move the traded tickets
+    to their buyers. Stale asks (ticket sold elsewhere, used, cancelled)
+    are cancelled and matching continues with the next best order.
+    """
+    entries = []
+    skip = set()
+    remaining = incoming.remaining
+    while remaining:
+        probe = Order(incoming.order_id, incoming.side, incoming.user_id, None, None,
+                      incoming.price, remaining, 0, incoming.cap)
+        fills = book.plan(probe, skip)
+        if not fills:
+            break
+
+        asks = [resting if resting.side == "ask" else incoming for resting, _ in fills]
+        result = await db.execute(
+            select(Ticket)
+            .where(Ticket.ticket_hash.in_([ask.ticket_hash for ask in asks]))
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        tickets = {ticket.ticket_hash: ticket for ticket in result.scalars()}
+
+        for (resting, price), ask in zip(fills, asks):
+            bid = incoming if ask is resting else resting
+            ticket = tickets.get(ask.ticket_hash)
+            if ticket is None or ticket.owner_id != ask.user_id or ticket.status != "Valid":
+                if ask is incoming:
+                    return entries + [_entry("cancel", ask.order_id, reason="Ticket no longer available")]
+                entries.append(_entry("cancel", ask.order_id, reason="Ticket no longer available"))
+                skip.add(ask.order_id)
+                continue
+
+            ticket.owner_id = bid.user_id
+            ticket.owner_name = bid.owner_name
+            await reissue_payload(db, ticket, reason="Resold")
+            entries.append(_entry(
+                "fill", bid.order_id, counter_order_id=ask.order_id,
+                ticket_hash=ticket.ticket_hash, price=price, user_id=bid.user_id,
+            ))
+            skip.add(resting.order_id)
+            remaining -= 1
+    return entries
+
+
+async def _commit(db: AsyncSession, book: OrderBook, entries: List[Dict[str, Any]]) -> bool:
+    """Append the entries and commit; False if another worker appended first."""
+    now = datetime.utcnow()
+    rows = [
+        {**entry, "event_id": book.event_id, "category": book.category,
+         "sequence": book.sequence + position, "created_at": now}
+        for position, entry in enumerate(entries, start=1)
+    ]
+    try:
+        await db.execute(insert(ResaleOrderLog), rows)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return False
+    for row in rows:
+        book.apply(row)
+    return True
+
+
+async def _run(db: AsyncSession, event_id: int, category: str, operation) -> Tuple[OrderBook, List[Dict[str, Any]]]:
+    """Run an operation on the current book, retrying after concurrent appends."""
+    async with resale_market.lock(event_id, category):
+        for _ in range(WRITE_ATTEMPTS):
+            book = await resale_market.book(db, event_id, category)
+            entries = await operation(book)
+            if not entries or await _commit(db, book, entries):
+                return book, entries
+            resale_market.conflicts += 1
+    raise BusinessLogicException(detail="Resale market is busy, please retry", error_code="RESALE_BUSY")
+
+
+def _result(book: OrderBook, order_id: str, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    fills = [
+        {"ticket_hash": entry["ticket_hash"], "price": entry["price"],
+         "bid_order_id": entry["order_id"], "ask_order_id": entry["counter_order_id"]}
+        for entry in entries
+        if entry["action"] == "fill" and order_id in (entry["order_id"], entry["counter_order_id"])
+    ]
+    order = book.orders.get(order_id)
+    cancelled = any(entry["action"] == "cancel" and entry["order_id"] == order_id for entry in entries)
+    return {
+        "order_id": order_id,
+        "status": "open" if order else "cancelled" if cancelled else "filled",
+        "remaining": order.remaining if order else 0,
+        "fills": fills,
+        "sequence": book.sequence,
+    }
+
+
+async def place_ask(db: AsyncSession, ticket_hash: str, price: float, user_id: int) -> Dict[str, Any]:
+    """
+    Offer a ticket for resale (commits). Matches the best bid at once if
+    one is at or above the price.
+
+    Raises:
+        NotFoundException: If the ticket does not exist
+        BusinessLogicException: If the user does not own the (Valid) ticket,
+            it is already listed or the price is above its cap
+    """
+    result = await db.execute(
+        select(Ticket.event_id, Ticket.category, Ticket.owner_id, Ticket.status, Ticket.price)
+        .where(Ticket.ticket_hash == ticket_hash)
+    )
+    ticket = result.first()
+    if ticket is None:
+        raise NotFoundException(resource="Ticket", resource_id=ticket_hash)
+    if ticket.owner_id != user_id:
+        raise BusinessLogicException(detail="You are not the owner of this ticket", error_code="NOT_TICKET_OWNER")
+    if ticket.status != "Valid":
+        raise BusinessLogicException(
+            detail=f"Cannot resell ticket with status {ticket.status}", error_code="TICKET_NOT_TRANSFERABLE",
+        )
+    cap = price_cap(ticket.price)
+    if price > cap:
+        raise BusinessLogicException(detail=f"Resale price is capped at {cap:.2f}", error_code="PRICE_ABOVE_CAP")
+
+    order_id = new_order_id()
+    category = ticket.category or "Standard"
+
+    async def operation(book: OrderBook) -> List[Dict[str, Any]]:
+        if ticket_hash in book.listed:
+            raise BusinessLogicException(detail="Ticket is already listed", error_code="TICKET_ALREADY_LISTED")
+        incoming = Order(order_id, "ask", user_id, None, ticket_hash, price, 1, book.sequence + 1, cap)
+        place = _entry("place", order_id, side="ask", user_id=user_id, ticket_hash=ticket_hash, price=price)
+        return [place] + await _fill(db, book, incoming)
+
+    book, entries = await _run(db, ticket.event_id, category, operation)
+    return _result(book, order_id, entries)
+
+
+async def place_bid(
+    db: AsyncSession,
+    event_id: int,
+    category: str,
+    price: float,
+    quantity: int,
+    user_id: int,
+    owner_name: str,
+) -> Dict[str, Any]:
+    """
+    Bid for tickets of an event category (commits). Buys from the best
+    asks at once; the rest rests in the book.
+
+    Raises:
+        BusinessLogicException: If the price is above the category's cap
+    """
+    order_id = new_order_id()
+
+    async def operation(book: OrderBook) -> List[Dict[str, Any]]:
+        if price > book.face_cap:
+            resale_market.drop(event_id, category)  # Re-read the cap next time
+            raise BusinessLogicException(
+                detail=f"Resale price is capped at {book.face_cap:.2f}", error_code="PRICE_ABOVE_CAP",
+            )
+        incoming = Order(order_id, "bid", user_id, owner_name, None, price, quantity, book.sequence + 1)
+        place = _entry(
+            "place", order_id, side="bid", user_id=user_id, owner_name=owner_name, price=price, quantity=quantity,
+        )
+        return [place] + await _fill(db, book, incoming)
+
+    book, entries = await _run(db, event_id, category, operation)
+    return _result(book, order_id, entries)
+
+
+async def cancel_order(db: AsyncSession, event_id: int, category: str, order_id: str, user_id: int) -> Dict[str, Any]:
+    """
+    Withdraw an open order (commits).
+
+    Raises:
+        NotFoundException: If the order is not open (or not the user's)
+    """
+    async def operation(book: OrderBook) -> List[Dict[str, Any]]:
+        order = book.orders.get(order_id)
+        if order is None or order.user_id != user_id:
+            raise NotFoundException(resource="Order", resource_id=order_id)
+        return [_entry("cancel", order_id, reason="Withdrawn")]
+
+    book, entries = await _run(db, event_id, category, operation)
+    return _result(book, order_id, entries)
+
+
+async def order_book(db: AsyncSession, event_id: int, category: str, levels: int = 10) -> Dict[str, Any]:
+    """Current depth of a book."""
+    async with resale_market.lock(event_id, category):
+        book = await resale_market.book(db, event_id, category)
+    return {
+        "event_id": event_id,
+        "category": category,
+        "sequence": book.sequence,
+        "best_ask": book.best("ask"),
+        "best_bid": book.best("bid"),
+        "trades": book.trades,
+        **book.depth(levels),
+    }
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _simulate(book: OrderBook, count: int, seed: int = 11) -> List[Dict[str, Any]]:
+    """
+    Drive a book with random orders (no database; every ask trades) and
+    return the log it would append.
+    """
+    rng = random.Random(seed)
+    log: List[Dict[str, Any]] = []
+    open_orders: List[str] = []
+
+    def append(entries):
+        for entry in entries:
+            entry["sequence"] = book.sequence + 1
+            book.apply(entry)
+            log.append(entry)
+
+    for index in range(count):
+        roll = rng.random()
+        if roll < 0.1 and open_orders:
+            order_id = open_orders.pop(rng.randrange(len(open_orders)))
+            if order_id in book.orders:
+                append([_entry("cancel", order_id, reason="Withdrawn")])
+            continue
+
+        side = "ask" if roll < 0.55 else "bid"
+        price = float(rng.randint(60, 100))
+        quantity = 1 if side == "ask" else rng.choice((1, 1, 2, 4))
+        user_id = rng.randint(1, 5000)
+        order_id = f"ORD-{index:012d}"
+        incoming = Order(order_id, side, user_id, "Fan", f"0x{index:064x}" if side == "ask" else None,
+                         price, quantity, 0, 100.0)
+        entries = [_entry("place", order_id, side=side, user_id=user_id, owner_name="Fan",
+                          ticket_hash=incoming.ticket_hash, price=price, quantity=quantity)]
+        for resting, trade_price in book.plan(incoming, set()):
+            bid, ask = (incoming, resting) if side == "bid" else (resting, incoming)
+            entries.append(_entry("fill", bid.order_id, counter_order_id=ask.order_id,
+                                  ticket_hash=ask.ticket_hash, price=trade_price))
+        append(entries)
+        open_orders.append(order_id)
+    return log
+
+
+def _bench(count: int) -> None:
+    live = OrderBook(1, "Standard")
+    began = time.perf_counter()
+    log = _simulate(live, count)
+    matched = time.perf_counter() - began
+
+    replayed = OrderBook(1, "Standard")
+    began = time.perf_counter()
+    for entry in log:
+        replayed.apply(entry)
+    replay = time.perf_counter() - began
+
+    assert replayed.depth(1000) == live.depth(1000) and replayed.sequence == live.sequence
+    print(f"Order log:  {len(log):,} entries from {count:,} operations, {live.trades:,} trades")
+    print(f"Matching:   {count / matched:,.0f} operations/s (one core)")
+    print(f"Replay:     {len(log) / replay:,.0f} entries/s, book identical ({len(live.orders):,} open orders)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ticket resale market")
+    parser.add_argument("command", choices=["bench"])
+    parser.add_argument("--orders", type=int, default=200000)
+    args = parser.parse_args()
+    _bench(args.orders)
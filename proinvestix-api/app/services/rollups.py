@@ -0,0 +1,556 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Statistics Rollups
+# Incrementally maintained counters for the /stats endpoints
+# ============================================================================
+#
+# Every tracked model declares a set of dimensions. Each dimension keeps one
+# StatRollup row per bucket (distinct column value, or "*" for the total)
+# holding a row count and optionally the sum of a value column.
+#
+# Rollups are maintained by an ORM flush listener: inserts, updates and
+# deletes of tracked objects are turned into count/sum deltas and upserted
+# in the same transaction as the change itself. Core bulk statements
+# (update()/delete() without the ORM) bypass the listener and must call
+# apply_deltas() themselves (see row_deltas() and update_deltas()).
+#
+# At startup, modules without any rollup rows (a database from before the
+# rollups, or a new module) are rebuilt from their base tables.
+#
+# Usage:
+#     python -m app.services.rollups rebuild [module ...]
+#     python -m app.services.rollups check [module ...]
+# ============================================================================
+
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, insert, literal, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.db.models import (
+    Talent, Transfer, Event, Ticket, Wallet, WalletTransaction,
+    Identity, FraudAlert, NILSignal, NILFactCard,
+    AntiHateIncident, AntiHateLegalCase, ConsularDocument, ConsularAppointment,
+    StatRollup,
+)
+
+
+# Bucket used for whole-table totals
+ALL_BUCKET = "*"
+
+# Bucket used for NULL column values (NULLs would break the unique key)
+NULL_BUCKET = ""
+
+# Tolerance when comparing float sums in the consistency checker
+SUM_TOLERANCE = 0.01
+
+
+# =============================================================================
+# DIMENSIONS
+# =============================================================================
+
+class RollupDimension:
+    """
+    A single rollup dimension of a tracked model.
+
+    Args:
+        name: Dimension name (unique within the module)
+        bucket: Column to group by, or None for a whole-table total
+        value: Column to sum, or None to only count rows
+    """
+
+    def __init__(self, name: str, bucket=None, value=None):
+        self.name = name
+        self.bucket = bucket
+        self.value = value
+
+    @property
+    def bucket_key(self) -> Optional[str]:
+        return self.bucket.key if self.bucket is not None else None
+
+    @property
+    def value_key(self) -> Optional[str]:
+        return self.value.key if self.value is not None else None
+
+    def bucket_for(self, raw: Any) -> str:
+        """Convert a column value to its bucket key."""
+        if self.bucket is None:
+            return ALL_BUCKET
+        return to_bucket(raw)
+
+
+def to_bucket(raw: Any) -> str:
+    """Normalize a column value to a bucket string."""
+    if raw is None:
+        return NULL_BUCKET
+    if isinstance(raw, bool):
+        return "true" if raw else "false"
+    return str(raw)
+
+
+def from_bucket(bucket: str) -> Optional[str]:
+    """Convert a stored bucket back to its display value."""
+    return None if bucket == NULL_BUCKET else bucket
+
+
+# Tracked models: model -> (module, dimensions)
+ROLLUP_SPECS: Dict[type, Tuple[str, List[RollupDimension]]] = {
+    Talent: ("talents", [
+        RollupDimension("talents", value=Talent.overall_score),
+        RollupDimension("talents.potential", value=Talent.potential_score),
+        RollupDimension("talents.status", Talent.status),
+        RollupDimension("talents.position", Talent.primary_position),
+        RollupDimension("talents.nationality", Talent.nationality),
+        RollupDimension("talents.diaspora", Talent.is_diaspora),
+    ]),
+    Transfer: ("transfers", [
+        RollupDimension("transfers", value=Transfer.transfer_fee),
+        RollupDimension("transfers.foundation", value=Transfer.foundation_contribution),
+        RollupDimension("transfers.type", Transfer.transfer_type),
+        RollupDimension("transfers.status", Transfer.status),
+        RollupDimension("transfers.to_club", Transfer.to_club, Transfer.transfer_fee),
+        RollupDimension("transfers.from_club", Transfer.from_club, Transfer.transfer_fee),
+    ]),
+    Event: ("ticketchain", [
+        RollupDimension("events"),
+    ]),
+    Ticket: ("ticketchain", [
+        RollupDimension("tickets", value=Ticket.price),
+        RollupDimension("tickets.status", Ticket.status),
+        RollupDimension("tickets.category", Ticket.category),
+    ]),
+    Wallet: ("wallets", [
+        RollupDimension("wallets", value=Wallet.balance),
+        RollupDimension("wallets.region", Wallet.diaspora_region),
+        RollupDimension("wallets.kyc_level", Wallet.kyc_level),
+    ]),
+    WalletTransaction: ("wallets", [
+        RollupDimension("transactions", value=WalletTransaction.amount),
+    ]),
+    Identity: ("identities", [
+        RollupDimension("identities"),
+        RollupDimension("identities.verified", Identity.is_verified),
+        RollupDimension("identities.level", Identity.verification_level),
+        RollupDimension("identities.nationality", Identity.nationality),
+    ]),
+    FraudAlert: ("identities", [
+        RollupDimension("fraud_alerts.status", FraudAlert.status),
+    ]),
+    NILSignal: ("nil", [
+        RollupDimension("signals.type", NILSignal.signal_type),
+    ]),
+    NILFactCard: ("nil", [
+        RollupDimension("factcards.verdict", NILFactCard.verdict),
+        RollupDimension("factcards.views", value=NILFactCard.views),
+        RollupDimension("factcards.shares", value=NILFactCard.shares),
+    ]),
+    AntiHateIncident: ("antihate", [
+        RollupDimension("incidents.type", AntiHateIncident.incident_type),
+        RollupDimension("incidents.platform", AntiHateIncident.platform),
+    ]),
+    AntiHateLegalCase: ("antihate", [
+        RollupDimension("legal_cases"),
+    ]),
+    ConsularDocument: ("consulate", [
+        RollupDimension("documents.type", ConsularDocument.document_type),
+    ]),
+    ConsularAppointment: ("consulate", [
+        RollupDimension("appointments"),
+    ]),
+}
+
+ROLLUP_MODULES = sorted({module for module, _ in ROLLUP_SPECS.values()})
+
+
+def specs_for(modules: Optional[Iterable[str]] = None):
+    """Yield (model, module, dimensions) for the selected modules."""
+    selected = set(modules) if modules else set(ROLLUP_MODULES)
+    for model, (module, dimensions) in ROLLUP_SPECS.items():
+        if module in selected:
+            yield model, module, dimensions
+
+
+# =============================================================================
+# DELTAS
+# =============================================================================
+
+# (module, dimension, bucket) -> [count delta, value delta]
+Deltas = Dict[Tuple[str, str, str], List[float]]
+
+
+def _old_value(obj, key: str) -> Any:
+    """Get the pre-flush value of an attribute."""
+    history = get_history(obj, key)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, key)
+
+
+def _add(deltas: Deltas, module: str, dim: RollupDimension, raw_bucket: Any, count: int, value: Any):
+    key = (module, dim.name, dim.bucket_for(raw_bucket))
+    entry = deltas.setdefault(key, [0, 0.0])
+    entry[0] += count
+    entry[1] += count * (value or 0)
+
+
+def collect_deltas(session: Session) -> Deltas:
+    """Compute rollup deltas for the pending changes of a session."""
+    deltas: Deltas = {}
+
+    for obj in session.new:
+        spec = ROLLUP_SPECS.get(type(obj))
+        if spec is None:
+            continue
+        module, dimensions = spec
+        for dim in dimensions:
+            bucket = getattr(obj, dim.bucket_key) if dim.bucket_key else None
+            value = getattr(obj, dim.value_key) if dim.value_key else None
+            _add(deltas, module, dim, bucket, 1, value)
+
+    for obj in session.deleted:
+        spec = ROLLUP_SPECS.get(type(obj))
+        if spec is None:
+            continue
+        module, dimensions = spec
+        for dim in dimensions:
+            bucket = _old_value(obj, dim.bucket_key) if dim.bucket_key else None
+            value = _old_value(obj, dim.value_key) if dim.value_key else None
+            _add(deltas, module, dim, bucket, -1, value)
+
+    for obj in session.dirty:
+        spec = ROLLUP_SPECS.get(type(obj))
+        if spec is None or obj in session.deleted:
+            continue
+        module, dimensions = spec
+        for dim in dimensions:
+            keys = [k for k in (dim.bucket_key, dim.value_key) if k]
+            if not any(get_history(obj, k).has_changes() for k in keys):
+                continue
+            old_bucket = _old_value(obj, dim.bucket_key) if dim.bucket_key else None
+            old_value = _old_value(obj, dim.value_key) if dim.value_key else None
+            new_bucket = getattr(obj, dim.bucket_key) if dim.bucket_key else None
+            new_value = getattr(obj, dim.value_key) if dim.value_key else None
+            _add(deltas, module, dim, old_bucket, -1, old_value)
+            _add(deltas, module, dim, new_bucket, 1, new_value)
+
+    return {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+
+
+def row_deltas(model, rows: Iterable[Dict[str, Any]], sign: int = 1) -> Deltas:
+    """Rollup deltas for rows inserted (sign=1) or deleted (sign=-1) with Core."""
+    module, dimensions = ROLLUP_SPECS[model]
+    deltas: Deltas = {}
+    for row in rows:
+        for dim in dimensions:
+            bucket = row.get(dim.bucket_key) if dim.bucket_key else None
+            value = row.get(dim.value_key) if dim.value_key else None
+            _add(deltas, module, dim, bucket, sign, value)
+    return {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+
+
+def update_deltas(model, rows: Iterable[Dict[str, Any]], changes: Dict[str, Any]) -> Deltas:
+    """Rollup deltas for rows (pre-update values) given the same new values with Core."""
+    module, dimensions = ROLLUP_SPECS[model]
+    changed = [dim for dim in dimensions if {dim.bucket_key, dim.value_key} & set(changes)]
+    deltas: Deltas = {}
+    for row in rows:
+        new = {**row, **changes}
+        for dim in changed:
+            _add(deltas, module, dim, row.get(dim.bucket_key) if dim.bucket_key else None, -1,
+                 row.get(dim.value_key) if dim.value_key else None)
+            _add(deltas, module, dim, new.get(dim.bucket_key) if dim.bucket_key else None, 1,
+                 new.get(dim.value_key) if dim.value_key else None)
+    return {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+
+
+def _upsert_statement(dialect_name: str):
+    """Build an insert-or-increment statement for the given dialect."""
+    table = StatRollup.__table__
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.module, table.c.dimension, table.c.bucket],
+        set_={
+            "item_count": table.c.item_count + stmt.excluded.item_count,
+            "value_total": table.c.value_total + stmt.excluded.value_total,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+
+
+def apply_deltas(connection: Connection, deltas: Deltas) -> None:
+    """
+    Apply rollup deltas on a connection (inside the caller's transaction).
+
+    Uses a native upsert on SQLite/PostgreSQL and update-then-insert on
+    other databases.
+    """
+    if not deltas:
+        return
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "module": module,
+            "dimension": dimension,
+            "bucket": bucket,
+            "item_count": int(count),
+            "value_total": float(total),
+            "updated_at": now,
+        }
+        for (module, dimension, bucket), (count, total) in sorted(deltas.items())
+    ]
+
+    stmt = _upsert_statement(connection.dialect.name)
+    if stmt is not None:
+        connection.execute(stmt, rows)
+        return
+
+    table = StatRollup.__table__
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(table.c.module == row["module"])
+            .where(table.c.dimension == row["dimension"])
+            .where(table.c.bucket == row["bucket"])
+            .values(
+                item_count=table.c.item_count + row["item_count"],
+                value_total=table.c.value_total + row["value_total"],
+                updated_at=now,
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table), [row])
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_rollups(session: Session, flush_context) -> None:
+    """Update rollups in the same transaction as the flushed changes."""
+    deltas = collect_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+class RollupView:
+    """Read-only view over the rollup rows of one module."""
+
+    def __init__(self, rows: Iterable[StatRollup]):
+        self._rows: Dict[str, Dict[str, Tuple[int, float]]] = defaultdict(dict)
+        for row in rows:
+            self._rows[row.dimension][row.bucket] = (row.item_count, row.value_total)
+
+    def count(self, dimension: str, bucket: Any = ALL_BUCKET) -> int:
+        """Row count of one bucket."""
+        key = bucket if bucket == ALL_BUCKET else to_bucket(bucket)
+        return self._rows[dimension].get(key, (0, 0.0))[0]
+
+    def total(self, dimension: str, bucket: Any = ALL_BUCKET) -> float:
+        """Value sum of one bucket."""
+        key = bucket if bucket == ALL_BUCKET else to_bucket(bucket)
+        return self._rows[dimension].get(key, (0, 0.0))[1]
+
+    def average(self, dimension: str, bucket: Any = ALL_BUCKET) -> float:
+        """Average value of one bucket."""
+        count = self.count(dimension, bucket)
+        return self.total(dimension, bucket) / count if count else 0
+
+    def count_sum(self, dimension: str) -> int:
+        """Total row count over all buckets of a dimension."""
+        return sum(count for count, _ in self._rows[dimension].values())
+
+    def counts(self, dimension: str) -> Dict[Optional[str], int]:
+        """Row count per bucket (empty buckets omitted)."""
+        return {
+            from_bucket(bucket): count
+            for bucket, (count, _) in self._rows[dimension].items()
+            if count > 0
+        }
+
+    def totals(self, dimension: str) -> Dict[Optional[str], float]:
+        """Value sum per bucket (empty buckets omitted)."""
+        return {
+            from_bucket(bucket): total
+            for bucket, (count, total) in self._rows[dimension].items()
+            if count > 0
+        }
+
+    def top(self, dimension: str, limit: int, by: str = "count") -> List[Tuple[Optional[str], int, float]]:
+        """Top buckets of a dimension as (bucket, count, total) tuples."""
+        rows = [
+            (from_bucket(bucket), count, total)
+            for bucket, (count, total) in self._rows[dimension].items()
+            if count > 0
+        ]
+        index = 1 if by == "count" else 2
+        rows.sort(key=lambda row: row[index], reverse=True)
+        return rows[:limit]
+
+
+async def read_rollups(db: AsyncSession, module: str) -> RollupView:
+    """Load all rollup rows of a module in one query."""
+    result = await db.execute(
+        select(StatRollup).where(StatRollup.module == module)
+    )
+    return RollupView(result.scalars().all())
+
+
+# =============================================================================
+# REBUILD & CONSISTENCY
+# =============================================================================
+
+def _live_statement(model, dim: RollupDimension):
+    """Aggregate statement computing a dimension from its base table."""
+    pk = model.__mapper__.primary_key[0]
+    value = func.coalesce(func.sum(dim.value), 0) if dim.value is not None else literal(0)
+    if dim.bucket is None:
+        return select(func.count(pk), value)
+    return select(dim.bucket, func.count(pk), value).group_by(dim.bucket)
+
+
+async def compute_live(db: AsyncSession, modules: Optional[Iterable[str]] = None) -> Dict[Tuple[str, str, str], Tuple[int, float]]:
+    """Compute rollup values directly from the base tables."""
+    live: Dict[Tuple[str, str, str], Tuple[int, float]] = {}
+    for model, module, dimensions in specs_for(modules):
+        for dim in dimensions:
+            result = await db.execute(_live_statement(model, dim))
+            for row in result.all():
+                if dim.bucket is None:
+                    bucket, count, total = ALL_BUCKET, row[0], row[1]
+                else:
+                    bucket, count, total = to_bucket(row[0]), row[1], row[2]
+                if count:
+                    live[(module, dim.name, bucket)] = (int(count), float(total or 0))
+    return live
+
+
+async def rebuild_rollups(db: AsyncSession, modules: Optional[Iterable[str]] = None) -> int:
+    """
+    Regenerate rollups from the base tables.
+
+    Returns:
+        Number of rollup rows written
+    """
+    selected = list(modules) if modules else ROLLUP_MODULES
+    live = await compute_live(db, selected)
+
+    await db.execute(delete(StatRollup).where(StatRollup.module.in_(selected)))
+    if live:
+        now = datetime.utcnow()
+        await db.execute(insert(StatRollup), [
+            {
+                "module": module,
+                "dimension": dimension,
+                "bucket": bucket,
+                "item_count": count,
+                "value_total": total,
+                "updated_at": now,
+            }
+            for (module, dimension, bucket), (count, total) in live.items()
+        ])
+    await db.commit()
+    return len(live)
+
+
+async def ensure_rollups(db: AsyncSession) -> List[str]:
+    """
+    Rebuild the modules that have no rollup rows at all.
+
+    Returns:
+        The modules rebuilt
+    """
+    result = await db.execute(select(StatRollup.module).distinct())
+    missing = sorted(set(ROLLUP_MODULES) - set(result.scalars().all()))
+    if not missing:
+        return []
+    try:
+        await rebuild_rollups(db, missing)
+    except IntegrityError:
+        await db.rollback()  # Another worker rebuilt them at the same time
+        return []
+    return missing
+
+
+async def check_rollups(db: AsyncSession, modules: Optional[Iterable[str]] = None) -> List[dict]:
+    """
+    Compare stored rollups against live aggregates.
+
+    Returns:
+        List of mismatches (empty when consistent)
+    """
+    selected = list(modules) if modules else ROLLUP_MODULES
+    live = await compute_live(db, selected)
+
+    result = await db.execute(
+        select(StatRollup).where(StatRollup.module.in_(selected))
+    )
+    stored = {
+        (row.module, row.dimension, row.bucket): (row.item_count, row.value_total)
+        for row in result.scalars().all()
+        if row.item_count or abs(row.value_total) > SUM_TOLERANCE
+    }
+
+    mismatches = []
+    for key in sorted(set(live) | set(stored)):
+        expected_count, expected_total = live.get(key, (0, 0.0))
+        actual_count, actual_total = stored.get(key, (0, 0.0))
+        if expected_count != actual_count or abs(expected_total - actual_total) > SUM_TOLERANCE:
+            module, dimension, bucket = key
+            mismatches.append({
+                "module": module,
+                "dimension": dimension,
+                "bucket": bucket,
+                "expected_count": expected_count,
+                "actual_count": actual_count,
+                "expected_total": expected_total,
+                "actual_total": actual_total,
+            })
+    return mismatches
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+async def _main(command: str, modules: List[str]) -> None:
+    from app.db.database import AsyncSessionLocal, init_db
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        if command == "rebuild":
+            written = await rebuild_rollups(db, modules or None)
+            print(f"Rebuilt {written} rollup rows")
+        else:
+            mismatches = await check_rollups(db, modules or None)
+            for mismatch in mismatches:
+                print(mismatch)
+            print(f"{len(mismatches)} mismatches")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain statistics rollups")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("modules", nargs="*", help=f"Modules (default: all of {', '.join(ROLLUP_MODULES)})")
+    args = parser.parse_args()
+    unknown = set(args.modules) - set(ROLLUP_MODULES)
+    if unknown:
+        parser.error(f"unknown modules: {', '.join(sorted(unknown))}")
+    asyncio.run(_main(args.command, args.modules))
@@ -0,0 +1,321 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Talent Score Totals
+# Running sums/counts of evaluation scores per talent and category
+# ============================================================================
+#
+# Every talent has one TalentScoreTotals row with the number of evaluations
+# and, per category (technical, physical, mental, overall), the sum and
+# count of evaluation scores. Talent.overall_score and
+# Talent.evaluation_count are derived from it.
+#
+# Evaluation inserts, corrections and deletions are applied as exact deltas
+# from a before_flush listener: an atomic SQL-side increment (upsert) in the
+# same transaction, followed by setting the derived talent fields so the
+# change is flushed (and rolled up) like any other talent update. The cost
+# per evaluation is constant, whatever the evaluation history.
+#
+# A talent without a totals row (e.g. evaluated before the table existed)
+# is seeded from its stored evaluations before the first delta is applied,
+# so the derived fields never restart from the new evaluation alone.
+#
+# Evaluations must reference an already persisted talent (talent_id set).
+#
+# Usage:
+#     python -m app.services.score_totals recompute
+# ============================================================================
+
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, delete, event, func, insert, literal, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.db.models import Talent, TalentEvaluation, TalentScoreTotals
+
+
+# Category -> evaluation column
+CATEGORIES = {
+    "technical": "overall_technical",
+    "physical": "overall_physical",
+    "mental": "overall_mental",
+    "overall": "overall_score",
+}
+
+# Delta layout: [evaluations, technical_sum, technical_count, physical_sum, ...]
+TOTAL_COLUMNS = ["evaluations"] + [
+    f"{category}_{part}" for category in CATEGORIES for part in ("sum", "count")
+]
+
+Deltas = Dict[int, List[float]]
+
+
+# =============================================================================
+# DELTAS
+# =============================================================================
+
+def _contribution(values: Dict[str, Optional[float]], sign: int) -> List[float]:
+    row = [sign]
+    for column in CATEGORIES.values():
+        value = values.get(column)
+        row += [sign * value, sign] if value is not None else [0, 0]
+    return row
+
+
+def _old_value(obj, key: str):
+    history = get_history(obj, key)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, key)
+
+
+def _add(deltas: Deltas, talent_id: Optional[int], row: List[float]) -> None:
+    if talent_id is None:
+        return
+    current = deltas[talent_id]
+    for i, value in enumerate(row):
+        current[i] += value
+
+
+def collect_deltas(session: Session) -> Deltas:
+    """Compute total deltas for the pending evaluation changes of a session."""
+    deltas: Deltas = defaultdict(lambda: [0] * len(TOTAL_COLUMNS))
+    keys = ("talent_id",) + tuple(CATEGORIES.values())
+
+    for obj in session.new:
+        if isinstance(obj, TalentEvaluation):
+            values = {key: getattr(obj, key) for key in keys}
+            _add(deltas, values["talent_id"], _contribution(values, 1))
+
+    for obj in session.deleted:
+        if isinstance(obj, TalentEvaluation):
+            values = {key: _old_value(obj, key) for key in keys}
+            _add(deltas, values["talent_id"], _contribution(values, -1))
+
+    for obj in session.dirty:
+        if not isinstance(obj, TalentEvaluation):
+            continue
+        if not any(get_history(obj, key).has_changes() for key in keys):
+            continue
+        old = {key: _old_value(obj, key) for key in keys}
+        new = {key: getattr(obj, key) for key in keys}
+        _add(deltas, old["talent_id"], _contribution(old, -1))
+        _add(deltas, new["talent_id"], _contribution(new, 1))
+
+    return {
+        talent_id: row for talent_id, row in deltas.items()
+        if any(row)
+    }
+
+
+# =============================================================================
+# APPLYING
+# =============================================================================
+
+def _evaluation_aggregates() -> list:
+    """Evaluation count, then sum and count per category (TOTAL_COLUMNS order)."""
+    aggregates = [func.count(TalentEvaluation.id)]
+    for column in CATEGORIES.values():
+        value = getattr(TalentEvaluation, column)
+        aggregates += [func.coalesce(func.sum(value), 0), func.count(value)]
+    return aggregates
+
+
+def seed_missing_totals(connection: Connection, talent_ids: Iterable[int]) -> None:
+    """
+    Create the totals rows that do not exist yet for these talents from the
+    stored evaluations (inside the caller's transaction, before their
+    pending changes are flushed).
+    """
+    table = TalentScoreTotals.__table__
+    source = (
+        select(TalentEvaluation.talent_id, *_evaluation_aggregates(), literal(datetime.utcnow()))
+        .where(
+            TalentEvaluation.talent_id.in_(list(talent_ids)),
+            ~select(table.c.talent_id)
+            .where(table.c.talent_id == TalentEvaluation.talent_id)
+            .exists(),
+        )
+        .group_by(TalentEvaluation.talent_id)
+    )
+    columns = ["talent_id", *TOTAL_COLUMNS, "updated_at"]
+
+    dialect_name = connection.dialect.name
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        connection.execute(insert(table).from_select(columns, source))
+        return
+    # Another transaction may seed the same talent concurrently
+    connection.execute(
+        dialect_insert(table).from_select(columns, source).on_conflict_do_nothing()
+    )
+
+
+def _upsert_statement(dialect_name: str):
+    """Build an insert-or-increment statement for the given dialect."""
+    table = TalentScoreTotals.__table__
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(table)
+    set_ = {name: table.c[name] + stmt.excluded[name] for name in TOTAL_COLUMNS}
+    set_["updated_at"] = stmt.excluded.updated_at
+    return stmt.on_conflict_do_update(index_elements=[table.c.talent_id], set_=set_)
+
+
+def apply_deltas(connection: Connection, deltas: Deltas) -> Dict[int, dict]:
+    """
+    Increment score totals (inside the caller's transaction).
+
+    Returns:
+        talent_id -> totals after the increment
+    """
+    if not deltas:
+        return {}
+
+    seed_missing_totals(connection, deltas)
+
+    table = TalentScoreTotals.__table__
+    now = datetime.utcnow()
+    rows = [
+        {"talent_id": talent_id, "updated_at": now, **dict(zip(TOTAL_COLUMNS, row))}
+        for talent_id, row in sorted(deltas.items())
+    ]
+
+    stmt = _upsert_statement(connection.dialect.name)
+    if stmt is not None:
+        connection.execute(stmt, rows)
+    else:
+        for row in rows:
+            result = connection.execute(
+                update(table)
+                .where(table.c.talent_id == row["talent_id"])
+                .values(
+                    updated_at=now,
+                    **{name: table.c[name] + row[name] for name in TOTAL_COLUMNS},
+                )
+            )
+            if result.rowcount == 0:
+                connection.execute(insert(table), [row])
+
+    result = connection.execute(select(table).where(table.c.talent_id.in_(list(deltas))))
+    return {row.talent_id: row._asdict() for row in result}
+
+
+def category_average(totals: dict, category: str) -> Optional[float]:
+    """Average score of a category, or None without scored evaluations."""
+    count = totals.get(f"{category}_count") or 0
+    return totals[f"{category}_sum"] / count if count else None
+
+
+@event.listens_for(Session, "before_flush")
+def _maintain_score_totals(session: Session, flush_context, instances) -> None:
+    """Apply evaluation deltas and refresh the derived talent fields."""
+    for obj in session.deleted:
+        if isinstance(obj, Talent) and obj.id is not None:
+            session.connection().execute(
+                delete(TalentScoreTotals).where(TalentScoreTotals.talent_id == obj.id)
+            )
+
+    deltas = collect_deltas(session)
+    if not deltas:
+        return
+
+    for talent_id, totals in apply_deltas(session.connection(), deltas).items():
+        talent = session.get(Talent, talent_id)
+        if talent is None or talent in session.deleted:
+            continue
+        talent.evaluation_count = totals["evaluations"]
+        overall = category_average(totals, "overall")
+        if overall is not None:
+            talent.overall_score = overall
+
+
+# =============================================================================
+# RECOMPUTE
+# =============================================================================
+
+async def recompute_score_totals(
+    db: AsyncSession,
+    talent_ids: Optional[Iterable[int]] = None,
+) -> int:
+    """
+    Regenerate score totals from the evaluations table and re-derive
+    Talent.overall_score / evaluation_count (bulk, set-based).
+
+    Returns:
+        Number of talents with totals
+    """
+    from app.services.rollups import rebuild_rollups
+
+    ids = list(talent_ids) if talent_ids is not None else None
+
+    source = select(
+        TalentEvaluation.talent_id, *_evaluation_aggregates(), literal(datetime.utcnow()),
+    ).group_by(TalentEvaluation.talent_id)
+
+    clear = delete(TalentScoreTotals)
+    if ids is not None:
+        source = source.where(TalentEvaluation.talent_id.in_(ids))
+        clear = clear.where(TalentScoreTotals.talent_id.in_(ids))
+
+    await db.execute(clear)
+    await db.execute(
+        insert(TalentScoreTotals).from_select(
+            ["talent_id", *TOTAL_COLUMNS, "updated_at"], source,
+        )
+    )
+
+    totals = TalentScoreTotals.__table__
+    row_totals = lambda column: (
+        select(column).where(totals.c.talent_id == Talent.id).scalar_subquery()
+    )
+    overall = row_totals(case(
+        (totals.c.overall_count > 0, totals.c.overall_sum / totals.c.overall_count),
+        else_=None,
+    ))
+    talents_update = update(Talent).values(
+        evaluation_count=func.coalesce(row_totals(totals.c.evaluations), 0),
+        overall_score=func.coalesce(overall, Talent.overall_score),
+    )
+    if ids is not None:
+        talents_update = talents_update.where(Talent.id.in_(ids))
+    await db.execute(talents_update.execution_options(synchronize_session=False))
+
+    written = (await db.execute(select(func.count()).select_from(TalentScoreTotals))).scalar()
+
+    # The bulk update bypasses the rollup listener; rebuild_rollups commits
+    await rebuild_rollups(db, ["talents"])
+    return written
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+async def _main() -> None:
+    from app.db.database import AsyncSessionLocal, init_db
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        written = await recompute_score_totals(db)
+        print(f"Recomputed score totals for {written} talents")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain talent score totals")
+    parser.add_argument("command", choices=["recompute"])
+    parser.parse_args()
+    asyncio.run(_main())
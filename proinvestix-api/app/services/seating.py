@@ -0,0 +1,779 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Seat Inventory
+# Bitmap seat maps, best-available allocation and checkout holds
+# ============================================================================
+#
+# An event's seat map is a list of rows (section, row, seat count), each
+# with two bitmaps: sold and held (bit i = seat i + 1). The rows are stored
+# in event_seat_rows and kept in memory per worker as Python ints, so an
+# availability check is one bit test and a section summary never touches
+# the tickets table.
+#
+# Every write is a conditional UPDATE ... WHERE version = :seen per row: if
+# another worker (or coroutine) changed the row since it was loaded, the
+# update matches nothing, the transaction is rolled back, the row is
+# reloaded and the allocation is planned again. Seats are therefore never
+# sold or held twice, whatever the age of the in-memory copy; the maps are
+# refreshed after SEAT_MAP_REFRESH_SECONDS only to keep the summaries
+# current. Writes of this worker are applied to its maps as they are made
+# (and the map is dropped if the transaction rolls back).
+#
+# Best available: a contiguous block of n seats in the frontmost row (lowest
+# position) of the requested sections that has one, as close to the centre
+# of the row as possible. Block starts are found with shifts and ANDs over
+# the free-seat bitmap.
+#
+# Holds reserve seats for SEAT_HOLD_SECONDS during checkout; minting with
+# the hold id sells them. Expired holds are released by a sweep whenever
+# the event's seats are held, sold without a hold or summarised.
+#
+# Usage:
+#     python -m app.services.seating bench [--sections 40] [--rows 30] [--seats 50]
+# ============================================================================
+
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.exceptions import BusinessLogicException, NotFoundException, ValidationException
+from app.db.models import Event, EventSeatRow, SeatHold
+
+
+# (section, row, seat number)
+SeatLabel = Tuple[str, str, int]
+
+# Write attempts before giving up on a contended seat map, and the
+# maximum random pause (seconds) per attempt after a conflict
+WRITE_ATTEMPTS = 5
+CONFLICT_BACKOFF = 0.01
+
+# Minimum seconds between expired-hold sweeps of an event (per worker)
+SWEEP_INTERVAL = 5.0
+
+_ROW_FIELDS = ("id", "seat_section", "seat_row", "position", "seats", "sold", "held", "version")
+
+
+# =============================================================================
+# BITMAPS
+# =============================================================================
+
+def pack_bits(bits: int, seats: int) -> bytes:
+    return bits.to_bytes((seats + 7) // 8, "little")
+
+
+def unpack_bits(data: Optional[bytes]) -> int:
+    return int.from_bytes(data or b"", "little")
+
+
+def block_starts(free: int, quantity: int) -> int:
+    """Bitmask of the seats where `quantity` free seats in a row begin."""
+    starts, span = free, 1
+    while span < quantity:  # starts marks runs of `span` free seats
+        step = min(span, quantity - span)
+        starts &= starts >> step
+        span += step
+    return starts
+
+
+def _nearest(candidates: int, target: float) -> int:
+    """Bit index in candidates closest to target (lower index on ties)."""
+    best, distance = -1, None
+    while candidates:
+        lowest = candidates & -candidates
+        index = lowest.bit_length() - 1
+        if distance is None or abs(index - target) < distance:
+            best, distance = index, abs(index - target)
+        elif index > target:
+            break  # Only getting further away
+        candidates ^= lowest
+    return best
+
+
+# =============================================================================
+# SEAT MAP
+# =============================================================================
+
+class SeatRow:
+    """One row of a seat map."""
+
+    __slots__ = _ROW_FIELDS
+
+    def __init__(self, id, seat_section, seat_row, position, seats, sold, held, version):
+        self.id = id
+        self.seat_section = seat_section
+        self.seat_row = seat_row
+        self.position = position
+        self.seats = seats
+        self.sold = unpack_bits(sold) if isinstance(sold, bytes) else sold
+        self.held = unpack_bits(held) if isinstance(held, bytes) else held
+        self.version = version
+
+    @property
+    def full(self) -> int:
+        return (1 << self.seats) - 1
+
+    @property
+    def free(self) -> int:
+        return self.full & ~(self.sold | self.held)
+
+    def is_free(self, seat: int) -> bool:
+        return 1 <= seat <= self.seats and not ((self.sold | self.held) >> (seat - 1)) & 1
+
+    def labels(self, mask: int) -> List[SeatLabel]:
+        return [
+            (self.seat_section, self.seat_row, index + 1)
+            for index in range(self.seats) if mask >> index & 1
+        ]
+
+
+# (row, seat mask) per touched row
+Picks = List[Tuple[SeatRow, int]]
+
+
+class SeatMap:
+    """Seat rows of one event, sections in layout order."""
+
+    def __init__(self, event_id: int, rows: Iterable[SeatRow]):
+        self.event_id = event_id
+        self.rows: Dict[Tuple[str, str], SeatRow] = {}
+        self.by_id: Dict[int, SeatRow] = {}
+        self.sections: Dict[str, List[SeatRow]] = {}
+        for row in rows:
+            self.rows[(row.seat_section, row.seat_row)] = row
+            self.by_id[row.id] = row
+            self.sections.setdefault(row.seat_section, []).append(row)
+        for section_rows in self.sections.values():
+            section_rows.sort(key=lambda row: row.position)
+        self.loaded_at = time.monotonic()
+
+    @property
+    def seated(self) -> bool:
+        return bool(self.rows)
+
+    def is_available(self, section: str, row: str, seat: int) -> bool:
+        seat_row = self.rows.get((section, row))
+        return seat_row is not None and seat_row.is_free(seat)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Seat counts per section."""
+        sections = []
+        for section, rows in self.sections.items():
+            seats = sum(row.seats for row in rows)
+            sold = sum(row.sold.bit_count() for row in rows)
+            held = sum(row.held.bit_count() for row in rows)
+            sections.append({
+                "section": section,
+                "rows": len(rows),
+                "seats": seats,
+                "sold": sold,
+                "held": held,
+                "available": seats - sold - held,
+            })
+        return sections
+
+    def section_rows(self, section: str) -> List[Dict[str, Any]]:
+        """Free seat numbers per row of a section."""
+        if section not in self.sections:
+            raise NotFoundException(resource="Section", resource_id=section)
+        return [
+            {
+                "row": row.seat_row,
+                "seats": row.seats,
+                "available": [seat for _, _, seat in row.labels(row.free)],
+            }
+            for row in self.sections[section]
+        ]
+
+    def _candidates(self, sections: Optional[Sequence[str]]) -> List[SeatRow]:
+        """Rows of the sections, front to back (layout order within a position)."""
+        names = list(sections) if sections else list(self.sections)
+        unknown = [name for name in names if name not in self.sections]
+        if unknown:
+            raise ValidationException(f"Unknown sections: {', '.join(unknown)}")
+        order = {name: index for index, name in enumerate(names)}
+        rows = [row for name in names for row in self.sections[name]]
+        return sorted(rows, key=lambda row: (row.position, order[row.seat_section]))
+
+    def find_block(self, quantity: int, sections: Optional[Sequence[str]] = None) -> Optional[Picks]:
+        """Best `quantity` adjacent seats, or None when no row has a block."""
+        for row in self._candidates(sections):
+            free = row.free
+            if free.bit_count() < quantity:
+                continue
+            starts = block_starts(free, quantity)
+            if starts:
+                start = _nearest(starts, (row.seats - quantity) / 2)
+                return [(row, ((1 << quantity) - 1) << start)]
+        return None
+
+    def find_seats(self, quantity: int, sections: Optional[Sequence[str]] = None) -> Optional[Picks]:
+        """Best `quantity` seats, not necessarily together."""
+        picks, needed = [], quantity
+        for row in self._candidates(sections):
+            free, mask = row.free, 0
+            while free and needed:
+                seat = _nearest(free, (row.seats - 1) / 2)
+                mask |= 1 << seat
+                free &= ~(1 << seat)
+                needed -= 1
+            if mask:
+                picks.append((row, mask))
+            if not needed:
+                return picks
+        return None
+
+    def locate(self, seats: Iterable[Sequence]) -> Picks:
+        """
+        Group seat labels by row.
+
+        Raises:
+            ValidationException: On an unknown or repeated seat
+        """
+        masks: Dict[int, int] = defaultdict(int)
+        for section, row_label, seat in seats:
+            row = self.rows.get((section, row_label))
+            if row is None or not 1 <= seat <= row.seats:
+                raise ValidationException(f"Unknown seat: {section}-{row_label}-{seat}")
+            bit = 1 << (seat - 1)
+            if masks[row.id] & bit:
+                raise ValidationException(f"Seat listed twice: {section}-{row_label}-{seat}")
+            masks[row.id] |= bit
+        return [(self.by_id[row_id], mask) for row_id, mask in masks.items()]
+
+
+def pick_labels(picks: Picks) -> List[SeatLabel]:
+    return [label for row, mask in picks for label in row.labels(mask)]
+
+
+# =============================================================================
+# PER-WORKER MAPS
+# =============================================================================
+
+def _row_query():
+    return select(*[getattr(EventSeatRow, field) for field in _ROW_FIELDS])
+
+
+class SeatInventory:
+    """
+    In-memory seat maps of this worker, one per event.
+
+    Args:
+        refresh_seconds: Reload a map after this many seconds
+        max_events: Maps kept at once (least recently used is dropped)
+    """
+
+    def __init__(self, refresh_seconds: float, max_events: int):
+        self.refresh_seconds = refresh_seconds
+        self.max_events = max_events
+        self.maps: Dict[int, SeatMap] = {}
+        self.loads = 0
+        self.conflicts = 0
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._writers: Dict[int, asyncio.Lock] = {}
+        self._swept: Dict[int, float] = {}
+
+    async def load(self, db: AsyncSession, event_id: int) -> SeatMap:
+        """(Re)load an event's seat rows."""
+        result = await db.execute(_row_query().where(EventSeatRow.event_id == event_id).order_by(EventSeatRow.id))
+        seat_map = SeatMap(event_id, [SeatRow(*row) for row in result])
+        self.maps.pop(event_id, None)
+        self.maps[event_id] = seat_map
+        while len(self.maps) > self.max_events:
+            self.maps.pop(next(iter(self.maps)))
+        self.loads += 1
+        return seat_map
+
+    async def seat_map(self, db: AsyncSession, event_id: int) -> SeatMap:
+        """An event's seat map, loaded on first use and after refresh_seconds."""
+        seat_map = self.maps.get(event_id)
+        if seat_map is not None and time.monotonic() - seat_map.loaded_at < self.refresh_seconds:
+            self.maps[event_id] = self.maps.pop(event_id)  # Most recently used last
+            return seat_map
+        async with self._locks.setdefault(event_id, asyncio.Lock()):
+            seat_map = self.maps.get(event_id)
+            if seat_map is not None and time.monotonic() - seat_map.loaded_at < self.refresh_seconds:
+                return seat_map
+            return await self.load(db, event_id)
+
+    async def reload_rows(self, db: AsyncSession, seat_map: SeatMap, row_ids: Iterable[int]) -> None:
+        """Refresh some rows of a map from the database (after a write conflict)."""
+        result = await db.execute(_row_query().where(EventSeatRow.id.in_(list(row_ids))))
+        for values in result:
+            fresh = SeatRow(*values)
+            row = seat_map.by_id.get(fresh.id)
+            if row is not None and fresh.version >= row.version:
+                row.sold, row.held, row.version = fresh.sold, fresh.held, fresh.version
+
+    def apply(self, changes: Iterable[Tuple[int, int, int, int, int]]) -> None:
+        """Apply committed row states (event_id, row_id, sold, held, version)."""
+        for event_id, row_id, sold, held, version in changes:
+            seat_map = self.maps.get(event_id)
+            row = seat_map.by_id.get(row_id) if seat_map is not None else None
+            if row is not None and version > row.version:
+                row.sold, row.held, row.version = sold, held, version
+
+    def writer(self, event_id: int) -> asyncio.Lock:
+        """Serialises seat writes of this worker per event."""
+        return self._writers.setdefault(event_id, asyncio.Lock())
+
+    def invalidate(self, event_id: int) -> None:
+        self.maps.pop(event_id, None)
+
+    def due_sweep(self, event_id: int) -> bool:
+        """Whether the event's expired holds should be swept now (marks the sweep)."""
+        now = time.monotonic()
+        if now - self._swept.get(event_id, -SWEEP_INTERVAL) < SWEEP_INTERVAL:
+            return False
+        self._swept[event_id] = now
+        return True
+
+    def clear(self) -> None:
+        self.maps.clear()
+        self._locks.clear()
+        self._writers.clear()
+        self._swept.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "events": [
+                {
+                    "event_id": event_id,
+                    "rows": len(seat_map.rows),
+                    "age_seconds": round(time.monotonic() - seat_map.loaded_at, 1),
+                }
+                for event_id, seat_map in self.maps.items()
+            ],
+            "loads": self.loads,
+            "conflicts": self.conflicts,
+        }
+
+
+seat_inventory = SeatInventory(settings.SEAT_MAP_REFRESH_SECONDS, settings.SEAT_MAP_MAX_EVENTS)
+
+
+# =============================================================================
+# WRITES
+# =============================================================================
+
+def _write_rows(connection: Connection, changes: List[Tuple[SeatRow, int, int]]) -> Optional[List[tuple]]:
+    """
+    Version-checked row updates, in id order (no deadlocks between writers).
+
+    Returns:
+        (row_id, sold, held, version) per row, or None on a conflict
+    """
+    table = EventSeatRow.__table__
+    now = datetime.utcnow()
+    written = []
+    for row, sold, held in sorted(changes, key=lambda change: change[0].id):
+        result = connection.execute(
+            update(table)
+            .where(table.c.id == row.id, table.c.version == row.version)
+            .values(
+                sold=pack_bits(sold, row.seats),
+                held=pack_bits(held, row.seats),
+                sold_count=sold.bit_count(),
+                held_count=held.bit_count(),
+                version=row.version + 1,
+                updated_at=now,
+            )
+        )
+        if result.rowcount != 1:
+            return None
+        written.append((row.id, sold, held, row.version + 1))
+    return written
+
+
+async def write_seats(
+    db: AsyncSession,
+    event_id: int,
+    plan: Callable[[SeatMap], Picks],
+    change: Callable[[SeatRow, int], Tuple[int, int]],
+) -> Picks:
+    """
+    Plan seats on the in-memory map and write them, replanning on conflicts.
+
+    Must be the first write of the transaction: a conflict rolls it back.
+    Coroutines of this worker plan and write one at a time per event, and
+    a write is applied to the map at once, so they pick different seats
+    (and wait on the row lock instead of failing); the event's map is
+    dropped if the transaction rolls back.
+
+    Args:
+        plan: Picks the (row, seat mask) pairs; raises when it cannot
+        change: New (sold, held) bitmaps of a row for its mask
+
+    Raises:
+        BusinessLogicException: If the rows stay contended (SEATS_BUSY)
+    """
+    for attempt in range(WRITE_ATTEMPTS):
+        seat_map = await seat_inventory.seat_map(db, event_id)
+        async with seat_inventory.writer(event_id):
+            picks = plan(seat_map)
+            connection = await db.connection()
+            written = await connection.run_sync(
+                _write_rows, [(row, *change(row, mask)) for row, mask in picks],
+            )
+            if written is not None:
+                changes = [(event_id, *values) for values in written]
+                seat_inventory.apply(changes)
+                _pending(db.sync_session).extend(changes)
+                return picks
+        seat_inventory.conflicts += 1
+        await db.rollback()
+        await asyncio.sleep(random.uniform(0, CONFLICT_BACKOFF * (attempt + 1)))  # De-synchronise the losers
+        await seat_inventory.reload_rows(db, seat_map, [row.id for row, _ in picks])
+    raise BusinessLogicException(detail="Seat map is busy, please retry", error_code="SEATS_BUSY")
+
+
+def _hold_seats(row: SeatRow, mask: int) -> Tuple[int, int]:
+    return row.sold, row.held | mask
+
+
+def _sell_held(row: SeatRow, mask: int) -> Tuple[int, int]:
+    return row.sold | mask, row.held & ~mask
+
+
+def _sell_free(row: SeatRow, mask: int) -> Tuple[int, int]:
+    return row.sold | mask, row.held
+
+
+def _release(row: SeatRow, mask: int) -> Tuple[int, int]:
+    return row.sold, row.held & ~mask
+
+
+def _require_free(picks: Picks) -> Picks:
+    taken = [label for row, mask in picks for label in row.labels(mask & ~row.free)]
+    if taken:
+        raise BusinessLogicException(
+            detail=f"Seats not available: {', '.join('-'.join(map(str, label)) for label in taken)}",
+            error_code="SEATS_UNAVAILABLE",
+        )
+    return picks
+
+
+def _require_seated(seat_map: SeatMap) -> SeatMap:
+    if not seat_map.seated:
+        raise BusinessLogicException(detail="Event has no seat map", error_code="NO_SEAT_MAP")
+    return seat_map
+
+
+# =============================================================================
+# LAYOUT
+# =============================================================================
+
+async def set_layout(db: AsyncSession, event_id: int, sections: Sequence) -> None:
+    """
+    Replace an event's seat map (committed by the caller).
+
+    Args:
+        sections: Objects with .section and .rows (.row, .seats), best first
+
+    Raises:
+        NotFoundException: If the event does not exist
+        BusinessLogicException: If seats are already sold or held
+    """
+    if (await db.execute(select(Event.id).where(Event.id == event_id))).scalar_one_or_none() is None:
+        raise NotFoundException(resource="Event", resource_id=event_id)
+
+    result = await db.execute(
+        select(func.coalesce(func.sum(EventSeatRow.sold_count + EventSeatRow.held_count), 0))
+        .where(EventSeatRow.event_id == event_id)
+    )
+    if result.scalar():
+        raise BusinessLogicException(
+            detail="Seat map has sold or held seats and cannot be replaced",
+            error_code="SEAT_MAP_IN_USE",
+        )
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "event_id": event_id,
+            "seat_section": section.section,
+            "seat_row": row.row,
+            "position": position,
+            "seats": row.seats,
+            "sold": pack_bits(0, row.seats),
+            "held": pack_bits(0, row.seats),
+            "sold_count": 0,
+            "held_count": 0,
+            "version": 0,
+            "updated_at": now,
+        }
+        for section in sections
+        for position, row in enumerate(section.rows)
+    ]
+    await db.execute(delete(EventSeatRow).where(EventSeatRow.event_id == event_id))
+    await db.execute(insert(EventSeatRow), rows)
+    _invalidated(db.sync_session).add(event_id)
+
+
+# =============================================================================
+# HOLDS
+# =============================================================================
+
+def hold_labels(hold: SeatHold) -> List[SeatLabel]:
+    return [tuple(label) for label in json.loads(hold.seats)]
+
+
+async def hold_seats(
+    db: AsyncSession,
+    event_id: int,
+    user_id: Optional[int],
+    quantity: int,
+    sections: Optional[Sequence[str]] = None,
+    together: bool = True,
+    seats: Optional[Sequence[SeatLabel]] = None,
+) -> SeatHold:
+    """
+    Hold the best available seats (or the given ones) for checkout
+    (committed by the caller).
+
+    Args:
+        sections: Sections to choose from, preferred first (default: all)
+        together: Require one block of adjacent seats in a row
+        seats: Exact seats to hold instead of choosing
+
+    Raises:
+        BusinessLogicException: If the event has no seat map or the seats
+        are not available
+    """
+    await sweep_expired_holds(db, event_id)
+
+    def plan(seat_map: SeatMap) -> Picks:
+        _require_seated(seat_map)
+        if seats:
+            return _require_free(seat_map.locate(seats))
+        picks = (seat_map.find_block if together else seat_map.find_seats)(quantity, sections)
+        if picks is None:
+            detail = f"No {quantity} adjacent seats available" if together else f"Fewer than {quantity} seats available"
+            raise BusinessLogicException(detail=detail, error_code="SEATS_UNAVAILABLE")
+        return picks
+
+    picks = await write_seats(db, event_id, plan, _hold_seats)
+    labels = pick_labels(picks)
+    hold = SeatHold(
+        hold_id=f"HLD-{secrets.token_hex(6).upper()}",
+        event_id=event_id,
+        user_id=user_id,
+        seats=json.dumps(labels),
+        quantity=len(labels),
+        status="Active",
+        expires_at=datetime.utcnow() + timedelta(seconds=settings.SEAT_HOLD_SECONDS),
+    )
+    db.add(hold)
+    return hold
+
+
+async def _active_hold(db: AsyncSession, event_id: int, hold_id: str, user_id: Optional[int]) -> SeatHold:
+    result = await db.execute(
+        select(SeatHold).where(SeatHold.hold_id == hold_id, SeatHold.event_id == event_id)
+    )
+    hold = result.scalar_one_or_none()
+    if hold is None or (hold.user_id is not None and user_id is not None and hold.user_id != user_id):
+        raise NotFoundException(resource="Seat hold", resource_id=hold_id)
+    if hold.status != "Active" or hold.expires_at <= datetime.utcnow():
+        raise BusinessLogicException(detail=f"Seat hold {hold_id} has expired", error_code="HOLD_EXPIRED")
+    return hold
+
+
+async def _close_holds(db: AsyncSession, hold_ids: List[int], status: str) -> bool:
+    """Move Active holds to a final status; False if any was closed meanwhile."""
+    result = await db.execute(
+        update(SeatHold)
+        .where(SeatHold.id.in_(hold_ids), SeatHold.status == "Active")
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == len(hold_ids)
+
+
+async def _settle_hold(
+    db: AsyncSession,
+    event_id: int,
+    hold_id: str,
+    user_id: Optional[int],
+    change: Callable[[SeatRow, int], Tuple[int, int]],
+    status: str,
+) -> List[SeatLabel]:
+    hold = await _active_hold(db, event_id, hold_id, user_id)
+    hold_pk, labels = hold.id, hold_labels(hold)
+
+    def plan(seat_map: SeatMap) -> Picks:
+        picks = _require_seated(seat_map).locate(labels)
+        if any(row.held & mask != mask for row, mask in picks):
+            raise BusinessLogicException(detail=f"Seat hold {hold_id} has expired", error_code="HOLD_EXPIRED")
+        return picks
+
+    # Seat rows before the hold row, like the sweep (lock order)
+    await write_seats(db, event_id, plan, change)
+    if not await _close_holds(db, [hold_pk], status):
+        await db.rollback()
+        raise BusinessLogicException(detail=f"Seat hold {hold_id} has expired", error_code="HOLD_EXPIRED")
+    return labels
+
+
+async def convert_hold(db: AsyncSession, event_id: int, hold_id: str, user_id: Optional[int]) -> List[SeatLabel]:
+    """
+    Sell a hold's seats (committed by the caller, with the tickets).
+
+    Returns:
+        The held seats, in hold order
+
+    Raises:
+        NotFoundException: If the hold does not exist (for this user)
+        BusinessLogicException: If the hold expired or was released
+    """
+    return await _settle_hold(db, event_id, hold_id, user_id, _sell_held, "Converted")
+
+
+async def release_hold(db: AsyncSession, event_id: int, hold_id: str, user_id: Optional[int]) -> List[SeatLabel]:
+    """Give a hold's seats back (committed by the caller)."""
+    return await _settle_hold(db, event_id, hold_id, user_id, _release, "Released")
+
+
+async def claim_seats(db: AsyncSession, event_id: int, seats: Sequence[SeatLabel]) -> None:
+    """
+    Sell free seats without a hold (committed by the caller).
+
+    Raises:
+        BusinessLogicException: If a seat is sold or held
+    """
+    await sweep_expired_holds(db, event_id)
+    await write_seats(db, event_id, lambda seat_map: _require_free(seat_map.locate(seats)), _sell_free)
+
+
+async def sweep_expired_holds(db: AsyncSession, event_id: int, limit: int = 500) -> int:
+    """
+    Release the event's expired holds in their own transaction (at most
+    once per SWEEP_INTERVAL per worker). Call before any other write of the
+    caller's transaction.
+
+    Returns:
+        Number of holds released
+    """
+    if not seat_inventory.due_sweep(event_id):
+        return 0
+    result = await db.execute(
+        select(SeatHold.id, SeatHold.seats)
+        .where(SeatHold.event_id == event_id, SeatHold.status == "Active", SeatHold.expires_at <= datetime.utcnow())
+        .order_by(SeatHold.id)
+        .limit(limit)
+    )
+    expired = result.all()
+    if not expired:
+        return 0
+
+    labels = [tuple(label) for _, seats in expired for label in json.loads(seats)]
+
+    def plan(seat_map: SeatMap) -> Picks:
+        return seat_map.locate(labels)
+
+    try:
+        await write_seats(db, event_id, plan, _release)
+    except (BusinessLogicException, ValidationException):
+        await db.rollback()
+        return 0
+    if not await _close_holds(db, [hold_pk for hold_pk, _ in expired], "Expired"):
+        await db.rollback()  # Converted meanwhile; the next sweep retries
+        return 0
+    await db.commit()
+    return len(expired)
+
+
+# =============================================================================
+# CHANGE TRACKING
+# =============================================================================
+
+def _pending(session: Session) -> List[Tuple[int, int, int, int, int]]:
+    return session.info.setdefault("seat_pending", [])
+
+
+def _invalidated(session: Session) -> set:
+    return session.info.setdefault("seat_invalidated", set())
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_seat_changes(session: Session) -> None:
+    # Already applied by write_seats; again in case the map was reloaded since
+    pending = session.info.pop("seat_pending", None)
+    if pending:
+        seat_inventory.apply(pending)
+    for event_id in session.info.pop("seat_invalidated", ()):
+        seat_inventory.invalidate(event_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_seat_changes(session: Session) -> None:
+    """Drop maps holding writes that were rolled back (reloaded on next use)."""
+    pending = session.info.pop("seat_pending", None) or ()
+    for event_id in {change[0] for change in pending} | session.info.pop("seat_invalidated", set()):
+        seat_inventory.invalidate(event_id)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _bench(sections: int, rows: int, seats: int) -> None:
+    layout = [
+        SeatRow(index, f"S{index // rows:02d}", str(index % rows + 1), index % rows, seats, 0, 0, 0)
+        for index in range(sections * rows)
+    ]
+    seat_map = SeatMap(1, layout)
+    total = sections * rows * seats
+    names = list(seat_map.sections)
+    rng = random.Random(7)
+
+    began = time.perf_counter()
+    groups = sold = 0
+    while True:
+        quantity = rng.choice((1, 2, 2, 3, 4, 4, 5, 6))
+        picks = seat_map.find_block(quantity, rng.sample(names, 3))
+        if picks is None:
+            picks = seat_map.find_block(quantity)
+        if picks is None:
+            break
+        for row, mask in picks:
+            row.sold |= mask
+        groups += 1
+        sold += quantity
+    elapsed = time.perf_counter() - began
+
+    began = time.perf_counter()
+    checks = 100000
+    for _ in range(checks):
+        seat_map.is_available(names[rng.randrange(sections)], str(rng.randrange(rows) + 1), rng.randrange(seats) + 1)
+    checked = time.perf_counter() - began
+
+    began = time.perf_counter()
+    seat_map.summary()
+    summarised = time.perf_counter() - began
+
+    print(f"Seat map:       {total:,} seats in {sections * rows:,} rows")
+    print(f"Allocation:     {groups:,} group bookings ({sold:,} seats, {sold / total:.1%}) at {groups / elapsed:,.0f}/s")
+    print(f"Availability:   {checked / checks * 1e6:.2f} us per check")
+    print(f"Summary:        {summarised * 1e3:.2f} ms for {sections} sections")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seat inventory")
+    parser.add_argument("command", choices=["bench"])
+    parser.add_argument("--sections", type=int, default=40)
+    parser.add_argument("--rows", type=int, default=30)
+    parser.add_argument("--seats", type=int, default=50)
+    args = parser.parse_args()
+    _bench(args.sections, args.rows, args.seats)
@@ -0,0 +1,464 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Talent Similarity
+# Nearest neighbours over mean evaluation attribute vectors (NumPy)
+# ============================================================================
+#
+# Every evaluated talent is one row of an in-memory matrix holding per
+# attribute sums and counts of its evaluation scores, so the mean vector of
+# a talent can be updated exactly when evaluations are added, corrected or
+# deleted. Means are standardized per attribute (z-scores, missing
+# attributes at the population mean) and queries rank all candidates with
+# one matrix-vector product. Changed rows are re-standardized on the next
+# query; the per-attribute mean/deviation are recomputed on full reloads.
+#
+# The index is per worker. Committed evaluation and talent changes of this
+# worker are applied incrementally; a full reload happens on first use and
+# every SIMILARITY_REFRESH_SECONDS to pick up other workers' writes.
+#
+# Usage:
+#     python -m app.services.similarity rebuild
+# ============================================================================
+
+import argparse
+import asyncio
+import time
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.config import settings
+from app.db.models import Talent, TalentEvaluation
+
+
+# The 18 outfield attributes (goalkeeper scores are not compared)
+ATTRIBUTES = (
+    "score_ball_control", "score_passing", "score_dribbling",
+    "score_shooting", "score_heading", "score_first_touch",
+    "score_speed", "score_acceleration", "score_stamina",
+    "score_strength", "score_jumping", "score_agility",
+    "score_positioning", "score_vision", "score_composure",
+    "score_leadership", "score_work_rate", "score_decision_making",
+)
+METRICS = ("cosine", "euclidean")
+METRIC_PATTERN = "^(cosine|euclidean)$"
+
+_META_FIELDS = ("primary_position", "secondary_position", "date_of_birth")
+
+# Per-row arrays, grown and compacted together
+_ROW_ARRAYS = (
+    "ids", "sums", "counts", "primary", "secondary", "born",
+    "_z", "_unit", "_squared", "_evaluated",
+)
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+class SimilarityIndex:
+    """
+    Per-talent attribute sums/counts with top-k nearest neighbour queries.
+
+    Args:
+        refresh_seconds: Reload from the database after this many seconds
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.loaded_at: Optional[float] = None
+        self.loads = 0
+        self.queries = 0
+        self._lock = asyncio.Lock()
+        self._loading = False
+        self._stale = False
+        self._reset(0)
+
+    def _reset(self, capacity: int) -> None:
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.sums = np.zeros((capacity, len(ATTRIBUTES)))
+        self.counts = np.zeros((capacity, len(ATTRIBUTES)))
+        self.primary = np.zeros(capacity, dtype=np.int16)
+        self.secondary = np.zeros(capacity, dtype=np.int16)
+        self.born = np.zeros(capacity, dtype=np.int64)
+        self.rows: Dict[int, int] = {}
+        self._positions: Dict[Optional[str], int] = {None: 0}
+
+        # Standardized vectors, valid for rows not in _dirty
+        self._z = np.zeros((capacity, len(ATTRIBUTES)))
+        self._unit = np.zeros((capacity, len(ATTRIBUTES)))
+        self._squared = np.zeros(capacity)
+        self._evaluated = np.zeros(capacity, dtype=bool)
+        self._center: Optional[np.ndarray] = None
+        self._spread: Optional[np.ndarray] = None
+        self._dirty: set = set()
+
+    def clear(self) -> None:
+        """Drop all rows; the next query reloads from the database."""
+        self._reset(0)
+        self.loaded_at = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    # -------------------------------------------------------------------------
+    # Loading
+    # -------------------------------------------------------------------------
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Load all evaluated talents from the database. Returns the row count."""
+        aggregates = []
+        for name in ATTRIBUTES:
+            column = getattr(TalentEvaluation, name)
+            aggregates += [func.sum(column), func.count(column)]
+
+        query = (
+            select(
+                Talent.id, Talent.primary_position, Talent.secondary_position,
+                Talent.date_of_birth, *aggregates,
+            )
+            .join(TalentEvaluation, TalentEvaluation.talent_id == Talent.id)
+            .group_by(
+                Talent.id, Talent.primary_position, Talent.secondary_position,
+                Talent.date_of_birth,
+            )
+        )
+
+        self._loading, self._stale = True, False
+        try:
+            rows = (await db.execute(query)).all()
+        finally:
+            self._loading = False
+
+        self._reset(len(rows))
+        if rows:
+            values = np.array([row[4:] for row in rows], dtype=float).reshape(len(rows), -1)
+            self.sums[:] = np.nan_to_num(values[:, 0::2])
+            self.counts[:] = values[:, 1::2]
+            self.ids[:] = [row[0] for row in rows]
+            self.primary[:] = [self._position_code(row[1]) for row in rows]
+            self.secondary[:] = [self._position_code(row[2]) for row in rows]
+            self.born[:] = [row[3].toordinal() for row in rows]
+            self.size = len(rows)
+            self.rows = {int(talent_id): i for i, talent_id in enumerate(self.ids)}
+
+        # Changes committed while the query ran may be missing
+        self.loaded_at = time.monotonic() if not self._stale else 0.0
+        self.loads += 1
+        return self.size
+
+    async def ensure_current(self, db: AsyncSession) -> None:
+        """Load on first use and reload after refresh_seconds."""
+        if self.loaded and time.monotonic() - self.loaded_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if self.loaded and time.monotonic() - self.loaded_at < self.refresh_seconds:
+                return
+            await self.rebuild(db)
+
+    # -------------------------------------------------------------------------
+    # Incremental maintenance
+    # -------------------------------------------------------------------------
+
+    def _add_row(self, talent_id: int, meta: tuple) -> int:
+        if self.size == len(self.ids):
+            capacity = max(16, self.size * 2)
+            for name in _ROW_ARRAYS:
+                old = getattr(self, name)
+                new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                new[:self.size] = old[:self.size]
+                setattr(self, name, new)
+
+        row = self.size
+        self.ids[row] = talent_id
+        self.sums[row] = 0
+        self.counts[row] = 0
+        self._set_meta(row, meta)
+        self.rows[talent_id] = row
+        self.size += 1
+        self._dirty.add(row)
+        return row
+
+    def _position_code(self, position: Optional[str]) -> int:
+        return self._positions.setdefault(position, len(self._positions))
+
+    def _set_meta(self, row: int, meta: tuple) -> None:
+        primary, secondary, born = meta
+        self.primary[row] = self._position_code(primary)
+        self.secondary[row] = self._position_code(secondary)
+        self.born[row] = born.toordinal() if born else 0
+
+    def _remove_row(self, talent_id: int) -> None:
+        row = self.rows.pop(talent_id, None)
+        if row is None:
+            return
+        last = self.size - 1
+        if row != last:
+            for name in _ROW_ARRAYS:
+                array = getattr(self, name)
+                array[row] = array[last]
+            self.rows[int(self.ids[row])] = row
+            if last in self._dirty:  # The moved row's vectors are stale too
+                self._dirty.add(row)
+        self._dirty.discard(last)
+        self.size = last
+
+    def apply(
+        self,
+        deltas: Iterable[Tuple[int, np.ndarray, np.ndarray]],
+        meta: Dict[int, tuple],
+        removed: Iterable[int] = (),
+    ) -> None:
+        """
+        Apply committed changes.
+
+        Args:
+            deltas: (talent_id, sum delta, count delta) per changed evaluation
+            meta: talent_id -> (primary, secondary, date_of_birth)
+            removed: Deleted talent ids
+        """
+        if not self.loaded:
+            return
+        if self._loading:
+            self._stale = True
+
+        for talent_id, sums, counts in deltas:
+            row = self.rows.get(talent_id)
+            if row is None:
+                if talent_id not in meta:
+                    self._stale = True
+                    continue
+                row = self._add_row(talent_id, meta[talent_id])
+            self.sums[row] += sums
+            self.counts[row] += counts
+            self._dirty.add(row)
+
+        for talent_id, values in meta.items():
+            row = self.rows.get(talent_id)
+            if row is not None:
+                self._set_meta(row, values)
+
+        for talent_id in removed:
+            self._remove_row(talent_id)
+
+        if self._stale and not self._loading:
+            self.loaded_at = 0.0
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def _means(self, rows) -> Tuple[np.ndarray, np.ndarray]:
+        counts = self.counts[rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self.sums[rows] / counts
+        return means, counts > 0
+
+    def _standardize(self, rows) -> None:
+        means, observed = self._means(rows)
+        z = np.where(observed, (means - self._center) / self._spread, 0.0)
+        squared = np.einsum("ij,ij->i", z, z)
+        norms = np.sqrt(squared)[:, None]
+        self._z[rows] = z
+        self._unit[rows] = np.divide(z, norms, out=np.zeros_like(z), where=norms > 0)
+        self._squared[rows] = squared
+        self._evaluated[rows] = observed.any(axis=1)
+
+    def _vectors(self) -> Tuple[np.ndarray, ...]:
+        """
+        Standardized mean vectors, their unit-length versions, squared norms
+        and the mask of evaluated rows.
+        """
+        n = self.size
+        if self._center is None:
+            means, observed = self._means(slice(0, n))
+            observations = np.maximum(observed.sum(axis=0), 1)
+            self._center = np.where(observed, means, 0).sum(axis=0) / observations
+            spread = np.sqrt(
+                np.where(observed, (means - self._center) ** 2, 0).sum(axis=0) / observations
+            )
+            spread[spread == 0] = 1
+            self._spread = spread
+            self._standardize(slice(0, n))
+            self._dirty.clear()
+        elif self._dirty:
+            self._standardize(np.fromiter(self._dirty, dtype=np.int64))
+            self._dirty.clear()
+        return self._z[:n], self._unit[:n], self._squared[:n], self._evaluated[:n]
+
+    def nearest(
+        self,
+        talent_id: int,
+        k: int = 10,
+        metric: str = "cosine",
+        position: Optional[str] = None,
+        born_after: Optional[date] = None,
+        born_on_or_before: Optional[date] = None,
+    ) -> Optional[List[Tuple[int, float]]]:
+        """
+        Most similar talents, best first.
+
+        Returns:
+            [(talent_id, score)] where score is the cosine similarity or the
+            euclidean distance (in standard deviations), or None when the
+            talent has no evaluated attributes
+        """
+        row = self.rows.get(talent_id)
+        if row is None or not self.counts[row].any():
+            return None
+
+        self.queries += 1
+        n = self.size
+        z, unit, squared, evaluated = self._vectors()
+        candidates = evaluated.copy()
+        candidates[row] = False
+        if position:
+            code = self._positions.get(position)
+            if code is None:
+                return []
+            candidates &= (self.primary[:n] == code) | (self.secondary[:n] == code)
+        if born_after is not None:
+            candidates &= self.born[:n] > born_after.toordinal()
+        if born_on_or_before is not None:
+            candidates &= self.born[:n] <= born_on_or_before.toordinal()
+
+        k = min(k, int(candidates.sum()))
+        if not k:
+            return []
+
+        # Score every row, then push excluded rows to the end
+        if metric == "euclidean":
+            # |a - b|^2 = |a|^2 + |b|^2 - 2ab
+            scores = np.sqrt(np.maximum(squared + squared[row] - 2 * (z @ z[row]), 0))
+            order_by = np.where(candidates, scores, np.inf)
+        else:
+            scores = unit @ unit[row]
+            order_by = np.where(candidates, -scores, np.inf)
+
+        top = np.argpartition(order_by, k - 1)[:k]
+        top = top[np.argsort(order_by[top], kind="stable")]
+        return [(int(self.ids[i]), float(scores[i])) for i in top]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "talents": self.size,
+            "loaded": self.loaded,
+            "loads": self.loads,
+            "queries": self.queries,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded else None,
+        }
+
+
+similarity_index = SimilarityIndex(settings.SIMILARITY_REFRESH_SECONDS)
+
+
+# =============================================================================
+# CHANGE TRACKING
+# =============================================================================
+
+def _scores(values: Iterable[Optional[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    values = [np.nan if value is None else value for value in values]
+    array = np.array(values, dtype=float)
+    present = ~np.isnan(array)
+    return np.where(present, array, 0.0), present.astype(float)
+
+
+def _previous(obj, name: str):
+    history = get_history(obj, name)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, name)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_evaluation_changes(session: Session, flush_context) -> None:
+    """Collect attribute deltas until the transaction commits."""
+    if not similarity_index.loaded:
+        return
+
+    deltas, meta, removed = [], {}, set()
+
+    for obj in session.new:
+        if isinstance(obj, TalentEvaluation):
+            deltas.append((obj.talent_id, *_scores(getattr(obj, name) for name in ATTRIBUTES)))
+
+    for obj in session.deleted:
+        if isinstance(obj, TalentEvaluation):
+            sums, counts = _scores(_previous(obj, name) for name in ATTRIBUTES)
+            deltas.append((obj.talent_id, -sums, -counts))
+        elif isinstance(obj, Talent):
+            removed.add(obj.id)
+
+    for obj in session.dirty:
+        if isinstance(obj, TalentEvaluation):
+            if any(get_history(obj, name).has_changes() for name in ATTRIBUTES):
+                old_sums, old_counts = _scores(_previous(obj, name) for name in ATTRIBUTES)
+                new_sums, new_counts = _scores(getattr(obj, name) for name in ATTRIBUTES)
+                deltas.append((obj.talent_id, new_sums - old_sums, new_counts - old_counts))
+        elif isinstance(obj, Talent):
+            if any(get_history(obj, name).has_changes() for name in _META_FIELDS):
+                meta[obj.id] = tuple(getattr(obj, name) for name in _META_FIELDS)
+
+    missing = {
+        talent_id for talent_id, _, _ in deltas
+        if talent_id not in similarity_index.rows and talent_id not in meta
+    }
+    if missing:
+        result = session.connection().execute(
+            select(Talent.id, *[getattr(Talent, name) for name in _META_FIELDS])
+            .where(Talent.id.in_(missing))
+        )
+        meta.update({row[0]: tuple(row[1:]) for row in result})
+
+    if deltas or meta or removed:
+        pending = session.info.setdefault("similarity_pending", ([], {}, set()))
+        pending[0].extend(deltas)
+        pending[1].update(meta)
+        pending[2].update(removed)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_evaluation_changes(session: Session) -> None:
+    pending = session.info.pop("similarity_pending", None)
+    if pending:
+        similarity_index.apply(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_evaluation_changes(session: Session) -> None:
+    session.info.pop("similarity_pending", None)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+async def _main() -> None:
+    from app.db.database import AsyncSessionLocal, init_db
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        size = await similarity_index.rebuild(db)
+        print(f"Indexed {size} talents in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    if size:
+        started = time.perf_counter()
+        queries = min(size, 100)
+        for talent_id in similarity_index.ids[:queries]:
+            similarity_index.nearest(int(talent_id), 10)
+        elapsed = (time.perf_counter() - started) * 1000 / queries
+        print(f"Top-10 query: {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the talent similarity index")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    asyncio.run(_main())
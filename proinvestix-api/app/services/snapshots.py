@@ -0,0 +1,327 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Analytics Snapshots
+# Columnar Parquet / Arrow IPC copies of the main tables
+# ============================================================================
+#
+# Each table is read through a server-side cursor in partitions of
+# SNAPSHOT_BATCH_SIZE rows; every partition becomes one Arrow record batch
+# (a Parquet row group) with types taken from the model columns, so memory
+# stays flat and analysts get typed files instead of JSON.
+#
+# A full run writes every row. An incremental run writes only the rows
+# whose change columns (created_at / updated_at, or the table's equivalent)
+# fall in (previous watermark - SNAPSHOT_OVERLAP_SECONDS, run start]; the
+# row key is "id", so later files supersede earlier versions of a row.
+# Timestamps are set when a row is written, not when its transaction
+# commits (a bulk import chunk stamps created_at when it starts), so a row
+# stamped before the watermark can become visible after the run that set
+# it; the overlap picks such rows up in the next run as long as their
+# transaction took less than SNAPSHOT_OVERLAP_SECONDS, at the cost of
+# writing recently changed rows again. Changes without a timestamp (e.g. a
+# ticket status change, deletes) only show up in the next full run.
+#
+# manifest.json in the snapshot directory lists, per table, the schema, the
+# watermark and the files of the current chain (one full file plus the
+# incrementals after it). Files are written under a temporary name and the
+# manifest is replaced atomically, so readers never see a partial file;
+# files superseded by a full run are removed only once the new manifest is
+# in place.
+#
+# Usage:
+#     python -m app.services.snapshots run [--full] [--format parquet|arrow]
+#                                          [--output DIR] [--tables talents ...]
+# ============================================================================
+
+import argparse
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from sqlalchemy import (
+    Boolean, Date, DateTime, Float, Integer, LargeBinary, Numeric, SmallInteger,
+    and_, or_, select,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.core.exceptions import ValidationException
+from app.db.models import Talent, TalentEvaluation, Ticket, Transfer, WalletTransaction
+
+
+SNAPSHOT_FORMAT_PATTERN = "^(parquet|arrow)$"
+
+EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Table -> (model, change columns)
+SNAPSHOT_TABLES = {
+    "talents": (Talent, ("created_at", "updated_at")),
+    "evaluations": (TalentEvaluation, ("created_at",)),
+    "transfers": (Transfer, ("created_at", "completed_at")),
+    "tickets": (Ticket, ("minted_at", "used_at")),
+    "wallet_transactions": (WalletTransaction, ("created_at",)),
+}
+
+
+# =============================================================================
+# SCHEMA
+# =============================================================================
+
+def arrow_type(column) -> pa.DataType:
+    """Arrow type of a model column (text for anything unrecognised)."""
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, SmallInteger):
+        return pa.int16()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, (Float, Numeric)):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    if isinstance(column_type, LargeBinary):
+        return pa.binary()
+    return pa.string()
+
+
+def arrow_schema(model) -> pa.Schema:
+    """Arrow schema of a model's table, nullability included."""
+    return pa.schema([
+        pa.field(column.name, arrow_type(column), nullable=column.nullable)
+        for column in model.__table__.columns
+    ])
+
+
+def record_batch(rows: Sequence, schema: pa.Schema) -> pa.RecordBatch:
+    """Transpose a partition of row tuples into a typed record batch."""
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+# =============================================================================
+# MANIFEST
+# =============================================================================
+
+def load_manifest(output: Path) -> Dict[str, Any]:
+    """The snapshot directory's manifest, empty when there is none yet."""
+    path = output / MANIFEST_NAME
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "tables": {}}
+    return json.loads(path.read_text())
+
+
+def _write_manifest(output: Path, manifest: Dict[str, Any]) -> None:
+    temporary = output / f".{MANIFEST_NAME}.tmp"
+    temporary.write_text(json.dumps(manifest, indent=2))
+    os.replace(temporary, output / MANIFEST_NAME)
+
+
+# =============================================================================
+# WRITING
+# =============================================================================
+
+class _ParquetSink:
+    def __init__(self, path: Path, schema: pa.Schema):
+        self.writer = pq.ParquetWriter(path, schema, compression="zstd")
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        self.writer.write_batch(batch)
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _ArrowSink:
+    def __init__(self, path: Path, schema: pa.Schema):
+        self.file = pa.OSFile(str(path), "wb")
+        self.writer = ipc.new_file(self.file, schema, options=ipc.IpcWriteOptions(compression="zstd"))
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        self.writer.write_batch(batch)
+
+    def close(self) -> None:
+        self.writer.close()
+        self.file.close()
+
+
+def change_conditions(model, change_columns: Sequence[str], since: Optional[datetime], until: datetime):
+    """Rows with any change column in (since, until]."""
+    return or_(*[
+        and_(
+            getattr(model, name) > since if since is not None else getattr(model, name).isnot(None),
+            getattr(model, name) <= until,
+        )
+        for name in change_columns
+    ])
+
+
+async def snapshot_table(
+    engine: AsyncEngine,
+    table: str,
+    path: Path,
+    format: str,
+    until: datetime,
+    since: Optional[datetime] = None,
+    full: bool = True,
+    batch_size: int = 0,
+) -> int:
+    """
+    Write one table (or its changes since the watermark) to a columnar file.
+
+    No file is left behind when there are no rows.
+
+    Returns:
+        Number of rows written
+    """
+    model, change_columns = SNAPSHOT_TABLES[table]
+    batch_size = batch_size or settings.SNAPSHOT_BATCH_SIZE
+    schema = arrow_schema(model)
+
+    query = select(*model.__table__.columns).order_by(model.id)
+    if not full:
+        query = query.where(change_conditions(model, change_columns, since, until))
+
+    temporary = path.with_name(f".{path.name}.tmp")
+    sink = None
+    rows = 0
+    try:
+        async with engine.connect() as connection:
+            result = await connection.stream(query.execution_options(yield_per=batch_size))
+            async for partition in result.partitions(batch_size):
+                if sink is None:
+                    sink = (_ParquetSink if format == "parquet" else _ArrowSink)(temporary, schema)
+                sink.write(record_batch(partition, schema))
+                rows += len(partition)
+        if sink is not None:
+            sink.close()
+            sink = None
+            os.replace(temporary, path)
+    finally:
+        if sink is not None:
+            sink.close()
+        temporary.unlink(missing_ok=True)
+    return rows
+
+
+# =============================================================================
+# RUNS
+# =============================================================================
+
+def _schema_fields(schema: pa.Schema) -> List[dict]:
+    return [{"name": field.name, "type": str(field.type), "nullable": field.nullable} for field in schema]
+
+
+async def run_snapshot(
+    engine: AsyncEngine,
+    output: Optional[str] = None,
+    format: str = "parquet",
+    full: bool = False,
+    tables: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Snapshot the analytics tables and update the manifest.
+
+    A table without a watermark (or whose schema changed) gets a full file
+    even in an incremental run; a full file replaces the table's chain and
+    the superseded files are removed.
+
+    Raises:
+        ValidationException: On an unknown table or format
+
+    Returns:
+        The updated manifest
+    """
+    if format not in EXTENSIONS:
+        raise ValidationException(f"Unknown snapshot format: {format}")
+    unknown = set(tables or ()) - set(SNAPSHOT_TABLES)
+    if unknown:
+        raise ValidationException(f"Unknown snapshot tables: {', '.join(sorted(unknown))}")
+
+    output = Path(output or settings.SNAPSHOT_DIR)
+    output.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(output)
+    until = datetime.utcnow()
+    run_id = f"{until:%Y%m%dT%H%M%S%f}"
+    superseded: List[Path] = []
+
+    for table in tables or SNAPSHOT_TABLES:
+        model, change_columns = SNAPSHOT_TABLES[table]
+        fields = _schema_fields(arrow_schema(model))
+        previous = manifest["tables"].get(table)
+        table_full = full or previous is None or previous["schema"] != fields
+        since = None if table_full else (
+            datetime.fromisoformat(previous["watermark"]) - timedelta(seconds=settings.SNAPSHOT_OVERLAP_SECONDS)
+        )
+
+        mode = "full" if table_full else "incremental"
+        relative = f"{table}/{table}-{run_id}-{mode}.{EXTENSIONS[format]}"
+        (output / table).mkdir(exist_ok=True)
+        rows = await snapshot_table(engine, table, output / relative, format, until, since, table_full)
+
+        files = [] if table_full else list(previous["files"])
+        if table_full and previous is not None:
+            superseded += [output / entry["path"] for entry in previous["files"]]
+        if rows:
+            files.append({
+                "path": relative,
+                "format": format,
+                "mode": mode,
+                "since": since.isoformat() if since else None,
+                "until": until.isoformat(),
+                "rows": rows,
+                "bytes": (output / relative).stat().st_size,
+            })
+
+        manifest["tables"][table] = {
+            "key": "id",
+            "change_columns": list(change_columns),
+            "watermark": until.isoformat(),
+            "schema": fields,
+            "files": files,
+        }
+
+    manifest["updated_at"] = until.isoformat()
+    _write_manifest(output, manifest)
+    for path in superseded:
+        path.unlink(missing_ok=True)
+    return manifest
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+async def _main(args: argparse.Namespace) -> None:
+    from app.db.database import engine, init_db
+
+    await init_db()
+    manifest = await run_snapshot(engine, args.output, args.format, args.full, args.tables)
+    for table in args.tables or SNAPSHOT_TABLES:
+        files = manifest["tables"][table]["files"]
+        written = files[-1]["rows"] if files and files[-1]["until"] == manifest["updated_at"] else 0
+        print(f"{table}: {written} rows written, {sum(entry['rows'] for entry in files)} in {len(files)} files")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write columnar analytics snapshots")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("--full", action="store_true", help="Rewrite every table instead of changes since the last run")
+    parser.add_argument("--format", choices=list(EXTENSIONS), default="parquet")
+    parser.add_argument("--output", help="Snapshot directory (default SNAPSHOT_DIR)")
+    parser.add_argument("--tables", nargs="+", choices=list(SNAPSHOT_TABLES))
+    asyncio.run(_main(parser.parse_args()))
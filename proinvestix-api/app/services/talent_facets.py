@@ -0,0 +1,259 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Talent Facets
+# One-pass facet counts and a versioned index of facet values
+# ============================================================================
+#
+# Facet counts (status, position, priority, nationality, diaspora, age band)
+# for a filter set come from a single statement: GROUPING SETS on
+# PostgreSQL, a UNION ALL over one materialized CTE elsewhere. Results are
+# cached per filter fingerprint and talent data version.
+#
+# Value lists that rarely change (clubs, nationalities) are kept in an
+# in-process index that reloads only when its version moves (a committed
+# talent insert/delete or club/nationality change in this worker) or after
+# FACET_VALUES_TTL seconds (changes made by other workers).
+# ============================================================================
+
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import event, func, literal, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.db.models import Talent
+from app.services.counting import count_fingerprint
+from app.services.talent_filters import age_band_expression, cumulative_bands
+
+
+# Facet name -> talent column (age_band is added as an expression)
+FACET_COLUMNS = {
+    "status": Talent.status,
+    "position": Talent.primary_position,
+    "priority": Talent.priority_level,
+    "nationality": Talent.nationality,
+    "is_diaspora": Talent.is_diaspora,
+}
+FACETS = tuple(FACET_COLUMNS) + ("age_band",)
+
+# Columns whose distinct values are served from the value index
+VALUE_COLUMNS = {
+    "nationalities": Talent.nationality,
+    "clubs": Talent.current_club,
+}
+
+facet_cache = TTLCache(settings.FACET_CACHE_SIZE, settings.FACET_CACHE_TTL, name="facets")
+
+
+# =============================================================================
+# VALUE INDEX
+# =============================================================================
+
+class FacetValueIndex:
+    """
+    Sorted distinct values per column, reloaded when the version changes.
+
+    Args:
+        columns: Name -> column to index
+        ttl: Seconds after which values are reloaded regardless of version
+    """
+
+    def __init__(self, columns: Dict[str, Any], ttl: float):
+        self.columns = columns
+        self.ttl = ttl
+        self.version = 0
+        self.loads = 0
+        self._values: Dict[str, List[Any]] = {}
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+
+    def bump(self) -> None:
+        """Mark the indexed values as changed."""
+        self.version += 1
+
+    def reset(self) -> None:
+        self._values = {}
+        self._loaded_version = -1
+
+    def is_current(self) -> bool:
+        return (
+            self._loaded_version == self.version
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    async def values(self, db: AsyncSession) -> Dict[str, List[Any]]:
+        """Return the indexed values, reloading them when stale."""
+        if not self.is_current():
+            version = self.version
+            values = {}
+            for name, column in self.columns.items():
+                result = await db.execute(
+                    select(column).distinct().where(column.is_not(None)).order_by(column)
+                )
+                values[name] = list(result.scalars().all())
+            self._values = values
+            self._loaded_version = version
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+        return self._values
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "current": self.is_current(),
+            "loads": self.loads,
+            "values": {name: len(values) for name, values in self._values.items()},
+        }
+
+
+facet_values = FacetValueIndex(VALUE_COLUMNS, settings.FACET_VALUES_TTL)
+
+# Bumped on every committed talent change; part of the facet cache key
+_data_version = 0
+
+
+# =============================================================================
+# CHANGE TRACKING
+# =============================================================================
+
+_VALUE_FIELDS = tuple(column.key for column in VALUE_COLUMNS.values())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_talent_changes(session: Session, flush_context) -> None:
+    """Remember talent changes until the transaction commits."""
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Talent):
+            session.info["talent_facets_changed"] = True
+            session.info["talent_values_changed"] = True
+            return
+
+    for obj in session.dirty:
+        if isinstance(obj, Talent) and session.is_modified(obj):
+            session.info["talent_facets_changed"] = True
+            if any(get_history(obj, field).has_changes() for field in _VALUE_FIELDS):
+                session.info["talent_values_changed"] = True
+                return
+
+
+def mark_talents_changed(session: Session, values: bool = True) -> None:
+    """Record talent changes made with Core statements (bulk inserts)."""
+    session.info["talent_facets_changed"] = True
+    if values:
+        session.info["talent_values_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_talent_changes(session: Session) -> None:
+    global _data_version
+    if session.info.pop("talent_facets_changed", False):
+        _data_version += 1
+    if session.info.pop("talent_values_changed", False):
+        facet_values.bump()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_talent_changes(session: Session) -> None:
+    session.info.pop("talent_facets_changed", None)
+    session.info.pop("talent_values_changed", None)
+
+
+# =============================================================================
+# FACET COUNTS
+# =============================================================================
+
+def _facet_statement(dialect: str, filtered):
+    """
+    Single statement returning (facet, value, count) rows plus a total row.
+
+    Args:
+        dialect: Database dialect name
+        filtered: Filtered select of the facet columns (one row per talent)
+    """
+    if dialect == "postgresql":
+        sub = filtered.subquery("filtered")
+        columns = [sub.c[name] for name in FACETS]
+        return select(
+            *columns,
+            *[func.grouping(column).label(f"grouping_{column.key}") for column in columns],
+            func.count().label("count"),
+        ).group_by(func.grouping_sets(*columns, text("()")))
+
+    cte = filtered.cte("filtered")
+    parts = [
+        select(literal(name).label("facet"), cte.c[name].label("value"), func.count().label("count"))
+        .group_by(cte.c[name])
+        for name in FACETS
+    ]
+    parts.append(
+        select(literal("total").label("facet"), literal(None).label("value"), func.count().label("count"))
+        .select_from(cte)
+    )
+    return union_all(*parts)
+
+
+def _facet_rows(dialect: str, rows) -> List[tuple]:
+    """Normalize result rows to (facet, value, count)."""
+    if dialect != "postgresql":
+        return [(row.facet, row.value, row.count) for row in rows]
+
+    normalized = []
+    for row in rows:
+        mapping = row._mapping
+        facet = next(
+            (name for name in FACETS if mapping[f"grouping_{name}"] == 0),
+            "total",
+        )
+        normalized.append((facet, mapping[facet] if facet != "total" else None, row.count))
+    return normalized
+
+
+async def facet_counts(db: AsyncSession, query, dialect: str) -> Dict[str, Any]:
+    """
+    Counts per facet value for the filtered talents.
+
+    Args:
+        db: Database session
+        query: Filtered select over Talent (filters and search join applied)
+        dialect: Database dialect name
+
+    Returns:
+        {"total": n, "status": {...}, "position": {...}, "priority": {...},
+        "nationality": {...}, "is_diaspora": {"true": n, "false": n},
+        "age_band": {"U15": n, ...}} (age bands are cumulative)
+    """
+    filtered = query.with_only_columns(
+        *[column.label(name) for name, column in FACET_COLUMNS.items()],
+        age_band_expression().label("age_band"),
+        maintain_column_froms=True,
+    )
+
+    key = (count_fingerprint(filtered), _data_version)
+    cached = facet_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(_facet_statement(dialect, filtered))
+
+    facets: Dict[str, Any] = {name: {} for name in FACETS}
+    total = 0
+    for facet, value, count in _facet_rows(dialect, result.all()):
+        if facet == "total":
+            total = count
+        elif value is not None:
+            if facet == "is_diaspora":
+                value = "true" if value else "false"
+            facets[facet][value] = count
+
+    facets["age_band"] = cumulative_bands(facets["age_band"])
+    data = {"total": total, **facets}
+    facet_cache.set(key, data)
+    return data
+
+
+def facet_stats() -> Dict[str, Any]:
+    """Facet cache and value index statistics (this worker)."""
+    return {**facet_cache.stats(), "data_version": _data_version, "values": facet_values.stats()}
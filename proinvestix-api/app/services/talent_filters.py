@@ -0,0 +1,175 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Talent Filters
+# Shared talent list filters, age bounds and youth age bands
+# ============================================================================
+#
+# Ages are never computed per row. Age bounds are converted once per request
+# into a date_of_birth range, which the (primary_position, date_of_birth) and
+# (nationality, date_of_birth) indexes serve as range scans.
+# ============================================================================
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import ValidationException
+from app.db.models import Talent
+
+
+# Youth bands: "U19" = younger than 19 today (bands are cumulative)
+AGE_BANDS = {"U15": 15, "U17": 17, "U19": 19, "U21": 21, "U23": 23}
+AGE_BAND_PATTERN = "^(U15|U17|U19|U21|U23)$"
+
+
+# =============================================================================
+# DATE RANGES
+# =============================================================================
+
+def years_before(day: date, years: int) -> date:
+    """Same calendar day `years` earlier (29 February becomes 28 February)."""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+def birth_date_range(
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    today: Optional[date] = None,
+    age_band: Optional[str] = None,
+) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Convert inclusive age bounds (and/or an age band) to a date_of_birth range.
+
+    Returns:
+        (born_after, born_on_or_before): date_of_birth > born_after and
+        date_of_birth <= born_on_or_before; either may be None
+
+    Raises:
+        ValidationException: If min_age is greater than max_age
+    """
+    if age_band:
+        band_max = AGE_BANDS[age_band] - 1
+        max_age = band_max if max_age is None else min(max_age, band_max)
+
+    if min_age is not None and max_age is not None and min_age > max_age:
+        raise ValidationException("min_age cannot be greater than max_age")
+
+    today = today or date.today()
+    born_after = years_before(today, max_age + 1) if max_age is not None else None
+    born_on_or_before = years_before(today, min_age) if min_age is not None else None
+    return born_after, born_on_or_before
+
+
+def age_conditions(
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    age_band: Optional[str] = None,
+    today: Optional[date] = None,
+) -> List:
+    """date_of_birth predicates for age bounds and/or an age band."""
+    born_after, born_on_or_before = birth_date_range(min_age, max_age, today, age_band)
+    conditions = []
+    if born_after is not None:
+        conditions.append(Talent.date_of_birth > born_after)
+    if born_on_or_before is not None:
+        conditions.append(Talent.date_of_birth <= born_on_or_before)
+    return conditions
+
+
+def talent_conditions(
+    nationality: Optional[str] = None,
+    position: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    is_diaspora: Optional[bool] = None,
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    age_band: Optional[str] = None,
+    today: Optional[date] = None,
+) -> List:
+    """WHERE conditions for the talent list filters (search excluded)."""
+    conditions = []
+
+    if nationality:
+        conditions.append(Talent.nationality == nationality)
+
+    if position:
+        conditions.append(
+            or_(
+                Talent.primary_position == position,
+                Talent.secondary_position == position,
+            )
+        )
+
+    if status:
+        conditions.append(Talent.status == status)
+
+    if priority:
+        conditions.append(Talent.priority_level == priority)
+
+    if is_diaspora is not None:
+        conditions.append(Talent.is_diaspora == is_diaspora)
+
+    conditions.extend(age_conditions(min_age, max_age, age_band, today))
+    return conditions
+
+
+# =============================================================================
+# AGE BANDS
+# =============================================================================
+
+def age_band_of(born: date, today: Optional[date] = None) -> str:
+    """Youngest band of a birth date, "Senior" when 23 or older."""
+    today = today or date.today()
+    for band, age in AGE_BANDS.items():
+        if born > years_before(today, age):
+            return band
+    return "Senior"
+
+
+def age_band_expression(today: Optional[date] = None):
+    """Youngest band a talent falls in (U15 ... U23), NULL when 23 or older."""
+    today = today or date.today()
+    return case(
+        *[
+            (Talent.date_of_birth > years_before(today, age), band)
+            for band, age in AGE_BANDS.items()
+        ],
+        else_=None,
+    )
+
+
+def cumulative_bands(youngest: Dict[str, int]) -> Dict[str, int]:
+    """Turn counts per youngest band into cumulative band counts."""
+    counts, running = {}, 0
+    for band in AGE_BANDS:
+        running += youngest.get(band, 0)
+        counts[band] = running
+    return counts
+
+
+async def age_band_counts(
+    db: AsyncSession,
+    conditions: List,
+    today: Optional[date] = None,
+) -> Dict[str, int]:
+    """
+    Count talents per youth band in one scan.
+
+    Only rows inside the widest band (U23) are read, so the scan is a
+    date_of_birth range.
+    """
+    today = today or date.today()
+    cutoffs = {band: years_before(today, age) for band, age in AGE_BANDS.items()}
+
+    query = select(*[
+        func.coalesce(func.sum(case((Talent.date_of_birth > cutoff, 1), else_=0)), 0).label(band)
+        for band, cutoff in cutoffs.items()
+    ]).where(Talent.date_of_birth > min(cutoffs.values()), *conditions)
+
+    row = (await db.execute(query)).one()
+    return {band: int(row._mapping[band]) for band in AGE_BANDS}
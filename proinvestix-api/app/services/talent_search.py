@@ -0,0 +1,291 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Talent Search
+# Accent-folded, relevance-ranked full-text search over talents
+# ============================================================================
+#
+# Every talent has one TalentSearchDocument holding its folded name and club
+# ("Sofiane Boufal" / "Aït-Nouri" -> "sofiane boufal" / "ait nouri aitnouri").
+# Documents are indexed by FTS5 on SQLite and by tsvector + trigram GIN
+# indexes on PostgreSQL (see app/db/models.py).
+#
+# Documents are maintained by an ORM flush listener, in the same transaction
+# as the talent change. Core bulk statements bypass the listener and must
+# call sync_documents() themselves. At startup the index is rebuilt when it
+# has fewer documents than there are talents (e.g. talents from before it).
+#
+# Usage:
+#     python -m app.services.talent_search rebuild
+# ============================================================================
+
+import argparse
+import asyncio
+import re
+import unicodedata
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, delete, event, false, func, insert, literal, or_, select, table, column, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.db.models import Talent, TalentSearchDocument, TALENT_TS_CONFIG
+
+
+# Talent columns that make up the search document
+SEARCH_FIELDS = ("first_name", "last_name", "current_club")
+
+# Longest query that is turned into search terms
+MAX_QUERY_TOKENS = 8
+
+# Letters that NFKD does not decompose into base letter + accent
+_SPECIAL_LETTERS = str.maketrans({
+    "ß": "ss", "ø": "o", "Ø": "o", "æ": "ae", "Æ": "ae", "œ": "oe", "Œ": "oe",
+    "ł": "l", "Ł": "l", "đ": "d", "Đ": "d", "ð": "d", "ı": "i", "þ": "th",
+})
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+_fts = table("talent_search_fts", column("rowid"))
+
+
+# =============================================================================
+# NORMALIZATION
+# =============================================================================
+
+def fold(value: Optional[str]) -> str:
+    """
+    Lowercase text and strip accents/diacritics and punctuation.
+
+    "Éric Abidal" -> "eric abidal", "N'Golo" -> "n golo",
+    "Aït-Nouri" -> "ait nouri"
+    """
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value.translate(_SPECIAL_LETTERS))
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", value.lower()).strip()
+
+
+def build_document(first_name: str, last_name: str, current_club: Optional[str]) -> str:
+    """
+    Build the folded search document of a talent.
+
+    Hyphenated and apostrophe names are also stored joined ("el-kaabi" ->
+    "el kaabi elkaabi"), so both spellings match.
+    """
+    words = []
+    for value, is_name in ((first_name, True), (last_name, True), (current_club, False)):
+        folded = fold(value)
+        if not folded:
+            continue
+        words.append(folded)
+        if is_name and " " in folded:
+            words.append(folded.replace(" ", ""))
+    return " ".join(words)
+
+
+def query_tokens(search: str) -> List[str]:
+    """Split a search string into folded terms."""
+    return fold(search).split()[:MAX_QUERY_TOKENS]
+
+
+# =============================================================================
+# QUERYING
+# =============================================================================
+
+def search_ranking(dialect: str, search: str):
+    """
+    Subquery of matching talents with a relevance score (higher is better).
+
+    Every term is matched as a prefix, so partially typed names match
+    (typeahead). A search without usable terms ("!!!") matches nothing.
+
+    Columns:
+        talent_id, score
+    """
+    tokens = query_tokens(search)
+    if not tokens:
+        return (
+            select(TalentSearchDocument.talent_id, literal(0.0).label("score"))
+            .where(false())
+            .subquery("search_ranking")
+        )
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{token}"*' for token in tokens)
+        return (
+            select(
+                _fts.c.rowid.label("talent_id"),
+                (-func.bm25(text("talent_search_fts"))).label("score"),
+            )
+            .select_from(_fts)
+            .where(text("talent_search_fts MATCH :match").bindparams(match=match))
+            .subquery("search_ranking")
+        )
+
+    document = TalentSearchDocument.document
+    if dialect == "postgresql":
+        vector = func.to_tsvector(TALENT_TS_CONFIG, document)
+        tsquery = func.to_tsquery(TALENT_TS_CONFIG, " & ".join(f"{token}:*" for token in tokens))
+        phrase = " ".join(tokens)
+        return (
+            select(
+                TalentSearchDocument.talent_id,
+                (func.ts_rank(vector, tsquery) + func.similarity(document, phrase)).label("score"),
+            )
+            .where(or_(vector.op("@@")(tsquery), document.op("%")(phrase)))
+            .subquery("search_ranking")
+        )
+
+    return (
+        select(TalentSearchDocument.talent_id, literal(0.0).label("score"))
+        .where(and_(*[document.like(f"%{token}%") for token in tokens]))
+        .subquery("search_ranking")
+    )
+
+
+# =============================================================================
+# MAINTENANCE
+# =============================================================================
+
+def _upsert_statement(dialect_name: str):
+    doc_table = TalentSearchDocument.__table__
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(doc_table)
+    return stmt.on_conflict_do_update(
+        index_elements=[doc_table.c.talent_id],
+        set_={"document": stmt.excluded.document, "updated_at": stmt.excluded.updated_at},
+    )
+
+
+def sync_documents(
+    connection: Connection,
+    upserts: Dict[int, str],
+    deletes: Iterable[int] = (),
+) -> None:
+    """Write and remove search documents (inside the caller's transaction)."""
+    doc_table = TalentSearchDocument.__table__
+    deletes = list(deletes)
+
+    if deletes:
+        connection.execute(delete(doc_table).where(doc_table.c.talent_id.in_(deletes)))
+    if not upserts:
+        return
+
+    now = datetime.utcnow()
+    rows = [
+        {"talent_id": talent_id, "document": document, "updated_at": now}
+        for talent_id, document in upserts.items()
+    ]
+    stmt = _upsert_statement(connection.dialect.name)
+    if stmt is None:
+        connection.execute(delete(doc_table).where(doc_table.c.talent_id.in_(list(upserts))))
+        stmt = insert(doc_table)
+    connection.execute(stmt, rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_search_documents(session: Session, flush_context) -> None:
+    """Keep search documents in step with flushed talent changes."""
+    upserts: Dict[int, str] = {}
+    deletes = set()
+
+    for obj in session.new:
+        if isinstance(obj, Talent):
+            upserts[obj.id] = build_document(obj.first_name, obj.last_name, obj.current_club)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Talent) or obj in session.deleted:
+            continue
+        if any(get_history(obj, field).has_changes() for field in SEARCH_FIELDS):
+            upserts[obj.id] = build_document(obj.first_name, obj.last_name, obj.current_club)
+
+    for obj in session.deleted:
+        if isinstance(obj, Talent):
+            deletes.add(obj.id)
+
+    if upserts or deletes:
+        sync_documents(session.connection(), upserts, deletes)
+
+
+async def rebuild_search_index(db: AsyncSession, batch_size: int = 1000) -> int:
+    """
+    Regenerate all search documents from the talents table.
+
+    Returns:
+        Number of documents written
+    """
+    await db.execute(delete(TalentSearchDocument))
+
+    written = 0
+    last_id = 0
+    connection = await db.connection()
+    while True:
+        result = await db.execute(
+            select(Talent.id, Talent.first_name, Talent.last_name, Talent.current_club)
+            .where(Talent.id > last_id)
+            .order_by(Talent.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            break
+        await connection.run_sync(lambda conn: sync_documents(conn, {
+            row.id: build_document(row.first_name, row.last_name, row.current_club)
+            for row in rows
+        }))
+        written += len(rows)
+        last_id = rows[-1].id
+
+    if db.bind.dialect.name == "sqlite":
+        await db.execute(text("INSERT INTO talent_search_fts(talent_search_fts) VALUES ('rebuild')"))
+
+    await db.commit()
+    return written
+
+
+async def ensure_search_index(db: AsyncSession) -> int:
+    """
+    Rebuild the search index when talents are missing from it.
+
+    Returns:
+        Number of documents written (0 when the index was complete)
+    """
+    talents = (await db.execute(select(func.count(Talent.id)))).scalar()
+    documents = (await db.execute(select(func.count(TalentSearchDocument.talent_id)))).scalar()
+    if documents >= talents:
+        return 0
+    try:
+        return await rebuild_search_index(db)
+    except IntegrityError:
+        await db.rollback()  # Another worker rebuilt it at the same time
+        return 0
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+async def _main() -> None:
+    from app.db.database import AsyncSessionLocal, init_db
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        written = await rebuild_search_index(db)
+        print(f"Indexed {written} talents")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the talent search index")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    asyncio.run(_main())
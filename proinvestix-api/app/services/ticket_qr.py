@@ -0,0 +1,299 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Signed Ticket QR Payloads
+# Ed25519-signed, self-verifying QR codes for offline gate validation
+# ============================================================================
+#
+# A ticket's QR code carries everything a gate device needs, signed with
+# the platform's Ed25519 key:
+#
+#     format (1) | ticket hash (32) | event id (4) | valid from (4)
+#     | valid until (4) | version (2) | seat (utf-8) | signature (64)
+#
+# (big-endian, times in epoch seconds, base64url without padding; about
+# 160 characters). Devices hold only the public key (GET /tickets/qr/key),
+# so a stolen device cannot forge tickets, and validate a scan with
+# verify_payload() without any database lookup.
+#
+# Payloads are never edited: a transfer re-issues the QR with the next
+# version and revokes the lower versions. Cancelled and expired tickets
+# revoke all versions. Revocations are append-only rows whose id is the
+# cursor of GET /tickets/revocations, so devices sync only the delta since
+# their last pull.
+#
+# Usage:
+#     python -m app.services.ticket_qr bench [--count 20000]
+# ============================================================================
+
+import argparse
+import base64
+import hashlib
+import struct
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.config import settings
+from app.db.models import Event, Ticket, TicketRevocation
+
+
+PAYLOAD_FORMAT = 1
+EPOCH = datetime(1970, 1, 1)
+
+# format, ticket hash, event id, valid from, valid until, version
+_HEADER = struct.Struct(">B32sIIIH")
+_SIGNATURE_SIZE = 64
+_MAX_SEAT_BYTES = 100
+
+# Revokes every version of a ticket
+ALL_VERSIONS = 0xFFFF
+
+# Ticket statuses that revoke the QR code
+REVOKING_STATUSES = ("Cancelled", "Expired")
+
+
+# =============================================================================
+# KEYS
+# =============================================================================
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+@lru_cache()
+def signing_key() -> Ed25519PrivateKey:
+    """The platform's QR signing key (TICKET_SIGNING_KEY, or derived from SECRET_KEY)."""
+    if settings.TICKET_SIGNING_KEY:
+        seed = _b64decode(settings.TICKET_SIGNING_KEY)
+    else:
+        seed = hashlib.sha256(b"ticket-qr:" + settings.SECRET_KEY.encode()).digest()
+    return Ed25519PrivateKey.from_private_bytes(seed)
+
+
+def public_key_info() -> Dict[str, Any]:
+    """What gate devices need to verify payloads offline."""
+    public = signing_key().public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    return {
+        "algorithm": "Ed25519",
+        "format": PAYLOAD_FORMAT,
+        "key_id": hashlib.sha256(public).hexdigest()[:16],
+        "public_key": _b64encode(public),
+    }
+
+
+def load_public_key(public_key: str) -> Ed25519PublicKey:
+    """Public key from its base64url form (as served by public_key_info)."""
+    return Ed25519PublicKey.from_public_bytes(_b64decode(public_key))
+
+
+# =============================================================================
+# PAYLOADS
+# =============================================================================
+
+def _epoch(moment: datetime) -> int:
+    return int((moment - EPOCH).total_seconds())
+
+
+def qr_valid_until(event_date: datetime) -> datetime:
+    """End of a ticket's validity window for an event starting at event_date."""
+    return event_date + timedelta(hours=settings.TICKET_QR_GRACE_HOURS)
+
+
+def sign_payload(
+    ticket_hash: str,
+    event_id: int,
+    seat: Optional[str],
+    valid_from: datetime,
+    valid_until: datetime,
+    version: int = 1,
+) -> str:
+    """Signed QR payload of a ticket (naive UTC datetimes)."""
+    body = _HEADER.pack(
+        PAYLOAD_FORMAT, bytes.fromhex(ticket_hash[2:]), event_id,
+        _epoch(valid_from), _epoch(valid_until), version,
+    ) + (seat or "").encode()[:_MAX_SEAT_BYTES]
+    return _b64encode(body + signing_key().sign(body))
+
+
+def payload_version(payload: Optional[str]) -> int:
+    """Version of a signed payload; 0 for legacy (unsigned) QR codes."""
+    try:
+        data = _b64decode(payload or "")
+        if len(data) >= _HEADER.size + _SIGNATURE_SIZE and data[0] == PAYLOAD_FORMAT:
+            return _HEADER.unpack_from(data)[5]
+    except ValueError:
+        pass
+    return 0
+
+
+def verify_payload(
+    payload: str,
+    public_key: Ed25519PublicKey,
+    now: Optional[datetime] = None,
+    revoked: Optional[Mapping[str, int]] = None,
+    event_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Validate a scanned QR payload without a database.
+
+    Args:
+        public_key: The platform's public key (load_public_key)
+        now: Current UTC time (default: system clock)
+        revoked: ticket_hash -> below_version, from the revocation deltas
+        event_id: Event the gate admits to (None = any)
+
+    Returns:
+        valid, reason (None, malformed, bad_signature, wrong_event,
+        not_yet_valid, expired or revoked) and the decoded fields
+    """
+    try:
+        data = _b64decode(payload)
+    except ValueError:
+        data = b""
+    if len(data) < _HEADER.size + _SIGNATURE_SIZE or data[0] != PAYLOAD_FORMAT:
+        return {"valid": False, "reason": "malformed"}
+
+    body, signature = data[:-_SIGNATURE_SIZE], data[-_SIGNATURE_SIZE:]
+    try:
+        public_key.verify(signature, body)
+    except InvalidSignature:
+        return {"valid": False, "reason": "bad_signature"}
+
+    _, raw_hash, payload_event, valid_from, valid_until, version = _HEADER.unpack_from(body)
+    ticket_hash = "0x" + raw_hash.hex()
+    result = {
+        "valid": False,
+        "reason": None,
+        "ticket_hash": ticket_hash,
+        "event_id": payload_event,
+        "seat": body[_HEADER.size:].decode(errors="replace") or None,
+        "valid_from": EPOCH + timedelta(seconds=valid_from),
+        "valid_until": EPOCH + timedelta(seconds=valid_until),
+        "version": version,
+    }
+
+    moment = _epoch(now or datetime.utcnow())
+    if event_id is not None and payload_event != event_id:
+        result["reason"] = "wrong_event"
+    elif moment < valid_from:
+        result["reason"] = "not_yet_valid"
+    elif moment > valid_until:
+        result["reason"] = "expired"
+    elif revoked and revoked.get(ticket_hash, 0) > version:
+        result["reason"] = "revoked"
+    else:
+        result["valid"] = True
+    return result
+
+
+# =============================================================================
+# REVOCATION
+# =============================================================================
+
+async def reissue_payload(db: AsyncSession, ticket: Ticket, reason: str = "Transferred") -> str:
+    """
+    Give a ticket a new QR payload (next version) and revoke the old ones,
+    e.g. after a transfer. Flushed with the caller's transaction.
+    """
+    event_date = (await db.execute(select(Event.date).where(Event.id == ticket.event_id))).scalar_one()
+    version = payload_version(ticket.qr_code) + 1
+    ticket.qr_code = sign_payload(
+        ticket.ticket_hash, ticket.event_id, ticket.seat_info,
+        datetime.utcnow(), qr_valid_until(event_date), version,
+    )
+    db.add(TicketRevocation(
+        ticket_hash=ticket.ticket_hash, event_id=ticket.event_id,
+        below_version=version, reason=reason,
+    ))
+    return ticket.qr_code
+
+
+async def revocations_since(
+    db: AsyncSession,
+    cursor: int = 0,
+    limit: int = 1000,
+    event_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Revocations after a cursor, oldest first, with the next cursor."""
+    query = select(TicketRevocation).where(TicketRevocation.id > cursor)
+    if event_id is not None:
+        query = query.where(TicketRevocation.event_id == event_id)
+    rows = (await db.execute(query.order_by(TicketRevocation.id).limit(limit + 1))).scalars().all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "data": [
+            {
+                "ticket_hash": row.ticket_hash,
+                "event_id": row.event_id,
+                "below_version": row.below_version,
+                "reason": row.reason,
+                "revoked_at": row.revoked_at,
+            }
+            for row in rows
+        ],
+        "cursor": rows[-1].id if rows else cursor,
+        "has_more": has_more,
+    }
+
+
+@event.listens_for(Session, "before_flush")
+def _revoke_on_status_change(session: Session, flush_context, instances) -> None:
+    """Revoke all QR versions of tickets that become cancelled or expired."""
+    for obj in session.dirty:
+        if not isinstance(obj, Ticket) or obj.status not in REVOKING_STATUSES:
+            continue
+        if get_history(obj, "status").has_changes():
+            session.add(TicketRevocation(
+                ticket_hash=obj.ticket_hash, event_id=obj.event_id,
+                below_version=ALL_VERSIONS, reason=obj.status,
+            ))
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _bench(count: int) -> None:
+    import secrets
+
+    start = datetime.utcnow()
+    hashes = ["0x" + secrets.token_hex(32) for _ in range(count)]
+
+    began = time.perf_counter()
+    payloads = [
+        sign_payload(ticket_hash, 1, f"N-{i % 40}-{i % 30}", start, start + timedelta(days=1))
+        for i, ticket_hash in enumerate(hashes)
+    ]
+    signed = time.perf_counter() - began
+
+    public_key = load_public_key(public_key_info()["public_key"])
+    revoked = {ticket_hash: ALL_VERSIONS for ticket_hash in hashes[::100]}
+    began = time.perf_counter()
+    valid = sum(verify_payload(payload, public_key, revoked=revoked)["valid"] for payload in payloads)
+    verified = time.perf_counter() - began
+
+    print(f"Payload size: {len(payloads[0])} characters")
+    print(f"Signing:      {count / signed:,.0f} payloads/s (one core)")
+    print(f"Verification: {count / verified:,.0f} payloads/s (one core), {valid} valid, {count - valid} revoked")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Signed ticket QR payloads")
+    parser.add_argument("command", choices=["bench"])
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+    _bench(args.count)
@@ -0,0 +1,398 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Ticketing
+# Oversell-proof inventory reservation and (batch) ticket minting
+# ============================================================================
+#
+# Capacity is never checked in Python. A mint reserves its tickets with one
+# conditional statement:
+#
+#     UPDATE events SET tickets_sold = tickets_sold + n
+#     WHERE id = :event AND tickets_sold + n <= capacity
+#     RETURNING ...
+#
+# which the database applies atomically per row, so concurrent sales can
+# never push tickets_sold past capacity. Tickets and loyalty points are
+# written first and the reservation follows, so the event row (hot during
+# its on-sale window) is locked only from there to the commit. The ticket
+# rollup rows are shared by every event and hotter still: their deltas are
+# the very last statement, after a successful reservation, so mints of all
+# events queue on them only for the commit itself. A failed reservation
+# rolls the whole mint back without touching them.
+#
+# On a seated event the seats are sold first (services.seating): a hold's
+# seats are assigned to the tickets in order, explicitly requested seats
+# must be free. A seat conflict aborts the mint before anything is written.
+#
+# Tickets are inserted with one Core executemany, which bypasses the ORM
+# flush listeners, so the rollup deltas are applied here (see above).
+# Loyalty points are credited with one upsert per owner.
+#
+# Redemption (scan at the gate) is one set-based conditional UPDATE ...
+# WHERE status = 'Valid' for a whole batch of scans. A ticket can only
+# leave Valid once, so of any concurrent scans exactly one gate wins; within
+# a batch the earliest scan wins and used_at is the scan time.
+# ============================================================================
+
+import hashlib
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import BusinessLogicException, NotFoundException, ValidationException
+from app.db.models import Event, LoyaltyPoints, Ticket
+from app.schemas.event import TicketMintRequest, TicketScan
+from app.services.gate_index import track_tickets
+from app.services.rollups import apply_deltas, row_deltas, update_deltas
+from app.services.seating import claim_seats, convert_hold, seat_inventory
+from app.services.ticket_qr import qr_valid_until, sign_payload
+
+
+# Tier reached at total points earned, highest first
+LOYALTY_TIERS = (("Platinum", 1000), ("Gold", 500), ("Silver", 100))
+
+
+# =============================================================================
+# TICKET DATA
+# =============================================================================
+
+def generate_ticket_hash() -> str:
+    """Generate blockchain-style ticket hash."""
+    data = f"{uuid.uuid4()}-{datetime.utcnow().isoformat()}"
+    return "0x" + hashlib.sha256(data.encode()).hexdigest()
+
+
+def ticket_row(
+    request: TicketMintRequest,
+    event_id: int,
+    owner_id: Optional[int],
+    now: datetime,
+    valid_until: datetime,
+) -> dict:
+    """Column values of a newly minted ticket, with its signed QR payload."""
+    ticket_hash = generate_ticket_hash()
+    seat_info = f"{request.seat_section or 'GA'}-{request.seat_row or '0'}-{request.seat_number or '0'}"
+    return {
+        "ticket_hash": ticket_hash,
+        "event_id": event_id,
+        "owner_id": request.owner_id or owner_id,
+        "owner_name": request.owner_name,
+        "seat_section": request.seat_section,
+        "seat_row": request.seat_row,
+        "seat_number": request.seat_number,
+        "seat_info": seat_info,
+        "category": request.category,
+        "price": request.price,
+        "minted_at": now,
+        "block_number": int(now.timestamp()),
+        "transaction_hash": "0x" + hashlib.sha256(ticket_hash.encode()).hexdigest()[:64],
+        "status": "Valid",
+        "qr_code": sign_payload(ticket_hash, event_id, seat_info, now, valid_until),
+    }
+
+
+# =============================================================================
+# LOYALTY
+# =============================================================================
+
+def loyalty_tier(total_earned: int, current: str = "Bronze") -> str:
+    """Tier for a points total; below the first threshold the current tier stays."""
+    for tier, threshold in LOYALTY_TIERS:
+        if total_earned >= threshold:
+            return tier
+    return current
+
+
+def _tier_expression(total):
+    table = LoyaltyPoints.__table__
+    return case(
+        *[(total >= threshold, tier) for tier, threshold in LOYALTY_TIERS],
+        else_=table.c.tier,
+    )
+
+
+def _loyalty_upsert(dialect_name: str):
+    table = LoyaltyPoints.__table__
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            "points_balance": table.c.points_balance + stmt.excluded.points_balance,
+            "total_earned": table.c.total_earned + stmt.excluded.total_earned,
+            "tickets_purchased": table.c.tickets_purchased + stmt.excluded.tickets_purchased,
+            "tier": _tier_expression(table.c.total_earned + stmt.excluded.total_earned),
+            "last_activity": stmt.excluded.last_activity,
+        },
+    )
+
+
+def credit_loyalty(connection: Connection, credits: Dict[int, Tuple[int, int]]) -> None:
+    """
+    Credit (points, tickets) per user in one statement, creating missing
+    loyalty accounts. Users are written in id order to avoid deadlocks.
+    """
+    if not credits:
+        return
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "points_balance": points,
+            "total_earned": points,
+            "total_spent": 0,
+            "tier": loyalty_tier(points),
+            "tickets_purchased": tickets,
+            "last_activity": now,
+            "created_at": now,
+        }
+        for user_id, (points, tickets) in sorted(credits.items())
+    ]
+
+    stmt = _loyalty_upsert(connection.dialect.name)
+    if stmt is not None:
+        connection.execute(stmt, rows)
+        return
+
+    table = LoyaltyPoints.__table__
+    for row in rows:
+        total = table.c.total_earned + row["total_earned"]
+        result = connection.execute(
+            update(table)
+            .where(table.c.user_id == row["user_id"])
+            .values(
+                points_balance=table.c.points_balance + row["points_balance"],
+                total_earned=total,
+                tickets_purchased=table.c.tickets_purchased + row["tickets_purchased"],
+                tier=_tier_expression(total),
+                last_activity=now,
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table), [row])
+
+
+# =============================================================================
+# MINTING
+# =============================================================================
+
+async def reserve_tickets(db: AsyncSession, event_id: int, quantity: int) -> int:
+    """
+    Atomically take `quantity` tickets from an event's inventory.
+
+    Returns:
+        Tickets still available after the reservation, or -1 when the
+        event does not have `quantity` tickets left
+    """
+    result = await db.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.tickets_sold + quantity <= Event.capacity)
+        .values(tickets_sold=Event.tickets_sold + quantity)
+        .returning(Event.capacity - Event.tickets_sold)
+        .execution_options(synchronize_session=False)
+    )
+    available = result.scalar_one_or_none()
+    return -1 if available is None else available
+
+
+def _unavailable(name: str, available: int) -> BusinessLogicException:
+    if available <= 0:
+        return BusinessLogicException(detail=f"Event '{name}' is sold out", error_code="EVENT_SOLD_OUT")
+    return BusinessLogicException(
+        detail=f"Only {available} tickets left for event '{name}'",
+        error_code="INSUFFICIENT_TICKETS",
+    )
+
+
+def _insert_tickets(connection: Connection, rows: List[dict]) -> List[dict]:
+    """Insert ticket rows with one executemany (rollup deltas not applied)."""
+    result = connection.execute(insert(Ticket).returning(*Ticket.__table__.columns), rows)
+    inserted = {row["ticket_hash"]: dict(row) for row in result.mappings()}
+    return [inserted[row["ticket_hash"]] for row in rows]
+
+
+async def _assign_seats(
+    db: AsyncSession,
+    event_id: int,
+    requests: Sequence[TicketMintRequest],
+    hold_id: Optional[str],
+    owner_id: Optional[int],
+) -> List[TicketMintRequest]:
+    """Sell the tickets' seats: a hold's seats in order, or the requested seats of a seated event."""
+    if hold_id:
+        seats = await convert_hold(db, event_id, hold_id, owner_id)
+        if len(seats) != len(requests):
+            await db.rollback()
+            raise ValidationException(f"Seat hold {hold_id} is for {len(seats)} tickets, not {len(requests)}")
+        return [
+            request.model_copy(update={"seat_section": section, "seat_row": row, "seat_number": str(seat)})
+            for request, (section, row, seat) in zip(requests, seats)
+        ]
+
+    seated = [request for request in requests if request.seat_number]
+    if not seated or not (await seat_inventory.seat_map(db, event_id)).seated:
+        return list(requests)  # Free-text seats
+    labels = []
+    for request in seated:
+        if not request.seat_number.isdigit():
+            raise ValidationException(f"Invalid seat number: {request.seat_number}")
+        labels.append((request.seat_section or "", request.seat_row or "", int(request.seat_number)))
+    await claim_seats(db, event_id, labels)
+    return list(requests)
+
+
+async def mint_tickets(
+    db: AsyncSession,
+    event_id: int,
+    requests: Sequence[TicketMintRequest],
+    owner_id: Optional[int] = None,
+    hold_id: Optional[str] = None,
+) -> Tuple[List[dict], int]:
+    """
+    Mint tickets for an event in one transaction (committed by the caller).
+
+    Args:
+        owner_id: Owner of tickets whose request names none (the buyer)
+        hold_id: Seat hold whose seats the tickets get (one per ticket)
+
+    Returns:
+        (ticket rows in request order, tickets still available)
+
+    Raises:
+        NotFoundException: If the event does not exist
+        BusinessLogicException: If fewer than len(requests) tickets are left,
+            or a seat is not available
+    """
+    result = await db.execute(
+        select(Event.name, Event.date, Event.capacity - Event.tickets_sold).where(Event.id == event_id)
+    )
+    event = result.first()
+    if event is None:
+        raise NotFoundException(resource="Event", resource_id=event_id)
+
+    name, event_date, available = event
+    quantity = len(requests)
+    if quantity > available:
+        raise _unavailable(name, available)  # Fail fast; the reservation decides
+
+    requests = await _assign_seats(db, event_id, requests, hold_id, owner_id)
+
+    now = datetime.utcnow()
+    valid_until = qr_valid_until(event_date)
+    rows = [ticket_row(request, event_id, owner_id, now, valid_until) for request in requests]
+
+    credits: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+    for request in requests:
+        if request.owner_id:
+            # 1 point per euro spent
+            credits[request.owner_id][0] += int(request.price)
+            credits[request.owner_id][1] += 1
+
+    connection = await db.connection()
+    tickets = await connection.run_sync(_insert_tickets, rows)
+    await connection.run_sync(credit_loyalty, {user: tuple(credit) for user, credit in credits.items()})
+
+    available = await reserve_tickets(db, event_id, quantity)
+    if available < 0:
+        await db.rollback()
+        result = await db.execute(select(Event.capacity - Event.tickets_sold).where(Event.id == event_id))
+        raise _unavailable(name, result.scalar() or 0)
+
+    # Last statement: the shared rollup rows stay locked until the commit
+    await connection.run_sync(apply_deltas, row_deltas(Ticket, rows))
+
+    track_tickets(db.sync_session, tickets)
+    return tickets, available
+
+
+# =============================================================================
+# REDEMPTION
+# =============================================================================
+
+SCAN_OUTCOMES = ("ok", "already_used", "invalid", "unknown")
+
+_REDEEM_COLUMNS = ("ticket_hash", "event_id", "category", "price", "status", "seat_info", "owner_name", "used_at")
+
+
+def _redeem(connection: Connection, scanned_at: Dict[str, datetime], event_id: Optional[int]) -> List[dict]:
+    """Mark the Valid tickets among the hashes Used, at their scan time."""
+    table = Ticket.__table__
+    stmt = (
+        update(table)
+        .where(table.c.ticket_hash.in_(list(scanned_at)), table.c.status == "Valid")
+        .values(status="Used", used_at=case(scanned_at, value=table.c.ticket_hash))
+        .returning(*[table.c[name] for name in _REDEEM_COLUMNS])
+    )
+    if event_id is not None:
+        stmt = stmt.where(table.c.event_id == event_id)
+
+    rows = [dict(row) for row in connection.execute(stmt).mappings()]
+    apply_deltas(connection, update_deltas(Ticket, [{**row, "status": "Valid"} for row in rows], {"status": "Used"}))
+    return rows
+
+
+async def redeem_tickets(
+    db: AsyncSession,
+    scans: Sequence[TicketScan],
+    event_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    Redeem scanned tickets with one conditional UPDATE (committed by the
+    caller).
+
+    Args:
+        event_id: Treat tickets of other events as unknown
+
+    Returns:
+        Per scan, in order: ticket_hash, gate_id, scanned_at, outcome
+        (one of SCAN_OUTCOMES), status and used_at
+    """
+    # Earliest scan per ticket; ties go to the first in the batch
+    winners: Dict[str, int] = {}
+    for position, scan in sorted(enumerate(scans), key=lambda item: item[1].scanned_at):
+        winners.setdefault(scan.ticket_hash, position)
+
+    connection = await db.connection()
+    redeemed = {
+        row["ticket_hash"]: row
+        for row in await connection.run_sync(
+            _redeem, {ticket_hash: scans[position].scanned_at for ticket_hash, position in winners.items()}, event_id,
+        )
+    }
+    track_tickets(db.sync_session, redeemed.values())
+
+    current = {}
+    rest = set(winners) - set(redeemed)
+    if rest:
+        result = await db.execute(
+            select(Ticket.ticket_hash, Ticket.event_id, Ticket.status, Ticket.used_at)
+            .where(Ticket.ticket_hash.in_(rest))
+        )
+        current = {row.ticket_hash: row._mapping for row in result}
+
+    outcomes = []
+    for position, scan in enumerate(scans):
+        outcome = {"ticket_hash": scan.ticket_hash, "gate_id": scan.gate_id, "scanned_at": scan.scanned_at}
+        ticket = redeemed.get(scan.ticket_hash) or current.get(scan.ticket_hash)
+        if ticket is None or (event_id is not None and ticket["event_id"] != event_id):
+            outcome.update(outcome="unknown", status=None, used_at=None)
+        elif scan.ticket_hash in redeemed:
+            won = winners[scan.ticket_hash] == position
+            outcome.update(outcome="ok" if won else "already_used", status="Used", used_at=ticket["used_at"])
+        elif ticket["status"] == "Used":
+            outcome.update(outcome="already_used", status="Used", used_at=ticket["used_at"])
+        else:
+            outcome.update(outcome="invalid", status=ticket["status"], used_at=ticket["used_at"])
+        outcomes.append(outcome)
+    return outcomes
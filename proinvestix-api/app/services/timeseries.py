@@ -0,0 +1,234 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Time Series Service
+# Bucketed GROUP BY aggregation for charts and growth statistics
+# ============================================================================
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, cast, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import ValidationException
+
+
+GRANULARITIES = ("day", "week", "month")
+
+LABEL_FORMATS = {
+    "day": "%d %b %Y",
+    "week": "%d %b %Y",
+    "month": "%b %Y",
+}
+
+
+# =============================================================================
+# SERIES DEFINITION
+# =============================================================================
+
+class TimeSeries:
+    """
+    One series of a time-bucketed aggregation.
+
+    Args:
+        timestamp: Datetime column that decides the bucket of a row
+        value: Column to sum, or None to count rows
+        filters: Extra WHERE clauses for this series
+    """
+
+    def __init__(self, timestamp, value=None, filters: Sequence[Any] = ()):
+        self.timestamp = timestamp
+        self.value = value
+        self.filters = tuple(filters)
+
+    def aggregate(self):
+        if self.value is None:
+            return func.count()
+        return func.coalesce(func.sum(self.value), 0)
+
+
+# =============================================================================
+# BUCKET ARITHMETIC
+# =============================================================================
+
+def truncate(day: date, granularity: str) -> date:
+    """Return the first day of the bucket containing `day`."""
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def shift(day: date, granularity: str, steps: int = 1) -> date:
+    """Move a bucket start `steps` buckets forward (or backward)."""
+    if granularity == "day":
+        return day + timedelta(days=steps)
+    if granularity == "week":
+        return day + timedelta(weeks=steps)
+    months = day.year * 12 + (day.month - 1) + steps
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def bucket_range(start: date, end: date, granularity: str) -> List[date]:
+    """List every bucket start from `start` up to and including `end`."""
+    buckets = []
+    current = truncate(start, granularity)
+    while current <= end:
+        buckets.append(current)
+        current = shift(current, granularity)
+    return buckets
+
+
+def bucket_count(first: date, last: date, granularity: str) -> int:
+    """Number of buckets between two bucket starts (inclusive)."""
+    if granularity == "day":
+        return (last - first).days + 1
+    if granularity == "week":
+        return (last - first).days // 7 + 1
+    return (last.year - first.year) * 12 + (last.month - first.month) + 1
+
+
+def resolve_range(
+    granularity: str = "month",
+    periods: int = 6,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Tuple[date, date]:
+    """
+    Resolve chart query parameters to the first and last bucket start.
+
+    Without explicit dates the range ends at the current bucket and spans
+    `periods` buckets.
+
+    Raises:
+        ValidationException: On an unknown granularity, an inverted range
+            or a range with more buckets than TIMESERIES_MAX_BUCKETS
+    """
+    if granularity not in GRANULARITIES:
+        raise ValidationException(
+            f"Invalid granularity '{granularity}', expected one of: {', '.join(GRANULARITIES)}"
+        )
+
+    max_buckets = settings.TIMESERIES_MAX_BUCKETS
+    if not start and periods > max_buckets:
+        raise ValidationException(f"Range spans {periods} buckets, maximum is {max_buckets}")
+
+    last = truncate(end or datetime.utcnow().date(), granularity)
+    first = truncate(start, granularity) if start else shift(last, granularity, 1 - periods)
+
+    if first > last:
+        raise ValidationException("Start date must be before end date")
+
+    buckets = bucket_count(first, last, granularity)
+    if buckets > max_buckets:
+        raise ValidationException(f"Range spans {buckets} buckets, maximum is {max_buckets}")
+    return first, last
+
+
+def bucket_label(bucket: date, granularity: str) -> str:
+    return bucket.strftime(LABEL_FORMATS[granularity])
+
+
+# =============================================================================
+# STATEMENT BUILDING
+# =============================================================================
+
+def bucket_expression(column, granularity: str, dialect: str):
+    """
+    Dialect-aware SQL expression truncating a datetime column to its bucket.
+
+    SQLite uses strftime/date modifiers (weeks start on Monday, like
+    date_trunc), other databases use date_trunc.
+    """
+    if dialect == "sqlite":
+        if granularity == "day":
+            return func.date(column)
+        if granularity == "week":
+            return func.date(column, "weekday 0", "-6 days")
+        return func.strftime("%Y-%m-01", column)
+    return cast(func.date_trunc(granularity, column), Date)
+
+
+def build_series_statement(
+    series: Mapping[str, TimeSeries],
+    granularity: str,
+    first: date,
+    last: date,
+    dialect: str,
+):
+    """
+    Build one statement returning (series, bucket, value) rows for all series.
+
+    Every series becomes a GROUP BY over its bucket expression; multiple
+    series are combined with UNION ALL so the chart costs a single query.
+    """
+    lower = datetime.combine(first, datetime.min.time())
+    upper = datetime.combine(shift(last, granularity), datetime.min.time())
+
+    selects = []
+    for name, spec in series.items():
+        bucket = bucket_expression(spec.timestamp, granularity, dialect)
+        selects.append(
+            select(
+                literal(name).label("series"),
+                bucket.label("bucket"),
+                spec.aggregate().label("value"),
+            )
+            .where(spec.timestamp >= lower, spec.timestamp < upper, *spec.filters)
+            .group_by(bucket)
+        )
+    return selects[0] if len(selects) == 1 else union_all(*selects)
+
+
+def _to_date(raw: Any) -> date:
+    if isinstance(raw, datetime):
+        return raw.date()
+    if isinstance(raw, date):
+        return raw
+    return date.fromisoformat(str(raw)[:10])
+
+
+# =============================================================================
+# EXECUTION
+# =============================================================================
+
+async def run_time_series(
+    db: AsyncSession,
+    series: Mapping[str, TimeSeries],
+    granularity: str,
+    first: date,
+    last: date,
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate one or more series per time bucket in a single query.
+
+    Buckets without rows are filled with 0, so the result always holds one
+    point per bucket between `first` and `last`.
+
+    Args:
+        db: Database session
+        series: Mapping of series name to its definition
+        granularity: day, week or month
+        first: First bucket start (see resolve_range)
+        last: Last bucket start
+
+    Returns:
+        List of {"period", "label", <series>: value} points in time order
+    """
+    buckets = bucket_range(first, last, granularity)
+    points = {
+        bucket: {"period": bucket.isoformat(), "label": bucket_label(bucket, granularity)}
+        for bucket in buckets
+    }
+    for point in points.values():
+        point.update({name: 0 for name in series})
+
+    stmt = build_series_statement(series, granularity, first, last, db.bind.dialect.name)
+    result = await db.execute(stmt)
+    for name, raw_bucket, value in result.all():
+        point = points.get(_to_date(raw_bucket))
+        if point is not None:
+            point[name] = value or 0
+
+    return [points[bucket] for bucket in buckets]
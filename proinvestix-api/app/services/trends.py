@@ -0,0 +1,236 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Talent Trends
+# Rising-stars index from evaluation score time series (NumPy)
+# ============================================================================
+#
+# Per talent, the evaluation scores over evaluation_date are fitted by least
+# squares: a line (slope in points per year, adjusted R^2 as confidence) for
+# the overall, technical, physical and mental scores, and a parabola for
+# the overall score (acceleration in points per year^2).
+#
+# All talents are fitted at once: the normal equations only need per-talent
+# sums of t^k and t^k * y, which np.bincount computes over the whole
+# evaluation table in one pass each. The quadratic systems are solved as
+# one batched 3x3 solve. Results replace the talent_trends table, which the
+# /talents/rising ranking reads.
+#
+# Usage:
+#     python -m app.services.trends recompute
+# ============================================================================
+
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import TalentEvaluation, TalentTrend
+
+
+# Series -> evaluation column
+SERIES = {
+    "overall": "overall_score",
+    "technical": "overall_technical",
+    "physical": "overall_physical",
+    "mental": "overall_mental",
+}
+CATEGORY_PATTERN = "^(overall|technical|physical|mental)$"
+
+# Trend column ranked per category
+SLOPE_COLUMNS = {
+    "overall": TalentTrend.slope,
+    "technical": TalentTrend.technical_slope,
+    "physical": TalentTrend.physical_slope,
+    "mental": TalentTrend.mental_slope,
+}
+
+DAYS_PER_YEAR = 365.25
+EPOCH = date(1970, 1, 1)
+
+
+# =============================================================================
+# FITTING
+# =============================================================================
+
+def linear_fits(groups: np.ndarray, t: np.ndarray, y: np.ndarray, size: int) -> Dict[str, np.ndarray]:
+    """
+    Least-squares line per group, ignoring NaN scores.
+
+    Args:
+        groups: (n,) group index per observation
+        t: (n,) time in years, centered per group
+        y: (n,) scores, NaN when missing
+        size: Number of groups
+
+    Returns:
+        count, mean_t, mean_y, slope (NaN below two distinct times) and
+        confidence (adjusted R^2 in 0..1, NaN below three points)
+    """
+    w = (~np.isnan(y)).astype(float)
+    y = np.where(w > 0, y, 0)
+    sums = lambda values: np.bincount(groups, weights=values, minlength=size)
+
+    n = sums(w)
+    st, sy = sums(w * t), sums(w * y)
+    stt, sty, syy = sums(w * t * t), sums(w * t * y), sums(w * y * y)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_t, mean_y = st / n, sy / n
+        sxx = stt - st * mean_t
+        sxy = sty - st * mean_y
+        syy = syy - sy * mean_y
+
+        fitted = (n >= 2) & (sxx > 1e-9)
+        slope = np.where(fitted, sxy / sxx, np.nan)
+
+        # A flat series is fitted perfectly
+        r2 = np.where(syy > 1e-9, sxy * sxy / (sxx * syy), 1.0)
+        adjusted = 1 - (1 - r2) * (n - 1) / (n - 2)
+        confidence = np.where(fitted & (n >= 3), np.clip(adjusted, 0, 1), np.nan)
+
+    return {"count": n, "mean_t": mean_t, "mean_y": mean_y, "slope": slope, "confidence": confidence}
+
+
+def quadratic_acceleration(groups: np.ndarray, t: np.ndarray, y: np.ndarray, size: int) -> np.ndarray:
+    """Second derivative (points per year^2) of a least-squares parabola per group."""
+    w = (~np.isnan(y)).astype(float)
+    y = np.where(w > 0, y, 0)
+    sums = lambda values: np.bincount(groups, weights=values, minlength=size)
+
+    s = [sums(w * t ** k) for k in range(5)]
+    b = np.stack([sums(w * t ** k * y) for k in range(3)], axis=1)
+    a = np.stack([np.stack(s[row:row + 3], axis=1) for row in range(3)], axis=1)
+
+    acceleration = np.full(size, np.nan)
+    # Needs three distinct times; the normalized determinant is scale-free
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spread = np.linalg.det(a) / (s[0] * s[2] * s[4])
+    solvable = (s[0] >= 3) & (spread > 1e-6)
+    if solvable.any():
+        coefficients = np.linalg.solve(a[solvable], b[solvable][..., None])[..., 0]
+        acceleration[solvable] = 2 * coefficients[:, 2]
+    return acceleration
+
+
+def fit_trends(talent_ids: np.ndarray, days: np.ndarray, scores: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Fit all talents' score trajectories at once.
+
+    Args:
+        talent_ids: (n,) talent id per evaluation
+        days: (n,) evaluation date as days since 1970-01-01
+        scores: Series name -> (n,) scores, NaN when missing
+
+    Returns:
+        Per talent arrays keyed like the talent_trends columns
+    """
+    ids, groups = np.unique(talent_ids, return_inverse=True)
+    size = len(ids)
+    counts = np.bincount(groups, minlength=size)
+
+    first = np.full(size, np.iinfo(np.int64).max)
+    last = np.full(size, np.iinfo(np.int64).min)
+    np.minimum.at(first, groups, days)
+    np.maximum.at(last, groups, days)
+
+    # Center time per talent for numerically stable moments
+    years = days / DAYS_PER_YEAR
+    center = np.bincount(groups, weights=years, minlength=size) / counts
+    t = years - center[groups]
+
+    overall = linear_fits(groups, t, scores["overall"], size)
+    latest = last / DAYS_PER_YEAR - center
+    current = overall["mean_y"] + np.nan_to_num(overall["slope"]) * (latest - overall["mean_t"])
+
+    trends = {
+        "talent_id": ids,
+        "evaluations": counts,
+        "first_evaluation": first,
+        "last_evaluation": last,
+        "slope": overall["slope"],
+        "acceleration": quadratic_acceleration(groups, t, scores["overall"], size),
+        "confidence": overall["confidence"],
+        "current_score": current,
+    }
+    for name in ("technical", "physical", "mental"):
+        trends[f"{name}_slope"] = linear_fits(groups, t, scores[name], size)["slope"]
+    return trends
+
+
+# =============================================================================
+# BATCH
+# =============================================================================
+
+def _value(value):
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else round(float(value), 4)
+    return int(value)
+
+
+def _trend_rows(trends: Dict[str, np.ndarray], now: datetime) -> List[dict]:
+    columns = list(trends)
+    rows = []
+    for values in zip(*(trends[name] for name in columns)):
+        row = dict(zip(columns, map(_value, values)))
+        row["first_evaluation"] = EPOCH + timedelta(days=row["first_evaluation"])
+        row["last_evaluation"] = EPOCH + timedelta(days=row["last_evaluation"])
+        row["computed_at"] = now
+        rows.append(row)
+    return rows
+
+
+async def recompute_trends(db: AsyncSession) -> int:
+    """
+    Fit every evaluated talent's score trajectory and replace talent_trends.
+
+    Returns:
+        Number of talents with a trend row
+    """
+    columns = [getattr(TalentEvaluation, column) for column in SERIES.values()]
+    result = await db.execute(
+        select(TalentEvaluation.talent_id, TalentEvaluation.evaluation_date, *columns)
+    )
+    rows = result.all()
+
+    await db.execute(delete(TalentTrend))
+    if rows:
+        talent_ids, dates, *series = zip(*rows)
+        days = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+        scores = {
+            name: np.array(values, dtype=float)
+            for name, values in zip(SERIES, series)
+        }
+        trend_rows = _trend_rows(
+            fit_trends(np.array(talent_ids, dtype=np.int64), days, scores),
+            datetime.utcnow(),
+        )
+        for start in range(0, len(trend_rows), 5000):
+            await db.execute(insert(TalentTrend), trend_rows[start:start + 5000])
+    else:
+        trend_rows = []
+    await db.commit()
+
+    return len(trend_rows)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+async def _main() -> None:
+    from app.db.database import AsyncSessionLocal, init_db
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        written = await recompute_trends(db)
+        print(f"Fitted score trends for {written} talents")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain talent score trends")
+    parser.add_argument("command", choices=["recompute"])
+    parser.parse_args()
+    asyncio.run(_main())
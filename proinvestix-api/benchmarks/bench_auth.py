@@ -0,0 +1,52 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Auth Overhead Benchmark
+# Per-request cost of token verification with the token cache on and off
+#
+# Usage (from proinvestix-api/):
+#     python -m benchmarks.bench_auth [--requests 20000] [--tokens 50]
+# ============================================================================
+
+import argparse
+import time
+
+from app.core.security import create_access_token, token_cache, verify_token
+
+
+def run(tokens: list, requests: int, cached: bool) -> float:
+    """Verify `requests` tokens round-robin and return microseconds per call."""
+    maxsize = token_cache.maxsize
+    token_cache.clear()
+    if not cached:
+        token_cache.maxsize = 0
+
+    try:
+        start = time.perf_counter()
+        for i in range(requests):
+            assert verify_token(tokens[i % len(tokens)]) is not None
+        elapsed = time.perf_counter() - start
+    finally:
+        token_cache.maxsize = maxsize
+        token_cache.clear()
+
+    return elapsed / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JWT verification overhead")
+    parser.add_argument("--requests", type=int, default=20000, help="Verifications per run")
+    parser.add_argument("--tokens", type=int, default=50, help="Distinct active tokens (clients)")
+    args = parser.parse_args()
+
+    tokens = [create_access_token(subject=i, role="User") for i in range(args.tokens)]
+
+    uncached = run(tokens, args.requests, cached=False)
+    cached = run(tokens, args.requests, cached=True)
+
+    print(f"{args.requests} verifications over {args.tokens} tokens")
+    print(f"  cache off: {uncached:8.2f} us/request")
+    print(f"  cache on:  {cached:8.2f} us/request")
+    print(f"  speedup:   {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
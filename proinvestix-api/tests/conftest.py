@@ -15,6 +15,13 @@ from app.main import app
 from app.db.database import get_db, Base
 from app.db.models import User
 from app.core.security import get_password_hash, create_access_token
+from app.core.user_cache import user_cache
+from app.services.counting import count_cache
+from app.services.gate_index import gate_index
+from app.services.resale import resale_market
+from app.services.seating import seat_inventory
+from app.services.similarity import similarity_index
+from app.services.talent_facets import facet_cache, facet_values
 
 
 # =============================================================================
@@ -53,6 +60,16 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    
+    # Ids and filter sets are reused by the next test database
+    user_cache.clear()
+    count_cache.clear()
+    facet_cache.clear()
+    facet_values.reset()
+    similarity_index.clear()
+    gate_index.clear()
+    seat_inventory.clear()
+    resale_market.clear()
 
 
 async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
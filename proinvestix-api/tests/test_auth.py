@@ -2,11 +2,28 @@
 # ProInvestiX Enterprise API - Auth Tests
 # ============================================================================
 
+import asyncio
+import threading
+from datetime import timedelta
+
 import pytest
 from httpx import AsyncClient
+from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import User
+from app.core import security
+from app.core.cache import TTLCache
+from app.core.exceptions import ServiceBusyException
+from app.core.security import (
+    PasswordHashPool,
+    create_access_token,
+    token_cache,
+    verify_and_rehash_password,
+    verify_password_async,
+    verify_token,
+)
+from app.core.user_cache import user_cache, load_user, invalidate_user
 
 
 class TestAuthRegister:
@@ -195,3 +212,110 @@ class TestAuthChangePassword:
             }
         )
         assert response.status_code == 400
+
+
+class TestUserCache:
+    """Test the authenticated user cache."""
+    
+    @pytest.mark.asyncio
+    async def test_cached_user_is_usable_and_invalidated(self, db_session: AsyncSession, test_user: User):
+        """Test that cache hits skip the lookup and writes invalidate them."""
+        user_cache.clear()
+        
+        user = await load_user(db_session, test_user.id)
+        assert user.id == test_user.id
+        hits = user_cache.hits
+        
+        db_session.expunge_all()
+        cached = await load_user(db_session, test_user.id)
+        assert user_cache.hits == hits + 1
+        assert cached.username == test_user.username
+        
+        # A cached user can be modified and committed like a loaded one
+        cached.first_name = "Cached"
+        await db_session.commit()
+        await invalidate_user(cached.id)
+        assert test_user.id not in user_cache
+        
+        db_session.expunge_all()
+        reloaded = await load_user(db_session, test_user.id)
+        assert reloaded.first_name == "Cached"
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set(1, "a")
+        cache.set(2, "b")
+        cache.get(1)
+        cache.set(3, "c")
+        
+        assert 1 in cache and 3 in cache
+        assert 2 not in cache
+        assert cache.stats()["evictions"] == 1
+
+
+class TestTokenCache:
+    """Test the verified token cache."""
+    
+    def test_cached_token_honors_exp(self, monkeypatch):
+        """Test that a cached payload is rejected once exp has passed."""
+        token_cache.clear()
+        token = create_access_token(subject=1, role="User", expires_delta=timedelta(minutes=5))
+        
+        payload = verify_token(token)
+        assert payload is not None
+        hits = token_cache.hits
+        assert verify_token(token) == payload
+        assert token_cache.hits == hits + 1
+        
+        expires_at = payload.exp.timestamp()
+        monkeypatch.setattr(security.time, "time", lambda: expires_at)
+        assert verify_token(token) is not None
+        monkeypatch.setattr(security.time, "time", lambda: expires_at + 1)
+        assert verify_token(token) is None
+    
+    def test_wrong_type_and_tampered_tokens(self):
+        """Test that the cache does not bypass type or signature checks."""
+        token_cache.clear()
+        token = create_access_token(subject=1)
+        assert verify_token(token) is not None
+        
+        assert verify_token(token, token_type="refresh") is None
+        assert verify_token(token[:-2] + ("AA" if token[-2:] != "AA" else "BB")) is None
+
+
+class TestPasswordHashPool:
+    """Test off-loop password hashing."""
+    
+    @pytest.mark.asyncio
+    async def test_rehash_on_cost_change(self):
+        """Test that hashes with another cost factor are flagged for rehash."""
+        old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret123")
+        
+        valid, new_hash = await verify_and_rehash_password("secret123", old_hash)
+        assert valid is True
+        assert new_hash is not None
+        assert await verify_password_async("secret123", new_hash)
+        
+        assert await verify_and_rehash_password("secret123", new_hash) == (True, None)
+        assert (await verify_and_rehash_password("wrong", old_hash))[0] is False
+    
+    @pytest.mark.asyncio
+    async def test_queue_limit_rejects(self):
+        """Test that a full queue fails fast instead of piling up."""
+        pool = PasswordHashPool(workers=1, max_queue=1)
+        release = threading.Event()
+        
+        running = asyncio.ensure_future(pool.run(release.wait))
+        queued = asyncio.ensure_future(pool.run(lambda: True))
+        await asyncio.sleep(0.05)
+        
+        assert pool.stats()["queued"] == 1
+        with pytest.raises(ServiceBusyException):
+            await pool.run(lambda: True)
+        
+        release.set()
+        assert await running is True
+        assert await queued is True
+        assert pool.stats()["rejected"] == 1
+        pool.shutdown()
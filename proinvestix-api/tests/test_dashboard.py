@@ -2,8 +2,19 @@
 # ProInvestiX Enterprise API - Dashboard Tests
 # ============================================================================
 
+from datetime import date, datetime
+from types import SimpleNamespace
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints.dashboard import get_chart_data
+from app.core.exceptions import ValidationException
+from app.db.models import User, Transfer, FoundationDonation
+from app.services.aggregation import ConnectionBudget, aggregate_connections, run_aggregates
+from app.services.timeseries import TimeSeries, resolve_range, run_time_series
 
 
 class TestDashboardStats:
@@ -26,6 +37,110 @@ class TestDashboardStats:
         assert response.status_code == 401
 
 
+class TestDashboardAggregation:
+    """Test combined aggregate queries."""
+    
+    @pytest.mark.asyncio
+    async def test_run_aggregates_single_statement(self, db_session: AsyncSession, test_user: User):
+        """Test that grouped counters are returned per group."""
+        groups = {
+            "users": {"total": select(func.count(User.id))},
+            "transfers": {
+                "total": select(func.count(Transfer.id)),
+                "volume": select(func.sum(Transfer.transfer_fee)),
+            },
+        }
+        result = await run_aggregates(db_session, groups, concurrent=False)
+        assert result["users"]["total"] == 1
+        assert result["transfers"]["total"] == 0
+        assert result["transfers"]["volume"] is None
+    
+    def test_connection_budget_never_overcommits(self):
+        """Test that the budget only grants free connections."""
+        budget = ConnectionBudget(4)
+        assert budget.take(9) == 4
+        assert budget.take(2) == 0
+        budget.give(4)
+        assert budget.take(3) == 3
+        assert budget.take(3) == 1
+    
+    @pytest.mark.asyncio
+    async def test_run_aggregates_falls_back_without_free_connections(
+        self, db_session: AsyncSession, test_user: User, monkeypatch
+    ):
+        """Test that an exhausted budget runs the groups on the request session."""
+        monkeypatch.setattr(aggregate_connections, "in_use", aggregate_connections.limit - 1)
+        groups = {
+            "users": {"total": select(func.count(User.id))},
+            "transfers": {"total": select(func.count(Transfer.id))},
+        }
+        result = await run_aggregates(db_session, groups, concurrent=True)
+        assert result == {"users": {"total": 1}, "transfers": {"total": 0}}
+        assert aggregate_connections.in_use == aggregate_connections.limit - 1
+
+
+class TestDashboardTimeSeries:
+    """Test bucketed time series aggregation."""
+    
+    def test_resolve_range_uses_calendar_months(self):
+        """Test that month ranges step by calendar month, not 30 days."""
+        first, last = resolve_range("month", 6, end=date(2024, 3, 31))
+        assert first == date(2023, 10, 1)
+        assert last == date(2024, 3, 1)
+    
+    @pytest.mark.asyncio
+    async def test_monthly_series_fills_empty_buckets(self, db_session: AsyncSession):
+        """Test monthly sums over two tables with zero-filled gaps."""
+        db_session.add_all([
+            Transfer(
+                transfer_id=f"TRF-TS{i}", player_name="Player", from_club="A", to_club="B",
+                transfer_type="Permanent", transfer_date=date(2024, 1, 1),
+                transfer_fee=fee, created_at=created_at,
+            )
+            for i, (fee, created_at) in enumerate([
+                (100, datetime(2024, 1, 31, 23, 0)),
+                (50, datetime(2024, 1, 2)),
+                (25, datetime(2024, 3, 1)),
+            ])
+        ])
+        db_session.add(FoundationDonation(
+            donation_id="DON-TS1", amount=10, created_at=datetime(2024, 2, 14),
+        ))
+        await db_session.commit()
+        
+        first, last = resolve_range("month", start=date(2023, 12, 5), end=date(2024, 3, 5))
+        data = await run_time_series(db_session, {
+            "transfers": TimeSeries(Transfer.created_at, Transfer.transfer_fee),
+            "donations": TimeSeries(FoundationDonation.created_at, FoundationDonation.amount),
+        }, "month", first, last)
+        
+        assert [point["period"] for point in data] == [
+            "2023-12-01", "2024-01-01", "2024-02-01", "2024-03-01",
+        ]
+        assert [point["transfers"] for point in data] == [0, 150, 0, 25]
+        assert [point["donations"] for point in data] == [0, 0, 10, 0]
+        assert data[1]["label"] == "Jan 2024"
+    
+    @pytest.mark.asyncio
+    async def test_weekly_count_series(self, db_session: AsyncSession):
+        """Test week buckets start on Monday."""
+        db_session.add_all([
+            FoundationDonation(donation_id="DON-W1", amount=1, created_at=datetime(2024, 5, 5, 12)),
+            FoundationDonation(donation_id="DON-W2", amount=1, created_at=datetime(2024, 5, 6, 8)),
+        ])
+        await db_session.commit()
+        
+        first, last = resolve_range("week", start=date(2024, 4, 29), end=date(2024, 5, 12))
+        data = await run_time_series(db_session, {
+            "count": TimeSeries(FoundationDonation.created_at),
+        }, "week", first, last)
+        
+        assert data == [
+            {"period": "2024-04-29", "label": "29 Apr 2024", "count": 1},
+            {"period": "2024-05-06", "label": "06 May 2024", "count": 1},
+        ]
+
+
 class TestDashboardKPIs:
     """Test dashboard KPIs."""
     
@@ -71,6 +186,16 @@ class TestDashboardCharts:
         """Test getting invalid chart type."""
         response = await client.get("/api/v1/dashboard/charts/invalid", headers=user_headers)
         assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_granularity_only_checked_for_time_series(self, db_session: AsyncSession):
+        """Test that charts without a time axis ignore the range parameters."""
+        params = dict(granularity="hour", periods=6, start=None, end=None)
+        user = SimpleNamespace(id=1)
+        chart = await get_chart_data("talents", db=db_session, current_user=user, **params)
+        assert chart["type"] == "talents_by_position"
+        with pytest.raises(ValidationException):
+            await get_chart_data("transfers", db=db_session, current_user=user, **params)
 
 
 class TestDashboardActivity:
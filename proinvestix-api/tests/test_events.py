@@ -2,8 +2,45 @@
 # ProInvestiX Enterprise API - Event & Ticket Tests
 # ============================================================================
 
+from datetime import datetime
+from types import SimpleNamespace
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import MetaData, Table, event as sa_event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.endpoints.events import (
+    cancel_resale_order, close_event_gate, get_event_seat_map, get_event_section_seats, get_resale_book,
+    hold_event_seats, mint_ticket, mint_tickets_batch, open_event_gate, place_resale_bid,
+    release_event_seats, set_event_seat_map, verify_gate_scan,
+)
+from app.api.v1.endpoints.tickets import (
+    get_qr_signing_key, get_ticket_revocations, resell_ticket, transfer_ticket, use_ticket,
+    use_tickets_batch,
+)
+from app.core.exceptions import BusinessLogicException, NotFoundException
+from app.db.database import Base
+from app.db.models import Event, EventSeatRow, LoyaltyPoints, ResaleOrderLog, SeatHold, Ticket, TicketRevocation
+from app.schemas.event import (
+    ResaleAskRequest, ResaleBidRequest, SeatHoldRequest, SeatLayoutRequest, TicketBatchMintRequest,
+    TicketMintRequest, TicketScanBatchRequest, TicketTransferRequest,
+)
+from app.services.gate_index import GATE_CLOSED, BloomFilter, gate_index
+from app.services.resale import resale_market
+from app.services.rollups import check_rollups
+from app.services.seating import SeatMap, SeatRow, block_starts, seat_inventory
+from app.services.ticket_qr import load_public_key, verify_payload
+from app.services.ticketing import generate_ticket_hash
+
+
+# Columns of the events table before gate mode, seat maps and resale
+BASELINE_EVENT_COLUMNS = {
+    "id", "event_id", "name", "event_type", "venue", "city", "country", "date", "doors_open",
+    "capacity", "tickets_sold", "tickets_available", "price_min", "price_max",
+    "mobility_enabled", "diaspora_package", "status", "created_at",
+}
 
 
 class TestEventList:
@@ -100,6 +137,514 @@ class TestTicketMint:
         assert response.status_code == 404
 
 
+class TestTicketMintInventory:
+    """Test atomic inventory reservation and batch minting."""
+    
+    @pytest.mark.asyncio
+    async def test_batch_mint_never_oversells(self, db_session: AsyncSession):
+        """Test all-or-nothing batches, sold-out errors and loyalty credits."""
+        event = Event(
+            event_id="EVT-MINT0001", name="WK 2030 Final", venue="Grand Stade",
+            date=datetime(2030, 7, 21), capacity=5, tickets_sold=0,
+        )
+        db_session.add(event)
+        await db_session.commit()
+        buyer = SimpleNamespace(id=7)
+        
+        batch = TicketBatchMintRequest(tickets=[
+            TicketMintRequest(owner_name=f"Fan {i}", owner_id=42, price=60) for i in range(3)
+        ])
+        response = await mint_tickets_batch(event.id, batch, db=db_session, current_user=buyer)
+        assert [t.owner_name for t in response.data] == ["Fan 0", "Fan 1", "Fan 2"]
+        assert response.meta == {"minted": 3, "tickets_available": 2}
+        
+        loyalty = (await db_session.execute(
+            select(LoyaltyPoints).where(LoyaltyPoints.user_id == 42)
+        )).scalar_one()
+        assert (loyalty.total_earned, loyalty.tickets_purchased, loyalty.tier) == (180, 3, "Silver")
+        
+        with pytest.raises(BusinessLogicException) as exc:
+            await mint_tickets_batch(event.id, batch, db=db_session, current_user=buyer)
+        assert exc.value.error_code == "INSUFFICIENT_TICKETS"
+        
+        ticket = await mint_ticket(event.id, TicketMintRequest(owner_name="Solo", price=10), db=db_session, current_user=buyer)
+        assert ticket.owner_id == 7
+        await mint_ticket(event.id, TicketMintRequest(owner_name="Last", price=10), db=db_session, current_user=buyer)
+        
+        with pytest.raises(BusinessLogicException) as exc:
+            await mint_ticket(event.id, TicketMintRequest(owner_name="Late", price=10), db=db_session, current_user=buyer)
+        assert exc.value.error_code == "EVENT_SOLD_OUT"
+        
+        sold = (await db_session.execute(select(Event.tickets_sold).where(Event.id == event.id))).scalar_one()
+        minted = (await db_session.execute(select(func.count(Ticket.id)))).scalar_one()
+        assert sold == minted == 5
+        assert await check_rollups(db_session, ["ticketchain"]) == []
+    
+    @pytest.mark.asyncio
+    async def test_rollups_written_last(self, db_session: AsyncSession):
+        """Test that the shared ticket rollup rows are the mint's last write."""
+        event = Event(
+            event_id="EVT-MINT0002", name="Friendly", venue="Grand Stade",
+            date=datetime(2030, 7, 1), capacity=5, tickets_sold=0,
+        )
+        db_session.add(event)
+        await db_session.commit()
+        
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split()[0:3])
+        engine = db_session.bind.sync_engine
+        sa_event.listen(engine, "before_cursor_execute", record)
+        try:
+            batch = TicketBatchMintRequest(tickets=[
+                TicketMintRequest(owner_name=f"Fan {i}", owner_id=42, price=60) for i in range(2)
+            ])
+            await mint_tickets_batch(event.id, batch, db=db_session, current_user=SimpleNamespace(id=7))
+        finally:
+            sa_event.remove(engine, "before_cursor_execute", record)
+        writes = [words for words in statements if words[0] in ("INSERT", "UPDATE")]
+        assert writes[-2][:2] == ["UPDATE", "events"]
+        assert writes[-1][:3] == ["INSERT", "INTO", "stat_rollups"]
+        assert await check_rollups(db_session, ["ticketchain"]) == []
+    
+    @pytest.mark.asyncio
+    async def test_mint_unknown_event(self, db_session: AsyncSession):
+        """Test minting for a missing event."""
+        with pytest.raises(NotFoundException):
+            await mint_ticket(
+                99999, TicketMintRequest(owner_name="Nobody", price=1),
+                db=db_session, current_user=SimpleNamespace(id=1),
+            )
+
+
+class TestGateMode:
+    """Test the in-memory gate verification index."""
+    
+    def test_bloom_filter(self):
+        """Test no false negatives and a low false positive rate."""
+        bloom = BloomFilter(1000)
+        hashes = [generate_ticket_hash() for _ in range(1000)]
+        for ticket_hash in hashes:
+            bloom.add(ticket_hash)
+        assert all(ticket_hash in bloom for ticket_hash in hashes)
+        
+        unknown = [generate_ticket_hash() for _ in range(2000)] + ["not-a-hash", "0xZZ" * 20]
+        assert sum(ticket_hash in bloom for ticket_hash in unknown) < 60
+    
+    @pytest.mark.asyncio
+    async def test_scans_follow_committed_changes(self, db_session: AsyncSession):
+        """Test preloaded scans, incremental mints and use_ticket updates."""
+        event = Event(
+            event_id="EVT-GATE0001", name="Derby", venue="Stade Mohammed V",
+            date=datetime(2030, 6, 14), capacity=100, tickets_sold=0,
+        )
+        db_session.add(event)
+        await db_session.commit()
+        fan = SimpleNamespace(id=3)
+        
+        first = await mint_ticket(event.id, TicketMintRequest(owner_name="Early", price=20), db=db_session, current_user=fan)
+        assert await verify_gate_scan(event.id, first.ticket_hash, db=db_session) == GATE_CLOSED
+        assert event.id not in gate_index
+        await open_event_gate(event.id, db=db_session, current_user=fan)
+        
+        scan = await verify_gate_scan(event.id, first.ticket_hash, db=db_session)
+        assert scan["valid"] and scan["owner"] == "Early" and scan["seat"] == "GA-0-0"
+        
+        # Minted after the gate opened
+        late = await mint_ticket(event.id, TicketMintRequest(owner_name="Late", price=20), db=db_session, current_user=fan)
+        assert (await verify_gate_scan(event.id, late.ticket_hash, db=db_session))["valid"]
+        
+        await use_ticket(first.ticket_hash, db=db_session, current_user=fan)
+        scan = await verify_gate_scan(event.id, first.ticket_hash, db=db_session)
+        assert not scan["valid"] and scan["status"] == "Used"
+        
+        scan = await verify_gate_scan(event.id, generate_ticket_hash(), db=db_session)
+        assert scan == {
+            "valid": False, "status": None, "seat": None, "owner": None,
+            "message": "Ticket not found for this event",
+        }
+        assert gate_index.gates[event.id].stats()["scans"] == 4
+        
+        # Closed: no index is (re)loaded for the event
+        assert (await close_event_gate(event.id, db=db_session, current_user=fan))["closed"]
+        assert await verify_gate_scan(event.id, late.ticket_hash, db=db_session) == GATE_CLOSED
+        assert event.id not in gate_index
+    
+    @pytest.mark.asyncio
+    async def test_gate_mode_on_existing_events_table(self):
+        """Test gate mode on a database whose events table predates it."""
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+        baseline = MetaData()
+        Table("events", baseline, *[
+            column.copy() for column in Event.__table__.columns if column.name in BASELINE_EVENT_COLUMNS
+        ])
+        async with engine.begin() as conn:
+            await conn.run_sync(baseline.create_all)
+            await conn.run_sync(Base.metadata.create_all)  # Leaves the existing table alone
+        
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            event = Event(
+                event_id="EVT-GATE0002", name="Friendly", venue="Stade de Fes",
+                date=datetime(2030, 6, 20), capacity=10, tickets_sold=0,
+            )
+            db.add(event)
+            await db.commit()
+            fan = SimpleNamespace(id=3)
+            ticket = await mint_ticket(event.id, TicketMintRequest(owner_name="Fan", price=20), db=db, current_user=fan)
+            await open_event_gate(event.id, db=db, current_user=fan)
+            assert (await verify_gate_scan(event.id, ticket.ticket_hash, db=db))["valid"]
+            assert (await db.execute(select(Event.name))).scalar() == "Friendly"
+        await engine.dispose()
+
+
+class TestTicketRedeemBatch:
+    """Test set-based redemption of buffered scans."""
+    
+    @pytest.mark.asyncio
+    async def test_first_scan_wins(self, db_session: AsyncSession):
+        """Test outcomes, scan-time used_at, replays and rollups."""
+        event = Event(
+            event_id="EVT-SCAN0001", name="Cup Final", venue="Stade Adrar",
+            date=datetime(2030, 5, 30), capacity=10, tickets_sold=0,
+        )
+        db_session.add(event)
+        await db_session.commit()
+        fan = SimpleNamespace(id=5)
+        
+        batch = TicketBatchMintRequest(tickets=[
+            TicketMintRequest(owner_name=f"Fan {i}", price=30) for i in range(3)
+        ])
+        first, second, cancelled = (await mint_tickets_batch(event.id, batch, db=db_session, current_user=fan)).data
+        ticket = (await db_session.execute(
+            select(Ticket).where(Ticket.ticket_hash == cancelled.ticket_hash)
+        )).scalar_one()
+        ticket.status = "Cancelled"
+        await db_session.commit()
+        
+        request = TicketScanBatchRequest(scans=[
+            {"ticket_hash": first.ticket_hash, "scanned_at": "2030-05-30T19:00:05", "gate_id": "A"},
+            {"ticket_hash": first.ticket_hash, "scanned_at": "2030-05-30T19:00:01", "gate_id": "B"},
+            {"ticket_hash": second.ticket_hash, "scanned_at": "2030-05-30T19:00:02", "gate_id": "A"},
+            {"ticket_hash": cancelled.ticket_hash, "scanned_at": "2030-05-30T19:00:03", "gate_id": "A"},
+            {"ticket_hash": "0xforged", "scanned_at": "2030-05-30T19:00:04", "gate_id": "C"},
+        ])
+        response = await use_tickets_batch(request, db=db_session, current_user=fan)
+        assert [r.outcome for r in response.data] == ["already_used", "ok", "ok", "invalid", "unknown"]
+        assert response.data[0].used_at == datetime(2030, 5, 30, 19, 0, 1)
+        assert response.meta == {"scans": 5, "ok": 2, "already_used": 1, "invalid": 1, "unknown": 1}
+        
+        # Replayed by another controller
+        replay = TicketScanBatchRequest(scans=[request.scans[2]])
+        assert (await use_tickets_batch(replay, db=db_session, current_user=fan)).data[0].outcome == "already_used"
+        
+        # Tickets of other events are unknown
+        other = TicketScanBatchRequest(event_id=event.id + 1, scans=[request.scans[2]])
+        assert (await use_tickets_batch(other, db=db_session, current_user=fan)).data[0].outcome == "unknown"
+        
+        with pytest.raises(BusinessLogicException) as exc:
+            await use_ticket(first.ticket_hash, db=db_session, current_user=fan)
+        assert exc.value.error_code == "TICKET_ALREADY_USED"
+        assert await check_rollups(db_session, ["ticketchain"]) == []
+    
+    @pytest.mark.asyncio
+    async def test_mixed_timezone_scans(self, db_session: AsyncSession):
+        """Test that aware and naive scan times compare and store as naive UTC."""
+        event = Event(
+            event_id="EVT-SCAN0002", name="Derby", venue="Stade Adrar",
+            date=datetime(2030, 5, 30), capacity=10, tickets_sold=0,
+        )
+        db_session.add(event)
+        await db_session.commit()
+        fan = SimpleNamespace(id=5)
+        ticket = (await mint_ticket(
+            event.id, TicketMintRequest(owner_name="Fan", price=30), db=db_session, current_user=fan,
+        ))
+        
+        request = TicketScanBatchRequest(scans=[
+            {"ticket_hash": ticket.ticket_hash, "scanned_at": "2030-05-30T19:00:05", "gate_id": "A"},
+            {"ticket_hash": ticket.ticket_hash, "scanned_at": "2030-05-30T20:00:01+02:00", "gate_id": "B"},
+            {"ticket_hash": ticket.ticket_hash, "scanned_at": "2030-05-30T19:00:03Z", "gate_id": "C"},
+        ])
+        assert request.scans[1].scanned_at == datetime(2030, 5, 30, 18, 0, 1)
+        response = await use_tickets_batch(request, db=db_session, current_user=fan)
+        assert [r.outcome for r in response.data] == ["already_used", "ok", "already_used"]
+        assert response.data[1].used_at == datetime(2030, 5, 30, 18, 0, 1)
+
+
+class TestSignedTicketQr:
+    """Test offline-verifiable QR payloads and revocation deltas."""
+    
+    @pytest.mark.asyncio
+    async def test_verify_transfer_and_revoke(self, db_session: AsyncSession):
+        """Test signature checks, validity window and revocations."""
+        event = Event(
+            event_id="EVT-QR000001", name="Atlas Derby", venue="Stade de Marrakech",
+            date=datetime(2030, 6, 20, 18), capacity=10, tickets_sold=0,
+        )
+        db_session.add(event)
+        await db_session.commit()
+        fan = SimpleNamespace(id=9)
+        key = load_public_key((await get_qr_signing_key())["public_key"])
+        during = datetime(2030, 6, 20, 17)
+        
+        ticket = await mint_ticket(
+            event.id, TicketMintRequest(owner_name="Owner", seat_section="N", seat_row="4", seat_number="12", price=40),
+            db=db_session, current_user=fan,
+        )
+        check = verify_payload(ticket.qr_code, key, now=during, event_id=event.id)
+        assert check["valid"] and check["ticket_hash"] == ticket.ticket_hash and check["seat"] == "N-4-12"
+        
+        assert verify_payload(ticket.qr_code, key, now=during, event_id=event.id + 1)["reason"] == "wrong_event"
+        assert verify_payload(ticket.qr_code, key, now=datetime(2030, 6, 22))["reason"] == "expired"
+        assert verify_payload("not a ticket", key)["reason"] == "malformed"
+        forged = ticket.qr_code[:10] + ("A" if ticket.qr_code[10] != "A" else "B") + ticket.qr_code[11:]
+        assert verify_payload(forged, key, now=during)["reason"] == "bad_signature"
+        
+        moved = await transfer_ticket(
+            ticket.ticket_hash, TicketTransferRequest(new_owner_name="Friend", new_owner_id=10),
+            db=db_session, current_user=fan,
+        )
+        delta = await get_ticket_revocations(cursor=0, limit=1000, event_id=event.id, db=db_session, current_user=fan)
+        revoked = {row["ticket_hash"]: row["below_version"] for row in delta["data"]}
+        assert verify_payload(ticket.qr_code, key, now=during, revoked=revoked)["reason"] == "revoked"
+        assert verify_payload(moved.qr_code, key, now=during, revoked=revoked)["version"] == 2
+        assert verify_payload(moved.qr_code, key, now=during, revoked=revoked)["valid"]
+        
+        other = await mint_ticket(event.id, TicketMintRequest(owner_name="Other", price=40), db=db_session, current_user=fan)
+        row = (await db_session.execute(select(Ticket).where(Ticket.ticket_hash == other.ticket_hash))).scalar_one()
+        row.status = "Cancelled"
+        await db_session.commit()
+        
+        more = await get_ticket_revocations(
+            cursor=delta["meta"]["cursor"], limit=1000, event_id=None, db=db_session, current_user=fan,
+        )
+        assert [(r["ticket_hash"], r["reason"]) for r in more["data"]] == [(other.ticket_hash, "Cancelled")]
+        revoked.update({r["ticket_hash"]: r["below_version"] for r in more["data"]})
+        assert verify_payload(other.qr_code, key, now=during, revoked=revoked)["reason"] == "revoked"
+
+
+class TestSeatInventory:
+    """Test bitmap seat maps, best-available allocation and holds."""
+    
+    @staticmethod
+    async def _stadium(db_session: AsyncSession) -> Event:
+        event = Event(
+            event_id="EVT-SEAT0001", name="Opening Match", venue="Grand Stade Casablanca",
+            date=datetime(2030, 6, 13), capacity=1000, tickets_sold=0,
+        )
+        db_session.add(event)
+        await db_session.commit()
+        layout = SeatLayoutRequest(sections=[
+            {"section": "Tribune Est", "rows": [{"row": "A", "seats": 10}, {"row": "B", "seats": 12}]},
+            {"section": "Virage Nord", "rows": [{"row": "A", "seats": 8}]},
+        ])
+        await set_event_seat_map(event.id, layout, db=db_session, current_user=SimpleNamespace(id=1))
+        return event
+    
+    def test_best_block(self):
+        """Test block starts against brute force and centred front-row picks."""
+        for free in (0b1110111110, 0b1111111111, 0b1010101010, 0):
+            for quantity in range(1, 11):
+                expected = sum(
+                    1 << start for start in range(10)
+                    if all(free >> seat & 1 for seat in range(start, start + quantity))
+                )
+                assert block_starts(free, quantity) == expected
+        
+        front = SeatRow(1, "Est", "A", 0, 10, 0b0000110000, 0, 0)
+        back = SeatRow(2, "Est", "B", 1, 10, 0, 0, 0)
+        seat_map = SeatMap(1, [back, front])
+        (row, mask), = seat_map.find_block(3)
+        assert row is front and row.labels(mask) == [("Est", "A", 2), ("Est", "A", 3), ("Est", "A", 4)]  # Tie: lower seats
+        (row, mask), = seat_map.find_block(5)
+        assert row is back and mask == 0b0001111100
+        assert not seat_map.is_available("Est", "A", 5) and seat_map.is_available("Est", "A", 4)
+        assert seat_map.find_block(11) is None
+        assert sum(mask.bit_count() for _, mask in seat_map.find_seats(12)) == 12
+    
+    @pytest.mark.asyncio
+    async def test_hold_mint_and_release(self, db_session: AsyncSession):
+        """Test holds, minting a hold, double sales and section summaries."""
+        event = await self._stadium(db_session)
+        fan = SimpleNamespace(id=4)
+        
+        hold = await hold_event_seats(event.id, SeatHoldRequest(quantity=4), db=db_session, current_user=fan)
+        assert [seat.model_dump() for seat in hold.seats] == [
+            {"section": "Tribune Est", "row": "A", "seat": seat} for seat in (4, 5, 6, 7)
+        ]
+        summary = (await get_event_seat_map(event.id, db=db_session, current_user=fan)).data[0]
+        assert (summary.seats, summary.held, summary.available) == (22, 4, 18)
+        
+        request = TicketBatchMintRequest(
+            hold_id=hold.hold_id, tickets=[TicketMintRequest(owner_name=f"Fan {i}", price=80) for i in range(4)],
+        )
+        minted = await mint_tickets_batch(event.id, request, db=db_session, current_user=fan)
+        assert [ticket.seat_info for ticket in minted.data] == [f"Tribune Est-A-{seat}" for seat in (4, 5, 6, 7)]
+        with pytest.raises(BusinessLogicException):
+            await mint_tickets_batch(event.id, request, db=db_session, current_user=fan)
+        
+        # The same seat cannot be sold twice
+        seat = TicketMintRequest(owner_name="Late", price=80, seat_section="Tribune Est", seat_row="A", seat_number="5")
+        with pytest.raises(BusinessLogicException):
+            await mint_ticket(event.id, seat, db=db_session, current_user=fan)
+        free = seat.model_copy(update={"seat_number": "1"})
+        assert (await mint_ticket(event.id, free, db=db_session, current_user=fan)).seat_info == "Tribune Est-A-1"
+        
+        # Exact seats, released again
+        other = await hold_event_seats(
+            event.id, SeatHoldRequest(seats=[{"section": "Virage Nord", "row": "A", "seat": 1}]),
+            db=db_session, current_user=fan,
+        )
+        await release_event_seats(event.id, other.hold_id, db=db_session, current_user=fan)
+        
+        rows = (await get_event_section_seats(event.id, "Tribune Est", db=db_session, current_user=fan)).data
+        assert rows[0].available == [2, 3, 8, 9, 10]
+        summaries = (await get_event_seat_map(event.id, db=db_session, current_user=fan)).data
+        assert [(s.sold, s.held, s.available) for s in summaries] == [(5, 0, 17), (0, 0, 8)]
+        stored = (await db_session.execute(select(func.sum(EventSeatRow.sold_count)))).scalar()
+        assert stored == 5 == (await db_session.execute(select(func.count(Ticket.id)))).scalar()
+    
+    @pytest.mark.asyncio
+    async def test_expired_holds_and_stale_maps(self, db_session: AsyncSession):
+        """Test the expired-hold sweep and replanning after another worker's write."""
+        event = await self._stadium(db_session)
+        fan = SimpleNamespace(id=6)
+        
+        first = await hold_event_seats(event.id, SeatHoldRequest(quantity=10), db=db_session, current_user=fan)
+        await db_session.execute(
+            update(SeatHold).where(SeatHold.hold_id == first.hold_id).values(expires_at=datetime(2020, 1, 1))
+        )
+        await db_session.commit()
+        seat_inventory.clear()  # Sweep throttle and maps of this worker
+        
+        second = await hold_event_seats(event.id, SeatHoldRequest(quantity=10), db=db_session, current_user=fan)
+        assert [seat.row for seat in second.seats] == ["A"] * 10
+        assert (await db_session.execute(
+            select(SeatHold.status).where(SeatHold.hold_id == first.hold_id)
+        )).scalar() == "Expired"
+        
+        # Another worker sells seat B-6 behind this worker's map
+        row = (await db_session.execute(
+            select(EventSeatRow).where(EventSeatRow.seat_section == "Tribune Est", EventSeatRow.seat_row == "B")
+        )).scalar_one()
+        row.sold, row.sold_count, row.version = (1 << 5).to_bytes(2, "little"), 1, row.version + 1
+        await db_session.commit()
+        
+        third = await hold_event_seats(
+            event.id, SeatHoldRequest(quantity=6, sections=["Tribune Est"]), db=db_session, current_user=fan,
+        )
+        assert [seat.seat for seat in third.seats] == [7, 8, 9, 10, 11, 12]
+        assert seat_inventory.conflicts == 1
+    
+    @pytest.mark.asyncio
+    async def test_expired_holds_swept_without_new_holds(self, db_session: AsyncSession):
+        """Test that summaries and direct sales release expired holds."""
+        event = await self._stadium(db_session)
+        fan = SimpleNamespace(id=7)
+        
+        hold = await hold_event_seats(
+            event.id, SeatHoldRequest(seats=[{"section": "Virage Nord", "row": "A", "seat": 1}]),
+            db=db_session, current_user=fan,
+        )
+        await db_session.execute(
+            update(SeatHold).where(SeatHold.hold_id == hold.hold_id).values(expires_at=datetime(2020, 1, 1))
+        )
+        await db_session.commit()
+        seat_inventory.clear()
+        
+        summaries = (await get_event_seat_map(event.id, db=db_session, current_user=fan)).data
+        assert [(s.held, s.available) for s in summaries] == [(0, 22), (0, 8)]
+        
+        second = await hold_event_seats(
+            event.id, SeatHoldRequest(seats=[{"section": "Virage Nord", "row": "A", "seat": 2}]),
+            db=db_session, current_user=fan,
+        )
+        await db_session.execute(
+            update(SeatHold).where(SeatHold.hold_id == second.hold_id).values(expires_at=datetime(2020, 1, 1))
+        )
+        await db_session.commit()
+        seat_inventory.clear()
+        
+        seat = TicketMintRequest(owner_name="Walk-up", price=40, seat_section="Virage Nord", seat_row="A", seat_number="2")
+        assert (await mint_ticket(event.id, seat, db=db_session, current_user=fan)).seat_info == "Virage Nord-A-2"
+
+
+class TestResaleMarket:
+    """Test the price-time priority resale order books."""
+    
+    @pytest.mark.asyncio
+    async def test_match_cap_and_replay(self, db_session: AsyncSession):
+        """Test priority, price caps, stale asks and rebuilding from the log."""
+        event = Event(
+            event_id="EVT-RSL00001", name="Semi Final", venue="Stade de Tanger",
+            date=datetime(2030, 7, 15), capacity=10, tickets_sold=0,
+        )
+        db_session.add(event)
+        await db_session.commit()
+        seller, buyer, late = SimpleNamespace(id=2), SimpleNamespace(id=3), SimpleNamespace(id=4)
+        first, cheap, spare = [
+            await mint_ticket(event.id, TicketMintRequest(owner_name="Seller", price=100), db=db_session, current_user=seller)
+            for _ in range(3)
+        ]
+        
+        with pytest.raises(BusinessLogicException) as exc:
+            await resell_ticket(first.ticket_hash, ResaleAskRequest(price=120), db=db_session, current_user=seller)
+        assert exc.value.error_code == "PRICE_ABOVE_CAP"
+        with pytest.raises(BusinessLogicException):
+            await resell_ticket(first.ticket_hash, ResaleAskRequest(price=90), db=db_session, current_user=buyer)
+        
+        for ticket, price in ((first, 90), (cheap, 80), (spare, 90)):
+            ask = await resell_ticket(ticket.ticket_hash, ResaleAskRequest(price=price), db=db_session, current_user=seller)
+            assert ask["status"] == "open"
+        
+        # Cheapest first, then the oldest at the same price
+        bid = await place_resale_bid(
+            event.id, "Standard", ResaleBidRequest(price=95, quantity=2, owner_name="Buyer"),
+            db=db_session, current_user=buyer,
+        )
+        assert bid["status"] == "filled"
+        assert [(fill["ticket_hash"], fill["price"]) for fill in bid["fills"]] == [
+            (cheap.ticket_hash, 80), (first.ticket_hash, 90),
+        ]
+        owners = dict((await db_session.execute(select(Ticket.ticket_hash, Ticket.owner_name))).all())
+        assert owners[first.ticket_hash] == owners[cheap.ticket_hash] == "Buyer"
+        revoked = (await db_session.execute(
+            select(func.count()).where(TicketRevocation.reason == "Resold")
+        )).scalar()
+        assert revoked == 2
+        
+        # The spare ticket leaves the market off-platform: its ask is stale
+        await transfer_ticket(
+            spare.ticket_hash, TicketTransferRequest(new_owner_name="Friend", new_owner_id=5),
+            db=db_session, current_user=seller,
+        )
+        rest = await place_resale_bid(
+            event.id, "Standard", ResaleBidRequest(price=90, owner_name="Late"), db=db_session, current_user=late,
+        )
+        assert rest["status"] == "open" and rest["fills"] == []
+        with pytest.raises(BusinessLogicException):
+            await place_resale_bid(
+                event.id, "Standard", ResaleBidRequest(price=101, owner_name="Late"), db=db_session, current_user=late,
+            )
+        
+        book = await get_resale_book(event.id, "Standard", db=db_session, current_user=late, levels=10)
+        assert book["asks"] == [] and book["bids"] == [{"price": 90, "quantity": 1, "orders": 1}]
+        
+        # Another worker withdraws the bid; this worker replays the log tail
+        db_session.add(ResaleOrderLog(
+            event_id=event.id, category="Standard", sequence=book["sequence"] + 1,
+            action="cancel", order_id=rest["order_id"], quantity=1, reason="Withdrawn",
+        ))
+        await db_session.commit()
+        with pytest.raises(NotFoundException):
+            await cancel_resale_order(event.id, "Standard", rest["order_id"], db=db_session, current_user=late)
+        
+        live = await get_resale_book(event.id, "Standard", db=db_session, current_user=late, levels=10)
+        resale_market.clear()
+        rebuilt = await get_resale_book(event.id, "Standard", db=db_session, current_user=late, levels=10)
+        assert rebuilt == live and rebuilt["trades"] == 2 and rebuilt["bids"] == []
+
+
 class TestTicketVerify:
     """Test ticket verification."""
     
@@ -0,0 +1,109 @@
+# ============================================================================
+# ProInvestiX Enterprise API - Statistics Rollup Tests
+# ============================================================================
+
+from datetime import date
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Talent, Transfer, StatRollup
+from app.services.rollups import ROLLUP_MODULES, read_rollups, check_rollups, ensure_rollups, rebuild_rollups
+
+
+def make_talent(talent_id: str, **kwargs) -> Talent:
+    data = {
+        "first_name": "Test",
+        "last_name": "Talent",
+        "date_of_birth": date(2006, 3, 1),
+        "nationality": "Moroccan",
+        "primary_position": "CM",
+    }
+    data.update(kwargs)
+    return Talent(talent_id=talent_id, **data)
+
+
+class TestRollupMaintenance:
+    """Test incremental rollup maintenance on flush."""
+
+    @pytest.mark.asyncio
+    async def test_insert_update_delete(self, db_session: AsyncSession):
+        """Test that writes keep the talent rollups current."""
+        first = make_talent("NTSP-T1", overall_score=60)
+        second = make_talent("NTSP-T2", nationality="Dutch", is_diaspora=True, overall_score=80)
+        db_session.add_all([first, second])
+        await db_session.commit()
+
+        rollups = await read_rollups(db_session, "talents")
+        assert rollups.count("talents") == 2
+        assert rollups.counts("talents.status") == {"Prospect": 2}
+        assert rollups.count("talents.diaspora", True) == 1
+        assert rollups.average("talents") == 70
+
+        first.status = "Priority"
+        first.overall_score = 40
+        await db_session.commit()
+
+        rollups = await read_rollups(db_session, "talents")
+        assert rollups.counts("talents.status") == {"Priority": 1, "Prospect": 1}
+        assert rollups.total("talents") == 120
+
+        await db_session.delete(second)
+        await db_session.commit()
+
+        rollups = await read_rollups(db_session, "talents")
+        assert rollups.count("talents") == 1
+        assert rollups.counts("talents.nationality") == {"Moroccan": 1}
+        assert await check_rollups(db_session) == []
+
+
+class TestRollupRebuild:
+    """Test rollup rebuild and consistency checking."""
+
+    @pytest.mark.asyncio
+    async def test_check_detects_drift_and_rebuild_fixes_it(self, db_session: AsyncSession):
+        """Test the consistency checker against a drifted rollup."""
+        transfer = Transfer(
+            transfer_id="TRF-T1",
+            player_name="Test Player",
+            from_club="Club A",
+            to_club="Club B",
+            transfer_type="Permanent",
+            transfer_date=date(2024, 7, 1),
+            transfer_fee=1000,
+        )
+        db_session.add(transfer)
+        await db_session.commit()
+
+        await rebuild_rollups(db_session, ["transfers"])
+        assert await check_rollups(db_session, ["transfers"]) == []
+
+        rollups = await read_rollups(db_session, "transfers")
+        assert rollups.total("transfers.to_club", "Club B") == 1000
+
+        # Simulate drift by emptying the rollups
+        await db_session.execute(delete(StatRollup).where(StatRollup.module == "transfers"))
+        await db_session.commit()
+
+        mismatches = await check_rollups(db_session, ["transfers"])
+        assert mismatches
+
+        await rebuild_rollups(db_session, ["transfers"])
+        assert await check_rollups(db_session, ["transfers"]) == []
+
+    @pytest.mark.asyncio
+    async def test_ensure_builds_missing_modules(self, db_session: AsyncSession):
+        """Test the startup backfill of a database without rollups."""
+        db_session.add_all([make_talent("NTSP-T1", overall_score=60), make_talent("NTSP-T2", overall_score=80)])
+        await db_session.commit()
+        await db_session.execute(delete(StatRollup))
+        await db_session.commit()
+
+        assert await ensure_rollups(db_session) == ROLLUP_MODULES
+        rollups = await read_rollups(db_session, "talents")
+        assert (rollups.count("talents"), rollups.average("talents")) == (2, 70)
+        assert await check_rollups(db_session) == []
+
+        # Modules with rollups are left alone (empty ones are rechecked, at no cost)
+        assert await ensure_rollups(db_session) == [module for module in ROLLUP_MODULES if module != "talents"]
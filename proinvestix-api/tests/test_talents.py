@@ -2,11 +2,41 @@
 # ProInvestiX Enterprise API - Talent Tests
 # ============================================================================
 
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+
+import numpy as np
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import User, Talent
+from app.config import settings
+from app.api.v1.endpoints.talents import (
+    calculate_overall_scores, calculate_overall_scores_batch, create_evaluations_batch,
+)
+from app.db.models import (
+    User, Talent, TalentEvaluation, TalentPercentile, TalentScoreTotals, TalentSearchDocument, TalentTrend,
+)
+from app.core.exceptions import NotFoundException, ValidationException
+from app.schemas.talent import EvaluationBatchCreate, TalentResponse
+from app.services.bulk_import import detect_format, import_talents, parse_records, start_import
+from app.services.counting import count_cache, count_total
+from app.services.export import export_columns, stream_export
+from app.services.pagination import encode_cursor, keyset_page
+from app.services.percentiles import (
+    cohort_breakpoints, cohort_key, percentile_ranks, rank_against, recompute_percentiles,
+)
+from app.services.rollups import read_rollups
+from app.services.score_totals import category_average, recompute_score_totals
+from app.services.similarity import ATTRIBUTES, similarity_index
+from app.services.snapshots import arrow_schema, load_manifest, run_snapshot
+from app.services.talent_facets import facet_counts, facet_values
+from app.services.talent_filters import age_band_counts, age_conditions, birth_date_range
+from app.services.talent_search import build_document, ensure_search_index, fold, search_ranking
+from app.services.trends import fit_trends, recompute_trends
 
 
 class TestTalentList:
@@ -151,3 +181,856 @@ class TestTalentFilters:
         data = response.json()
         assert "nationalities" in data
         assert "positions" in data
+
+
+class TestTalentKeysetPagination:
+    """Test cursor-based talent pagination."""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sort_order", ["asc", "desc"])
+    async def test_cursor_walks_all_rows_once(self, db_session: AsyncSession, sort_order: str):
+        """Test that cursor pages cover ties and NULLs in keyset order."""
+        scores = [70, None, 55, 70, None, 90, 55, 70]
+        db_session.add_all([
+            Talent(
+                talent_id=f"NTSP-K{i}", first_name="Key", last_name=f"Set{i}",
+                date_of_birth=date(2005, 1, 1), nationality="Moroccan",
+                primary_position="ST", overall_score=score,
+            )
+            for i, score in enumerate(scores)
+        ])
+        await db_session.commit()
+        
+        seen, cursor = [], ""
+        while True:
+            page, meta = await keyset_page(
+                db_session, select(Talent), Talent.overall_score, Talent.id,
+                "overall_score", sort_order, 3, cursor,
+            )
+            seen.extend((t.overall_score, t.id) for t in page)
+            if not meta["has_more"]:
+                break
+            cursor = meta["next_cursor"]
+        
+        # NULLs sort as the greatest value
+        key = lambda row: (row[0] is None, row[0] or 0, row[1])
+        expected = sorted(seen, key=key, reverse=sort_order == "desc")
+        assert len(seen) == len(scores)
+        assert seen == expected
+    
+    @pytest.mark.asyncio
+    async def test_cursor_must_match_sort(self, db_session: AsyncSession):
+        """Test that a cursor is rejected for another sort order."""
+        cursor = encode_cursor("overall_score", "asc", 70, 1)
+        with pytest.raises(ValidationException):
+            await keyset_page(
+                db_session, select(Talent), Talent.overall_score, Talent.id,
+                "overall_score", "desc", 3, cursor,
+            )
+        with pytest.raises(ValidationException):
+            await keyset_page(
+                db_session, select(Talent), Talent.created_at, Talent.id,
+                "created_at", "desc", 3, "not-a-cursor",
+            )
+
+
+class TestTalentListTotals:
+    """Test list total strategies."""
+    
+    @pytest.mark.asyncio
+    async def test_count_modes(self, db_session: AsyncSession):
+        """Test cached exact totals, estimate fallback and count=none."""
+        count_cache.clear()
+        db_session.add(Talent(
+            talent_id="NTSP-C1", first_name="Count", last_name="One",
+            date_of_birth=date(2005, 1, 1), nationality="Moroccan", primary_position="ST",
+        ))
+        await db_session.commit()
+        
+        query = select(Talent).where(Talent.nationality == "Moroccan")
+        assert await count_total(db_session, query, "exact") == (1, "exact")
+        
+        db_session.add(Talent(
+            talent_id="NTSP-C2", first_name="Count", last_name="Two",
+            date_of_birth=date(2005, 1, 1), nationality="Moroccan", primary_position="ST",
+        ))
+        await db_session.commit()
+        
+        # Served from the cache for the same filter set
+        assert await count_total(db_session, query, "auto") == (1, "exact")
+        other = select(Talent).where(Talent.nationality == "Dutch")
+        assert await count_total(db_session, other, "exact") == (0, "exact")
+        
+        # No planner estimates on SQLite
+        assert await count_total(db_session, other, "estimate") == (0, "exact")
+        assert await count_total(db_session, query, "none") == (None, "none")
+
+
+class TestTalentSearch:
+    """Test the talent full-text search index."""
+    
+    async def _search(self, db: AsyncSession, text: str) -> list:
+        ranking = search_ranking(db.bind.dialect.name, text)
+        query = (
+            select(Talent.last_name)
+            .join(ranking, ranking.c.talent_id == Talent.id)
+            .order_by(ranking.c.score.desc(), Talent.id)
+        )
+        return list((await db.execute(query)).scalars().all())
+    
+    def test_fold(self):
+        """Test accent and punctuation folding."""
+        assert fold("Aït-Nouri") == "ait nouri"
+        assert fold("Mbappé") == "mbappe"
+        assert fold("N'Golo Kanté") == "n golo kante"
+        assert fold("Ødegaard") == "odegaard"
+        assert build_document("Ayoub", "El-Kaabi", "Olympiacos") == "ayoub el kaabi elkaabi olympiacos"
+        # A club equal to a name is still not joined
+        assert build_document("Ait Nouri", "Ait Nouri", "Ait Nouri") == "ait nouri aitnouri ait nouri aitnouri ait nouri"
+    
+    @pytest.mark.asyncio
+    async def test_search_folds_and_prefixes(self, db_session: AsyncSession):
+        """Test accent-insensitive prefix matches, ranked by relevance."""
+        for i, (first, last, club) in enumerate([
+            ("Rayan", "Aït-Nouri", "Wolverhampton"),
+            ("Achraf", "Hakimi", "PSG"),
+            ("Hakim", "Ziyech", "Galatasaray"),
+            ("Hakim", "Hakimi", "Raja"),
+        ]):
+            db_session.add(Talent(
+                talent_id=f"NTSP-S{i}", first_name=first, last_name=last,
+                date_of_birth=date(2005, 1, 1), nationality="Moroccan",
+                primary_position="ST", current_club=club,
+            ))
+        await db_session.commit()
+        
+        assert await self._search(db_session, "ait nouri") == ["Aït-Nouri"]
+        assert await self._search(db_session, "AÏTNOURI") == ["Aït-Nouri"]
+        assert await self._search(db_session, "gala") == ["Ziyech"]
+        assert await self._search(db_session, "hakimi") == ["Hakimi", "Hakimi"]
+        # Prefix of first and last names, not of "Wolverhampton"
+        results = await self._search(db_session, "hak")
+        assert len(results) == 3
+        assert await self._search(db_session, "!!") == []  # No usable terms: no matches
+    
+    @pytest.mark.asyncio
+    async def test_missing_documents_rebuilt(self, db_session: AsyncSession):
+        """Test the startup backfill for talents from before the index."""
+        db_session.add(Talent(
+            talent_id="NTSP-S8", first_name="Azzedine", last_name="Ounahi",
+            date_of_birth=date(2000, 4, 19), nationality="Moroccan", primary_position="CM",
+        ))
+        await db_session.commit()
+        assert await ensure_search_index(db_session) == 0
+        
+        await db_session.execute(TalentSearchDocument.__table__.delete())
+        if db_session.bind.dialect.name == "sqlite":
+            await db_session.execute(text("INSERT INTO talent_search_fts(talent_search_fts) VALUES ('rebuild')"))
+        await db_session.commit()
+        assert await self._search(db_session, "ounahi") == []
+        
+        assert await ensure_search_index(db_session) == 1
+        assert await self._search(db_session, "ounahi") == ["Ounahi"]
+    
+    @pytest.mark.asyncio
+    async def test_index_follows_updates_and_deletes(self, db_session: AsyncSession):
+        """Test that talent changes are reflected in the search index."""
+        talent = Talent(
+            talent_id="NTSP-S9", first_name="Bilal", last_name="El Khannouss",
+            date_of_birth=date(2004, 5, 10), nationality="Moroccan",
+            primary_position="CAM", current_club="Genk",
+        )
+        db_session.add(talent)
+        await db_session.commit()
+        assert await self._search(db_session, "elkhan") == ["El Khannouss"]
+        
+        talent.current_club = "Leicester City"
+        await db_session.commit()
+        assert await self._search(db_session, "genk") == []
+        assert await self._search(db_session, "leicester") == ["El Khannouss"]
+        
+        await db_session.delete(talent)
+        await db_session.commit()
+        assert await self._search(db_session, "leicester") == []
+
+
+class TestTalentAgeFilters:
+    """Test age bounds and youth bands."""
+    
+    def test_birth_date_range(self):
+        """Test inclusive age bounds as date_of_birth ranges."""
+        today = date(2026, 3, 1)
+        assert birth_date_range(16, 18, today) == (date(2007, 3, 1), date(2010, 3, 1))
+        assert birth_date_range(None, None, today) == (None, None)
+        # Leap day falls back to 28 February
+        assert birth_date_range(1, None, date(2024, 2, 29)) == (None, date(2023, 2, 28))
+        with pytest.raises(ValidationException):
+            birth_date_range(20, 18, today)
+    
+    @pytest.mark.asyncio
+    async def test_age_filters_and_bands(self, db_session: AsyncSession):
+        """Test age predicates and cumulative band counts."""
+        today = date(2026, 6, 15)
+        births = {
+            "Fourteen": date(2012, 1, 1),
+            "Sixteen": date(2010, 6, 15),
+            "Eighteen": date(2007, 6, 16),
+            "Twenty": date(2006, 1, 1),
+            "Thirty": date(1996, 1, 1),
+        }
+        db_session.add_all([
+            Talent(
+                talent_id=f"NTSP-A{i}", first_name="Age", last_name=name,
+                date_of_birth=born, nationality="Moroccan", primary_position="CM",
+            )
+            for i, (name, born) in enumerate(births.items())
+        ])
+        await db_session.commit()
+        
+        async def names(**bounds):
+            query = select(Talent.last_name).where(*age_conditions(today=today, **bounds))
+            return sorted((await db_session.execute(query)).scalars().all())
+        
+        assert await names(min_age=16, max_age=18) == ["Eighteen", "Sixteen"]
+        assert await names(max_age=15) == ["Fourteen"]
+        assert await names(age_band="U19") == ["Eighteen", "Fourteen", "Sixteen"]
+        assert await names(age_band="U23", min_age=18) == ["Eighteen", "Twenty"]
+        
+        counts = await age_band_counts(db_session, [Talent.nationality == "Moroccan"], today)
+        assert counts == {"U15": 1, "U17": 2, "U19": 3, "U21": 4, "U23": 4}
+
+
+class TestTalentFacets:
+    """Test one-pass facet counts and the facet value index."""
+    
+    @pytest.mark.asyncio
+    async def test_facet_counts(self, db_session: AsyncSession):
+        """Test counts per facet value and invalidation after commits."""
+        rows = [
+            ("Prospect", "ST", "Moroccan", True, date(2012, 1, 1)),
+            ("Prospect", "CM", "Moroccan", False, date(2009, 1, 1)),
+            ("Signed", "ST", "Dutch", True, date(1995, 1, 1)),
+        ]
+        db_session.add_all([
+            Talent(
+                talent_id=f"NTSP-F{i}", first_name="Facet", last_name=f"Row{i}",
+                status=status, primary_position=position, nationality=nationality,
+                is_diaspora=diaspora, date_of_birth=born,
+            )
+            for i, (status, position, nationality, diaspora, born) in enumerate(rows)
+        ])
+        await db_session.commit()
+        dialect = db_session.bind.dialect.name
+        
+        facets = await facet_counts(db_session, select(Talent), dialect)
+        assert facets["total"] == 3
+        assert facets["status"] == {"Prospect": 2, "Signed": 1}
+        assert facets["position"] == {"ST": 2, "CM": 1}
+        assert facets["is_diaspora"] == {"true": 2, "false": 1}
+        assert facets["age_band"]["U15"] == 1
+        assert facets["age_band"]["U23"] == 2
+        
+        filtered = select(Talent).where(Talent.nationality == "Moroccan")
+        assert (await facet_counts(db_session, filtered, dialect))["total"] == 2
+        
+        # A committed talent change invalidates cached counts
+        db_session.add(Talent(
+            talent_id="NTSP-F9", first_name="Facet", last_name="New", status="Signed",
+            primary_position="GK", nationality="Moroccan", date_of_birth=date(2000, 1, 1),
+        ))
+        await db_session.commit()
+        facets = await facet_counts(db_session, select(Talent), dialect)
+        assert facets["total"] == 4
+        assert facets["status"] == {"Prospect": 2, "Signed": 2}
+    
+    @pytest.mark.asyncio
+    async def test_value_index_reloads_on_version(self, db_session: AsyncSession):
+        """Test that club/nationality values reload only after relevant changes."""
+        talent = Talent(
+            talent_id="NTSP-V1", first_name="Value", last_name="Index",
+            date_of_birth=date(2005, 1, 1), nationality="Moroccan",
+            primary_position="ST", current_club="Wydad",
+        )
+        db_session.add(talent)
+        await db_session.commit()
+        
+        values = await facet_values.values(db_session)
+        assert values == {"nationalities": ["Moroccan"], "clubs": ["Wydad"]}
+        loads = facet_values.loads
+        
+        talent.overall_score = 80
+        await db_session.commit()
+        await facet_values.values(db_session)
+        assert facet_values.loads == loads
+        
+        talent.current_club = "Raja"
+        await db_session.commit()
+        values = await facet_values.values(db_session)
+        assert values["clubs"] == ["Raja"]
+        assert facet_values.loads == loads + 1
+
+
+class TestTalentSimilarity:
+    """Test the evaluation-profile similarity index."""
+    
+    def _evaluation(self, talent_id: int, number: int, technical: int, physical: int, mental: int):
+        scores = dict(zip(ATTRIBUTES, [technical] * 6 + [physical] * 6 + [mental] * 6))
+        return TalentEvaluation(
+            evaluation_id=f"EVAL-SIM{number}", talent_id=talent_id,
+            evaluation_date=date(2026, 1, 1), **scores,
+        )
+    
+    @pytest.mark.asyncio
+    async def test_nearest_and_incremental_updates(self, db_session: AsyncSession):
+        """Test ranking, filters and updates applied on commit."""
+        talents = [
+            Talent(
+                talent_id=f"NTSP-SIM{i}", first_name="Sim", last_name=name,
+                date_of_birth=date(2008, 1, 1), nationality="Moroccan", primary_position=position,
+            )
+            for i, (name, position) in enumerate([
+                ("Playmaker", "CAM"), ("Creator", "CAM"), ("Destroyer", "CDM"), ("Runner", "LW"),
+            ])
+        ]
+        db_session.add_all(talents)
+        await db_session.commit()
+        profiles = [(90, 50, 85), (85, 55, 80), (40, 90, 50), (60, 95, 40)]
+        db_session.add_all([
+            self._evaluation(t.id, i, *profile)
+            for i, (t, profile) in enumerate(zip(talents, profiles))
+        ])
+        await db_session.commit()
+        playmaker, creator, destroyer, runner = [t.id for t in talents]
+        
+        await similarity_index.ensure_current(db_session)
+        assert similarity_index.size == 4
+        
+        cosine = similarity_index.nearest(playmaker, 3)
+        assert [talent_id for talent_id, _ in cosine] == [creator, runner, destroyer]
+        assert cosine[0][1] > 0.9
+        euclidean = similarity_index.nearest(playmaker, 1, "euclidean")
+        assert euclidean[0][0] == creator
+        assert similarity_index.nearest(playmaker, 3, position="CDM") == [
+            (destroyer, pytest.approx(cosine[2][1]))
+        ]
+        
+        # New evaluations shift the creator's mean towards the destroyer
+        loads = similarity_index.loads
+        db_session.add_all([self._evaluation(creator, 10 + i, 40, 90, 50) for i in range(3)])
+        await db_session.commit()
+        assert similarity_index.loads == loads
+        assert similarity_index.nearest(destroyer, 1)[0][0] == creator
+        
+        # Deleted evaluations are subtracted, deleted talents removed
+        evaluations = (await db_session.execute(
+            select(TalentEvaluation).where(TalentEvaluation.talent_id == creator)
+        )).scalars().all()
+        for evaluation in evaluations[1:]:
+            await db_session.delete(evaluation)
+        await db_session.commit()
+        assert similarity_index.nearest(playmaker, 1)[0][0] == creator
+        
+        await db_session.delete(evaluations[0])
+        await db_session.delete(talents[1])
+        await db_session.commit()
+        assert creator not in [talent_id for talent_id, _ in similarity_index.nearest(playmaker, 3)]
+        assert similarity_index.size == 3
+
+    @pytest.mark.asyncio
+    async def test_removal_keeps_moved_row_current(self, db_session: AsyncSession):
+        """Test that a changed row moved into a deleted talent's slot is restandardized."""
+        talents = [
+            Talent(
+                talent_id=f"NTSP-SIM{i}", first_name="Sim", last_name=name,
+                date_of_birth=date(2008, 1, 1), nationality="Moroccan", primary_position="CM",
+            )
+            for i, name in enumerate(["Leaver", "Anchor", "Mover"])
+        ]
+        db_session.add_all(talents)
+        await db_session.commit()
+        leaver, anchor, mover = [t.id for t in talents]
+        evaluations = [
+            self._evaluation(leaver, 0, 90, 50, 85),
+            self._evaluation(anchor, 1, 40, 90, 50),
+            self._evaluation(mover, 2, 40, 90, 50),
+        ]
+        db_session.add_all(evaluations)
+        await db_session.commit()
+
+        await similarity_index.ensure_current(db_session)
+        await db_session.delete(evaluations[0])
+        await db_session.commit()
+        assert similarity_index.nearest(anchor, 1, "euclidean") == [(mover, pytest.approx(0, abs=1e-6))]
+
+        # The mover's profile changes, then it fills the leaver's slot
+        db_session.add_all([self._evaluation(mover, 10 + i, 90, 50, 85) for i in range(3)])
+        await db_session.commit()
+        await db_session.delete(talents[0])
+        await db_session.commit()
+        assert similarity_index.rows[mover] == 0
+
+        [(nearest, distance)] = similarity_index.nearest(anchor, 1, "euclidean")
+        assert nearest == mover
+        assert distance > 1
+
+
+class TestTalentScoreTotals:
+    """Test running evaluation score totals."""
+    
+    async def _totals(self, db: AsyncSession, talent_id: int) -> dict:
+        row = await db.get(TalentScoreTotals, talent_id, populate_existing=True)
+        return {c.name: getattr(row, c.name) for c in TalentScoreTotals.__table__.columns}
+    
+    @pytest.mark.asyncio
+    async def test_deltas_and_recompute(self, db_session: AsyncSession):
+        """Test inserts, corrections and deletions as exact deltas."""
+        talent = Talent(
+            talent_id="NTSP-T1", first_name="Run", last_name="Total",
+            date_of_birth=date(2007, 1, 1), nationality="Moroccan", primary_position="CM",
+        )
+        db_session.add(talent)
+        await db_session.commit()
+        
+        evaluations = [
+            TalentEvaluation(
+                evaluation_id=f"EVAL-T{i}", talent_id=talent.id, evaluation_date=date(2026, 1, 1),
+                overall_technical=technical, overall_mental=70, overall_score=overall,
+            )
+            for i, (technical, overall) in enumerate([(80, 75), (60, 65), (None, 90)])
+        ]
+        db_session.add_all(evaluations)
+        await db_session.commit()
+        
+        totals = await self._totals(db_session, talent.id)
+        assert totals["evaluations"] == 3
+        assert category_average(totals, "technical") == 70
+        assert category_average(totals, "physical") is None
+        assert talent.evaluation_count == 3
+        assert talent.overall_score == pytest.approx(230 / 3)
+        
+        evaluations[2].overall_score = 60
+        await db_session.commit()
+        assert talent.overall_score == pytest.approx(200 / 3)
+        
+        await db_session.delete(evaluations[0])
+        await db_session.commit()
+        totals = await self._totals(db_session, talent.id)
+        assert (totals["evaluations"], totals["technical_count"]) == (2, 1)
+        assert talent.overall_score == pytest.approx(62.5)
+        
+        # Recompute from scratch gives the same totals
+        await db_session.execute(TalentScoreTotals.__table__.delete())
+        assert await recompute_score_totals(db_session) == 1
+        assert await self._totals(db_session, talent.id) == {
+            **totals, "updated_at": (await self._totals(db_session, talent.id))["updated_at"],
+        }
+        await db_session.refresh(talent)
+        assert (talent.evaluation_count, talent.overall_score) == (2, pytest.approx(62.5))
+
+    @pytest.mark.asyncio
+    async def test_missing_totals_seeded_from_evaluations(self, db_session: AsyncSession):
+        """Test that the first delta for a talent without totals keeps its history."""
+        talent = Talent(
+            talent_id="NTSP-T2", first_name="Old", last_name="History",
+            date_of_birth=date(2007, 1, 1), nationality="Moroccan", primary_position="CM",
+        )
+        db_session.add(talent)
+        await db_session.commit()
+        db_session.add_all([
+            TalentEvaluation(
+                evaluation_id=f"EVAL-H{i}", talent_id=talent.id,
+                evaluation_date=date(2026, 1, 1), overall_score=score,
+            )
+            for i, score in enumerate([60, 70])
+        ])
+        await db_session.commit()
+
+        # Database from before the totals table: evaluations without totals
+        await db_session.execute(TalentScoreTotals.__table__.delete())
+        await db_session.commit()
+
+        db_session.add(TalentEvaluation(
+            evaluation_id="EVAL-H2", talent_id=talent.id,
+            evaluation_date=date(2026, 2, 1), overall_score=95,
+        ))
+        await db_session.commit()
+        totals = await self._totals(db_session, talent.id)
+        assert (totals["evaluations"], totals["overall_count"]) == (3, 3)
+        assert (talent.evaluation_count, talent.overall_score) == (3, pytest.approx(75))
+
+
+class TestTalentPercentiles:
+    """Test cohort percentile ranks."""
+    
+    def test_cohort_key(self):
+        """Test position, age band and nationality group."""
+        today = date(2026, 6, 1)
+        assert cohort_key("CM", date(2010, 1, 1), "Moroccan", False, today) == "CM|U17|moroccan"
+        assert cohort_key("ST", date(2000, 1, 1), "Dutch", True, today) == "ST|Senior|diaspora"
+        assert cohort_key("GK", date(2012, 1, 1), "French", False, today) == "GK|U15|international"
+    
+    def test_ranks_match_per_cohort_computation(self):
+        """Test the single-sort ranking against a direct per-cohort count."""
+        rng = np.random.default_rng(7)
+        values = rng.integers(0, 101, size=(300, 4)).astype(float)
+        values[rng.random(values.shape) < 0.1] = np.nan
+        codes = rng.integers(0, 5, size=300)
+        
+        ranks = percentile_ranks(values, codes)
+        for i in (0, 17, 299):
+            for a in range(4):
+                if np.isnan(values[i, a]):
+                    assert np.isnan(ranks[i, a])
+                    continue
+                peers = values[(codes == codes[i]) & ~np.isnan(values[:, a]), a]
+                expected = 100 * ((peers < values[i, a]).sum() + 0.5 * (peers == values[i, a]).sum()) / len(peers)
+                assert ranks[i, a] == pytest.approx(expected)
+    
+    def test_rank_against_breakpoints(self):
+        """Test interpolation against a cohort breakpoint table."""
+        breakpoints = cohort_breakpoints(np.arange(101, dtype=float)[:, None])
+        ranks = rank_against(breakpoints, np.array([42.5]))
+        assert ranks[0] == pytest.approx(42.5)
+        assert rank_against(breakpoints, np.array([-5.0]))[0] == 0
+        assert np.isnan(rank_against(breakpoints, np.array([np.nan]))[0])
+    
+    @pytest.mark.asyncio
+    async def test_recompute_and_incremental_refresh(self, db_session: AsyncSession):
+        """Test the batch ranking and re-ranking on a new evaluation."""
+        talents = [
+            Talent(
+                talent_id=f"NTSP-P{i}", first_name="Pct", last_name=f"T{i}",
+                date_of_birth=date(2000, 1, 1), nationality="Moroccan", primary_position="CB",
+            )
+            for i in range(5)
+        ]
+        db_session.add_all(talents)
+        await db_session.commit()
+        db_session.add_all([
+            TalentEvaluation(
+                evaluation_id=f"EVAL-P{i}", talent_id=talent.id, evaluation_date=date(2026, 1, 1),
+                score_speed=(i + 1) * 10, overall_score=50,
+            )
+            for i, talent in enumerate(talents)
+        ])
+        await db_session.commit()
+        
+        assert await recompute_percentiles(db_session) == {"talents": 5, "cohorts": 1}
+        rows = {
+            row.talent_id: row
+            for row in (await db_session.execute(select(TalentPercentile))).scalars()
+        }
+        assert [rows[t.id].speed for t in talents] == [10, 30, 50, 70, 90]
+        assert {rows[t.id].overall for t in talents} == {50}
+        assert rows[talents[0].id].passing is None
+        
+        # A second evaluation lifts the slowest talent's mean speed to 30
+        db_session.add(TalentEvaluation(
+            evaluation_id="EVAL-P9", talent_id=talents[0].id, evaluation_date=date(2026, 2, 1),
+            score_speed=50, overall_score=50,
+        ))
+        await db_session.commit()
+        row = await db_session.get(TalentPercentile, talents[0].id, populate_existing=True)
+        assert row.speed == 50
+        assert row.cohort == "CB|Senior|moroccan"
+
+
+class TestTalentTrends:
+    """Test evaluation score trends."""
+    
+    def test_fit_matches_polyfit(self):
+        """Test the grouped fits against per-talent polynomial fits."""
+        rng = np.random.default_rng(3)
+        talent_ids = rng.integers(0, 20, size=400)
+        days = rng.integers(19000, 20000, size=400)
+        y = 50 + talent_ids * (days - 19000) / 365.25 + rng.normal(0, 3, size=400)
+        missing = y.copy()
+        missing[::7] = np.nan
+        
+        trends = fit_trends(talent_ids, days, {
+            "overall": y, "technical": missing, "physical": y, "mental": y,
+        })
+        for i in (0, 9, 19):
+            mask = talent_ids == trends["talent_id"][i]
+            t = days[mask] / 365.25
+            assert trends["slope"][i] == pytest.approx(np.polyfit(t, y[mask], 1)[0])
+            assert trends["acceleration"][i] == pytest.approx(2 * np.polyfit(t, y[mask], 2)[0])
+            keep = mask & ~np.isnan(missing)
+            assert trends["technical_slope"][i] == pytest.approx(
+                np.polyfit(days[keep] / 365.25, missing[keep], 1)[0]
+            )
+            assert 0 <= trends["confidence"][i] <= 1
+    
+    def test_single_evaluation_has_no_slope(self):
+        """Test that a lone evaluation gives no slope."""
+        series = np.array([70.0])
+        trends = fit_trends(np.array([1]), np.array([19000]), {
+            name: series for name in ("overall", "technical", "physical", "mental")
+        })
+        assert np.isnan(trends["slope"][0]) and np.isnan(trends["acceleration"][0])
+        assert trends["current_score"][0] == 70
+    
+    @pytest.mark.asyncio
+    async def test_recompute_trends(self, db_session: AsyncSession):
+        """Test the batch fit into the trend table."""
+        talent = Talent(
+            talent_id="NTSP-R1", first_name="Rising", last_name="Star",
+            date_of_birth=date(2008, 1, 1), nationality="Moroccan", primary_position="ST",
+        )
+        db_session.add(talent)
+        await db_session.commit()
+        db_session.add_all([
+            TalentEvaluation(
+                evaluation_id=f"EVAL-R{i}", talent_id=talent.id,
+                evaluation_date=date(2024 + i, 1, 1), overall_score=60 + 5 * i,
+            )
+            for i in range(3)
+        ])
+        await db_session.commit()
+        
+        assert await recompute_trends(db_session) == 1
+        trend = await db_session.get(TalentTrend, talent.id)
+        assert trend.evaluations == 3
+        assert trend.slope == pytest.approx(5, rel=0.01)
+        assert trend.confidence == pytest.approx(1)
+        assert trend.current_score == pytest.approx(70, abs=0.01)
+        assert (trend.first_evaluation, trend.last_evaluation) == (date(2024, 1, 1), date(2026, 1, 1))
+        assert trend.technical_slope is None
+
+
+async def _byte_stream(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+class TestTalentImport:
+    """Test bulk talent import."""
+    
+    CSV = (
+        "first_name,last_name,date_of_birth,nationality,primary_position,current_club,notes\r\n"
+        'Yassine,Bounou,2008-04-05,Moroccan,GK,Sevilla,"two\nlines, ""quoted"""\r\n'
+        "Bad,Date,2008-13-45,Moroccan,CM,,\r\n"
+        "Achraf,Hakimi,2009-11-04,Moroccan,RB,,\r\n"
+    ).encode()
+    
+    @pytest.mark.asyncio
+    async def test_parse_csv_across_chunk_boundaries(self):
+        """Test that records survive arbitrary byte chunking."""
+        records = [record async for record in parse_records(_byte_stream(self.CSV, 7), "csv")]
+        assert [row for row, _ in records] == [1, 2, 3]
+        assert records[0][1]["notes"] == 'two\nlines, "quoted"'
+        assert "current_club" not in records[2][1]
+    
+    def test_detect_format(self):
+        """Test format detection from the content type."""
+        assert detect_format("text/csv; charset=utf-8") == "csv"
+        assert detect_format("application/json", "ndjson") == "ndjson"
+        with pytest.raises(ValidationException):
+            detect_format("application/json")
+    
+    @pytest.mark.asyncio
+    async def test_import_reports_errors_and_maintains_search(self, db_session: AsyncSession):
+        """Test row errors, inserts, rollups and search documents."""
+        progress = await import_talents(
+            db_session, _byte_stream(self.CSV, 16), start_import("talents", "csv"), "importer",
+        )
+        assert (progress.rows, progress.imported, progress.failed) == (3, 2, 1)
+        assert progress.errors[0]["row"] == 2
+        assert progress.errors[0]["errors"][0]["field"] == "date_of_birth"
+        
+        talents = (await db_session.execute(select(Talent).order_by(Talent.id))).scalars().all()
+        assert [t.last_name for t in talents] == ["Bounou", "Hakimi"]
+        assert len({t.talent_id for t in talents}) == 2
+        assert talents[0].created_by == "importer"
+        
+        rollups = await read_rollups(db_session, "talents")
+        assert rollups.count("talents") == 2
+        assert rollups.count("talents.position", "GK") == 1
+        
+        ranking = search_ranking(db_session.bind.dialect.name, "bounou")
+        found = (await db_session.execute(select(ranking.c.talent_id))).scalars().all()
+        assert found == [talents[0].id]
+    
+    @pytest.mark.asyncio
+    async def test_ndjson_records(self, db_session: AsyncSession):
+        """Test NDJSON rows and malformed lines."""
+        body = (
+            b'{"first_name":"N","last_name":"D","date_of_birth":"2009-01-01",'
+            b'"nationality":"French","primary_position":"LB"}\n\n[1]\n{oops\n'
+        )
+        progress = await import_talents(
+            db_session, _byte_stream(body, 10), start_import("talents", "ndjson"), "importer",
+        )
+        assert (progress.imported, progress.failed) == (1, 2)
+        assert [error["row"] for error in progress.errors] == [2, 3]
+
+
+class TestEvaluationBatch:
+    """Test batch evaluation submission."""
+    
+    def test_batch_scores_match_single(self):
+        """Test the vectorized overall scores against the per-evaluation ones."""
+        rng = np.random.default_rng(5)
+        evaluations = [
+            {name: int(rng.integers(1, 101)) for name in rng.choice(ATTRIBUTES, size=int(k), replace=False)}
+            for k in rng.integers(0, 10, size=200)
+        ]
+        assert calculate_overall_scores_batch(evaluations) == [
+            calculate_overall_scores(evaluation) for evaluation in evaluations
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_batch_updates_each_talent_once(self, db_session: AsyncSession):
+        """Test inserts across talents and the running aggregates."""
+        talents = [
+            Talent(
+                talent_id=f"NTSP-B{i}", first_name="Batch", last_name=f"T{i}",
+                date_of_birth=date(2009, 1, 1), nationality="Moroccan", primary_position="CM",
+            )
+            for i in range(2)
+        ]
+        db_session.add_all(talents)
+        await db_session.commit()
+        
+        request = EvaluationBatchCreate(evaluations=[
+            {"talent_id": talents[i % 2].id, "evaluation_date": "2026-03-01", "score_passing": 40 + 10 * i}
+            for i in range(4)
+        ])
+        response = await create_evaluations_batch(request, db_session, None)
+        
+        assert [e.talent_id for e in response.data] == [talents[i % 2].id for i in range(4)]
+        assert [e.overall_score for e in response.data] == [40, 50, 60, 70]
+        assert response.meta == {"evaluations": 4, "talents": 2}
+        assert [(t.evaluation_count, t.overall_score) for t in talents] == [(2, 50), (2, 60)]
+        
+        with pytest.raises(NotFoundException):
+            await create_evaluations_batch(
+                EvaluationBatchCreate(evaluations=[{"talent_id": 0, "evaluation_date": "2026-03-01"}]),
+                db_session, None,
+            )
+
+
+class TestTalentExport:
+    """Test streaming talent export."""
+    
+    @pytest.mark.asyncio
+    async def test_stream_csv_and_ndjson(self, db_session: AsyncSession):
+        """Test header, partitions and encodings."""
+        db_session.add_all([
+            Talent(
+                talent_id=f"NTSP-X{i}", first_name="Export", last_name=f"Row, {i}",
+                date_of_birth=date(2008, 1, 1 + i), nationality="Moroccan", primary_position="CM",
+            )
+            for i in range(5)
+        ])
+        await db_session.commit()
+        
+        query = select(*export_columns(Talent, TalentResponse)).order_by(Talent.id)
+        chunks = [chunk async for chunk in stream_export(db_session.bind, query, "csv", batch_size=2)]
+        assert len(chunks) == 4  # Header + 3 partitions
+        
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        assert rows[0][:3] == ["first_name", "last_name", "date_of_birth"]
+        assert "percentile" not in rows[0]
+        assert rows[1][:3] == ["Export", "Row, 0", "2008-01-01"]
+        assert len(rows) == 6
+        
+        lines = b"".join([
+            chunk async for chunk in stream_export(db_session.bind, query.limit(1), "ndjson")
+        ]).decode().splitlines()
+        assert json.loads(lines[0])["date_of_birth"] == "2008-01-01"
+
+
+
+class TestTalentSnapshots:
+    """Test columnar analytics snapshots."""
+    
+    @pytest.mark.asyncio
+    async def test_full_then_incremental(self, db_session: AsyncSession, tmp_path, monkeypatch):
+        """Test typed files, watermark and manifest chain."""
+        import pyarrow.parquet as pq
+        
+        monkeypatch.setattr(settings, "SNAPSHOT_OVERLAP_SECONDS", 0)
+        db_session.add_all([
+            Talent(
+                talent_id=f"NTSP-S{i}", first_name="Snap", last_name=f"Shot{i}",
+                date_of_birth=date(2007, 1, 1 + i), nationality="Moroccan", primary_position="ST",
+            )
+            for i in range(3)
+        ])
+        await db_session.commit()
+        
+        manifest = await run_snapshot(db_session.bind, str(tmp_path), tables=["talents"])
+        entry = manifest["tables"]["talents"]
+        assert [f["mode"] for f in entry["files"]] == ["full"]
+        
+        table = pq.read_table(tmp_path / entry["files"][0]["path"])
+        assert table.num_rows == 3
+        assert table.schema == arrow_schema(Talent)
+        assert table.column("date_of_birth").to_pylist()[0] == date(2007, 1, 1)
+        
+        # Nothing changed: no new file, watermark advances
+        manifest = await run_snapshot(db_session.bind, str(tmp_path), tables=["talents"])
+        assert len(manifest["tables"]["talents"]["files"]) == 1
+        
+        talent = (await db_session.execute(select(Talent).where(Talent.talent_id == "NTSP-S1"))).scalar_one()
+        talent.current_club = "Raja"
+        await db_session.commit()
+        
+        manifest = await run_snapshot(db_session.bind, str(tmp_path), tables=["talents"])
+        files = manifest["tables"]["talents"]["files"]
+        assert [f["mode"] for f in files] == ["full", "incremental"]
+        changed = pq.read_table(tmp_path / files[1]["path"])
+        assert changed.column("talent_id").to_pylist() == ["NTSP-S1"]
+        assert load_manifest(tmp_path) == manifest
+        
+        # A full run replaces the chain
+        manifest = await run_snapshot(db_session.bind, str(tmp_path), format="arrow", full=True, tables=["talents"])
+        files = manifest["tables"]["talents"]["files"]
+        assert [f["format"] for f in files] == ["arrow"]
+        assert sorted(p.name for p in (tmp_path / "talents").iterdir()) == [files[0]["path"].split("/")[1]]
+    
+    @pytest.mark.asyncio
+    async def test_late_commits_picked_up_by_overlap(self, db_session: AsyncSession, tmp_path):
+        """Test that a row stamped before the watermark but committed after it is exported."""
+        import pyarrow.parquet as pq
+        
+        db_session.add(Talent(
+            talent_id="NTSP-S5", first_name="Snap", last_name="Early",
+            date_of_birth=date(2007, 1, 1), nationality="Moroccan", primary_position="ST",
+        ))
+        await db_session.commit()
+        manifest = await run_snapshot(db_session.bind, str(tmp_path), tables=["talents"])
+        watermark = datetime.fromisoformat(manifest["tables"]["talents"]["watermark"])
+        
+        # Stamped by a transaction that began before the run and committed after it
+        db_session.add(Talent(
+            talent_id="NTSP-S6", first_name="Snap", last_name="Late",
+            date_of_birth=date(2007, 1, 1), nationality="Moroccan", primary_position="ST",
+            created_at=watermark - timedelta(seconds=5), updated_at=watermark - timedelta(seconds=5),
+        ))
+        await db_session.commit()
+        
+        files = (await run_snapshot(db_session.bind, str(tmp_path), tables=["talents"]))["tables"]["talents"]["files"]
+        assert files[-1]["mode"] == "incremental"
+        assert "NTSP-S6" in pq.read_table(tmp_path / files[-1]["path"]).column("talent_id").to_pylist()
+    
+    @pytest.mark.asyncio
+    async def test_failed_full_run_keeps_chain(self, db_session: AsyncSession, tmp_path, monkeypatch):
+        """Test that superseded files outlive a run that fails before the manifest."""
+        from app.services import snapshots
+        
+        db_session.add(Talent(
+            talent_id="NTSP-S9", first_name="Snap", last_name="Keep",
+            date_of_birth=date(2007, 1, 1), nationality="Moroccan", primary_position="ST",
+        ))
+        await db_session.commit()
+        manifest = await run_snapshot(db_session.bind, str(tmp_path), tables=["talents"])
+        
+        def fail(output, manifest):
+            raise OSError("disk full")
+        monkeypatch.setattr(snapshots, "_write_manifest", fail)
+        with pytest.raises(OSError):
+            await run_snapshot(db_session.bind, str(tmp_path), full=True, tables=["talents"])
+        assert load_manifest(tmp_path) == manifest
+        assert all((tmp_path / f["path"]).exists() for f in manifest["tables"]["talents"]["files"])